@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Benchmarks import the app's modules the way main.py does, with Backend/ on the path.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,253 @@
+"""
+Drive a realistic mix of web (therapist) and mobile (app user) requests and report
+latency percentiles and throughput per route.
+
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8000 --concurrency 50 --duration 60
+    python -m benchmarks.loadtest --in-process --stand-ins --mix mobile
+
+Every virtual user logs in once (therapists through /Therapist_Login, app users through
+/loginUser) and then loops over weighted requests with the rows the seeder gave its
+account. --in-process runs the app through httpx's ASGI transport instead of a server;
+--stand-ins additionally swaps Redis for fakeredis and MongoDB for mongomock-motor
+(MySQL has no faithful in-process stand-in, so it always needs a server).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.seed import DEFAULT_MANIFEST, RESULTS_DIR, owner  # noqa: E402
+
+# (weight, route template, path builder); builders get the virtual user and a Random.
+WEB_MIX = (
+    (10, "/front-page", lambda user, rng: "/front-page"),
+    (15, "/appointments", lambda user, rng: "/appointments"),
+    (8, "/appointments/{appointment_id}", lambda user, rng: f"/appointments/{rng.choice(user['appointments'])}"),
+    (12, "/patients", lambda user, rng: "/patients"),
+    (8, "/patients/{patient_id}", lambda user, rng: f"/patients/{rng.choice(user['patients'])}"),
+    (10, "/messages", lambda user, rng: "/messages"),
+    (4, "/messages/{message_id}", lambda user, rng: f"/messages/{rng.choice(user['messages'])}"),
+    (12, "/api/messages/unread-count", lambda user, rng: "/api/messages/unread-count"),
+    (6, "/treatment-plans", lambda user, rng: "/treatment-plans"),
+    (4, "/exercises", lambda user, rng: "/exercises"),
+    (4, "/reports/patients", lambda user, rng: "/reports/patients"),
+    (5, "/reports/patients/{patient_id}", lambda user, rng: f"/reports/patients/{rng.choice(user['patients'])}"),
+    (2, "/profile", lambda user, rng: "/profile"),
+)
+MOBILE_MIX = (
+    (20, "/therapists", lambda user, rng: "/therapists"),
+    (10, "/therapists/{id}", lambda user, rng: f"/therapists/{rng.randint(1, user['therapists'])}"),
+    (10, "/therapists/{id}/availability", lambda user, rng: f"/therapists/{rng.randint(1, user['therapists'])}/availability"),
+    (5, "/therapists/{id}/reviews", lambda user, rng: f"/therapists/{rng.randint(1, user['therapists'])}/reviews"),
+    (15, "/mobile/bootstrap", lambda user, rng: "/mobile/bootstrap"),
+    (12, "/user/appointments", lambda user, rng: "/user/appointments"),
+    (12, "/user/messages", lambda user, rng: "/user/messages"),
+    (6, "/user/therapist", lambda user, rng: "/user/therapist"),
+    (6, "/user/profile", lambda user, rng: "/user/profile"),
+    (4, "/getUserInfo", lambda user, rng: "/getUserInfo"),
+)
+MOBILE_USER_AGENT = "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 Mobile Safari/537.36"
+WEB_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/126.0 Safari/537.36"
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def owned_ids(therapist_id, count, therapists, limit=50):
+    """Ids of rows seeded for `therapist_id` (see seed.owner), at most `limit` of them."""
+    return [row_id for row_id in range(therapist_id, count + 1, therapists)][:limit] or [1]
+
+
+def therapist_account(therapist_id, sizes):
+    T = sizes["therapists"]
+    return {
+        "kind": "web",
+        "login": ("/Therapist_Login", {"data": {"email": f"therapist{therapist_id}@bench.local"}}),
+        "patients": owned_ids(therapist_id, sizes["patients"], T),
+        "appointments": owned_ids(therapist_id, sizes["appointments"], T),
+        "messages": owned_ids(therapist_id, sizes["messages"], T),
+    }
+
+
+def mobile_account(user_id, sizes):
+    return {
+        "kind": "mobile",
+        "login": ("/loginUser", {"json": {"username": f"user{user_id}"}}),
+        "therapists": sizes["therapists"],
+        "therapist_id": owner(user_id, sizes["therapists"]),
+    }
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route, seconds, status):
+        self.latencies[route].append(seconds)
+        self.statuses[route][status] += 1
+        if status == "error" or status >= 500:
+            self.errors[route] += 1
+
+    def report(self, elapsed):
+        rows = []
+        everything = []
+        for route, samples in sorted(self.latencies.items(), key=lambda item: -len(item[1])):
+            ordered = sorted(samples)
+            everything.extend(ordered)
+            rows.append(self._row(route, ordered, elapsed))
+        return {"elapsed_seconds": round(elapsed, 1), "routes": rows, "total": self._row("TOTAL", sorted(everything), elapsed)}
+
+    def _row(self, route, ordered, elapsed):
+        ms = lambda value: round(value * 1000, 1) if value is not None else None  # noqa: E731
+        return {
+            "route": route,
+            "requests": len(ordered),
+            "errors": sum(self.errors.values()) if route == "TOTAL" else self.errors[route],
+            "rps": round(len(ordered) / elapsed, 1) if elapsed else None,
+            "p50_ms": ms(percentile(ordered, 0.50)),
+            "p95_ms": ms(percentile(ordered, 0.95)),
+            "p99_ms": ms(percentile(ordered, 0.99)),
+            "max_ms": ms(ordered[-1] if ordered else None),
+            "statuses": {} if route == "TOTAL" else {str(code): count for code, count in self.statuses[route].items()},
+        }
+
+
+def print_report(report):
+    header = f"{'route':<36} {'reqs':>7} {'err':>5} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in report["routes"] + [report["total"]]:
+        print(f"{row['route'][:36]:<36} {row['requests']:>7} {row['errors']:>5} {row['rps']:>7} "
+              f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8} {row['max_ms']:>8}")
+    print(f"{report['elapsed_seconds']}s measured; latencies in ms")
+
+
+async def login(client, account, password):
+    path, body = account["login"]
+    body = {key: {**value, "password": password} for key, value in body.items()}
+    response = await client.post(path, follow_redirects=False, **body)
+    if "session_id" not in client.cookies:
+        raise RuntimeError(f"Login at {path} failed with {response.status_code}: {response.text[:200]}")
+
+
+async def virtual_user(make_client, account, password, mix, stats, deadline, warmup_until, think, rng):
+    weights = [weight for weight, _, _ in mix]
+    user_agent = MOBILE_USER_AGENT if account["kind"] == "mobile" else WEB_USER_AGENT
+    async with make_client(user_agent) as client:
+        await login(client, account, password)
+        while time.monotonic() < deadline:
+            _, route, build = rng.choices(mix, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = await client.get(build(account, rng), follow_redirects=False)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = "error"
+            if time.monotonic() >= warmup_until:
+                stats.record(route, time.perf_counter() - started, status)
+            if think:
+                await asyncio.sleep(rng.expovariate(1 / think))
+
+
+def install_stand_ins():
+    """Swap the Redis client and Mongo clients for in-process fakes before the app starts."""
+    try:
+        import fakeredis
+        from mongomock_motor import AsyncMongoMockClient
+        import mongomock
+    except ImportError as e:
+        raise SystemExit(f"--stand-ins needs the packages in benchmarks/requirements.txt ({e})")
+
+    import connections.mongo_db as mongo_db
+    import connections.redis_database as redis_database
+
+    original, fake = redis_database.r, fakeredis.FakeAsyncRedis(decode_responses=True)
+    # Modules star-import `r`, so every module-level binding has to be replaced.
+    for module in list(sys.modules.values()):
+        if getattr(module, "r", None) is original:
+            module.r = fake
+    mongo_db._client = mongomock.MongoClient()
+    mongo_db._async_client = AsyncMongoMockClient()
+
+
+async def run(args):
+    manifest = json.loads(Path(args.manifest).read_text())
+    sizes, password = manifest["sizes"], manifest["password"]
+
+    if args.in_process:
+        os.chdir(Path(__file__).resolve().parent.parent)
+        from main import app
+
+        if args.stand_ins:
+            install_stand_ins()
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+    else:
+        transport, base_url = None, args.base_url.rstrip("/")
+
+    def make_client(user_agent):
+        return httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout,
+                                 headers={"User-Agent": user_agent})
+
+    rng = random.Random(args.seed)
+    web_users = {"web": args.concurrency, "mobile": 0, "mixed": args.concurrency // 2}[args.mix]
+    accounts = [therapist_account(rng.randint(1, sizes["therapists"]), sizes) for _ in range(web_users)]
+    accounts += [mobile_account(rng.randint(1, sizes["users"]), sizes) for _ in range(args.concurrency - web_users)]
+
+    stats = Stats()
+    now = time.monotonic()
+    warmup_until, deadline = now + args.warmup, now + args.warmup + args.duration
+    await asyncio.gather(*(
+        virtual_user(make_client, account, password, WEB_MIX if account["kind"] == "web" else MOBILE_MIX,
+                     stats, deadline, warmup_until, args.think, random.Random(args.seed + i))
+        for i, account in enumerate(accounts)
+    ))
+
+    report = stats.report(min(args.duration, time.monotonic() - warmup_until))
+    report["config"] = {key: value for key, value in vars(args).items()}
+    report["manifest"] = {"rows": manifest["rows"], "sizes": sizes}
+    print_report(report)
+
+    output = Path(args.output or RESULTS_DIR / f"loadtest-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Report written to {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the PerceptronX API with a web/mobile request mix")
+    parser.add_argument("--base-url", default=os.getenv("BENCH_BASE_URL", "http://127.0.0.1:8000"))
+    parser.add_argument("--in-process", action="store_true", help="call the ASGI app directly instead of a server")
+    parser.add_argument("--stand-ins", action="store_true", help="with --in-process: fake Redis and MongoDB")
+    parser.add_argument("--manifest", default=str(DEFAULT_MANIFEST))
+    parser.add_argument("--mix", choices=("web", "mobile", "mixed"), default="mixed")
+    parser.add_argument("--concurrency", type=int, default=20, help="virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds run before measuring")
+    parser.add_argument("--think", type=float, default=0, help="mean think time between requests, seconds")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default=None, help="JSON report path (default benchmarks/results/)")
+    args = parser.parse_args()
+    if args.stand_ins and not args.in_process:
+        parser.error("--stand-ins requires --in-process")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+Seed the init.sql schema with synthetic data for load tests.
+
+    docker compose -f benchmarks/docker-compose.yml up -d
+    python -m benchmarks.seed --rows 100000 --reset
+
+--rows is the approximate total number of MySQL rows (10k to 10M); every table is
+sized as a fixed share of it. Ids are explicit and deterministic, so the load test
+can derive which patients, appointments and messages belong to which therapist from
+the manifest written at the end. Every therapist and app user gets BENCH_PASSWORD.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import time
+from pathlib import Path
+
+import bcrypt
+import mysql.connector
+
+BENCH_PASSWORD = os.getenv("BENCH_PASSWORD", "bench-password")
+BATCH_SIZE = int(os.getenv("BENCH_SEED_BATCH", 5000))
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_MANIFEST = RESULTS_DIR / "manifest.json"
+
+SEEDED_TABLES = (
+    "Therapists", "users", "Patients", "Exercises", "TreatmentPlans", "TreatmentPlanExercises",
+    "PatientExerciseProgress", "PatientMetrics", "PatientNotes", "Appointments", "AppointmentRequests",
+    "Messages", "Reviews", "feedback",
+)
+
+FIRST_NAMES = ("Ana", "Ben", "Carla", "Diego", "Ella", "Farid", "Grace", "Hiro", "Iris", "Jun", "Kofi", "Lea")
+LAST_NAMES = ("Reyes", "Santos", "Cruz", "Garcia", "Tan", "Lim", "Mendoza", "Bautista", "Ocampo", "Navarro")
+SPECIALTIES = ("Orthopedic Physical Therapy", "Sports Physical Therapy", "Geriatric Physical Therapy",
+               "Neurological Physical Therapy", "Manual Therapy", "Pain Management")
+DIAGNOSES = ("Lower back pain", "ACL reconstruction", "Frozen shoulder", "Ankle sprain", "Stroke recovery")
+FREQUENCIES = ("Daily", "3x per week", "2x per week", "Weekly")
+
+
+def table_sizes(rows):
+    """Rows per table for a target total; shares roughly follow a clinic's real data."""
+    therapists = max(5, rows // 2000)
+    patients = max(therapists, rows // 20)
+    return {
+        "therapists": therapists,
+        "users": patients,
+        "patients": patients,
+        "exercises": max(20, min(500, rows // 1000)),
+        "plans": patients,
+        "plan_exercises": patients * 3,
+        "progress": rows // 4,
+        "metrics": rows // 50,
+        "notes": rows // 50,
+        "appointments": rows // 5,
+        "appointment_requests": rows // 50,
+        "messages": rows // 5,
+        "reviews": min(rows // 100, therapists * 20),
+        "feedback": rows // 200,
+    }
+
+
+def owner(row_id, therapists):
+    """Therapist owning row `row_id`; the load test uses the same rule to pick its own rows."""
+    return (row_id - 1) % therapists + 1
+
+
+def patient_of(row_id, sizes):
+    """A patient of owner(row_id): patient ids t, t + T, t + 2T, ... belong to therapist t."""
+    therapists = sizes["therapists"]
+    per_therapist = max(1, sizes["patients"] // therapists)
+    return owner(row_id, therapists) + therapists * ((row_id - 1) // therapists % per_therapist)
+
+
+def insert_rows(cursor, table, columns, rows):
+    """Multi-row INSERTs of BATCH_SIZE rows each."""
+    statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    batch = []
+    inserted = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            cursor.executemany(statement, batch)
+            inserted += len(batch)
+            batch.clear()
+    if batch:
+        cursor.executemany(statement, batch)
+        inserted += len(batch)
+    return inserted
+
+
+def generate(sizes, rng, password_hash, today):
+    """(table, columns, row generator) for every seeded table, parents first."""
+    T, P = sizes["therapists"], sizes["patients"]
+
+    def day(offset_range):
+        return today + datetime.timedelta(days=rng.randint(*offset_range))
+
+    def name():
+        return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+    yield "Therapists", ("id", "first_name", "last_name", "company_email", "password", "profile_image", "bio",
+                         "experience_years", "specialties", "education", "languages", "address", "rating",
+                         "review_count", "is_accepting_new_patients", "average_session_length"), (
+        (t, *name(), f"therapist{t}@bench.local", password_hash, f"avatar-{t % 10}.jpg", "Bench therapist",
+         rng.randint(0, 30), json.dumps(rng.sample(SPECIALTIES, 3)), json.dumps(["Bench University"]),
+         json.dumps(["English"]), "Bench City", round(rng.uniform(3, 5), 1), 0, rng.random() < 0.9, 60)
+        for t in range(1, T + 1)
+    )
+    yield "users", ("user_id", "username", "email", "password_hash"), (
+        (u, f"user{u}", f"patient{u}@bench.local", password_hash) for u in range(1, sizes["users"] + 1)
+    )
+    yield "Patients", ("patient_id", "therapist_id", "first_name", "last_name", "email", "phone", "date_of_birth",
+                       "diagnosis", "status"), (
+        (p, owner(p, T), *name(), f"patient{p}@bench.local", f"0917{p:07d}", day((-30000, -7000)),
+         rng.choice(DIAGNOSES), rng.choices(("Active", "Inactive", "At Risk"), (8, 1, 1))[0])
+        for p in range(1, P + 1)
+    )
+    yield "Exercises", ("exercise_id", "therapist_id", "category_id", "name", "description", "video_type",
+                        "duration", "difficulty", "instructions"), (
+        (e, None, rng.randint(1, 8), f"Bench exercise {e}", "Synthetic exercise", "none", rng.randint(5, 60),
+         rng.choice(("Beginner", "Intermediate", "Advanced")), "Repeat slowly")
+        for e in range(1, sizes["exercises"] + 1)
+    )
+    yield "TreatmentPlans", ("plan_id", "patient_id", "therapist_id", "name", "description", "start_date",
+                             "end_date", "status"), (
+        (p, p, owner(p, T), f"Plan {p}", "Synthetic plan", day((-120, 0)), day((1, 120)),
+         rng.choices(("Active", "Completed", "Cancelled"), (7, 2, 1))[0])
+        for p in range(1, sizes["plans"] + 1)
+    )
+    yield "TreatmentPlanExercises", ("plan_exercise_id", "plan_id", "exercise_id", "sets", "repetitions",
+                                     "frequency", "duration"), (
+        (x, (x - 1) // 3 + 1, rng.randint(1, sizes["exercises"]), rng.randint(1, 4), rng.randint(5, 15),
+         rng.choice(FREQUENCIES), rng.randint(5, 30))
+        for x in range(1, sizes["plan_exercises"] + 1)
+    )
+    yield "PatientExerciseProgress", ("progress_id", "patient_id", "plan_exercise_id", "completion_date",
+                                      "sets_completed", "repetitions_completed", "duration_seconds", "pain_level",
+                                      "difficulty_level", "form_score"), (
+        (i, (x - 1) // 3 + 1, x, day((-90, 0)), rng.randint(1, 4), rng.randint(5, 15), rng.randint(60, 1800),
+         rng.randint(0, 10), rng.randint(1, 5), round(rng.uniform(40, 100), 2))
+        for i in range(1, sizes["progress"] + 1)
+        for x in (rng.randint(1, sizes["plan_exercises"]),)
+    )
+    yield "PatientMetrics", ("metric_id", "patient_id", "therapist_id", "measurement_date", "adherence_rate",
+                             "pain_level", "functionality_score", "recovery_progress"), (
+        (i, p, owner(p, T), day((-180, 0)), round(rng.uniform(20, 100), 2), rng.randint(0, 10),
+         rng.randint(0, 100), round(rng.uniform(0, 100), 2))
+        for i in range(1, sizes["metrics"] + 1)
+        for p in (rng.randint(1, P),)
+    )
+    yield "PatientNotes", ("note_id", "patient_id", "therapist_id", "note_text"), (
+        (i, p, owner(p, T), "Synthetic session note") for i in range(1, sizes["notes"] + 1)
+        for p in (rng.randint(1, P),)
+    )
+    yield "Appointments", ("appointment_id", "patient_id", "therapist_id", "appointment_date", "appointment_time",
+                           "duration", "status", "notes"), (
+        (a, patient_of(a, sizes), owner(a, T), day((-180, 60)), f"{rng.randint(8, 17):02d}:{rng.choice((0, 30)):02d}:00",
+         rng.choice((30, 45, 60)), rng.choices(("Scheduled", "Completed", "Cancelled", "No-Show"), (4, 4, 1, 1))[0],
+         "Type: Regular Session")
+        for a in range(1, sizes["appointments"] + 1)
+    )
+    yield "AppointmentRequests", ("request_id", "user_id", "therapist_id", "appointment_date", "appointment_time",
+                                  "duration", "notes", "status"), (
+        (i, rng.randint(1, sizes["users"]), owner(i, T), day((1, 60)), f"{rng.randint(8, 17):02d}:00:00", 60,
+         "Synthetic request", rng.choice(("Pending", "Approved", "Rejected")))
+        for i in range(1, sizes["appointment_requests"] + 1)
+    )
+    yield "Messages", ("message_id", "sender_id", "sender_type", "recipient_id", "recipient_type", "subject",
+                       "content", "is_read", "created_at"), (
+        (m, rng.randint(1, T), "therapist", owner(m, T), "therapist", f"Subject {m}", "Synthetic message body",
+         rng.random() < 0.7, datetime.datetime.combine(day((-365, 0)), datetime.time(rng.randint(0, 23))))
+        for m in range(1, sizes["messages"] + 1)
+    )
+    yield "Reviews", ("review_id", "therapist_id", "patient_id", "rating", "comment"), (
+        (i, owner(i, T), patient_of(i, sizes), rng.randint(3, 5), "Synthetic review")
+        for i in range(1, sizes["reviews"] + 1)
+    )
+    yield "feedback", ("feedback_id", "user_id", "message", "rating"), (
+        (i, rng.randint(1, sizes["users"]), "Synthetic feedback", rng.randint(1, 5))
+        for i in range(1, sizes["feedback"] + 1)
+    )
+
+
+def seed_mysql(connection, sizes, seed=42, reset=False):
+    rng = random.Random(seed)
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode(), bcrypt.gensalt(rounds=4)).decode()
+    cursor = connection.cursor()
+    cursor.execute("SET foreign_key_checks = 0")
+    cursor.execute("SET unique_checks = 0")
+    try:
+        if reset:
+            for table in SEEDED_TABLES:
+                cursor.execute(f"TRUNCATE TABLE {table}")
+
+        for table, columns, rows in generate(sizes, rng, password_hash, datetime.date.today()):
+            started = time.perf_counter()
+            inserted = insert_rows(cursor, table, columns, rows)
+            connection.commit()
+            print(f"{table}: {inserted} rows in {time.perf_counter() - started:.1f}s")
+    finally:
+        cursor.execute("SET unique_checks = 1")
+        cursor.execute("SET foreign_key_checks = 1")
+        cursor.close()
+
+
+def seed_mongo(database, count, sizes, seed=42, reset=False):
+    """Annotation documents in the shape the inference routes write."""
+    rng = random.Random(seed)
+    collection = database["annotations"]
+    if reset:
+        collection.delete_many({})
+
+    now = datetime.datetime.now()
+    batch = []
+    for i in range(count):
+        batch.append({
+            "user_id": rng.randint(1, sizes["users"]),
+            "image": f"bench_{i}.jpg",
+            "annotations": [
+                {"class": 0, "label": "person", "confidence": round(rng.uniform(0.3, 1), 3),
+                 "bbox": [rng.randint(0, 300), rng.randint(0, 300), rng.randint(300, 640), rng.randint(300, 640)]}
+                for _ in range(rng.randint(0, 4))
+            ],
+            "size": rng.randint(20000, 400000),
+            "save_location": f"uploads/bench_{i}.jpg",
+            "model_used": "yolov8n.pt",
+            "timestamp": now - datetime.timedelta(seconds=rng.randint(0, 180 * 86400)),
+            "status": "completed",
+            "confidence_threshold": 0.25,
+            "processing_time": round(rng.uniform(0.02, 0.3), 3),
+            "device": "cpu",
+        })
+        if len(batch) >= BATCH_SIZE:
+            collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        collection.insert_many(batch, ordered=False)
+    print(f"annotations: {count} documents")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed MySQL (and optionally MongoDB) with synthetic PerceptronX data")
+    parser.add_argument("--rows", type=int, default=100_000, help="approximate total MySQL rows, 10k-10M")
+    parser.add_argument("--annotations", type=int, default=None, help="Mongo annotation documents (default rows/20)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="truncate the seeded tables / collection first")
+    parser.add_argument("--skip-mongo", action="store_true")
+    parser.add_argument("--manifest", default=str(DEFAULT_MANIFEST))
+    args = parser.parse_args()
+
+    sizes = table_sizes(args.rows)
+    connection = mysql.connector.connect(
+        host=os.getenv("MYSQL_HOST", "127.0.0.1"),
+        port=int(os.getenv("MYSQL_PORT", 3306)),
+        user=os.getenv("MYSQL_USER", "root"),
+        password=os.getenv("MYSQL_PASSWORD", "root"),
+        database=os.getenv("MYSQL_DB", "perceptronx"),
+    )
+    try:
+        seed_mysql(connection, sizes, args.seed, args.reset)
+    finally:
+        connection.close()
+
+    if not args.skip_mongo:
+        from pymongo import MongoClient
+
+        client = MongoClient(f"mongodb://{os.getenv('MONGO_HOST', '127.0.0.1')}:{os.getenv('MONGO_PORT', '27017')}")
+        annotations = args.annotations if args.annotations is not None else args.rows // 20
+        seed_mongo(client["PerceptronX"], annotations, sizes, args.seed, args.reset)
+        client.close()
+
+    manifest = {"rows": args.rows, "seed": args.seed, "password": BENCH_PASSWORD, "sizes": sizes}
+    Path(args.manifest).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.manifest).write_text(json.dumps(manifest, indent=2))
+    print(f"Manifest written to {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
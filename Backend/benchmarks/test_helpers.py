@@ -0,0 +1,120 @@
+"""
+Microbenchmarks for the pure-Python helpers that run per row or per slot on hot pages.
+
+    cd Backend
+    pytest benchmarks/test_helpers.py --benchmark-autosave --benchmark-storage=benchmarks/history
+    pytest benchmarks/test_helpers.py --benchmark-storage=benchmarks/history \
+        --benchmark-compare --benchmark-compare-fail=mean:15%
+
+The first command records a run under benchmarks/history; the second fails when any
+benchmark's mean is more than 15% slower than the last recorded run, which is the
+check to run before a deploy. Sizes match what the pages actually render: a page of
+messages or appointments, a therapist directory, a day of slots.
+"""
+import datetime
+import json
+import random
+
+import pytest
+
+from connections.functions import find_best_matching_image, safely_parse_json_field
+from connections.routers.common import (
+    build_availability_slots, format_message_time, process_appointment_for_calendar, serialize_datetime
+)
+
+ROW_COUNTS = (50, 1000)
+NOW = datetime.datetime(2025, 4, 16, 15, 30)
+
+
+def appointment_rows(count, rng):
+    """Rows as mysql.connector returns them: TIME columns come back as timedelta."""
+    return [
+        {
+            "appointment_id": i,
+            "patient_id": rng.randint(1, 500),
+            "first_name": "Ana",
+            "last_name": "Reyes",
+            "appointment_date": datetime.date(2025, 4, 1) + datetime.timedelta(days=rng.randint(0, 60)),
+            "appointment_time": datetime.timedelta(hours=rng.randint(8, 17), minutes=rng.choice((0, 30))),
+            "duration": rng.choice((30, 45, 60)),
+            "status": "Scheduled",
+            "notes": "Type: Regular Session",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("count", ROW_COUNTS)
+def test_process_appointment_for_calendar(benchmark, count):
+    rows = appointment_rows(count, random.Random(count))
+    result = benchmark(lambda: [process_appointment_for_calendar(row) for row in rows])
+    assert len(result) == count and "appointment_time_12h" in result[0]
+
+
+@pytest.mark.parametrize("count", ROW_COUNTS)
+def test_serialize_datetime(benchmark, count):
+    rows = [process_appointment_for_calendar(row) for row in appointment_rows(count, random.Random(count))]
+    body = benchmark(json.dumps, rows, default=serialize_datetime)
+    assert body.startswith("[")
+
+
+@pytest.mark.parametrize("count", ROW_COUNTS)
+def test_safely_parse_json_field(benchmark, count):
+    rng = random.Random(count)
+    fields = [
+        rng.choice((
+            '["Orthopedic Physical Therapy", "Sports Physical Therapy", "Manual Therapy"]',
+            '[]', None, "", "not json", ["already", "a", "list"],
+        ))
+        for _ in range(count * 3)
+    ]
+    result = benchmark(lambda: [safely_parse_json_field(field, []) for field in fields])
+    assert len(result) == count * 3
+
+
+@pytest.fixture(scope="module")
+def static_dir(tmp_path_factory):
+    """A static tree with as many uploaded images as a busy clinic's user folder."""
+    root = tmp_path_factory.mktemp("static")
+    images = root / "assets" / "images" / "user"
+    images.mkdir(parents=True)
+    for therapist_id in range(1, 2001):
+        (images / f"therapist_{therapist_id}_1744774979.jpg").touch()
+    for avatar in range(10):
+        (images / f"avatar-{avatar}.jpg").touch()
+    return str(root)
+
+
+@pytest.mark.parametrize("case", ("exact", "prefix_fallback", "default_avatar"))
+def test_find_best_matching_image(benchmark, static_dir, case):
+    """One therapist directory page: 50 lookups, each either an exact hit, a prefix scan or a miss."""
+    requested = {
+        "exact": lambda therapist_id: f"therapist_{therapist_id}_1744774979.jpg",
+        "prefix_fallback": lambda therapist_id: f"therapist_{therapist_id}_renamed.jpg",
+        "default_avatar": lambda therapist_id: "missing.jpg",
+    }[case]
+    therapist_ids = list(range(1, 51)) if case != "default_avatar" else list(range(5001, 5051))
+    result = benchmark(lambda: [
+        find_best_matching_image(therapist_id, requested(therapist_id), static_dir) for therapist_id in therapist_ids
+    ])
+    assert len(result) == 50
+
+
+@pytest.mark.parametrize("count", ROW_COUNTS)
+def test_format_message_time(benchmark, count):
+    rng = random.Random(count)
+    timestamps = [NOW - datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 30)) for _ in range(count)]
+    result = benchmark(lambda: [format_message_time(timestamp, NOW) for timestamp in timestamps])
+    assert len(result) == count
+
+
+@pytest.mark.parametrize("booked", (0, 8, 40))
+def test_build_availability_slots(benchmark, booked):
+    rng = random.Random(booked)
+    booked_slots = [
+        {"appointment_time": datetime.timedelta(hours=rng.randint(9, 16), minutes=rng.choice((0, 30))),
+         "duration": rng.choice((30, 60))}
+        for _ in range(booked)
+    ]
+    slots = benchmark(build_availability_slots, "2025-04-16", booked_slots, 60)
+    assert len(slots) == 16
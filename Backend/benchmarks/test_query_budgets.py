@@ -0,0 +1,190 @@
+"""
+Query-count budgets: how many MySQL statements, Redis round trips and Mongo operations
+each page may make, measured per request against a seeded database.
+
+    docker compose -f benchmarks/docker-compose.yml up -d
+    BENCH_QUERY_BUDGETS=1 MYSQL_HOST=127.0.0.1 REDIS_HOST=127.0.0.1 MONGO_HOST=127.0.0.1 \
+        pytest benchmarks/test_query_budgets.py
+
+The suite TRUNCATEs and reseeds the MySQL tables, so it only runs when
+BENCH_QUERY_BUDGETS=1 and never against a database you care about.
+
+Two checks per page:
+- test_within_budget: the counts stay within BUDGETS. The seeded accounts have far more
+  rows than any budget, so a new per-row query fails here.
+- test_counts_do_not_grow_with_rows: the counts are the same before and after the signed-in
+  therapist gets extra patients, appointments and messages. This is the N+1 check.
+Lower a budget when a page gets cheaper; raise one only with a reason in the review.
+"""
+import json
+import os
+import uuid
+
+import pytest
+
+for service in ("MYSQL_HOST", "REDIS_HOST", "MONGO_HOST"):
+    os.environ.setdefault(service, "127.0.0.1")
+
+pytestmark = pytest.mark.skipif(os.getenv("BENCH_QUERY_BUDGETS") != "1",
+                                reason="set BENCH_QUERY_BUDGETS=1 to run against the benchmark databases")
+
+SEED_ROWS = int(os.getenv("BENCH_BUDGET_ROWS", 20000))
+THERAPIST_ID = 1
+USER_ID = 1
+
+# (session kind, path, budget); a path with {patient}/{appointment}/{message} gets one of
+# the signed-in therapist's own rows.
+BUDGETS = (
+    ("therapist", "/front-page", {"mysql": 24, "redis": 1, "mongo": 0}),
+    ("therapist", "/appointments", {"mysql": 6, "redis": 1, "mongo": 0}),
+    ("therapist", "/appointments/{appointment}", {"mysql": 5, "redis": 1, "mongo": 0}),
+    ("therapist", "/patients", {"mysql": 2, "redis": 1, "mongo": 0}),
+    ("therapist", "/patients/{patient}", {"mysql": 5, "redis": 1, "mongo": 0}),
+    ("therapist", "/messages", {"mysql": 7, "redis": 1, "mongo": 0}),
+    ("therapist", "/messages/{message}", {"mysql": 4, "redis": 1, "mongo": 0}),
+    ("therapist", "/api/messages/unread-count", {"mysql": 1, "redis": 1, "mongo": 0}),
+    ("therapist", "/treatment-plans", {"mysql": 2, "redis": 1, "mongo": 0}),
+    ("therapist", "/exercises", {"mysql": 4, "redis": 1, "mongo": 0}),
+    ("therapist", "/reports/patients", {"mysql": 3, "redis": 1, "mongo": 0}),
+    ("therapist", "/reports/patients/{patient}", {"mysql": 7, "redis": 1, "mongo": 0}),
+    ("therapist", "/profile", {"mysql": 6, "redis": 1, "mongo": 0}),
+    ("anonymous", "/therapists", {"mysql": 1, "redis": 0, "mongo": 0}),
+    ("anonymous", "/therapists/1", {"mysql": 1, "redis": 0, "mongo": 0}),
+    ("anonymous", "/therapists/1/availability", {"mysql": 2, "redis": 0, "mongo": 0}),
+    ("anonymous", "/therapists/1/reviews", {"mysql": 2, "redis": 0, "mongo": 0}),
+    ("user", "/mobile/bootstrap", {"mysql": 6, "redis": 1, "mongo": 0}),
+    ("user", "/user/appointments", {"mysql": 2, "redis": 1, "mongo": 0}),
+    ("user", "/user/messages", {"mysql": 1, "redis": 1, "mongo": 0}),
+    ("user", "/user/therapist", {"mysql": 1, "redis": 1, "mongo": 0}),
+    ("user", "/user/profile", {"mysql": 2, "redis": 1, "mongo": 0}),
+)
+
+# Pages whose output grows with the therapist's rows.
+ROW_DEPENDENT = ("/front-page", "/appointments", "/patients", "/messages", "/reports/patients", "/treatment-plans")
+
+
+def bench_connection():
+    import mysql.connector
+
+    return mysql.connector.connect(
+        host=os.environ["MYSQL_HOST"], port=int(os.getenv("MYSQL_PORT", 3306)),
+        user=os.getenv("MYSQL_USER", "root"), password=os.getenv("MYSQL_PASSWORD", "root"),
+        database=os.getenv("MYSQL_DB", "perceptronx"),
+    )
+
+
+@pytest.fixture(scope="module")
+def sizes():
+    from benchmarks.seed import seed_mysql, table_sizes
+
+    sizes = table_sizes(SEED_ROWS)
+    connection = bench_connection()
+    try:
+        seed_mysql(connection, sizes, reset=True)
+    finally:
+        connection.close()
+    return sizes
+
+
+@pytest.fixture(scope="module")
+def sessions():
+    """Redis sessions shaped like the ones the login routes create."""
+    import redis
+
+    client = redis.Redis(host=os.environ["REDIS_HOST"], port=int(os.getenv("REDIS_PORT", 6379)))
+    session_ids = {}
+    for kind, data in (
+        ("therapist", {"user_id": str(THERAPIST_ID), "email": f"therapist{THERAPIST_ID}@bench.local", "user_type": "therapist"}),
+        ("user", {"user_id": str(USER_ID), "email": f"patient{USER_ID}@bench.local", "user_type": "user"}),
+    ):
+        session_ids[kind] = str(uuid.uuid4())
+        client.set(f"session:{session_ids[kind]}", json.dumps(data), ex=3600)
+    yield session_ids
+    client.delete(*(f"session:{session_id}" for session_id in session_ids.values()))
+    client.close()
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Client for the whole app; used without `with`, so the lifespan (model preload, video pipeline) stays off."""
+    from fastapi.testclient import TestClient
+    from main import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def measure(client, sessions):
+    """measure(kind, path) -> (status code, {"mysql": n, "redis": n, "mongo": n}) for one request."""
+    from connections.metrics import call_observers
+
+    observed = []
+    observer = lambda route, counters: observed.append(dict(counters))  # noqa: E731
+    call_observers.append(observer)
+
+    def request(kind, path):
+        observed.clear()
+        cookies = {"session_id": sessions[kind]} if kind in sessions else {}
+        client.cookies.clear()
+        response = client.get(path, cookies=cookies, follow_redirects=False)
+        assert len(observed) == 1, f"expected one measured request, got {observed}"
+        return response.status_code, observed[0]
+
+    yield request
+    call_observers.remove(observer)
+
+
+def owned_path(path):
+    """Fill {patient}/{appointment}/{message} with a row seeded for THERAPIST_ID: row id n belongs to seed.owner(n)."""
+    return path.format(patient=THERAPIST_ID, appointment=THERAPIST_ID, message=THERAPIST_ID)
+
+
+@pytest.mark.parametrize("kind, path, budget", BUDGETS, ids=[path for _, path, _ in BUDGETS])
+def test_within_budget(measure, sizes, kind, path, budget):
+    status, counts = measure(kind, owned_path(path))
+    assert status < 500, f"{path} failed with {status}"
+    over = {backend: (counts[backend], limit) for backend, limit in budget.items() if counts[backend] > limit}
+    assert not over, f"{path} is over its query budget (made, allowed): {over}"
+
+
+@pytest.fixture
+def extra_rows(sizes):
+    """Give THERAPIST_ID 30 more patients, appointments and incoming messages, removed afterwards."""
+    connection = bench_connection()
+    cursor = connection.cursor()
+    first_patient = sizes["patients"] + 1
+    patients = range(first_patient, first_patient + 30)
+
+    def add():
+        cursor.executemany(
+            "INSERT INTO Patients (patient_id, therapist_id, first_name, last_name, email, status) "
+            "VALUES (%s, %s, 'Extra', 'Patient', %s, 'Active')",
+            [(patient_id, THERAPIST_ID, f"extra{patient_id}@bench.local") for patient_id in patients]
+        )
+        cursor.executemany(
+            "INSERT INTO Appointments (patient_id, therapist_id, appointment_date, appointment_time, status) "
+            "VALUES (%s, %s, CURDATE(), '10:00:00', 'Scheduled')",
+            [(patient_id, THERAPIST_ID) for patient_id in patients]
+        )
+        cursor.executemany(
+            "INSERT INTO Messages (sender_id, sender_type, recipient_id, recipient_type, subject, content) "
+            "VALUES (%s, 'therapist', %s, 'therapist', 'Extra', 'Extra message')",
+            [(2, THERAPIST_ID)] * 30
+        )
+        connection.commit()
+
+    yield add
+
+    cursor.execute("DELETE FROM Messages WHERE subject = 'Extra' AND recipient_id = %s", (THERAPIST_ID,))
+    cursor.execute("DELETE FROM Patients WHERE patient_id >= %s", (first_patient,))
+    connection.commit()
+    cursor.close()
+    connection.close()
+
+
+@pytest.mark.parametrize("path", ROW_DEPENDENT)
+def test_counts_do_not_grow_with_rows(measure, sizes, extra_rows, path):
+    _, before = measure("therapist", path)
+    extra_rows()
+    _, after = measure("therapist", path)
+    assert after == before, f"{path} makes more calls with more rows (N+1): {before} -> {after}"
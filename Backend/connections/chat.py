@@ -0,0 +1,403 @@
+import asyncio
+import datetime
+import functools
+import json
+import os
+from typing import Dict, Optional, Set
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from connections.logs import get_logger
+from connections.metrics import create_background_task
+from connections.mysql_database import get_Mysql_db
+from connections.redis_database import r
+
+CHAT_PARTICIPANT_TYPES = ("therapist", "patient", "user")
+CHAT_DEFAULT_SUBJECT = "Chat"
+CHAT_REPLAY_LIMIT = int(os.getenv("CHAT_REPLAY_LIMIT", 200))
+PERSIST_BATCH_SIZE = int(os.getenv("CHAT_PERSIST_BATCH_SIZE", 50))
+PERSIST_FLUSH_INTERVAL = float(os.getenv("CHAT_PERSIST_FLUSH_INTERVAL", 0.25))
+
+logger = get_logger("chat")
+
+
+def conversation_channel(a_type, a_id, b_type, b_id):
+    """
+    Redis pub/sub channel shared by both participants of a conversation.
+    The pair is sorted so either side resolves to the same channel.
+    """
+    first, second = sorted([(a_type, int(a_id)), (b_type, int(b_id))])
+    return f"chat:{first[0]}:{first[1]}:{second[0]}:{second[1]}"
+
+
+def serialize_chat_row(row):
+    return {
+        "message_id": row["message_id"],
+        "sender": {"id": row["sender_id"], "type": row["sender_type"]},
+        "recipient": {"id": row["recipient_id"], "type": row["recipient_type"]},
+        "subject": row["subject"] or "",
+        "content": row["content"] or "",
+        "is_read": bool(row["is_read"]),
+        "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+    }
+
+
+def fetch_conversation_history(me_type, me_id, peer_type, peer_id, cursor=None, limit=CHAT_REPLAY_LIMIT):
+    """
+    Load the messages exchanged between two participants.
+
+    With a cursor (the last message_id the client has seen) only newer messages
+    are returned, oldest first. Without one the latest `limit` messages are returned.
+    """
+    db = get_Mysql_db()
+    cursor_obj = db.cursor(dictionary=True)
+
+    try:
+        conversation_filter = """
+            ((sender_id = %s AND sender_type = %s AND recipient_id = %s AND recipient_type = %s)
+             OR (sender_id = %s AND sender_type = %s AND recipient_id = %s AND recipient_type = %s))
+        """
+        params = [me_id, me_type, peer_id, peer_type, peer_id, peer_type, me_id, me_type]
+
+        if cursor is not None:
+            cursor_obj.execute(
+                f"""SELECT message_id, sender_id, sender_type, recipient_id, recipient_type,
+                        subject, content, is_read, created_at
+                    FROM Messages
+                    WHERE message_id > %s AND {conversation_filter}
+                    ORDER BY message_id ASC
+                    LIMIT %s""",
+                [cursor] + params + [limit + 1]
+            )
+            rows = cursor_obj.fetchall()
+        else:
+            cursor_obj.execute(
+                f"""SELECT message_id, sender_id, sender_type, recipient_id, recipient_type,
+                        subject, content, is_read, created_at
+                    FROM Messages
+                    WHERE {conversation_filter}
+                    ORDER BY message_id DESC
+                    LIMIT %s""",
+                params + [limit + 1]
+            )
+            rows = list(reversed(cursor_obj.fetchall()))
+
+        has_more = len(rows) > limit
+        if has_more:
+            rows = rows[:limit] if cursor is not None else rows[1:]
+
+        return [serialize_chat_row(row) for row in rows], has_more
+    finally:
+        cursor_obj.close()
+        db.close()
+
+
+class MessagePersister:
+    """
+    Buffers chat writes and flushes them to MySQL in batches from a worker thread,
+    so the event loop never waits on an INSERT or a commit.
+    """
+
+    def __init__(self, batch_size=PERSIST_BATCH_SIZE, flush_interval=PERSIST_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self.queue = asyncio.Queue()
+            self._task = create_background_task(self._run())
+
+    def submit_message(self, record: dict) -> asyncio.Future:
+        """Queue a message insert. The returned future resolves to its message_id."""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(("message", record, future))
+        return future
+
+    def submit_read(self, reader_type, reader_id, peer_type, peer_id, up_to) -> asyncio.Future:
+        """Queue a read-state flip for every message from peer to reader up to message_id `up_to`."""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait(("read", (reader_type, reader_id, peer_type, peer_id, up_to), future))
+        return future
+
+    async def flush(self):
+        """Wait until everything queued so far has been written."""
+        if self.queue is not None:
+            await self.queue.join()
+
+    async def close(self):
+        if self._task is None:
+            return
+        await self.flush()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                results = await asyncio.to_thread(self._write_batch, batch)
+                for (_, _, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            except Exception as e:
+                print(f"Error persisting chat batch of {len(batch)}: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def _write_batch(self, batch):
+        db = get_Mysql_db()
+        cursor = db.cursor()
+
+        try:
+            results = []
+            for kind, payload, _ in batch:
+                if kind == "message":
+                    cursor.execute(
+                        """INSERT INTO Messages
+                            (sender_id, sender_type, recipient_id, recipient_type, subject, content, created_at)
+                            VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                        (payload["sender_id"], payload["sender_type"], payload["recipient_id"],
+                         payload["recipient_type"], payload["subject"], payload["content"], payload["created_at"])
+                    )
+                    results.append(cursor.lastrowid)
+                else:
+                    reader_type, reader_id, peer_type, peer_id, up_to = payload
+                    cursor.execute(
+                        """UPDATE Messages SET is_read = TRUE
+                            WHERE recipient_id = %s AND recipient_type = %s
+                            AND sender_id = %s AND sender_type = %s
+                            AND message_id <= %s AND is_read = FALSE""",
+                        (reader_id, reader_type, peer_id, peer_type, up_to)
+                    )
+                    results.append(cursor.rowcount)
+            db.commit()
+            return results
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+            db.close()
+
+
+def log_failed_read(future, reader, up_to):
+    """Done-callback for submit_read: nobody awaits the receipt, so report a failed write here."""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("chat_read_failed", reader=reader, up_to=up_to, error=str(future.exception()))
+
+
+class ChatHub:
+    """
+    Per-worker registry of open chat sockets.
+
+    Every event is published to the conversation's Redis channel and delivered to
+    local sockets only from the subscription, so all workers see the same order.
+    """
+
+    def __init__(self, redis_client):
+        self.redis = redis_client
+        self.connections: Dict[str, Set[WebSocket]] = {}
+        self.persister = MessagePersister()
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        # Strong references to fire-and-forget tasks; the loop only keeps weak ones.
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _spawn(self, coro):
+        task = create_background_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def join(self, channel, websocket):
+        async with self._lock:
+            self.persister.start()
+            sockets = self.connections.setdefault(channel, set())
+            sockets.add(websocket)
+            if len(sockets) == 1:
+                if self._pubsub is None:
+                    self._pubsub = self.redis.pubsub()
+                await self._pubsub.subscribe(channel)
+            if self._reader is None or self._reader.done():
+                self._reader = create_background_task(self._read_loop())
+
+    async def leave(self, channel, websocket):
+        async with self._lock:
+            sockets = self.connections.get(channel)
+            if not sockets:
+                return
+            sockets.discard(websocket)
+            if not sockets:
+                del self.connections[channel]
+                await self._pubsub.unsubscribe(channel)
+
+    async def publish(self, channel, event):
+        await self.redis.publish(channel, json.dumps(event, default=str))
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except asyncio.CancelledError:
+                pass
+            self._reader = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        await self.persister.close()
+        # The persister has settled every future, so pending confirmations finish promptly.
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _read_loop(self):
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Chat pub/sub read error: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            if not message:
+                continue
+
+            sockets = list(self.connections.get(message["channel"], ()))
+            results = await asyncio.gather(
+                *(ws.send_text(message["data"]) for ws in sockets),
+                return_exceptions=True
+            )
+            for ws, result in zip(sockets, results):
+                if isinstance(result, Exception):
+                    self.connections.get(message["channel"], set()).discard(ws)
+
+    async def replay(self, websocket, me_type, me_id, peer_type, peer_id, cursor=None):
+        """Send the conversation history after `cursor` to a (re)connecting client."""
+        try:
+            cursor = int(cursor) if cursor not in (None, "") else None
+        except (TypeError, ValueError):
+            cursor = None
+
+        await self.persister.flush()
+        messages, has_more = await asyncio.to_thread(
+            fetch_conversation_history, me_type, me_id, peer_type, peer_id, cursor
+        )
+        await websocket.send_json({
+            "type": "history",
+            "messages": messages,
+            "has_more": has_more,
+            "cursor": messages[-1]["message_id"] if messages else cursor
+        })
+
+    async def serve(self, websocket: WebSocket, me_type, me_id, peer_type, peer_id, cursor=None):
+        me_id, peer_id = int(me_id), int(peer_id)
+        channel = conversation_channel(me_type, me_id, peer_type, peer_id)
+        me = {"id": me_id, "type": me_type}
+
+        await websocket.accept()
+        await self.join(channel, websocket)
+
+        try:
+            await self.replay(websocket, me_type, me_id, peer_type, peer_id, cursor)
+
+            while True:
+                try:
+                    event = json.loads(await websocket.receive_text())
+                except ValueError:
+                    await websocket.send_json({"type": "error", "detail": "Invalid JSON"})
+                    continue
+
+                kind = event.get("type") if isinstance(event, dict) else None
+
+                if kind == "message":
+                    content = (event.get("content") or "").strip()
+                    if not content:
+                        await websocket.send_json({"type": "error", "detail": "Message content is required",
+                                                   "client_id": event.get("client_id")})
+                        continue
+
+                    client_id = event.get("client_id")
+                    created_at = datetime.datetime.now().replace(microsecond=0)
+                    stored = self.persister.submit_message({
+                        "sender_id": me_id,
+                        "sender_type": me_type,
+                        "recipient_id": peer_id,
+                        "recipient_type": peer_type,
+                        "subject": (event.get("subject") or CHAT_DEFAULT_SUBJECT)[:100],
+                        "content": content,
+                        "created_at": created_at
+                    })
+
+                    await websocket.send_json({"type": "ack", "status": "accepted", "client_id": client_id})
+                    await self.publish(channel, {
+                        "type": "message",
+                        "client_id": client_id,
+                        "sender": me,
+                        "content": content,
+                        "created_at": created_at.isoformat()
+                    })
+                    self._spawn(self._confirm_stored(channel, me, client_id, stored))
+
+                elif kind == "delivered":
+                    await self.publish(channel, {"type": "delivered", "message_id": event.get("message_id"), "by": me})
+
+                elif kind == "read":
+                    try:
+                        up_to = int(event.get("up_to") or event.get("message_id"))
+                    except (TypeError, ValueError):
+                        await websocket.send_json({"type": "error", "detail": "up_to is required"})
+                        continue
+                    self.persister.submit_read(me_type, me_id, peer_type, peer_id, up_to).add_done_callback(
+                        functools.partial(log_failed_read, reader=me, up_to=up_to)
+                    )
+                    await self.publish(channel, {"type": "read", "up_to": up_to, "by": me})
+
+                elif kind == "replay":
+                    await self.replay(websocket, me_type, me_id, peer_type, peer_id, event.get("cursor"))
+
+                elif kind == "ping":
+                    await websocket.send_json({"type": "pong"})
+
+                else:
+                    await websocket.send_json({"type": "error", "detail": f"Unknown event type: {kind}"})
+
+        except WebSocketDisconnect:
+            pass
+        finally:
+            await self.leave(channel, websocket)
+
+    async def _confirm_stored(self, channel, sender, client_id, stored):
+        try:
+            message_id = await stored
+            await self.publish(channel, {"type": "stored", "client_id": client_id,
+                                         "message_id": message_id, "sender": sender})
+        except Exception as e:
+            print(f"Chat message {client_id} from {sender} was not stored: {e}")
+            await self.publish(channel, {"type": "failed", "client_id": client_id, "sender": sender})
+
+
+chat_hub = ChatHub(r)
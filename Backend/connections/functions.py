@@ -4,20 +4,21 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi import APIRouter, FastAPI, Response, Depends, Form, HTTPException, status, File, UploadFile
 from pydantic import BaseModel
 from fastapi.responses import StreamingResponse, HTMLResponse, RedirectResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
 from starlette.requests import Request
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path as FilePath
 from fastapi import *
-from ultralytics import YOLO
 from typing import Optional, Dict, List
-import cv2, matplotlib.pyplot as plt, pandas as pd, torch, bcrypt, user_agents, datetime
+import bcrypt, user_agents, datetime
 from datetime import date, time, timedelta
 import traceback
 from contextlib import asynccontextmanager
 import uvicorn, secrets, qrcode, io, socket, time
 import json
 import aiofiles
+from connections.logs import get_logger
+
+logger = get_logger("functions")
 
 class AppointmentRequest(BaseModel):
     therapist_id: int
@@ -91,4 +92,94 @@ def serialize_document(doc):
         "processing_time": doc["processing_time"],
         "device": doc["device"]
     }
+
+def find_best_matching_image(therapist_id, requested_filename, static_dir):
+    """
+    Find the best matching image for a therapist, even if the filename doesn't exactly match.
+    This handles cases where database references don't match actual files.
+    
+    Args:
+        therapist_id: The ID of the therapist
+        requested_filename: The filename from the database
+        static_dir: The static directory path
+        
+    Returns:
+        The best matching filename or a default avatar
+    """
+    import os
+    
+    user_images_dir = os.path.join(static_dir, "assets/images/user")
     
+    if requested_filename and os.path.exists(os.path.join(user_images_dir, requested_filename)):
+        return requested_filename
+    
+    if therapist_id:
+        prefix = f"therapist_{therapist_id}_"
+        
+        if os.path.exists(user_images_dir) and os.path.isdir(user_images_dir):
+            try:
+                all_files = os.listdir(user_images_dir)
+                
+                matching_files = [f for f in all_files if f.startswith(prefix)]
+                
+                if matching_files:
+                    logger.debug("therapist_image_fallback", therapist_id=therapist_id, matched=matching_files[0])
+                    return matching_files[0]
+            except Exception as e:
+                print(f"Error searching for matching images: {e}")
+    
+    avatar_id = (therapist_id % 10) if therapist_id else 1
+    default_image = f"avatar-{avatar_id}.jpg"
+    
+    if os.path.exists(os.path.join(user_images_dir, default_image)):
+        return default_image
+    else:
+        return "avatar-1.jpg"
+
+def safely_parse_json_field(field_value, default=None):
+    """
+    Safely parse a JSON field from the database.
+    Returns the parsed JSON or the default value if parsing fails.
+    """
+    if field_value is None:
+        return default if default is not None else []
+    
+    if isinstance(field_value, (list, dict)):
+        return field_value
+        
+    if isinstance(field_value, bytes):
+        field_value = field_value.decode('utf-8')
+        
+    if not isinstance(field_value, str):
+        return default if default is not None else []
+        
+    try:
+        return json.loads(field_value)
+    except (json.JSONDecodeError, TypeError):
+        if isinstance(field_value, str) and ',' in field_value:
+            return [item.strip() for item in field_value.split(',')]
+        return default if default is not None else []
+
+# Imported only by the inference and reporting code that needs them; a web worker should never load these.
+HEAVY_MODULES = ("ultralytics", "torch", "cv2", "matplotlib", "pandas")
+
+def startup_report(started_at):
+    """
+    Summarise how expensive booting this worker was.
+
+    Args:
+        started_at: time.perf_counter() value taken before the app modules were imported
+
+    Returns:
+        Boot time, peak RSS and which heavy modules ended up imported
+    """
+    import resource
+    import sys
+
+    report = {
+        "boot_seconds": round(time.perf_counter() - started_at, 3),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+    print(f"Startup report: {report}")
+    return report
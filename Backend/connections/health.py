@@ -0,0 +1,95 @@
+import asyncio
+import os
+import time
+
+from connections.logs import get_logger
+from connections.metrics import DEPENDENCY_LATENCY, DEPENDENCY_UP
+
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", 1.0))
+# Probes arriving within this many seconds of a check get its result instead of a new round of pings.
+HEALTH_CHECK_CACHE_SECONDS = float(os.getenv("HEALTH_CHECK_CACHE_SECONDS", 2.0))
+READY_DEPENDENCIES = tuple(
+    name.strip() for name in os.getenv("READY_DEPENDENCIES", "mysql,redis,mongo").split(",") if name.strip()
+)
+
+logger = get_logger("health")
+
+
+def ping_mysql():
+    """Borrow a pooled connection and ping it; no statement is run."""
+    from connections.mysql_database import get_pooled_Mysql_db
+
+    db = get_pooled_Mysql_db()
+    try:
+        db.raw.ping(reconnect=False)
+    finally:
+        db.close()
+
+
+async def ping_redis():
+    from connections.redis_database import r
+
+    await r.ping()
+
+
+async def ping_mongo():
+    from connections.mongo_db import ping_Mongo
+
+    await ping_Mongo()
+
+
+CHECKS = {
+    "mysql": lambda: asyncio.to_thread(ping_mysql),
+    "redis": ping_redis,
+    "mongo": ping_mongo,
+}
+
+
+class ReadinessProbe:
+    """
+    Pings every dependency in READY_DEPENDENCIES concurrently, each bounded by
+    HEALTH_CHECK_TIMEOUT, and reports per-dependency status and latency; failure details
+    are logged rather than returned, since the endpoint is unauthenticated. Results are shared by
+    all probes within HEALTH_CHECK_CACHE_SECONDS, and concurrent probes wait for the
+    check already running, so probing more often does not ping more often.
+    """
+
+    def __init__(self, dependencies=READY_DEPENDENCIES, timeout=HEALTH_CHECK_TIMEOUT,
+                 cache_seconds=HEALTH_CHECK_CACHE_SECONDS):
+        self.dependencies = dependencies
+        self.timeout = timeout
+        self.cache_seconds = cache_seconds
+        self._result = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _check(self, name):
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(CHECKS[name](), self.timeout)
+            ok = True
+        except asyncio.TimeoutError:
+            ok = False
+            logger.warning("dependency_unavailable", dependency=name, error=f"timed out after {self.timeout}s")
+        except Exception as e:
+            ok = False
+            logger.warning("dependency_unavailable", dependency=name, error=str(e))
+        latency = time.perf_counter() - started
+        DEPENDENCY_UP.labels(name).set(1 if ok else 0)
+        DEPENDENCY_LATENCY.labels(name).set(latency)
+        return {"ok": ok, "status": "ok" if ok else "unavailable", "latency_ms": round(latency * 1000, 1)}
+
+    async def check(self):
+        async with self._lock:
+            if self._result is None or time.monotonic() - self._checked_at >= self.cache_seconds:
+                results = await asyncio.gather(*(self._check(name) for name in self.dependencies))
+                checks = dict(zip(self.dependencies, results))
+                self._result = {
+                    "status": "ready" if all(check["ok"] for check in checks.values()) else "degraded",
+                    "checks": checks,
+                }
+                self._checked_at = time.monotonic()
+            return self._result
+
+
+readiness_probe = ReadinessProbe()
@@ -0,0 +1,190 @@
+import atexit
+import contextvars
+import copy
+import datetime
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Fraction of each high-volume event that is kept; override with e.g. LOG_SAMPLE_RATES="therapist_image=0.5".
+# Events not listed are always kept.
+LOG_SAMPLE_RATES = {
+    "session_loaded": 0.01,
+    "therapist_image": 0.05,
+    "therapist_image_fallback": 0.05,
+    **{
+        event.strip(): float(rate)
+        for event, _, rate in (item.partition("=") for item in os.getenv("LOG_SAMPLE_RATES", "").split(","))
+        if event.strip() and rate
+    },
+}
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+
+# Correlation id of the request being handled, or None outside a request.
+request_id = contextvars.ContextVar("request_id", default=None)
+
+_listener = None
+_dropped = 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, event, request id and the event's fields."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a `sample` fraction of a record, from the call site or LOG_SAMPLE_RATES by event name."""
+
+    def filter(self, record):
+        rate = getattr(record, "sample", None)
+        if rate is None:
+            rate = LOG_SAMPLE_RATES.get(record.msg, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without ever blocking the event loop:
+    the request id is captured here, JSON formatting and the stdout write happen on
+    the listener thread, and records are dropped (and counted) if the queue is full.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.request_id = request_id.get()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        global _dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _dropped += 1
+
+
+def configure_logging(level=LOG_LEVEL, stream=None):
+    """Route the `perceptronx` loggers through a bounded queue to a JSON stdout writer; idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    records = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(records)
+    handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger("perceptronx")
+    root.setLevel(level)
+    root.addHandler(handler)
+    root.propagate = False
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush whatever is still queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def dropped_records():
+    return _dropped
+
+
+class EventLogger:
+    """
+    Thin wrapper so call sites log an event name plus fields:
+        logger.info("plan_created", plan_id=plan_id, exercises=3)
+        logger.debug("therapist_image", sample=0.01, therapist_id=7)
+    Level checks happen before anything is built, so disabled events cost almost nothing.
+    """
+
+    def __init__(self, name):
+        self._logger = logging.getLogger(f"perceptronx.{name}")
+
+    def isEnabledFor(self, level):
+        return self._logger.isEnabledFor(level)
+
+    def log(self, level, event, sample=None, exc_info=False, **fields):
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, event, exc_info=exc_info, extra={"fields": fields, "sample": sample})
+
+    def debug(self, event, **fields):
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event, **fields):
+        self.log(logging.ERROR, event, **fields)
+
+    def exception(self, event, **fields):
+        self.log(logging.ERROR, event, exc_info=True, **fields)
+
+
+def get_logger(name):
+    configure_logging()
+    return EventLogger(name)
+
+
+class RequestIdMiddleware:
+    """
+    Pure ASGI middleware giving every HTTP request a correlation id: the caller's
+    X-Request-ID when it sends one, a new one otherwise. The id is on every log
+    record made while handling the request and is echoed in the response headers.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")[:64]
+        current = incoming or uuid.uuid4().hex[:16]
+        token = request_id.set(current)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", current.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id.reset(token)
@@ -0,0 +1,156 @@
+import asyncio
+import contextvars
+import os
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+# Set PROMETHEUS_MULTIPROC_DIR when running several uvicorn workers so /metrics aggregates all of them.
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+
+BACKENDS = ("mysql", "redis", "mongo")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+REQUESTS = Counter("http_requests_total", "Requests by route and status code", ["method", "route", "status"])
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled", ["method"], multiprocess_mode="livesum")
+BACKEND_CALLS = Histogram(
+    "http_request_backend_calls", "MySQL queries, Redis round trips and Mongo operations per request",
+    ["route", "backend"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+
+QUERY_LATENCY = Histogram(
+    "mysql_query_duration_seconds", "MySQL statement latency by calling route",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+
+REDIS_COMMAND_LATENCY = Histogram(
+    "redis_command_duration_seconds", "Redis round-trip latency by command (a pipeline is one round trip)",
+    ["command"],
+    buckets=(0.0002, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+
+DEPENDENCY_UP = Gauge("dependency_up", "1 when the last readiness check of a dependency passed", ["dependency"],
+                      multiprocess_mode="liveall")
+DEPENDENCY_LATENCY = Gauge("dependency_check_seconds", "Latency of the last readiness check of a dependency",
+                           ["dependency"], multiprocess_mode="liveall")
+
+# Orchestrator probes and scrapes are not application traffic.
+UNMEASURED_PATHS = {"/metrics", "/healthz", "/readyz"}
+
+# Per-request call counters and ASGI scope; None outside a request (startup, background tasks).
+request_calls = contextvars.ContextVar("request_calls", default=None)
+request_scope = contextvars.ContextVar("request_scope", default=None)
+
+# Callables run with (route, counters) after every request; query-count tests hook in here.
+call_observers = []
+
+
+def create_background_task(coro):
+    """
+    Start a task that outlives the current request. It runs in an empty context, so
+    request counters, route, request id and statement trace are not inherited from
+    whichever request happened to start it.
+    """
+    return asyncio.create_task(coro, context=contextvars.Context())
+
+
+def count_call(backend, calls=1):
+    counters = request_calls.get()
+    if counters is not None:
+        counters[backend] += calls
+
+
+def current_route():
+    """Route template of the request being handled, or None outside a request."""
+    scope = request_scope.get()
+    return route_label(scope) if scope is not None else None
+
+
+def route_label(scope):
+    """The route template (e.g. /patients/{patient_id}), never the raw path, to keep label cardinality bounded."""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    path = scope.get("path", "")
+    for prefix in ("/static", "/dist"):
+        if path.startswith(prefix + "/"):
+            return prefix
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording, for each HTTP request: latency, status code,
+    in-flight count and how many MySQL/Redis/Mongo calls it made.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in UNMEASURED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = {"code": 500}
+        counters = dict.fromkeys(BACKENDS, 0)
+        token = request_calls.set(counters)
+        scope_token = request_scope.set(scope)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        IN_FLIGHT.labels(method).inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            IN_FLIGHT.labels(method).dec()
+            request_calls.reset(token)
+            request_scope.reset(scope_token)
+
+            route = route_label(scope)
+            REQUEST_LATENCY.labels(method, route).observe(elapsed)
+            REQUESTS.labels(method, route, str(status["code"])).inc()
+            for backend, calls in counters.items():
+                BACKEND_CALLS.labels(route, backend).observe(calls)
+            for observer in call_observers:
+                observer(route, counters)
+
+
+def render_metrics():
+    """Prometheus text exposition for this process, or for all workers in multiprocess mode."""
+    if PROMETHEUS_MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class CountingCollection:
+    """Mongo (pymongo or motor) collection proxy counting every operation against the current request."""
+
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if not callable(attribute) or name.startswith("_"):
+            return attribute
+
+        def counted(*args, **kwargs):
+            count_call("mongo")
+            return attribute(*args, **kwargs)
+        return counted
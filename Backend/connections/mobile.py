@@ -0,0 +1,396 @@
+import asyncio
+import datetime
+import hashlib
+import json
+
+from connections.functions import find_best_matching_image, safely_parse_json_field
+from connections.logs import get_logger
+from connections.mysql_database import get_pooled_Mysql_db
+from connections.pagination import encode_cursor, decode_cursor
+
+logger = get_logger("mobile")
+
+USER_MESSAGES_DEFAULT_LIMIT = 50
+USER_MESSAGES_MAX_LIMIT = 200
+
+# Short keys used by /user/messages?compact=true
+COMPACT_MESSAGE_KEYS = {
+    "id": "i",
+    "subject": "s",
+    "content": "c",
+    "date": "d",
+    "isRead": "r",
+    "sender": "f",
+    "direction": "o",
+    "updatedAt": "u",
+}
+COMPACT_SENDER_KEYS = {"id": "i", "name": "n", "photoUrl": "p", "type": "t"}
+
+USER_MESSAGE_COLUMNS = """
+    m.message_id, m.subject, m.content, m.is_read, m.sender_id, m.sender_type,
+    DATE_FORMAT(m.created_at, '%%Y-%%m-%%d %%H:%%i') as date,
+    DATE_FORMAT(m.updated_at, '%%Y-%%m-%%d %%H:%%i:%%s') as updated_at,
+    CASE
+        WHEN m.sender_type = 'therapist' THEN CONCAT(t.first_name, ' ', t.last_name)
+        ELSE 'System'
+    END as sender_name,
+    CASE
+        WHEN m.sender_type = 'therapist' THEN
+            CONCAT('/static/assets/images/user/', COALESCE(NULLIF(t.profile_image, ''), 'avatar-1.jpg'))
+        ELSE '/static/assets/images/user/system-avatar.jpg'
+    END as sender_photo,
+    CASE
+        WHEN m.recipient_id = %s AND m.recipient_type = 'user' THEN 'incoming'
+        ELSE 'outgoing'
+    END as direction
+"""
+
+USER_MESSAGE_SOURCE = """
+    FROM Messages m
+    LEFT JOIN Therapists t ON m.sender_id = t.id AND m.sender_type = 'therapist'
+    WHERE ((m.recipient_id = %s AND m.recipient_type = 'user')
+           OR (m.sender_id = %s AND m.sender_type = 'user'))
+"""
+
+
+def format_user_message(row, compact=False):
+    message = {
+        "id": row["message_id"],
+        "subject": row["subject"] or "",
+        "content": row["content"] or "",
+        "date": row["date"] or "N/A",
+        "isRead": bool(row["is_read"]),
+        "sender": {
+            "id": row["sender_id"],
+            "name": row["sender_name"],
+            "photoUrl": row["sender_photo"],
+            "type": row["sender_type"]
+        },
+        "direction": row["direction"]
+    }
+
+    if not compact:
+        return message
+
+    message["updatedAt"] = row["updated_at"]
+    sender = {COMPACT_SENDER_KEYS[key]: value for key, value in message.pop("sender").items()}
+    compacted = {COMPACT_MESSAGE_KEYS[key]: value for key, value in message.items()}
+    compacted["f"] = sender
+    return compacted
+
+
+def parse_since(since):
+    """
+    Accept either a sync token from a previous delta response or a plain timestamp
+    (ISO 8601 or epoch seconds). Returns (updated_at, message_id) or None if invalid.
+    """
+    values = decode_cursor(since, size=2)
+    if values is not None:
+        if not isinstance(values[0], str):
+            return None
+        try:
+            return values[0], int(values[1])
+        except (TypeError, ValueError):
+            return None
+
+    try:
+        timestamp = datetime.datetime.fromtimestamp(float(since))
+    except (TypeError, ValueError, OverflowError, OSError):
+        try:
+            timestamp = datetime.datetime.fromisoformat(since.replace("Z", ""))
+        except (AttributeError, ValueError):
+            return None
+
+    return timestamp.strftime("%Y-%m-%d %H:%M:%S"), 0
+
+
+def fetch_user_messages(cursor, user_id, compact=False):
+    """The user's whole mailbox, newest first (legacy response)."""
+    user_id = int(user_id)
+    cursor.execute(
+        f"SELECT {USER_MESSAGE_COLUMNS} {USER_MESSAGE_SOURCE} ORDER BY m.created_at DESC",
+        (user_id, user_id, user_id)
+    )
+    return [format_user_message(row, compact) for row in cursor.fetchall()]
+
+
+def fetch_user_messages_page(cursor, user_id, limit=USER_MESSAGES_DEFAULT_LIMIT, before=None, compact=False):
+    """
+    One page of the mailbox, newest first, keyed on message_id.
+    `before` is the next_cursor of the previous page.
+    """
+    user_id = int(user_id)
+    params = [user_id, user_id, user_id]
+    keyset = ""
+
+    if before is not None:
+        keyset = "AND m.message_id < %s"
+        params.append(before)
+
+    cursor.execute(
+        f"""SELECT {USER_MESSAGE_COLUMNS} {USER_MESSAGE_SOURCE} {keyset}
+            ORDER BY m.message_id DESC
+            LIMIT %s""",
+        params + [limit + 1]
+    )
+    rows = cursor.fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return {
+        "messages": [format_user_message(row, compact) for row in rows],
+        "next_cursor": encode_cursor(rows[-1]["message_id"]) if has_more else None,
+        "has_more": has_more
+    }
+
+
+def fetch_user_messages_delta(cursor, user_id, since, limit=USER_MESSAGES_DEFAULT_LIMIT, compact=False):
+    """
+    Messages created or changed (e.g. read-state flips) after `since`, oldest change first.
+
+    `since` is the (updated_at, message_id) pair from parse_since. While has_more is
+    true the returned sync_token continues the same sweep; once caught up it points at
+    the start of the last second seen, so late changes within that second are re-sent
+    rather than missed. Clients upsert by id.
+    """
+    user_id = int(user_id)
+    since_updated_at, since_id = since
+
+    cursor.execute(
+        f"""SELECT {USER_MESSAGE_COLUMNS} {USER_MESSAGE_SOURCE}
+            AND (m.updated_at > %s OR (m.updated_at = %s AND m.message_id > %s))
+            ORDER BY m.updated_at ASC, m.message_id ASC
+            LIMIT %s""",
+        (user_id, user_id, user_id, since_updated_at, since_updated_at, since_id, limit + 1)
+    )
+    rows = cursor.fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if not rows:
+        sync_token = encode_cursor(since_updated_at, since_id)
+    elif has_more:
+        sync_token = encode_cursor(rows[-1]["updated_at"], rows[-1]["message_id"])
+    else:
+        sync_token = encode_cursor(rows[-1]["updated_at"], 0)
+
+    return {
+        "messages": [format_user_message(row, compact) for row in rows],
+        "sync_token": sync_token,
+        "has_more": has_more
+    }
+
+
+def fetch_user_info(cursor, user_id):
+    cursor.execute("SELECT username, email, created_at FROM users WHERE user_id = %s", (user_id,))
+    row = cursor.fetchone()
+
+    if not row:
+        return None
+
+    return {
+        "username": row["username"],
+        "email": row["email"],
+        "joined": str(row["created_at"])
+    }
+
+
+def fetch_user_appointments(cursor, user_id):
+    cursor.execute(
+        "SELECT patient_id FROM Patients WHERE user_id = %s",
+        (user_id,)
+    )
+    patient_record = cursor.fetchone()
+
+    if not patient_record:
+        return []
+
+    cursor.execute(
+        """SELECT a.appointment_id, a.appointment_date, a.appointment_time, a.duration, a.status, a.notes,
+                t.id as therapist_id, t.first_name, t.last_name, t.profile_image
+        FROM Appointments a
+        JOIN Therapists t ON a.therapist_id = t.id
+        WHERE a.patient_id = %s
+        ORDER BY 
+            CASE WHEN a.status = 'Scheduled' THEN 0
+                WHEN a.status = 'Completed' THEN 1
+                ELSE 2 END,
+            a.appointment_date DESC, 
+            a.appointment_time DESC""",
+        (patient_record['patient_id'],)
+    )
+    appointments = cursor.fetchall()
+
+    formatted_appointments = []
+    for appointment in appointments:
+        time_obj = appointment['appointment_time']
+        formatted_time = time_obj.strftime("%I:%M %p") if time_obj else "N/A"
+
+        date_obj = appointment['appointment_date']
+        formatted_date = date_obj.strftime("%Y-%m-%d") if date_obj else "N/A"
+
+        formatted_appointments.append({
+            "id": appointment['appointment_id'],
+            "date": formatted_date,
+            "time": formatted_time,
+            "duration": appointment['duration'],
+            "status": appointment['status'],
+            "notes": appointment['notes'],
+            "therapist": {
+                "id": appointment['therapist_id'],
+                "name": f"{appointment['first_name']} {appointment['last_name']}",
+                "photoUrl": f"/static/assets/images/user/{appointment['profile_image']}" if appointment['profile_image'] else "/static/assets/images/user/avatar-1.jpg"
+            }
+        })
+
+    return formatted_appointments
+
+
+def fetch_current_therapist(cursor, user_id):
+    cursor.execute(
+        """SELECT p.therapist_id, t.first_name, t.last_name, t.profile_image, 
+                t.bio, t.experience_years, t.specialties, t.education, t.languages, 
+                t.address, t.rating, t.review_count, 
+                t.is_accepting_new_patients, t.average_session_length
+        FROM Patients p
+        JOIN Therapists t ON p.therapist_id = t.id
+        WHERE p.user_id = %s""",
+        (user_id,)
+    )
+    result = cursor.fetchone()
+
+    if not result:
+        return None
+
+    for field in ['specialties', 'education', 'languages']:
+        result[field] = safely_parse_json_field(result[field], [])
+
+    return {
+        "id": result["therapist_id"],
+        "name": f"{result['first_name']} {result['last_name']}",
+        "photoUrl": f"/static/assets/images/user/{result['profile_image']}" if result['profile_image'] else "/static/assets/images/user/avatar-1.jpg",
+        "specialties": result["specialties"],
+        "bio": result["bio"] or "",
+        "experienceYears": result["experience_years"] or 0,
+        "education": result["education"],
+        "languages": result["languages"],
+        "address": result["address"] or "",
+        "rating": float(result["rating"] or 0),
+        "reviewCount": result["review_count"] or 0,
+        "isAcceptingNewPatients": bool(result["is_accepting_new_patients"]),
+        "averageSessionLength": result["average_session_length"] or 60
+    }
+
+
+def fetch_therapist_list(cursor, static_dir):
+    """Therapists accepting new patients, best rated first, in the shape of TherapistListItem."""
+    cursor.execute(
+        """SELECT id, first_name, last_name, profile_image, 
+                specialties, address, rating, review_count, 
+                is_accepting_new_patients
+        FROM Therapists 
+        WHERE is_accepting_new_patients = TRUE
+        ORDER BY rating DESC, review_count DESC"""
+    )
+    therapists = cursor.fetchall()
+
+    formatted_therapists = []
+    for therapist in therapists:
+        specialties = safely_parse_json_field(therapist['specialties'], [])
+
+        profile_image = therapist['profile_image']
+        matched_image = find_best_matching_image(
+            therapist["id"], 
+            profile_image, 
+            static_dir
+        )
+
+        photoUrl = f"/static/assets/images/user/{matched_image}"
+
+        logger.debug("therapist_image", therapist_id=therapist["id"], requested=profile_image, matched=matched_image)
+
+        formatted_therapists.append({
+            "id": therapist["id"],
+            "name": f"{therapist['first_name']} {therapist['last_name']}",
+            "photoUrl": photoUrl,
+            "specialties": specialties,
+            "location": therapist["address"] or "Location not provided",
+            "rating": float(therapist["rating"] or 0),
+            "reviewCount": therapist["review_count"] or 0,
+            "distance": 0.0, 
+            "nextAvailable": "Today" 
+        })
+
+    return formatted_therapists
+
+
+def section_etag(data):
+    raw = json.dumps(data, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def parse_known_etags(header):
+    """Parse an X-Section-ETags header of the form `user=abc, messages=def`."""
+    known = {}
+    for part in (header or "").split(","):
+        name, _, etag = part.strip().partition("=")
+        if name and etag:
+            known[name] = etag.strip('"')
+    return known
+
+
+def run_with_pooled_cursor(loader, *args):
+    db = get_pooled_Mysql_db()
+    cursor = db.cursor(dictionary=True)
+
+    try:
+        return loader(cursor, *args)
+    finally:
+        cursor.close()
+        db.close()
+
+
+async def build_bootstrap(session_data, static_dir, known_etags=None, compact=False):
+    """
+    Load every home-screen section concurrently, each on its own pooled connection.
+
+    Each section carries an etag; sections whose etag the client already holds are
+    sent as `not_modified` without data. A failing section is logged and reported with a
+    generic error, without failing the others.
+    """
+    known_etags = known_etags or {}
+    user_id = session_data["user_id"]
+
+    loaders = {
+        "user": (fetch_user_info, user_id),
+        "appointments": (fetch_user_appointments, user_id),
+        "therapist": (fetch_current_therapist, user_id),
+        "messages": (fetch_user_messages_page, user_id, USER_MESSAGES_DEFAULT_LIMIT, None, compact),
+        "therapists": (fetch_therapist_list, static_dir),
+    }
+
+    results = await asyncio.gather(
+        *(asyncio.to_thread(run_with_pooled_cursor, *spec) for spec in loaders.values()),
+        return_exceptions=True
+    )
+
+    data_by_section = {"status": {"status": "valid", "user": session_data}}
+    data_by_section.update(zip(loaders, results))
+
+    sections = {}
+    for name, data in data_by_section.items():
+        if isinstance(data, Exception):
+            logger.error("bootstrap_section_failed", exc_info=data, section=name)
+            # Driver and SQL error text stays in the log.
+            sections[name] = {"error": "Section could not be loaded"}
+            continue
+
+        etag = section_etag(data)
+        if known_etags.get(name) == etag:
+            sections[name] = {"etag": etag, "not_modified": True}
+        else:
+            sections[name] = {"etag": etag, "data": data}
+
+    return {"sections": sections}
@@ -1,25 +1,182 @@
 from pymongo import MongoClient
+from connections.metrics import CountingCollection, create_background_task
+from pymongo.errors import BulkWriteError
+import asyncio
 import os
+import threading
 import time
 
+MONGO_HOST = os.getenv("MONGO_HOST", "mongodb")
+MONGO_PORT = os.getenv("MONGO_PORT", "27017")
+MONGO_URI = f"mongodb://{MONGO_HOST}:{MONGO_PORT}"
+DB_NAME = "PerceptronX"
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", 50))
+MONGO_BULK_SIZE = int(os.getenv("MONGO_BULK_SIZE", 500))
+MONGO_BULK_INTERVAL = float(os.getenv("MONGO_BULK_INTERVAL_MS", 200)) / 1000
+MONGO_BULK_MAX_BUFFER = int(os.getenv("MONGO_BULK_MAX_BUFFER", 20000))
+
+_client = None
+_client_lock = threading.Lock()
+_async_client = None
+
 def get_Mongo_db(collection_name, max_retries=5, retry_delay=2):
-    MONGO_HOST = os.getenv("MONGO_HOST", "mongodb")  
-    MONGO_PORT = os.getenv("MONGO_PORT", "27017")
-    MONGO_URI = f"mongodb://{MONGO_HOST}:{MONGO_PORT}"
-    DB_NAME = "PerceptronX"
-    COLLECTION_NAME = collection_name
-    
-    for attempt in range(max_retries):
-        try:
-            client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000)
-            client.admin.command('ping')
-            db = client[DB_NAME]
-            collection = db[COLLECTION_NAME]
-            return collection
-        except Exception as e:
-            if attempt < max_retries - 1:
-                print(f"MongoDB connection attempt {attempt+1} failed: {e}. Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-            else:
-                print(f"Failed to connect to MongoDB after {max_retries} attempts: {e}")
-                raise
\ No newline at end of file
+    """
+    Collection from the process-wide MongoClient. The client (and its connection pool)
+    is created and pinged once; later calls reuse it without a round trip.
+    """
+    global _client
+    if _client is not None:
+        return CountingCollection(_client[DB_NAME][collection_name])
+
+    with _client_lock:
+        for attempt in range(max_retries):
+            if _client is not None:
+                break
+            try:
+                client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=5000, maxPoolSize=MONGO_MAX_POOL_SIZE)
+                client.admin.command('ping')
+                _client = client
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    print(f"MongoDB connection attempt {attempt+1} failed: {e}. Retrying in {retry_delay} seconds...")
+                    time.sleep(retry_delay)
+                else:
+                    print(f"Failed to connect to MongoDB after {max_retries} attempts: {e}")
+                    raise
+
+    return CountingCollection(_client[DB_NAME][collection_name])
+
+def get_async_Mongo_db(collection_name):
+    """
+    Collection from the process-wide motor client, for use in async routes.
+    Connections are pooled and opened lazily, so this never blocks the event loop.
+    """
+    global _async_client
+    if _async_client is None:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        _async_client = AsyncIOMotorClient(MONGO_URI, serverSelectionTimeoutMS=5000, maxPoolSize=MONGO_MAX_POOL_SIZE)
+    return CountingCollection(_async_client[DB_NAME][collection_name])
+
+# The query API filters on the leading fields and pages newest-first on (timestamp, _id),
+# so both indexes end in the sort keys and no query needs an in-memory sort.
+ANNOTATION_INDEXES = {
+    "timestamp": [("timestamp", -1), ("_id", -1)],
+    "user_timestamp": [("user_id", 1), ("timestamp", -1), ("_id", -1)],
+    "model_status_timestamp": [("model_used", 1), ("status", 1), ("timestamp", -1), ("_id", -1)],
+}
+
+async def ensure_annotation_indexes():
+    """Create the annotations indexes; a no-op when they already exist."""
+    from pymongo import IndexModel
+
+    collection = get_async_Mongo_db("annotations")
+    await collection.create_indexes([IndexModel(keys, name=name) for name, keys in ANNOTATION_INDEXES.items()])
+
+async def ping_Mongo():
+    """One ping through the motor client's pool, for readiness checks."""
+    get_async_Mongo_db("annotations")
+    return await _async_client.admin.command("ping")
+
+def close_Mongo_clients():
+    global _client, _async_client
+    if _client is not None:
+        _client.close()
+        _client = None
+    if _async_client is not None:
+        _async_client.close()
+        _async_client = None
+
+
+class BulkWriter:
+    """
+    Buffers documents for one collection and writes them with unordered insert_many,
+    once MONGO_BULK_SIZE documents are waiting or MONGO_BULK_INTERVAL_MS after the
+    first one arrived, whichever comes first.
+
+    `add` never waits on Mongo. If a flush fails the documents go back into the buffer
+    for the next attempt; beyond MONGO_BULK_MAX_BUFFER the oldest are dropped.
+    """
+
+    def __init__(self, collection_name, max_documents=MONGO_BULK_SIZE, flush_interval=MONGO_BULK_INTERVAL,
+                 max_buffer=MONGO_BULK_MAX_BUFFER):
+        self.collection_name = collection_name
+        self.max_documents = max_documents
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.buffer = []
+        self.written = 0
+        self.dropped = 0
+        self._wakeup = None
+        self._task = None
+        self._flush_lock = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = create_background_task(self._run())
+
+    def add(self, document):
+        self.add_many([document])
+
+    def add_many(self, documents):
+        self.start()
+        self.buffer.extend(documents)
+        if len(self.buffer) > self.max_buffer:
+            overflow = len(self.buffer) - self.max_buffer
+            del self.buffer[:overflow]
+            self.dropped += overflow
+            print(f"Mongo bulk writer for {self.collection_name} dropped {overflow} documents (buffer full)")
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            if len(self.buffer) < self.max_documents:
+                # Give the batch up to flush_interval to fill before writing it.
+                deadline = asyncio.get_running_loop().time() + self.flush_interval
+                while len(self.buffer) < self.max_documents:
+                    self._wakeup.clear()
+                    remaining = deadline - asyncio.get_running_loop().time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        if self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            while self.buffer:
+                batch = self.buffer[:self.max_documents]
+                del self.buffer[:self.max_documents]
+                try:
+                    await get_async_Mongo_db(self.collection_name).insert_many(batch, ordered=False)
+                    self.written += len(batch)
+                except BulkWriteError as e:
+                    # Unordered: everything except the failed documents was written.
+                    failed = len(e.details.get("writeErrors", []))
+                    self.written += len(batch) - failed
+                    print(f"Mongo bulk write to {self.collection_name}: {failed} of {len(batch)} documents failed")
+                except Exception as e:
+                    print(f"Mongo bulk write to {self.collection_name} failed, will retry: {e}")
+                    self.buffer[:0] = batch
+                    return
+
+    def stats(self):
+        return {"buffered": len(self.buffer), "written": self.written, "dropped": self.dropped}
+
+    async def close(self):
+        """Write out whatever is buffered and stop the background flusher."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+
+annotation_writer = BulkWriter("annotations")
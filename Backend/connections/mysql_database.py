@@ -1,6 +1,40 @@
 import mysql.connector
+from mysql.connector import pooling
 from connections.functions import *
+from connections.query_log import InstrumentedConnection
 import os
+import threading
+
+MYSQL_POOL_SIZE = int(os.getenv("MYSQL_POOL_SIZE", 10))
+_mysql_pool = None
+_mysql_pool_lock = threading.Lock()
+
+def get_Mysql_pool():
+    """
+    Process-wide connection pool, created on first use.
+    Connections taken from it go back to the pool on close().
+    """
+    global _mysql_pool
+    with _mysql_pool_lock:
+        if _mysql_pool is None:
+            _mysql_pool = pooling.MySQLConnectionPool(
+                pool_name="perceptronx",
+                pool_size=MYSQL_POOL_SIZE,
+                pool_reset_session=True,
+                host=os.getenv("MYSQL_HOST", "db"),
+                user=os.getenv("MYSQL_USER", "root"),
+                password=os.getenv("MYSQL_PASSWORD", "root"),
+                database=os.getenv("MYSQL_DB", "perceptronx"),
+                auth_plugin='mysql_native_password'
+            )
+    return _mysql_pool
+
+def get_pooled_Mysql_db():
+    """Borrow a pooled connection, falling back to a fresh one when the pool is exhausted."""
+    try:
+        return InstrumentedConnection(get_Mysql_pool().get_connection())
+    except mysql.connector.errors.PoolError:
+        return get_Mysql_db()
 
 def get_Mysql_db(max_retries=5, retry_delay=2):
     host = os.getenv("MYSQL_HOST", "db")  
@@ -17,7 +51,7 @@ def get_Mysql_db(max_retries=5, retry_delay=2):
                 database=database,
                 auth_plugin='mysql_native_password'
             )
-            return connection
+            return InstrumentedConnection(connection)
         except mysql.connector.Error as err:
             if attempt < max_retries - 1:
                 print(f"Database connection attempt {attempt+1} failed: {err}. Retrying in {retry_delay} seconds...")
@@ -0,0 +1,30 @@
+import base64
+import json
+
+
+def encode_cursor(*values):
+    """
+    Pack keyset values (e.g. a timestamp and an id) into an opaque URL-safe token.
+    """
+    raw = json.dumps(list(values), default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, size=None):
+    """
+    Unpack a token made by encode_cursor.
+    Returns the list of values, or None when the token is malformed or has the wrong size.
+    """
+    if not token:
+        return None
+
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+    if not isinstance(values, list) or (size is not None and len(values) != size):
+        return None
+
+    return values
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import random
+import secrets
+import time
+import uuid
+from pathlib import Path
+
+from connections.logs import get_logger
+from connections.metrics import request_calls, route_label
+from connections.query_log import statement_trace
+
+# Fraction of requests profiled without being asked to; 0 profiles only on an admin's X-Profile header.
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.001))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", 200))
+PROFILE_DIR = os.getenv("PROFILE_DIR", str(Path(__file__).resolve().parent.parent / "uploads" / "profiles"))
+
+logger = get_logger("profiling")
+
+
+def profile_path(profile_id, suffix):
+    return os.path.join(PROFILE_DIR, f"{profile_id}.{suffix}")
+
+
+def db_breakdown(statements, calls):
+    """MySQL time per statement shape, slowest first, plus Redis/Mongo call counts."""
+    by_statement = {}
+    for entry in statements:
+        shape = by_statement.setdefault(entry["statement"], {"statement": entry["statement"], "count": 0, "total_ms": 0.0})
+        shape["count"] += 1
+        shape["total_ms"] += entry["duration_ms"]
+    shapes = sorted(by_statement.values(), key=lambda shape: shape["total_ms"], reverse=True)
+    for shape in shapes:
+        shape["total_ms"] = round(shape["total_ms"], 2)
+    return {
+        "mysql_ms": round(sum(entry["duration_ms"] for entry in statements), 2),
+        "mysql_statements": len(statements),
+        "mysql_by_statement": shapes,
+        "calls": dict(calls or {}),
+    }
+
+
+def save_profile(profile_id, session, summary):
+    """Write the speedscope profile, the flame graph and the summary, then drop the oldest profiles."""
+    from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with open(profile_path(profile_id, "speedscope.json"), "w") as f:
+        f.write(SpeedscopeRenderer().render(session))
+    with open(profile_path(profile_id, "html"), "w") as f:
+        f.write(HTMLRenderer().render(session))
+    with open(profile_path(profile_id, "json"), "w") as f:
+        json.dump(summary, f, default=str)
+
+    summaries = sorted(Path(PROFILE_DIR).glob("*.json"), key=lambda path: path.stat().st_mtime)
+    summaries = [path for path in summaries if not path.name.endswith(".speedscope.json")]
+    for path in summaries[:-PROFILE_KEEP] if PROFILE_KEEP else []:
+        for suffix in ("json", "speedscope.json", "html"):
+            Path(profile_path(path.stem, suffix)).unlink(missing_ok=True)
+
+
+def list_profiles(route=None):
+    """Summaries of the stored profiles, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for path in Path(PROFILE_DIR).glob("*.json"):
+        if path.name.endswith(".speedscope.json"):
+            continue
+        try:
+            summary = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        if route is None or summary.get("route") == route:
+            profiles.append({field: value for field, value in summary.items() if field != "db"})
+    return sorted(profiles, key=lambda summary: summary["started_at"], reverse=True)
+
+
+def load_profile(profile_id):
+    try:
+        with open(profile_path(profile_id, "json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware running pyinstrument's statistical profiler over chosen requests:
+    those carrying `X-Profile: 1` together with a valid X-Admin-Token, and a random
+    PROFILE_SAMPLE_RATE fraction of the rest. For each one it stores a speedscope
+    profile, an HTML flame graph and a summary with the MySQL time per statement under
+    PROFILE_DIR (see /admin/profiles), and returns the id in an X-Profile-Id header.
+
+    Requests that are not profiled cost one header lookup. Only the event loop thread is
+    sampled, so time a sync route spends in the threadpool shows up as waiting.
+    """
+
+    def __init__(self, app, sample_rate=PROFILE_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    def wants_profile(self, scope):
+        headers = dict(scope["headers"])
+        if headers.get(b"x-profile") in (b"1", b"true"):
+            from connections.routers.common import ADMIN_TOKEN
+
+            token = headers.get(b"x-admin-token", b"").decode("latin-1")
+            return bool(ADMIN_TOKEN) and secrets.compare_digest(token, ADMIN_TOKEN)
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            logger.warning("profiling_unavailable", detail="pyinstrument is not installed")
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        statements = []
+        token = statement_trace.set(statements)
+        profiler = Profiler(interval=PROFILE_INTERVAL, async_mode="enabled")
+        started_at = time.time()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session = profiler.stop()
+            statement_trace.reset(token)
+
+            summary = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route_label(scope),
+                "status": status["code"],
+                "started_at": started_at,
+                "duration_ms": round(session.duration * 1000, 1),
+                "db": db_breakdown(statements, request_calls.get()),
+            }
+            try:
+                await asyncio.to_thread(save_profile, profile_id, session, summary)
+                logger.info("request_profiled", profile_id=profile_id, route=summary["route"],
+                            duration_ms=summary["duration_ms"], mysql_ms=summary["db"]["mysql_ms"])
+            except Exception as e:
+                logger.error("profile_save_failed", profile_id=profile_id, error=str(e))
@@ -0,0 +1,172 @@
+import collections
+import contextvars
+import hashlib
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from connections.logs import get_logger
+from connections.metrics import QUERY_LATENCY, count_call, current_route
+
+MYSQL_SLOW_QUERY_MS = float(os.getenv("MYSQL_SLOW_QUERY_MS", 200))
+MYSQL_EXPLAIN_SLOW = os.getenv("MYSQL_EXPLAIN_SLOW", "0").lower() in ("1", "true", "yes")
+MYSQL_EXPLAIN_INTERVAL = float(os.getenv("MYSQL_EXPLAIN_INTERVAL", 300))
+
+# Most recent slow statements (with their EXPLAIN when captured), newest last.
+slow_queries = collections.deque(maxlen=200)
+
+logger = get_logger("mysql")
+
+# Set to a list while a request is being profiled; every statement is appended to it.
+statement_trace = contextvars.ContextVar("statement_trace", default=None)
+STATEMENT_TRACE_LIMIT = 500
+
+_explained_at = {}
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+
+
+def normalize_statement(statement):
+    if isinstance(statement, (bytes, bytearray)):
+        statement = statement.decode("utf-8", "replace")
+    return re.sub(r"\s+", " ", statement).strip()
+
+
+def redact_value(value):
+    """Keep only the shape of a parameter: its type and, for strings/bytes, its length."""
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes, bytearray)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_params(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {name: redact_value(value) for name, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [redact_value(value) for value in params]
+    return redact_value(params)
+
+
+def record_statement(statement, params, seconds, rowcount=None, explainable=True):
+    """Time a statement against its route; log it as a slow query above MYSQL_SLOW_QUERY_MS."""
+    route = current_route() or "background"
+    QUERY_LATENCY.labels(route).observe(seconds)
+
+    duration_ms = seconds * 1000
+    trace = statement_trace.get()
+    if trace is not None and len(trace) < STATEMENT_TRACE_LIMIT:
+        trace.append({"statement": normalize_statement(statement)[:500], "duration_ms": round(duration_ms, 2),
+                      "rows": rowcount})
+
+    if duration_ms < MYSQL_SLOW_QUERY_MS:
+        return
+
+    normalized = normalize_statement(statement)
+    fingerprint = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+    entry = {
+        "route": route,
+        "duration_ms": round(duration_ms, 1),
+        "fingerprint": fingerprint,
+        "statement": normalized[:2000],
+        "params": redact_params(params),
+        "rows": rowcount,
+        "timestamp": time.time(),
+    }
+    logger.warning("slow_query", **entry)
+    slow_queries.append(entry)
+
+    explainable = explainable and normalized.upper().startswith(("SELECT", "UPDATE", "DELETE", "INSERT", "REPLACE"))
+    if MYSQL_EXPLAIN_SLOW and explainable:
+        # One EXPLAIN per statement shape per interval, off the request path.
+        now = time.monotonic()
+        if now - _explained_at.get(fingerprint, -MYSQL_EXPLAIN_INTERVAL) >= MYSQL_EXPLAIN_INTERVAL:
+            _explained_at[fingerprint] = now
+            _explain_executor.submit(capture_explain, entry, statement, params)
+
+
+def capture_explain(entry, statement, params):
+    """Run EXPLAIN for a slow statement on a separate connection and attach the plan to its log entry."""
+    from connections.mysql_database import get_pooled_Mysql_db
+
+    db = get_pooled_Mysql_db()
+    raw = getattr(db, "raw", db)
+    cursor = None
+    try:
+        cursor = raw.cursor(dictionary=True)
+        cursor.execute(f"EXPLAIN {normalize_statement(statement)}", params)
+        entry["explain"] = cursor.fetchall()
+        logger.info("slow_query_explain", fingerprint=entry["fingerprint"], route=entry["route"], plan=entry["explain"])
+    except Exception as e:
+        logger.warning("slow_query_explain_failed", fingerprint=entry["fingerprint"], error=str(e))
+    finally:
+        if cursor:
+            cursor.close()
+        db.close()
+
+
+class InstrumentedCursor:
+    """
+    Cursor proxy that counts and times every statement against the current request's route.
+    Timing covers execute, i.e. until MySQL starts returning rows.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _timed(self, method, statement, params, explainable=True):
+        count_call("mysql")
+        started = time.perf_counter()
+        try:
+            return method(statement, params)
+        finally:
+            record_statement(statement, params, time.perf_counter() - started,
+                             getattr(self._cursor, "rowcount", None), explainable)
+
+    def execute(self, statement, params=None, *args, **kwargs):
+        count_call("mysql")
+        started = time.perf_counter()
+        try:
+            return self._cursor.execute(statement, params, *args, **kwargs)
+        finally:
+            record_statement(statement, params, time.perf_counter() - started, getattr(self._cursor, "rowcount", None))
+
+    def executemany(self, statement, seq_params):
+        return self._timed(self._cursor.executemany, statement, seq_params, explainable=False)
+
+    def callproc(self, procname, args=()):
+        return self._timed(self._cursor.callproc, procname, args, explainable=False)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._cursor.close()
+
+
+class InstrumentedConnection:
+    """MySQL connection proxy whose cursors are instrumented; `raw` is the wrapped connection."""
+
+    def __init__(self, connection):
+        self.raw = connection
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self.raw.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.raw.close()
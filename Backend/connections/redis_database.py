@@ -1,61 +1,133 @@
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ResponseError
 import uuid
 import os
+import time
 from dotenv import load_dotenv
 import json
+from connections.logs import get_logger
+from connections.metrics import REDIS_COMMAND_LATENCY, count_call
 
 load_dotenv()
 
-REDIS_HOST = os.getenv("REDIS_HOST", "redis")  
+REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+# "json" stores a session as one JSON string, "hash" as a hash with one field per key,
+# so single fields can be read with HMGET. Sessions in the other format are still read.
+REDIS_SESSION_FORMAT = os.getenv("REDIS_SESSION_FORMAT", "json")
 
-r = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, decode_responses=True)
+logger = get_logger("redis")
+
+class CountingRedisConnection(redis.Connection):
+    """Counts every round trip (a whole pipeline is one) against the current request."""
+
+    async def send_packed_command(self, command, check_health=True):
+        count_call("redis")
+        return await super().send_packed_command(command, check_health)
+
+class TimedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        if not self.command_stack:
+            return await super().execute(raise_on_error)
+        started = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_COMMAND_LATENCY.labels("PIPELINE").observe(time.perf_counter() - started)
+
+class TimedRedis(redis.Redis):
+    """Redis client recording each command's round-trip latency by command name."""
+
+    async def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_COMMAND_LATENCY.labels(str(args[0]).upper()).observe(time.perf_counter() - started)
+
+    def pipeline(self, transaction: bool = True, shard_hint=None):
+        return TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+r = TimedRedis(connection_pool=redis.ConnectionPool(
+    host=REDIS_HOST, port=REDIS_PORT, decode_responses=True, connection_class=CountingRedisConnection
+))
 SESSION_TTL = 63072000
 
+def session_key(session_id: str):
+    return f"session:{session_id}"
+
 async def create_redis_session(data: dict):
+    """Store a new session in one round trip and return its id (None if Redis failed)."""
     session_id = str(uuid.uuid4())
-    session_key = f"session:{session_id}"  
-    
+
     try:
-        json_data = json.dumps(data)
-        await r.set(session_key, json_data, ex=SESSION_TTL)
-        
-        verification = await r.get(session_key)
-        print(f"Session verification: {verification}")
-        
+        if REDIS_SESSION_FORMAT == "hash":
+            async with r.pipeline(transaction=True) as pipe:
+                pipe.hset(session_key(session_id), mapping={field: json.dumps(value) for field, value in data.items()})
+                pipe.expire(session_key(session_id), SESSION_TTL)
+                await pipe.execute()
+        else:
+            await r.set(session_key(session_id), json.dumps(data), ex=SESSION_TTL)
         return session_id
     except Exception as e:
-        print(f"Error creating Redis session: {e}")
+        logger.error("session_create_failed", error=str(e))
         return None
-    
+
 async def test_redis_connection():
     try:
-        await r.set('test_key', 'Success!')
-        value = await r.get('test_key')
-        print(f"Test Redis connection successful: {value}")
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.set('test_key', 'Success!')
+            pipe.get('test_key')
+            _, value = await pipe.execute()
+        logger.info("redis_connection_ok", value=value)
         return True
     except Exception as e:
-        print(f"Error connecting to Redis: {e}")
+        logger.error("redis_connection_failed", error=str(e))
         return False
 
-async def get_redis_session(session_id: str):
+async def _read_session(key, fields, as_hash):
+    if as_hash:
+        if fields:
+            values = await r.hmget(key, fields)
+            if all(value is None for value in values):
+                return None
+            return {field: json.loads(value) for field, value in zip(fields, values) if value is not None}
+        values = await r.hgetall(key)
+        return {field: json.loads(value) for field, value in values.items()} if values else None
+
+    json_data = await r.get(key)
+    if not json_data:
+        return None
+    data = json.loads(json_data)
+    return {field: data[field] for field in fields if field in data} if fields else data
+
+async def get_redis_session(session_id: str, fields=None):
+    """
+    The session's data, or only `fields` of it, in one round trip; None when it does
+    not exist or has expired. With hash sessions only the requested fields are read.
+    """
+    as_hash = REDIS_SESSION_FORMAT == "hash"
     try:
-        session_key = f"session:{session_id}"
-        json_data = await r.get(session_key)
-        
-        if not json_data:
-            print(f"Session ID {session_id} does not exist or has expired.")
-            return None
-            
-        return json.loads(json_data)
+        try:
+            session = await _read_session(session_key(session_id), fields, as_hash)
+        except ResponseError as e:
+            if "WRONGTYPE" not in str(e):
+                raise
+            # Written before REDIS_SESSION_FORMAT changed.
+            session = await _read_session(session_key(session_id), fields, not as_hash)
+
+        if session is None:
+            logger.debug("session_missing")
+        return session
     except Exception as e:
-        print(f"Error retrieving Redis session: {e}")
+        logger.error("session_read_failed", error=str(e))
         return None
-    
+
 async def delete_redis_session(session_id: str):
     """
     >>> To log out user
     Args:
     session_id (str): User id
     """
-    await r.delete(session_id)
\ No newline at end of file
+    await r.delete(session_key(session_id))
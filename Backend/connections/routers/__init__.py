@@ -0,0 +1,52 @@
+import importlib
+import os
+
+ROUTER_DOMAINS = (
+    "auth", "dashboard", "messages", "appointments",
+    "exercises", "plans", "therapists", "mobile", "inference", "annotations"
+)
+
+TEMPLATE_DOMAINS = ("auth", "dashboard", "appointments", "exercises", "plans")
+
+DEPLOYMENT_ROLES = {
+    "all": ROUTER_DOMAINS,
+    "web": ("auth", "dashboard", "messages", "appointments", "exercises", "plans", "therapists"),
+    "api": ("messages", "therapists", "mobile", "annotations"),
+    "inference": ("inference", "annotations"),
+}
+
+
+def get_deployment_role():
+    return os.environ.get("DEPLOYMENT_ROLE", "all").strip().lower()
+
+
+def resolve_router_domains(role):
+    """
+    Map a deployment role ("all", "web", "api", "inference") or a comma-separated list of domains
+    to the router domains it serves.
+    """
+    if role in DEPLOYMENT_ROLES:
+        return DEPLOYMENT_ROLES[role]
+
+    domains = tuple(domain.strip() for domain in role.split(",") if domain.strip())
+    unknown = [domain for domain in domains if domain not in ROUTER_DOMAINS]
+    if not domains or unknown:
+        raise ValueError(f"Unknown deployment role or router domains: {role}")
+
+    return domains
+
+
+def include_routers(app, role=None):
+    """
+    Import and mount only the routers for this role, so e.g. an API worker
+    never loads the template-rendering dashboard modules.
+    Returns the mounted domains.
+    """
+    domains = resolve_router_domains(role or get_deployment_role())
+
+    for domain in ROUTER_DOMAINS:
+        if domain in domains:
+            module = importlib.import_module(f"connections.routers.{domain}")
+            app.include_router(module.router)
+
+    return domains
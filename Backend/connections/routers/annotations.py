@@ -0,0 +1,224 @@
+from connections.functions import *
+from connections.mysql_database import *
+from connections.mongo_db import *
+from connections.routers.common import *
+from connections.pagination import decode_cursor, encode_cursor
+from bson import ObjectId
+from bson.errors import InvalidId
+import asyncio
+import traceback
+
+router = APIRouter()
+logger = get_logger("annotations")
+
+ANNOTATION_PAGE_SIZE = int(os.getenv("ANNOTATION_PAGE_SIZE", 50))
+ANNOTATION_MAX_PAGE_SIZE = int(os.getenv("ANNOTATION_MAX_PAGE_SIZE", 500))
+ANNOTATION_STREAM_BATCH = int(os.getenv("ANNOTATION_STREAM_BATCH", 500))
+
+# Fields a client may ask for; the large `annotations` array is only returned when requested.
+ANNOTATION_FIELDS = (
+    "user_id", "user_type", "image", "annotations", "size", "save_location", "model_used", "model_version",
+    "timestamp", "status", "confidence_threshold", "processing_time", "device", "video_id", "frame"
+)
+DEFAULT_ANNOTATION_FIELDS = tuple(field for field in ANNOTATION_FIELDS if field != "annotations")
+
+NEWEST_FIRST = [("timestamp", -1), ("_id", -1)]
+
+
+def annotation_cursor(doc):
+    """Keyset cursor for the last document on a page: its timestamp and _id (ObjectId or video frame id)."""
+    return encode_cursor(doc["timestamp"].isoformat(), str(doc["_id"]), isinstance(doc["_id"], ObjectId))
+
+
+def parse_annotation_cursor(cursor):
+    values = decode_cursor(cursor, size=3)
+    if values is None:
+        raise ValueError("cursor is not a keyset cursor")
+    timestamp, last_id, is_object_id = values
+    return datetime.datetime.fromisoformat(timestamp), ObjectId(last_id) if is_object_id else last_id
+
+
+def serialize_annotation(doc):
+    """Like serialize_document, but for projected documents that only carry some fields."""
+    item = {"id": str(doc["_id"])}
+    for field in ANNOTATION_FIELDS:
+        if field in doc:
+            value = doc[field]
+            item[field] = value.isoformat() if isinstance(value, datetime.datetime) else value
+    return item
+
+
+def parse_fields(fields):
+    if not fields:
+        return DEFAULT_ANNOTATION_FIELDS
+    requested = tuple(field.strip() for field in fields.split(",") if field.strip())
+    unknown = [field for field in requested if field not in ANNOTATION_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+def fetch_patient_user_ids(therapist_id):
+    """App-user ids of a therapist's patients; a patient record is linked to its app account by email."""
+    db = get_pooled_Mysql_db()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute(
+            """SELECT u.user_id FROM Patients p
+            JOIN users u ON u.email = p.email
+            WHERE p.therapist_id = %s""",
+            (therapist_id,)
+        )
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        db.close()
+
+
+async def annotation_scope(user):
+    """
+    The annotations `user` may read. App users see their own. Therapists see their own and
+    their patients'. Ids of therapists and app users overlap, so user_type tells them apart.
+    """
+    if user["user_type"] != "therapist":
+        return {"user_id": user["user_id"], "user_type": {"$ne": "therapist"}}
+
+    patient_user_ids = await asyncio.to_thread(fetch_patient_user_ids, user["user_id"])
+    return {"$or": [
+        {"user_id": user["user_id"], "user_type": "therapist"},
+        # Written before user_id was stored as an int and user_type was recorded.
+        {"user_id": str(user["user_id"])},
+        {"user_id": {"$in": patient_user_ids}, "user_type": {"$ne": "therapist"}},
+    ]}
+
+
+def build_annotation_filter(scope, user_id, model_used, status, since, until):
+    """
+    `scope` (from annotation_scope) narrowed by the request's filters; a user_id outside
+    the scope matches nothing. Filters line up with the (user_id, timestamp),
+    (model_used, status) and (timestamp) indexes.
+    """
+    query = {"$and": [scope]}
+    if user_id is not None:
+        query["user_id"] = user_id
+
+    if model_used:
+        query["model_used"] = model_used
+    if status:
+        query["status"] = status
+
+    if since or until:
+        query["timestamp"] = {}
+        if since:
+            query["timestamp"]["$gte"] = datetime.datetime.fromisoformat(since)
+        if until:
+            query["timestamp"]["$lt"] = datetime.datetime.fromisoformat(until)
+    return query
+
+
+@router.get("/annotations")
+async def list_annotations(
+    user_id: Optional[int] = None,
+    model_used: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    fields: Optional[str] = None,
+    limit: int = ANNOTATION_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    user=Depends(get_inference_user)
+):
+    """
+    API endpoint paging through annotations newest first.
+    Pass the returned next_cursor to get the following page; `fields` is a comma-separated
+    projection (the annotations array is left out unless asked for).
+    """
+    try:
+        projection = parse_fields(fields)
+        query = build_annotation_filter(await annotation_scope(user), user_id, model_used, status, since, until)
+        if cursor:
+            timestamp, last_id = parse_annotation_cursor(cursor)
+            query["$and"].append({"$or": [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "_id": {"$lt": last_id}},
+            ]})
+    except (ValueError, TypeError, KeyError, InvalidId) as e:
+        return JSONResponse(status_code=400, content={"status": "invalid", "detail": f"Invalid query: {str(e)}"})
+
+    limit = max(1, min(limit, ANNOTATION_MAX_PAGE_SIZE))
+
+    try:
+        collection = get_async_Mongo_db("annotations")
+        # timestamp is always projected because the cursor is built from it.
+        docs = await collection.find(
+            query, {field: 1 for field in projection + ("timestamp",)}
+        ).sort(NEWEST_FIRST).limit(limit + 1).to_list(length=limit + 1)
+
+        next_cursor = annotation_cursor(docs[limit - 1]) if len(docs) > limit else None
+        return {
+            "status": "valid",
+            "items": [serialize_annotation(doc) for doc in docs[:limit]],
+            "next_cursor": next_cursor
+        }
+    except Exception as e:
+        logger.exception("annotations_list_failed", error=str(e))
+        return JSONResponse(status_code=500, content={"status": "invalid", "detail": f"Database error: {str(e)}"})
+
+
+@router.get("/annotations/export")
+async def export_annotations(
+    user_id: Optional[int] = None,
+    model_used: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    fields: Optional[str] = None,
+    user=Depends(get_inference_user)
+):
+    """
+    API endpoint streaming every matching annotation as NDJSON, one document per line,
+    read from Mongo in batches so memory stays flat however many documents match.
+    """
+    try:
+        projection = parse_fields(fields)
+        query = build_annotation_filter(await annotation_scope(user), user_id, model_used, status, since, until)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"status": "invalid", "detail": f"Invalid query: {str(e)}"})
+
+    collection = get_async_Mongo_db("annotations")
+
+    async def lines():
+        documents = collection.find(query, {field: 1 for field in projection}).sort(NEWEST_FIRST)
+        async for doc in documents.batch_size(ANNOTATION_STREAM_BATCH):
+            yield json.dumps(serialize_annotation(doc)) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@router.get("/annotations/{annotation_id}/detections")
+async def stream_detections(annotation_id: str, user=Depends(get_inference_user)):
+    """
+    API endpoint streaming one document's annotations array as NDJSON, one detection per line.
+    The array is unwound inside Mongo, so a huge document is never loaded whole.
+    """
+    query = {
+        "_id": ObjectId(annotation_id) if ObjectId.is_valid(annotation_id) else annotation_id,
+        "$and": [await annotation_scope(user)],
+    }
+
+    collection = get_async_Mongo_db("annotations")
+    if not await collection.find_one(query, {"_id": 1}):
+        return JSONResponse(status_code=404, content={"status": "invalid", "detail": "Annotation not found"})
+
+    async def lines():
+        pipeline = [
+            {"$match": query},
+            {"$project": {"_id": 0, "annotations": 1}},
+            {"$unwind": "$annotations"},
+            {"$replaceRoot": {"newRoot": "$annotations"}},
+        ]
+        async for detection in collection.aggregate(pipeline, batchSize=ANNOTATION_STREAM_BATCH):
+            yield json.dumps(detection) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,787 @@
+from connections.functions import *
+from connections.mysql_database import *
+from connections.redis_database import *
+from connections.mongo_db import *
+from connections.routers.common import *
+from connections.templating import templates
+import traceback
+
+router = APIRouter()
+
+@router.get("/appointments/new")
+async def new_appointment_form(request: Request):
+    """Display the new appointment form"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        db = get_Mysql_db()
+        cursor = None
+
+        try:
+            cursor = db.cursor(dictionary=True)
+
+            cursor.execute(
+                "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
+                (session_data["user_id"],)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return RedirectResponse(url="/Therapist_Login")
+
+            cursor.execute(
+                """SELECT patient_id, first_name, last_name, diagnosis, phone
+                FROM Patients 
+                WHERE therapist_id = %s
+                ORDER BY last_name, first_name""", 
+                (session_data["user_id"],)
+            )
+            patients = cursor.fetchall()
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            unread_count_result = cursor.fetchone()
+            unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+
+            cursor.execute(
+                """SELECT m.message_id, m.subject, m.content, m.created_at, 
+                        t.first_name, t.last_name, COALESCE(t.profile_image, 'avatar-1.jpg') as profile_image
+                    FROM Messages m
+                    JOIN Therapists t ON m.sender_id = t.id
+                    WHERE m.recipient_id = %s AND m.is_read = FALSE
+                    ORDER BY m.created_at DESC
+                    LIMIT 4""",
+                (session_data["user_id"],)
+            )
+            messages_result = cursor.fetchall()
+
+            recent_messages = []
+            for message in messages_result:
+                message_with_time = message.copy()
+
+                timestamp = message['created_at']
+                now = datetime.datetime.now()
+                if isinstance(timestamp, datetime.datetime):
+                    diff = now - timestamp
+                    if timestamp.date() == now.date():
+                        message_with_time['time_display'] = timestamp.strftime('%I:%M %p')
+
+                        minutes_ago = diff.seconds // 60
+                        if minutes_ago < 60:
+                            message_with_time['time_ago'] = f"{minutes_ago} min ago"
+                        else:
+                            hours_ago = minutes_ago // 60
+                            message_with_time['time_ago'] = f"{hours_ago} hours ago"
+
+                    elif timestamp.date() == (now - timedelta(days=1)).date():
+                        message_with_time['time_display'] = "Yesterday"
+                        message_with_time['time_ago'] = timestamp.strftime('%I:%M %p')
+                    else:
+                        message_with_time['time_display'] = timestamp.strftime('%d %b')
+                        message_with_time['time_ago'] = timestamp.strftime('%Y')
+
+                recent_messages.append(message_with_time)
+
+            today = datetime.datetime.now().strftime('%Y-%m-%d')
+
+            return templates.TemplateResponse(
+                "dist/appointments/new_appointment.html",
+                {
+                    "request": request,
+                    "first_name": therapist["first_name"],
+                    "last_name": therapist["last_name"],
+                    "patients": patients,
+                    "unread_messages_count": unread_messages_count,
+                    "recent_messages": recent_messages,
+                    "today": today
+                }
+            )
+        except Exception as e:
+            print(f"Database error in new appointment form: {e}")
+            print(f"Traceback: {traceback.format_exc()}")
+            return RedirectResponse(url="/appointments")
+        finally:
+            if cursor:
+                cursor.close()
+            if db:
+                db.close()
+    except Exception as e:
+        print(f"Error in new appointment form: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.get("/appointments")
+async def appointments_page(request: Request):
+    """Route to display appointments schedule and management page"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        db = get_Mysql_db()
+        cursor = None
+
+        try:
+            cursor = db.cursor(dictionary=True)
+
+            cursor.execute(
+                "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
+                (session_data["user_id"],)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return RedirectResponse(url="/Therapist_Login")
+
+            cursor.execute(
+                """SELECT a.*, p.first_name as patient_first_name, p.last_name as patient_last_name 
+                FROM Appointments a
+                JOIN Patients p ON a.patient_id = p.patient_id
+                WHERE a.therapist_id = %s AND a.appointment_date >= CURDATE()
+                ORDER BY a.appointment_date, a.appointment_time""", 
+                (session_data["user_id"],)
+            )
+            upcoming_appointments_raw = cursor.fetchall()
+
+            cursor.execute(
+                """SELECT a.*, p.first_name as patient_first_name, p.last_name as patient_last_name 
+                FROM Appointments a
+                JOIN Patients p ON a.patient_id = p.patient_id
+                WHERE a.therapist_id = %s AND a.appointment_date < CURDATE()
+                ORDER BY a.appointment_date DESC, a.appointment_time DESC
+                LIMIT 10""", 
+                (session_data["user_id"],)
+            )
+            past_appointments_raw = cursor.fetchall()
+
+            cursor.execute(
+                "SELECT patient_id, first_name, last_name, diagnosis FROM Patients WHERE therapist_id = %s", 
+                (session_data["user_id"],)
+            )
+            patients = cursor.fetchall()
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            unread_count_result = cursor.fetchone()
+            unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+
+            cursor.execute(
+                """SELECT m.message_id, m.subject, m.content, m.created_at, 
+                        t.first_name, t.last_name, COALESCE(t.profile_image, 'avatar-1.jpg') as profile_image
+                    FROM Messages m
+                    JOIN Therapists t ON m.sender_id = t.id
+                    WHERE m.recipient_id = %s AND m.is_read = FALSE
+                    ORDER BY m.created_at DESC
+                    LIMIT 4""",
+                (session_data["user_id"],)
+            )
+            messages_result = cursor.fetchall()
+
+            recent_messages = []
+            for message in messages_result:
+                message_with_time = message.copy()
+
+                timestamp = message['created_at']
+                now = datetime.datetime.now()
+                if isinstance(timestamp, datetime):
+                    diff = now - timestamp
+                    if timestamp.date() == now.date():
+                        message_with_time['time_display'] = timestamp.strftime('%I:%M %p')
+
+                        minutes_ago = diff.seconds // 60
+                        if minutes_ago < 60:
+                            message_with_time['time_ago'] = f"{minutes_ago} min ago"
+                        else:
+                            hours_ago = minutes_ago // 60
+                            message_with_time['time_ago'] = f"{hours_ago} hours ago"
+
+                    elif timestamp.date() == (now - timedelta(days=1)).date():
+                        message_with_time['time_display'] = "Yesterday"
+                        message_with_time['time_ago'] = timestamp.strftime('%I:%M %p')
+                    else:
+                        message_with_time['time_display'] = timestamp.strftime('%d %b')
+                        message_with_time['time_ago'] = timestamp.strftime('%Y')
+
+                recent_messages.append(message_with_time)
+
+            today = datetime.datetime.now().strftime('%Y-%m-%d')
+
+
+            upcoming_appointments = []
+            for appt in upcoming_appointments_raw:
+                processed_appt = process_appointment_for_calendar(appt)
+                upcoming_appointments.append(processed_appt)
+
+            past_appointments = []
+            for appt in past_appointments_raw:
+                processed_appt = process_appointment_for_calendar(appt)
+                past_appointments.append(processed_appt)
+
+
+            serialized_upcoming = json.dumps(upcoming_appointments, default=serialize_datetime)
+
+            return templates.TemplateResponse(
+                "dist/appointments/appointment_list.html",
+                {
+                    "request": request,
+                    "first_name": therapist["first_name"],
+                    "last_name": therapist["last_name"],
+                    "upcoming_appointments": upcoming_appointments,
+                    "past_appointments": past_appointments,
+                    "patients": patients,
+                    "unread_messages_count": unread_messages_count,
+                    "recent_messages": recent_messages,
+                    "today": today,
+                    "serialized_upcoming": serialized_upcoming  # Pass serialized data to template
+                }
+            )
+        except Exception as e:
+            print(f"Database error in appointments page: {e}")
+            print(f"Traceback: {traceback.format_exc()}")
+            return RedirectResponse(url="/front-page")
+        finally:
+            if cursor:
+                cursor.close()
+            if db:
+                db.close()
+    except Exception as e:
+        print(f"Error in appointments page: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.get("/appointments/{appointment_id}")
+async def view_appointment(request: Request, appointment_id: int):
+    """Display the detailed view of an appointment"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        db = get_Mysql_db()
+        cursor = None
+
+        try:
+            cursor = db.cursor(dictionary=True)
+
+
+            cursor.execute(
+                "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
+                (session_data["user_id"],)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return RedirectResponse(url="/Therapist_Login")
+
+
+            cursor.execute(
+                """SELECT a.*, p.first_name as patient_first_name, p.last_name as patient_last_name,
+                        p.diagnosis, p.phone, p.email
+                FROM Appointments a
+                JOIN Patients p ON a.patient_id = p.patient_id
+                WHERE a.appointment_id = %s AND a.therapist_id = %s""", 
+                (appointment_id, session_data["user_id"])
+            )
+            appointment = cursor.fetchone()
+
+            if not appointment:
+                return RedirectResponse(url="/appointments?error=not_found")
+
+
+            processed_appointment = process_appointment_for_calendar(appointment)
+
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            unread_count_result = cursor.fetchone()
+            unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+
+
+            cursor.execute(
+                """SELECT m.message_id, m.subject, m.content, m.created_at, 
+                        t.first_name, t.last_name, COALESCE(t.profile_image, 'avatar-1.jpg') as profile_image
+                    FROM Messages m
+                    JOIN Therapists t ON m.sender_id = t.id
+                    WHERE m.recipient_id = %s AND m.is_read = FALSE
+                    ORDER BY m.created_at DESC
+                    LIMIT 4""",
+                (session_data["user_id"],)
+            )
+            messages_result = cursor.fetchall()
+
+            recent_messages = []
+            for message in messages_result:
+                message_with_time = message.copy()
+
+                timestamp = message['created_at']
+                now = datetime.datetime.now()
+                if isinstance(timestamp, datetime.datetime):
+                    diff = now - timestamp
+                    if timestamp.date() == now.date():
+                        message_with_time['time_display'] = timestamp.strftime('%I:%M %p')
+
+                        minutes_ago = diff.seconds // 60
+                        if minutes_ago < 60:
+                            message_with_time['time_ago'] = f"{minutes_ago} min ago"
+                        else:
+                            hours_ago = minutes_ago // 60
+                            message_with_time['time_ago'] = f"{hours_ago} hours ago"
+
+                    elif timestamp.date() == (now - timedelta(days=1)).date():
+                        message_with_time['time_display'] = "Yesterday"
+                        message_with_time['time_ago'] = timestamp.strftime('%I:%M %p')
+                    else:
+                        message_with_time['time_display'] = timestamp.strftime('%d %b')
+                        message_with_time['time_ago'] = timestamp.strftime('%Y')
+
+                recent_messages.append(message_with_time)
+
+
+            cursor.execute(
+                """SELECT plan_id, name, status 
+                FROM TreatmentPlans 
+                WHERE patient_id = %s 
+                ORDER BY start_date DESC""",
+                (appointment['patient_id'],)
+            )
+            treatment_plans = cursor.fetchall()
+
+            return templates.TemplateResponse(
+                "dist/appointments/view_appointment.html",
+                {
+                    "request": request,
+                    "first_name": therapist["first_name"],
+                    "last_name": therapist["last_name"],
+                    "appointment": processed_appointment,
+                    "treatment_plans": treatment_plans,
+                    "unread_messages_count": unread_messages_count,
+                    "recent_messages": recent_messages
+                }
+            )
+        except Exception as e:
+            print(f"Database error in view appointment: {e}")
+            print(f"Traceback: {traceback.format_exc()}")
+            return RedirectResponse(url="/appointments?error=database")
+        finally:
+            if cursor:
+                cursor.close()
+            if db:
+                db.close()
+    except Exception as e:
+        print(f"Error in view appointment: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.get("/appointments/{appointment_id}/edit")
+async def edit_appointment_form(request: Request, appointment_id: int):
+    """Display the form to edit an appointment"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        db = get_Mysql_db()
+        cursor = None
+
+        try:
+            cursor = db.cursor(dictionary=True)
+
+            cursor.execute(
+                "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
+                (session_data["user_id"],)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return RedirectResponse(url="/Therapist_Login")
+
+            cursor.execute(
+                """SELECT a.*, p.first_name as patient_first_name, p.last_name as patient_last_name 
+                FROM Appointments a
+                JOIN Patients p ON a.patient_id = p.patient_id
+                WHERE a.appointment_id = %s AND a.therapist_id = %s""", 
+                (appointment_id, session_data["user_id"])
+            )
+            appointment = cursor.fetchone()
+
+            if not appointment:
+                return RedirectResponse(url="/appointments?error=not_found")
+
+            processed_appointment = process_appointment_for_calendar(appointment)
+
+            cursor.execute(
+                """SELECT patient_id, first_name, last_name, diagnosis, phone
+                FROM Patients 
+                WHERE therapist_id = %s
+                ORDER BY last_name, first_name""", 
+                (session_data["user_id"],)
+            )
+            patients = cursor.fetchall()
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            unread_count_result = cursor.fetchone()
+            unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+
+            cursor.execute(
+                """SELECT m.message_id, m.subject, m.content, m.created_at, 
+                        t.first_name, t.last_name, COALESCE(t.profile_image, 'avatar-1.jpg') as profile_image
+                    FROM Messages m
+                    JOIN Therapists t ON m.sender_id = t.id
+                    WHERE m.recipient_id = %s AND m.is_read = FALSE
+                    ORDER BY m.created_at DESC
+                    LIMIT 4""",
+                (session_data["user_id"],)
+            )
+            messages_result = cursor.fetchall()
+
+            recent_messages = []
+            for message in messages_result:
+                message_with_time = message.copy()
+
+                timestamp = message['created_at']
+                now = datetime.datetime.now()
+                if isinstance(timestamp, datetime.datetime):
+                    diff = now - timestamp
+                    if timestamp.date() == now.date():
+                        message_with_time['time_display'] = timestamp.strftime('%I:%M %p')
+
+                        minutes_ago = diff.seconds // 60
+                        if minutes_ago < 60:
+                            message_with_time['time_ago'] = f"{minutes_ago} min ago"
+                        else:
+                            hours_ago = minutes_ago // 60
+                            message_with_time['time_ago'] = f"{hours_ago} hours ago"
+
+                    elif timestamp.date() == (now - timedelta(days=1)).date():
+                        message_with_time['time_display'] = "Yesterday"
+                        message_with_time['time_ago'] = timestamp.strftime('%I:%M %p')
+                    else:
+                        message_with_time['time_display'] = timestamp.strftime('%d %b')
+                        message_with_time['time_ago'] = timestamp.strftime('%Y')
+
+                recent_messages.append(message_with_time)
+
+            appointment_date = appointment['appointment_date']
+            formatted_date = appointment_date.strftime('%Y-%m-%d') if isinstance(appointment_date, datetime.date) else appointment_date
+
+            appointment_time = appointment['appointment_time']
+            if isinstance(appointment_time, datetime.time):
+                formatted_time = appointment_time.strftime('%H:%M')
+            elif isinstance(appointment_time, datetime.timedelta):
+                total_seconds = appointment_time.total_seconds()
+                hours = int(total_seconds // 3600)
+                minutes = int((total_seconds % 3600) // 60)
+                formatted_time = f"{hours:02d}:{minutes:02d}"
+            else:
+                formatted_time = appointment_time
+
+            status_options = ['Scheduled', 'Completed', 'Cancelled', 'No-Show']
+
+            return templates.TemplateResponse(
+                "dist/appointments/edit_appointment.html",
+                {
+                    "request": request,
+                    "first_name": therapist["first_name"],
+                    "last_name": therapist["last_name"],
+                    "appointment": processed_appointment,
+                    "appointment_date": formatted_date,
+                    "appointment_time": formatted_time,
+                    "patients": patients,
+                    "unread_messages_count": unread_messages_count,
+                    "recent_messages": recent_messages,
+                    "status_options": status_options
+                }
+            )
+        except Exception as e:
+            print(f"Database error in edit appointment form: {e}")
+            print(f"Traceback: {traceback.format_exc()}")
+            return RedirectResponse(url="/appointments?error=database")
+        finally:
+            if cursor:
+                cursor.close()
+            if db:
+                db.close()
+    except Exception as e:
+        print(f"Error in edit appointment form: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.post("/appointments/{appointment_id}/edit")
+async def update_appointment(request: Request, appointment_id: int):
+    """Handle appointment update form submission"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        form_data = await request.form()
+
+        patient_id = form_data.get("patient_id")
+        appointment_date = form_data.get("appointment_date")
+        appointment_time = form_data.get("appointment_time")
+        duration = form_data.get("duration", "60")
+        notes = form_data.get("notes")
+        status = form_data.get("status", "Scheduled")
+
+        if not patient_id or not appointment_date or not appointment_time:
+            return RedirectResponse(
+                url=f"/appointments/{appointment_id}/edit?error=missing_fields", 
+                status_code=303
+            )
+
+        db = get_Mysql_db()
+        cursor = None
+
+        try:
+            cursor = db.cursor()
+
+
+            cursor.execute(
+                """SELECT appointment_id 
+                FROM Appointments 
+                WHERE appointment_id = %s AND therapist_id = %s""",
+                (appointment_id, session_data["user_id"])
+            )
+
+            if not cursor.fetchone():
+                print(f"Appointment {appointment_id} does not belong to therapist {session_data['user_id']}")
+                return RedirectResponse(url="/appointments?error=unauthorized")
+
+
+            cursor.execute(
+                "SELECT patient_id FROM Patients WHERE patient_id = %s AND therapist_id = %s",
+                (patient_id, session_data["user_id"])
+            )
+
+            if not cursor.fetchone():
+                print(f"Patient {patient_id} does not belong to therapist {session_data['user_id']}")
+                return RedirectResponse(url=f"/appointments/{appointment_id}/edit?error=invalid_patient")
+
+            try:
+
+                try:
+                    time_obj = datetime.datetime.strptime(appointment_time, "%H:%M").time()
+                except ValueError:
+                    try:
+                        time_obj = datetime.datetime.strptime(appointment_time, "%I:%M %p").time()
+                    except ValueError:
+                        time_obj = datetime.datetime.strptime(appointment_time, "%I:%M%p").time()
+
+
+                cursor.execute(
+                    """UPDATE Appointments 
+                    SET patient_id = %s, 
+                        appointment_date = %s, 
+                        appointment_time = %s, 
+                        duration = %s, 
+                        notes = %s, 
+                        status = %s,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE appointment_id = %s""",
+                    (patient_id, appointment_date, time_obj, duration, notes, status, appointment_id)
+                )
+                db.commit()
+
+                return RedirectResponse(url="/appointments?success=updated", status_code=303)
+            except ValueError as ve:
+                print(f"Time parsing error: {ve}")
+                return RedirectResponse(url=f"/appointments/{appointment_id}/edit?error=invalid_time_format")
+
+        except Exception as e:
+            if db:
+                db.rollback()
+            print(f"Database error updating appointment: {e}")
+            print(f"Traceback: {traceback.format_exc()}")
+            return RedirectResponse(url=f"/appointments/{appointment_id}/edit?error=db_error")
+        finally:
+            if cursor:
+                cursor.close()
+            if db:
+                db.close()
+    except Exception as e:
+        print(f"Error updating appointment: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.post("/appointments/new")
+async def create_appointment(request: Request):
+    """Handle appointment creation"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        form_data = await request.form()
+
+        patient_id = form_data.get("patient_id")
+        appointment_date = form_data.get("appointment_date")
+        appointment_time = form_data.get("appointment_time")
+        duration = form_data.get("duration", "60")
+        notes = form_data.get("notes")
+
+        if not patient_id or not appointment_date or not appointment_time:
+            return RedirectResponse(url="/appointments/new?error=missing_fields", status_code=303)
+
+        db = get_Mysql_db()
+        cursor = None
+
+        try:
+            cursor = db.cursor()
+
+            cursor.execute(
+                "SELECT patient_id FROM Patients WHERE patient_id = %s AND therapist_id = %s",
+                (patient_id, session_data["user_id"])
+            )
+
+            if not cursor.fetchone():
+                print(f"Patient {patient_id} does not belong to therapist {session_data['user_id']}")
+                return RedirectResponse(url="/appointments/new?error=invalid_patient")
+
+            try:
+                try:
+                    time_obj = datetime.datetime.strptime(appointment_time, "%H:%M").time()
+                except ValueError:
+                    try:
+                        time_obj = datetime.datetime.strptime(appointment_time, "%I:%M %p").time()
+                    except ValueError:
+                        time_obj = datetime.datetime.strptime(appointment_time, "%I:%M%p").time()
+
+                cursor.execute(
+                    """INSERT INTO Appointments 
+                    (patient_id, therapist_id, appointment_date, appointment_time, duration, notes, status) 
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                    (patient_id, session_data["user_id"], appointment_date, time_obj, duration, notes, "Scheduled")
+                )
+                db.commit()
+
+                return RedirectResponse(url="/appointments", status_code=303)
+            except ValueError as ve:
+                print(f"Time parsing error: {ve}")
+                return RedirectResponse(url="/appointments/new?error=invalid_time_format")
+
+        except Exception as e:
+            if db:
+                db.rollback()
+            print(f"Database error creating appointment: {e}")
+            print(f"Traceback: {traceback.format_exc()}")
+            return RedirectResponse(url="/appointments/new?error=db_error")
+        finally:
+            if cursor:
+                cursor.close()
+            if db:
+                db.close()
+    except Exception as e:
+        print(f"Error creating appointment: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.post("/appointments/{appointment_id}/status")
+async def update_appointment_status(
+    request: Request,
+    appointment_id: int,
+    status: str = Form(...),
+    session_notes: str = Form(None)
+):
+    """Route to update appointment status"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(status_code=401, content={"success": False, "message": "Not authenticated"})
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(status_code=401, content={"success": False, "message": "Not authenticated"})
+
+        db = get_Mysql_db()
+        cursor = None
+
+        try:
+            cursor = db.cursor()
+
+            cursor.execute(
+                """SELECT appointment_id FROM Appointments 
+                WHERE appointment_id = %s AND therapist_id = %s""",
+                (appointment_id, session_data["user_id"])
+            )
+
+            if not cursor.fetchone():
+                return JSONResponse(
+                    status_code=403, 
+                    content={"success": False, "message": "You don't have permission to update this appointment"}
+                )
+
+            notes_update = ""
+            if session_notes:
+                notes_update = f", notes = CONCAT(COALESCE(notes, ''), '\n\n{session_notes}')"
+
+            cursor.execute(
+                f"UPDATE Appointments SET status = %s{notes_update} WHERE appointment_id = %s",
+                (status, appointment_id)
+            )
+
+            db.commit()
+
+            return JSONResponse(content={"success": True, "message": f"Appointment marked as {status}"})
+
+        except Exception as e:
+            if db:
+                db.rollback()
+            print(f"Database error in update appointment status: {e}")
+            print(f"Traceback: {traceback.format_exc()}")
+            return JSONResponse(
+                status_code=500, 
+                content={"success": False, "message": f"Error updating appointment: {str(e)}"}
+            )
+        finally:
+            if cursor:
+                cursor.close()
+            if db:
+                db.close()
+    except Exception as e:
+        print(f"Error in update appointment status: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500, 
+            content={"success": False, "message": "Server error"}
+        )
@@ -0,0 +1,133 @@
+from connections.functions import *
+from connections.mysql_database import *
+from connections.redis_database import *
+from connections.mongo_db import *
+from connections.routers.common import *
+from connections.templating import templates
+import traceback
+
+router = APIRouter()
+
+@router.route("/Register_User_Web", methods=["GET", "POST"])
+async def Register_User_Web(request: Request):
+    form = await request.form()
+    first_name = form.get("first_name")
+    last_name = form.get("last_name")
+    company_email = form.get("company_email")
+    password = form.get("password")
+
+    if not all([first_name, last_name, company_email, password]):
+        return templates.TemplateResponse("dist/pages/register.html", {
+            "request": request,
+            "error": "All fields are required."
+        })
+
+    db = get_Mysql_db()
+    cursor = db.cursor()
+
+    hashed_password = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+
+    try:
+        cursor.execute(
+            "INSERT INTO Therapists (first_name, last_name, company_email, password) VALUES (%s, %s, %s, %s)",
+            (first_name, last_name, company_email, hashed_password.decode("utf-8"))
+        )
+        db.commit()
+        return RedirectResponse(url="/", status_code=303)
+    except mysql.connector.IntegrityError:
+        return templates.TemplateResponse("dist/pages/register.html", {
+            "request": request,
+            "error": "Therapist with this email already exists."
+        })
+    finally:
+        cursor.close()
+        db.close()
+
+
+@router.get("/logout")
+async def logout_get(request: Request):
+    session_id = request.cookies.get("session_id")
+    if session_id:
+        await delete_session(session_id)
+    response = RedirectResponse(url="/Therapist_Login")
+    response.delete_cookie("session_id")
+    return response
+
+
+@router.get("/Therapist_Login")
+async def therapist_login_page(request: Request):
+    session_id = request.cookies.get("session_id")
+    if session_id:
+        session = await get_session_data(session_id)
+        if session:
+            return RedirectResponse(url="/front-page")
+
+    return templates.TemplateResponse("dist/pages/login.html", {"request": request})
+
+
+@router.post("/Therapist_Login")
+async def therapist_login(
+    request: Request,
+    email: str = Form(...),
+    password: str = Form(...),
+    remember: bool = Form(False)
+):
+    db = get_Mysql_db()
+    cursor = db.cursor(dictionary=True)
+
+    try:
+        cursor.execute(
+            "SELECT id, company_email, password, first_name, last_name FROM Therapists WHERE company_email = %s",
+            (email,)
+        )
+        therapist = cursor.fetchone()
+
+        if not therapist:
+            return templates.TemplateResponse(
+                "dist/pages/login.html",
+                {"request": request, "error": "Invalid email or password"}
+            )
+
+        stored_password = therapist["password"]
+
+        if bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8')):
+            session_data = {
+                "user_id": str(therapist["id"]),
+                "email": therapist["company_email"],
+                "user_type": "therapist"
+            }
+
+            session_id = await create_redis_session(
+                data=session_data,
+            )
+
+            print(f"Session created: {session_id}")
+            print(f"User ID: {therapist['id']}")
+
+            response = RedirectResponse(url="/front-page", status_code=303)
+
+            response.set_cookie(
+                key="session_id",
+                value=session_id,
+                httponly=True,
+                samesite="lax"
+            )
+
+            print(f"Response created with cookie: {response.headers}")
+            return response
+        else:
+            return templates.TemplateResponse(
+                "dist/pages/login.html",
+                {"request": request, "error": "Invalid email or password"}
+            )
+
+    except Exception as e:
+        print(f"Login error: {e}")
+        return templates.TemplateResponse(
+            "dist/pages/login.html",
+            {"request": request, "error": f"Server error: {str(e)}"}
+        )
+
+    finally:
+        cursor.close()
+        db.close()
@@ -0,0 +1,287 @@
+from connections.functions import *
+from connections.mysql_database import *
+from connections.redis_database import *
+from connections.mongo_db import *
+import traceback
+
+
+def ensure_bytes(data):
+    """
+    Ensure data is in bytes format, converting from string if necessary.
+    Use this before writing data to binary mode files or sending to functions expecting bytes.
+    """
+    if data is None:
+        return b''
+    if isinstance(data, bytes):
+        return data
+    if isinstance(data, str):
+        return data.encode('utf-8')
+    return str(data).encode('utf-8')
+
+def ensure_str(data):
+    """
+    Ensure data is in string format, converting from bytes if necessary.
+    Use this before inserting data into database fields expecting strings.
+    """
+    if data is None:
+        return None
+    if isinstance(data, str):
+        return data
+    if isinstance(data, bytes):
+        return data.decode('utf-8')
+    return str(data)
+
+def get_all_specialties():
+    """Return list of all specialties"""
+    return [
+        "Orthopedic Physical Therapy",
+        "Neurological Physical Therapy",
+        "Cardiovascular & Pulmonary Physical Therapy",
+        "Pediatric Physical Therapy",
+        "Geriatric Physical Therapy",
+        "Sports Physical Therapy",
+        "Women's Health Physical Therapy",
+        "Manual Therapy",
+        "Vestibular Rehabilitation",
+        "Post-Surgical Rehabilitation",
+        "Pain Management"
+    ]
+
+
+active_sessions: Dict[str, SessionData] = {}
+
+
+async def create_session(user_id: int, email: str, remember: bool = False) -> str:
+    session_id = secrets.token_hex(16)
+
+    if remember:
+        expires = datetime.datetime.now() + datetime.timedelta(days=30)
+    else:
+        expires = datetime.datetime.now() + datetime.timedelta(hours=24)
+
+    active_sessions[session_id] = SessionData(
+        user_id=user_id,
+        email=email,
+        expires=expires
+    )
+
+    return session_id
+
+
+async def delete_session(session_id: str) -> None:
+    if session_id in active_sessions:
+        del active_sessions[session_id]
+
+
+async def get_session_data(session_id: str) -> Optional[SessionData]:
+    session = active_sessions.get(session_id)
+
+    if not session:
+        return None
+
+    if session.expires < datetime.datetime.now():
+        await delete_session(session_id)
+        return None
+
+    return session
+
+
+async def get_session_user(connection):
+    """
+    The signed-in therapist (Redis session) or app user (in-memory session) as
+    {"user_id": int, "user_type": "therapist" | "user"}.
+    Works for both HTTP requests and WebSockets; returns None when not signed in.
+    """
+    session_id = connection.cookies.get("session_id")
+    if not session_id:
+        return None
+
+    session = await get_redis_session(session_id, fields=("user_id", "user_type"))
+    if session:
+        # Only therapists get Redis sessions; ones created before user_type was stored lack the field.
+        # Redis keeps the id as a string; it is returned as an int like the app users' ids.
+        return {"user_id": int(session["user_id"]), "user_type": session.get("user_type", "therapist")}
+
+    session = await get_session_data(session_id)
+    if session:
+        return {"user_id": session.user_id, "user_type": "user"}
+
+    return None
+
+async def get_inference_user(request: Request):
+    user = await get_session_user(request)
+    if not user:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return user
+
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def is_admin_request(request: Request):
+    """Operational endpoints take an X-Admin-Token header matching ADMIN_TOKEN; disabled when it is unset."""
+    token = request.headers.get("X-Admin-Token", "")
+    return bool(ADMIN_TOKEN) and secrets.compare_digest(token, ADMIN_TOKEN)
+
+async def require_admin(request: Request):
+    if not is_admin_request(request):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+def process_appointment_for_calendar(appointment):
+    """Process an appointment object to make it suitable for calendar display"""
+    from datetime import datetime, date, time, timedelta  # Import at the top of the function
+
+    processed = dict(appointment)
+
+
+    if 'appointment_id' in processed and processed['appointment_id'] is not None:
+        processed['appointment_id'] = int(processed['appointment_id'])
+
+
+    if 'appointment_date' in processed and processed['appointment_date'] is not None:
+        if isinstance(processed['appointment_date'], datetime) or isinstance(processed['appointment_date'], date):
+            processed['appointment_date_iso'] = processed['appointment_date'].isoformat()
+
+
+    if 'appointment_time' in processed and processed['appointment_time'] is not None:
+        if isinstance(processed['appointment_time'], timedelta):
+            total_seconds = processed['appointment_time'].total_seconds()
+            hours = int(total_seconds // 3600)
+            minutes = int((total_seconds % 3600) // 60)
+
+
+            processed['appointment_time_obj'] = {
+                'hour': hours,
+                'minute': minutes
+            }
+
+
+            processed['appointment_time_24h'] = f"{hours:02d}:{minutes:02d}"
+
+
+            am_pm = "AM" if hours < 12 else "PM"
+            display_hours = hours if hours <= 12 else hours - 12
+            display_hours = 12 if display_hours == 0 else display_hours
+            processed['appointment_time_12h'] = f"{display_hours}:{minutes:02d} {am_pm}"
+
+
+            end_hours = hours + ((processed.get('duration', 60) + minutes) // 60)
+            end_minutes = (minutes + processed.get('duration', 60)) % 60
+            processed['end_time_24h'] = f"{end_hours:02d}:{end_minutes:02d}"
+
+
+            processed['formatted_time'] = processed['appointment_time_12h']
+
+        elif hasattr(processed['appointment_time'], 'hour'):
+
+            hours = processed['appointment_time'].hour
+            minutes = processed['appointment_time'].minute
+
+
+            processed['appointment_time_obj'] = {
+                'hour': hours,
+                'minute': minutes
+            }
+
+
+            processed['appointment_time_24h'] = f"{hours:02d}:{minutes:02d}"
+
+
+            am_pm = "AM" if hours < 12 else "PM"
+            display_hours = hours if hours <= 12 else hours - 12
+            display_hours = 12 if display_hours == 0 else display_hours
+            processed['appointment_time_12h'] = f"{display_hours}:{minutes:02d} {am_pm}"
+
+
+            end_hours = hours + ((processed.get('duration', 60) + minutes) // 60)
+            end_minutes = (minutes + processed.get('duration', 60)) % 60
+            processed['end_time_24h'] = f"{end_hours:02d}:{end_minutes:02d}"
+
+
+            processed['formatted_time'] = processed['appointment_time_12h']
+
+
+    if 'duration' not in processed or processed['duration'] is None:
+        processed['duration'] = 60
+
+
+    if 'status' not in processed or processed['status'] is None:
+        processed['status'] = 'Scheduled'
+
+    return processed
+
+
+def serialize_datetime(obj):
+    """JSON serializer for datetime objects not serializable by default json code"""
+    from datetime import datetime, date, time, timedelta
+
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    elif isinstance(obj, time):
+        return obj.strftime('%H:%M:%S')
+    elif isinstance(obj, timedelta):
+        total_seconds = obj.total_seconds()
+        hours = int(total_seconds // 3600)
+        minutes = int((total_seconds % 3600) // 60)
+        return f"{hours:02d}:{minutes:02d}"
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+def format_message_time(timestamp, now):
+    """
+    (date label, relative time) for a message list: "10:42 AM" / "5 min ago" today,
+    "Yesterday" / "10:42 AM" yesterday, "03 Apr" / "2025" before that.
+    """
+    if timestamp.date() == now.date():
+        minutes_ago = (now - timestamp).seconds // 60
+        time_ago = f"{minutes_ago} min ago" if minutes_ago < 60 else f"{minutes_ago // 60} hours ago"
+        return timestamp.strftime('%I:%M %p'), time_ago
+    if timestamp.date() == (now - datetime.timedelta(days=1)).date():
+        return "Yesterday", timestamp.strftime('%I:%M %p')
+    return timestamp.strftime('%d %b'), timestamp.strftime('%Y')
+
+
+def minutes_of_day(value):
+    """Minutes since midnight of a MySQL TIME column, read either as timedelta or as time."""
+    if isinstance(value, datetime.timedelta):
+        return int(value.total_seconds()) // 60
+    return value.hour * 60 + value.minute
+
+
+def build_availability_slots(date, booked_slots, slot_duration=60, start_hour=9, end_hour=17, step=30):
+    """
+    Slots every `step` minutes between start_hour and end_hour; a slot is unavailable
+    when it overlaps a booked (appointment_time, duration) row.
+    """
+    booked = sorted(
+        (start, start + (slot["duration"] or 60))
+        for slot in booked_slots
+        for start in (minutes_of_day(slot["appointment_time"]),)
+    )
+
+    slots = []
+    for slot_id, start in enumerate(range(start_hour * 60, end_hour * 60, step), start=1):
+        end = start + slot_duration
+        hour, minute = divmod(start, 60)
+        slots.append({
+            "id": slot_id,
+            "date": date,
+            "time": f"{(hour - 1) % 12 + 1:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}",
+            "isAvailable": not any(start < booked_end and end > booked_start for booked_start, booked_end in booked),
+        })
+    return slots
+
+
+async def get_therapist_data(therapist_id):
+    db = get_Mysql_db()
+    cursor = db.cursor(dictionary=True)
+
+    try:
+        cursor.execute(
+            "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
+            (therapist_id,)
+        )
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+        db.close()
@@ -0,0 +1,1473 @@
+from connections.functions import *
+from connections.mysql_database import *
+from connections.redis_database import *
+from connections.mongo_db import *
+from connections.routers.common import *
+from connections.templating import templates
+import traceback
+
+router = APIRouter()
+
+@router.get("/front-page")
+async def front_page(request: Request):
+    session_id = request.cookies.get("session_id")
+    print(f"Session ID from cookie: {session_id}")
+    if not session_id:
+        print("No session ID found in cookie")
+        return RedirectResponse(url="/Therapist_Login")
+    try:
+        session_data = await get_redis_session(session_id)
+        print(f"Session data retrieved: {session_data}")
+        if not session_data:
+            print("Session data is None")
+            return RedirectResponse(url="/Therapist_Login")
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+        try:
+
+            cursor.execute(
+                "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
+                (session_data["user_id"],)
+            )
+            therapist = cursor.fetchone()
+            print(f"Therapist data: {therapist}")
+            if not therapist:
+                print(f"No therapist found for ID: {session_data['user_id']}")
+                return RedirectResponse(url="/Therapist_Login")
+
+
+            cursor.execute(
+                """SELECT m.message_id, m.subject, m.content, m.created_at, 
+                        t.first_name, t.last_name, COALESCE(t.profile_image, 'avatar-1.jpg') as profile_image
+                    FROM Messages m
+                    JOIN Therapists t ON m.sender_id = t.id
+                    WHERE m.recipient_id = %s AND m.is_read = FALSE
+                    ORDER BY m.created_at DESC
+                    LIMIT 4""",
+                (session_data["user_id"],)
+            )
+            messages_result = cursor.fetchall()
+
+
+            recent_messages = []
+            now = datetime.datetime.now()
+            for message in messages_result:
+                message_with_time = message.copy()
+
+
+                timestamp = message['created_at']
+                if isinstance(timestamp, datetime.datetime):
+                    message_with_time['time_display'], message_with_time['time_ago'] = format_message_time(timestamp, now)
+
+                recent_messages.append(message_with_time)
+
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            unread_count_result = cursor.fetchone()
+            unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Appointments WHERE therapist_id = %s", 
+                (session_data["user_id"],)
+            )
+            appointments_result = cursor.fetchone()
+            appointments_count = appointments_result['count'] if appointments_result else 0
+
+
+            last_month = datetime.datetime.now() - timedelta(days=30)
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Appointments WHERE therapist_id = %s AND created_at < %s", 
+                (session_data["user_id"], last_month)
+            )
+            last_month_appointments = cursor.fetchone()
+            last_month_count = last_month_appointments['count'] if last_month_appointments else 0
+
+
+            appointments_monthly_diff = appointments_count - last_month_count
+            appointments_growth = round((appointments_monthly_diff / max(last_month_count, 1)) * 100, 1)
+
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Patients WHERE therapist_id = %s AND status = 'Active'", 
+                (session_data["user_id"],)
+            )
+            active_patients_result = cursor.fetchone()
+            active_patients_count = active_patients_result['count'] if active_patients_result else 0
+
+
+            this_month_start = datetime.datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Patients WHERE therapist_id = %s AND created_at >= %s", 
+                (session_data["user_id"], this_month_start)
+            )
+            new_patients_result = cursor.fetchone()
+            new_patients_monthly = new_patients_result['count'] if new_patients_result else 0
+
+
+            last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Patients WHERE therapist_id = %s AND created_at BETWEEN %s AND %s", 
+                (session_data["user_id"], last_month_start, this_month_start)
+            )
+            last_month_new_patients = cursor.fetchone()
+            last_month_new_count = last_month_new_patients['count'] if last_month_new_patients else 1
+            patient_growth = round((new_patients_monthly / max(last_month_new_count, 1)) * 100, 1)
+
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM TreatmentPlans WHERE therapist_id = %s", 
+                (session_data["user_id"],)
+            )
+            treatment_plans_result = cursor.fetchone()
+            treatment_plans_count = treatment_plans_result['count'] if treatment_plans_result else 0
+
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM TreatmentPlans WHERE therapist_id = %s AND created_at >= %s", 
+                (session_data["user_id"], this_month_start)
+            )
+            new_plans_result = cursor.fetchone()
+            new_plans_monthly = new_plans_result['count'] if new_plans_result else 0
+
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM TreatmentPlans WHERE therapist_id = %s AND created_at BETWEEN %s AND %s", 
+                (session_data["user_id"], last_month_start, this_month_start)
+            )
+            last_month_plans = cursor.fetchone()
+            last_month_plans_count = last_month_plans['count'] if last_month_plans else 1
+            plans_growth = round((new_plans_monthly / max(last_month_plans_count, 1)) * 100, 1)
+
+
+            cursor.execute(
+                "SELECT AVG(adherence_rate) as avg_rate FROM PatientMetrics WHERE therapist_id = %s", 
+                (session_data["user_id"],)
+            )
+            adherence_result = cursor.fetchone()
+            average_adherence_rate = round(adherence_result['avg_rate'], 1) if adherence_result and adherence_result['avg_rate'] is not None else 0
+
+
+            cursor.execute(
+                """SELECT AVG(adherence_rate) as avg_rate 
+                FROM PatientMetrics 
+                WHERE therapist_id = %s AND measurement_date BETWEEN %s AND %s""", 
+                (session_data["user_id"], last_month_start, this_month_start)
+            )
+            last_month_adherence = cursor.fetchone()
+            last_month_adherence_rate = last_month_adherence['avg_rate'] if last_month_adherence and last_month_adherence['avg_rate'] is not None else 0
+
+
+            adherence_monthly_diff = round(average_adherence_rate - last_month_adherence_rate, 1)
+            adherence_change = abs(adherence_monthly_diff)
+
+            if adherence_monthly_diff >= 0:
+                adherence_trend_direction = "up"
+                adherence_trend_color = "success"
+                adherence_direction = "Up by"
+            else:
+                adherence_trend_direction = "down"
+                adherence_trend_color = "warning"
+                adherence_direction = "Down"
+
+            week_ago = datetime.datetime.now() - timedelta(days=7)
+            cursor.execute(
+                """SELECT AVG(
+                    CASE 
+                        WHEN repetitions IS NOT NULL THEN (repetitions_completed / repetitions) * 100
+                        ELSE (sets_completed / sets) * 100
+                    END
+                ) as completion_rate
+                FROM PatientExerciseProgress pep
+                JOIN TreatmentPlanExercises tpe ON pep.plan_exercise_id = tpe.plan_exercise_id
+                WHERE pep.completion_date >= %s""", 
+                (week_ago,)
+            )
+            completion_result = cursor.fetchone()
+            weekly_completion_rate = round(completion_result['completion_rate'], 0) if completion_result and completion_result['completion_rate'] is not None else 0
+
+
+            cursor.execute(
+                """SELECT p.patient_id, p.first_name, p.last_name, p.diagnosis, p.status,
+                    COALESCE(AVG(pm.adherence_rate), 0) as adherence_rate
+                FROM Patients p
+                LEFT JOIN PatientMetrics pm ON p.patient_id = pm.patient_id
+                WHERE p.therapist_id = %s
+                GROUP BY p.patient_id
+                ORDER BY p.created_at DESC
+                LIMIT 5""", 
+                (session_data["user_id"],)
+            )
+            recent_patients_result = cursor.fetchall()
+
+
+            recent_patients = []
+            for patient in recent_patients_result:
+                status_color = "success"
+                if patient['status'] == "Inactive":
+                    status_color = "danger"
+                elif patient['status'] == "At Risk":
+                    status_color = "warning"
+
+                patient_with_color = patient.copy()
+                patient_with_color['status_color'] = status_color
+                patient_with_color['adherence_rate'] = round(patient['adherence_rate'], 0)
+                recent_patients.append(patient_with_color)
+
+
+            cursor.execute(
+                "SELECT AVG(recovery_progress) as avg_recovery FROM PatientMetrics WHERE therapist_id = %s", 
+                (session_data["user_id"],)
+            )
+            recovery_result = cursor.fetchone()
+            avg_recovery_rate = round(recovery_result['avg_recovery'], 1) if recovery_result and recovery_result['avg_recovery'] is not None else 0
+
+
+            cursor.execute(
+                """SELECT AVG(
+                    CASE 
+                        WHEN repetitions IS NOT NULL THEN (repetitions_completed / repetitions) * 100
+                        ELSE (sets_completed / sets) * 100
+                    END
+                ) as completion_rate
+                FROM PatientExerciseProgress pep
+                JOIN TreatmentPlanExercises tpe ON pep.plan_exercise_id = tpe.plan_exercise_id"""
+            )
+            overall_completion = cursor.fetchone()
+            exercise_completion_rate = round(overall_completion['completion_rate'], 1) if overall_completion and overall_completion['completion_rate'] is not None else 0
+
+
+            cursor.execute(
+                "SELECT AVG(rating) as avg_rating FROM feedback"
+            )
+            satisfaction_result = cursor.fetchone()
+            avg_satisfaction = satisfaction_result['avg_rating'] if satisfaction_result and satisfaction_result['avg_rating'] is not None else 0
+
+            if avg_satisfaction >= 4:
+                patient_satisfaction = "High"
+            elif avg_satisfaction >= 3:
+                patient_satisfaction = "Medium"
+            else:
+                patient_satisfaction = "Low"
+
+
+            cursor.execute(
+                "SELECT AVG(functionality_score) as avg_score FROM PatientMetrics WHERE therapist_id = %s", 
+                (session_data["user_id"],)
+            )
+            progress_result = cursor.fetchone()
+            progress_metric_value = progress_result['avg_score'] if progress_result and progress_result['avg_score'] is not None else 0
+
+
+            cursor.execute(
+                """(SELECT 'video' as type, 'New Exercise Uploaded' as title, e.name as primary_detail, 
+                    CONCAT(e.duration, ' min') as secondary_detail, e.created_at as timestamp,
+                    CONCAT('/exercises/', e.exercise_id) as link
+                FROM Exercises e
+                WHERE e.therapist_id = %s
+                ORDER BY e.created_at DESC
+                LIMIT 3)
+                UNION
+                (SELECT 'user-plus' as type, 'New Patient Added' as title, 
+                    CONCAT(p.first_name, ' ', p.last_name) as primary_detail, 
+                    p.diagnosis as secondary_detail, p.created_at as timestamp,
+                    CONCAT('/patients/', p.patient_id) as link
+                FROM Patients p
+                WHERE p.therapist_id = %s
+                ORDER BY p.created_at DESC
+                LIMIT 3)
+                UNION
+                (SELECT 'report-medical' as type, 'Progress Report Updated' as title, 
+                    CONCAT(p.first_name, ' ', p.last_name) as primary_detail, 
+                    CONCAT('+', pm.recovery_progress, '% improvement') as secondary_detail, 
+                    pm.created_at as timestamp,
+                    CONCAT('/patients/', p.patient_id) as link
+                FROM PatientMetrics pm
+                JOIN Patients p ON pm.patient_id = p.patient_id
+                WHERE pm.therapist_id = %s
+                ORDER BY pm.created_at DESC
+                LIMIT 3)
+                ORDER BY timestamp DESC
+                LIMIT 3""", 
+                (session_data["user_id"], session_data["user_id"], session_data["user_id"])
+            )
+            activities_result = cursor.fetchall()
+
+
+            recent_activities = []
+            for activity in activities_result:
+                activity_with_color = activity.copy()
+
+
+                if activity['type'] == 'video':
+                    activity_with_color['color'] = 'success'
+                    activity_with_color['icon'] = 'video'
+                elif activity['type'] == 'user-plus':
+                    activity_with_color['color'] = 'primary'
+                    activity_with_color['icon'] = 'user-plus'
+                else:
+                    activity_with_color['color'] = 'warning'
+                    activity_with_color['icon'] = 'report-medical'
+
+
+                timestamp = activity['timestamp']
+                now = datetime.datetime.now()
+                if isinstance(timestamp, datetime.datetime):
+                    if timestamp.date() == now.date():
+                        activity_with_color['timestamp'] = f"Today, {timestamp.strftime('%I:%M %p')}"
+                    elif timestamp.date() == (now - timedelta(days=1)).date():
+                        activity_with_color['timestamp'] = f"Yesterday, {timestamp.strftime('%I:%M %p')}"
+                    else:
+                        activity_with_color['timestamp'] = f"{(now - timestamp).days} days ago"
+
+                recent_activities.append(activity_with_color)
+
+
+            cursor.execute(
+                """SELECT 
+                    DATE_FORMAT(completion_date, '%a') as day, 
+                    COUNT(*) as count
+                FROM PatientExerciseProgress
+                WHERE completion_date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
+                GROUP BY DATE_FORMAT(completion_date, '%a')
+                ORDER BY FIELD(day, 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')"""
+            )
+            weekly_activity = cursor.fetchall()
+
+
+            days_of_week = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+            activity_data = {day: 0 for day in days_of_week}
+
+            for record in weekly_activity:
+                if record['day'] in activity_data:
+                    activity_data[record['day']] = record['count']
+
+            chart_data = [{'day': day, 'count': count} for day, count in activity_data.items()]
+
+            cursor.execute(
+                """SELECT 
+                    DATE_FORMAT(completion_date, '%d') as date, 
+                    COUNT(*) as count
+                FROM PatientExerciseProgress
+                WHERE completion_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+                GROUP BY DATE_FORMAT(completion_date, '%d')
+                ORDER BY date"""
+            )
+            monthly_activity = cursor.fetchall()
+            monthly_chart_data = [{'date': record['date'], 'count': record['count']} for record in monthly_activity]
+
+            cursor.execute(
+                """SELECT 
+                    DATE_FORMAT(measurement_date, '%d %b') as date,
+                    AVG(functionality_score) as score 
+                FROM PatientMetrics 
+                WHERE measurement_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
+                AND therapist_id = %s
+                GROUP BY DATE_FORMAT(measurement_date, '%d %b')
+                ORDER BY measurement_date""", 
+                (session_data["user_id"],)
+            )
+            progress_chart_data = cursor.fetchall()
+            progress_data = [{'date': record['date'], 'score': float(record['score']) if record['score'] is not None else 0} for record in progress_chart_data]
+
+
+            cursor.execute(
+                """SELECT 
+                    CASE 
+                        WHEN (
+                            CASE 
+                                WHEN repetitions IS NOT NULL THEN (repetitions_completed / repetitions) * 100
+                                ELSE (sets_completed / sets) * 100
+                            END
+                        ) >= 90 THEN 'Completed'
+                        WHEN (
+                            CASE 
+                                WHEN repetitions IS NOT NULL THEN (repetitions_completed / repetitions) * 100
+                                ELSE (sets_completed / sets) * 100
+                            END
+                        ) >= 50 THEN 'Partial'
+                        ELSE 'Missed'
+                    END as status,
+                    COUNT(*) as count
+                FROM PatientExerciseProgress pep
+                JOIN TreatmentPlanExercises tpe ON pep.plan_exercise_id = tpe.plan_exercise_id
+                WHERE completion_date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
+                GROUP BY status"""
+            )
+            completion_breakdown = cursor.fetchall()
+            donut_data = {'Completed': 0, 'Partial': 0, 'Missed': 0}
+            for record in completion_breakdown:
+                if record['status'] in donut_data:
+                    donut_data[record['status']] = record['count']
+
+
+            print("Rendering dashboard template with dynamic data")
+            return templates.TemplateResponse(
+                "dist/dashboard/index.html", 
+                {
+                    "request": request,
+                    "first_name": therapist["first_name"],
+                    "last_name": therapist["last_name"],
+                    "appointments_count": appointments_count,
+                    "appointments_growth": appointments_growth,
+                    "appointments_monthly_diff": appointments_monthly_diff,
+                    "active_patients_count": active_patients_count,
+                    "patient_growth": patient_growth,
+                    "new_patients_monthly": new_patients_monthly,
+                    "treatment_plans_count": treatment_plans_count,
+                    "plans_growth": plans_growth,
+                    "new_plans_monthly": new_plans_monthly,
+                    "average_adherence_rate": average_adherence_rate,
+                    "adherence_trend_color": adherence_trend_color,
+                    "adherence_trend_direction": adherence_trend_direction,
+                    "adherence_change": adherence_change,
+                    "adherence_direction": adherence_direction,
+                    "adherence_monthly_diff": adherence_monthly_diff,
+                    "weekly_completion_rate": weekly_completion_rate,
+                    "recent_patients": recent_patients,
+                    "avg_recovery_rate": avg_recovery_rate,
+                    "exercise_completion_rate": exercise_completion_rate,
+                    "patient_satisfaction": patient_satisfaction,
+                    "progress_metric_value": progress_metric_value,
+                    "recent_activities": recent_activities,
+                    "chart_data": chart_data,
+                    "monthly_chart_data": monthly_chart_data,
+                    "progress_data": progress_data,
+                    "donut_data": donut_data,
+                    "recent_messages": recent_messages,
+                    "unread_messages_count": unread_messages_count
+                }
+            )
+        except Exception as e:
+            print(f"Database error in front-page route: {e}")
+            return RedirectResponse(url="/Therapist_Login")
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in front-page route: {e}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.get("/messages")
+async def messages_page(request: Request, search: str = None):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+
+            cursor.execute(
+                "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
+                (session_data["user_id"],)
+            )
+            therapist = cursor.fetchone()
+            if not therapist:
+                return RedirectResponse(url="/Therapist_Login")
+
+
+            search_condition = ""
+            search_params = []
+            if search:
+                search_condition = """
+                    AND (
+                        t.first_name LIKE %s OR 
+                        t.last_name LIKE %s OR 
+                        m.subject LIKE %s OR 
+                        m.content LIKE %s
+                    )
+                """
+                search_term = f"%{search}%"
+                search_params = [search_term, search_term, search_term, search_term]
+
+
+            inbox_query = f"""
+                SELECT 
+                    m.message_id, m.subject, m.content, m.created_at, m.is_read,
+                    CASE 
+                        WHEN m.sender_type = 'therapist' THEN 
+                            (SELECT CONCAT(first_name, ' ', last_name) FROM Therapists WHERE id = m.sender_id)
+                        WHEN m.sender_type = 'patient' THEN 
+                            (SELECT CONCAT(first_name, ' ', last_name) FROM Patients WHERE patient_id = m.sender_id)
+                        ELSE 
+                            (SELECT username FROM users WHERE user_id = m.sender_id)
+                    END as sender_name,
+                    CASE 
+                        WHEN m.sender_type = 'therapist' THEN 
+                            COALESCE((SELECT profile_image FROM Therapists WHERE id = m.sender_id), 'avatar-1.jpg')
+                        WHEN m.sender_type = 'patient' THEN 
+                            'patient-avatar.jpg'
+                        ELSE 
+                            COALESCE((SELECT profile_pic FROM users WHERE user_id = m.sender_id), 'user-avatar.jpg')
+                    END as profile_image,
+                    m.sender_type,
+                    m.sender_id
+                FROM Messages m
+                WHERE m.recipient_id = %s 
+                AND m.recipient_type = 'therapist'
+                {search_condition}
+                ORDER BY m.created_at DESC
+            """
+
+            inbox_params = [session_data["user_id"]] + search_params if search else [session_data["user_id"]]
+            cursor.execute(inbox_query, inbox_params)
+            inbox_messages = cursor.fetchall()
+
+
+            sent_query = f"""
+                SELECT 
+                    m.message_id, m.subject, m.content, m.created_at, m.is_read,
+                    CASE 
+                        WHEN m.recipient_type = 'therapist' THEN 
+                            (SELECT CONCAT(first_name, ' ', last_name) FROM Therapists WHERE id = m.recipient_id)
+                        WHEN m.recipient_type = 'patient' THEN 
+                            (SELECT CONCAT(first_name, ' ', last_name) FROM Patients WHERE patient_id = m.recipient_id)
+                        ELSE 
+                            (SELECT username FROM users WHERE user_id = m.recipient_id)
+                    END as recipient_name,
+                    CASE 
+                        WHEN m.recipient_type = 'therapist' THEN 
+                            COALESCE((SELECT profile_image FROM Therapists WHERE id = m.recipient_id), 'avatar-1.jpg')
+                        WHEN m.recipient_type = 'patient' THEN 
+                            'patient-avatar.jpg'
+                        ELSE 
+                            COALESCE((SELECT profile_pic FROM users WHERE user_id = m.recipient_id), 'user-avatar.jpg')
+                    END as profile_image,
+                    m.recipient_type,
+                    m.recipient_id
+                FROM Messages m
+                WHERE m.sender_id = %s 
+                AND m.sender_type = 'therapist'
+                {search_condition}
+                ORDER BY m.created_at DESC
+            """
+
+            sent_params = [session_data["user_id"]] + search_params if search else [session_data["user_id"]]
+            cursor.execute(sent_query, sent_params)
+            sent_messages = cursor.fetchall()
+
+
+            now = datetime.datetime.now()
+            for messages_list in [inbox_messages, sent_messages]:
+                for message in messages_list:
+
+                    timestamp = message['created_at']
+                    if isinstance(timestamp, datetime.datetime):
+                        message['formatted_date'], message['time_ago'] = format_message_time(timestamp, now)
+
+
+                    if message['content'] and len(message['content']) > 100:
+                        message['short_content'] = message['content'][:100] + '...'
+                    else:
+                        message['short_content'] = message['content']
+
+
+            cursor.execute(
+                "SELECT id, first_name, last_name FROM Therapists WHERE id != %s",
+                (session_data["user_id"],)
+            )
+            therapists = cursor.fetchall()
+
+
+            cursor.execute(
+                "SELECT patient_id, first_name, last_name FROM Patients"
+            )
+            patients = cursor.fetchall()
+
+
+            cursor.execute(
+                "SELECT user_id, username FROM users"
+            )
+            users = cursor.fetchall()
+
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            unread_count_result = cursor.fetchone()
+            unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+
+            return templates.TemplateResponse(
+                "dist/messages/index.html", 
+                {
+                    "request": request,
+                    "first_name": therapist["first_name"],
+                    "last_name": therapist["last_name"],
+                    "inbox_messages": inbox_messages,
+                    "sent_messages": sent_messages,
+                    "therapists": therapists,
+                    "patients": patients,
+                    "users": users,
+                    "unread_messages_count": unread_messages_count,
+                    "search_term": search
+                }
+            )
+
+        except Exception as e:
+            print(f"Database error in messages page: {e}")
+            return RedirectResponse(url="/front-page")
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in messages page: {e}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.get("/messages/{message_id}")
+async def view_message(request: Request, message_id: int):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+
+            cursor.execute(
+                "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
+                (session_data["user_id"],)
+            )
+            therapist = cursor.fetchone()
+            if not therapist:
+                return RedirectResponse(url="/Therapist_Login")
+
+
+            cursor.execute(
+                """SELECT 
+                    m.message_id, m.subject, m.content, m.created_at, m.is_read,
+                    m.sender_id, m.recipient_id, m.sender_type, m.recipient_type,
+                    CASE 
+                        WHEN m.sender_type = 'therapist' THEN 
+                            (SELECT CONCAT(first_name, ' ', last_name) FROM Therapists WHERE id = m.sender_id)
+                        WHEN m.sender_type = 'patient' THEN 
+                            (SELECT CONCAT(first_name, ' ', last_name) FROM Patients WHERE patient_id = m.sender_id)
+                        ELSE 
+                            (SELECT username FROM users WHERE user_id = m.sender_id)
+                    END as sender_name,
+                    CASE 
+                        WHEN m.recipient_type = 'therapist' THEN 
+                            (SELECT CONCAT(first_name, ' ', last_name) FROM Therapists WHERE id = m.recipient_id)
+                        WHEN m.recipient_type = 'patient' THEN 
+                            (SELECT CONCAT(first_name, ' ', last_name) FROM Patients WHERE patient_id = m.recipient_id)
+                        ELSE 
+                            (SELECT username FROM users WHERE user_id = m.recipient_id)
+                    END as recipient_name,
+                    CASE 
+                        WHEN m.sender_type = 'therapist' THEN 
+                            COALESCE((SELECT profile_image FROM Therapists WHERE id = m.sender_id), 'avatar-1.jpg')
+                        WHEN m.sender_type = 'patient' THEN 
+                            'patient-avatar.jpg'
+                        ELSE 
+                            COALESCE((SELECT profile_pic FROM users WHERE user_id = m.sender_id), 'user-avatar.jpg')
+                    END as sender_profile_image
+                FROM Messages m
+                WHERE m.message_id = %s
+                AND ((m.sender_id = %s AND m.sender_type = 'therapist') 
+                     OR (m.recipient_id = %s AND m.recipient_type = 'therapist'))""", 
+                (message_id, session_data["user_id"], session_data["user_id"])
+            )
+            message = cursor.fetchone()
+
+            if not message:
+
+                return RedirectResponse(url="/messages")
+
+
+            if message['recipient_id'] == int(session_data["user_id"]) and message['recipient_type'] == 'therapist' and not message['is_read']:
+                cursor.execute(
+                    "UPDATE Messages SET is_read = TRUE WHERE message_id = %s",
+                    (message_id,)
+                )
+                db.commit()
+
+
+            timestamp = message['created_at']
+            if isinstance(timestamp, datetime.datetime):
+                now = datetime.datetime.now()
+                if timestamp.date() == now.date():
+                    message['formatted_date'] = f"Today at {timestamp.strftime('%I:%M %p')}"
+                elif timestamp.date() == (now - timedelta(days=1)).date():
+                    message['formatted_date'] = f"Yesterday at {timestamp.strftime('%I:%M %p')}"
+                else:
+                    message['formatted_date'] = timestamp.strftime('%b %d, %Y at %I:%M %p')
+
+
+            message['direction'] = 'received' if message['recipient_id'] == int(session_data["user_id"]) and message['recipient_type'] == 'therapist' else 'sent'
+
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            unread_count_result = cursor.fetchone()
+            unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+
+            return templates.TemplateResponse(
+                "dist/messages/view.html",
+                {
+                    "request": request,
+                    "first_name": therapist["first_name"],
+                    "last_name": therapist["last_name"],
+                    "message": message,
+                    "unread_messages_count": unread_messages_count
+                }
+            )
+
+        except Exception as e:
+            print(f"Database error in view message: {e}")
+            return RedirectResponse(url="/messages")
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in view message: {e}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.get("/profile")
+async def view_profile(request: Request):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+            cursor.execute(
+                """SELECT id, first_name, last_name, company_email, profile_image, 
+                        bio, experience_years, specialties, education, languages, 
+                        address, rating, review_count, 
+                        is_accepting_new_patients, average_session_length
+                FROM Therapists 
+                WHERE id = %s""", 
+                (session_data["user_id"],)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return RedirectResponse(url="/Therapist_Login")
+
+            for field in ['specialties', 'education', 'languages']:
+                therapist[field] = safely_parse_json_field(therapist[field])
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            unread_count_result = cursor.fetchone()
+            unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+
+            cursor.execute(
+                """SELECT patient_id, first_name, last_name, diagnosis, status 
+                FROM Patients 
+                WHERE therapist_id = %s 
+                ORDER BY created_at DESC 
+                LIMIT 5""",
+                (session_data["user_id"],)
+            )
+            recent_patients = cursor.fetchall()
+
+            for patient in recent_patients:
+                for key in patient:
+                    if isinstance(patient[key], bytes):
+                        patient[key] = patient[key].decode('utf-8')
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Patients WHERE therapist_id = %s",
+                (session_data["user_id"],)
+            )
+            total_patients_result = cursor.fetchone()
+            total_patients = total_patients_result['count'] if total_patients_result else 0
+
+            cursor.execute(
+                """SELECT AVG(rating) as average_rating, COUNT(*) as review_count 
+                FROM Reviews 
+                WHERE therapist_id = %s""",
+                (session_data["user_id"],)
+            )
+            reviews_summary = cursor.fetchone()
+            if reviews_summary and reviews_summary['average_rating']:
+                average_rating = round(reviews_summary['average_rating'], 1)
+                review_count = reviews_summary['review_count']
+            else:
+                average_rating = 0
+                review_count = 0
+
+            cursor.execute(
+                """SELECT r.review_id, r.rating, r.comment, r.created_at, 
+                        p.first_name, p.last_name
+                FROM Reviews r
+                JOIN Patients p ON r.patient_id = p.patient_id
+                WHERE r.therapist_id = %s
+                ORDER BY r.created_at DESC
+                LIMIT 3""",
+                (session_data["user_id"],)
+            )
+            recent_reviews = cursor.fetchall()
+
+            for review in recent_reviews:
+                for key in review:
+                    if isinstance(review[key], bytes):
+                        review[key] = review[key].decode('utf-8')
+
+            return templates.TemplateResponse(
+                "dist/dashboard/therapist_profile.html",
+                {
+                    "request": request,
+                    "therapist": therapist,
+                    "first_name": ensure_str(therapist["first_name"]),
+                    "last_name": ensure_str(therapist["last_name"]),
+                    "unread_messages_count": unread_messages_count,
+                    "recent_patients": recent_patients,
+                    "total_patients": total_patients,
+                    "average_rating": average_rating,
+                    "review_count": review_count,
+                    "recent_reviews": recent_reviews,
+                }
+            )
+
+        except Exception as e:
+            print(f"Database error in profile view: {e}")
+            print(f"Traceback: {traceback.format_exc()}")
+            return RedirectResponse(url="/front-page")
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in profile view: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.get("/profile/edit")
+async def edit_profile_form(request: Request):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+        try:
+            cursor.execute(
+                """SELECT id, first_name, last_name, company_email, profile_image, 
+                        bio, experience_years, specialties, education, languages, 
+                        address, rating, review_count, 
+                        is_accepting_new_patients, average_session_length
+                FROM Therapists 
+                WHERE id = %s""", 
+                (session_data["user_id"],)
+            )
+            therapist = cursor.fetchone()
+            if not therapist:
+                return RedirectResponse(url="/Therapist_Login")
+            for field in ['specialties', 'education', 'languages']:
+                therapist[field] = safely_parse_json_field(therapist[field])
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            unread_count_result = cursor.fetchone()
+            unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+            all_specialties = get_all_specialties()
+            existing_specialties = therapist["specialties"]
+
+            return templates.TemplateResponse(
+                "dist/dashboard/therapist_edit_profile.html",
+                {
+                    "request": request,
+                    "therapist": therapist,
+                    "first_name": ensure_str(therapist["first_name"]),
+                    "last_name": ensure_str(therapist["last_name"]),
+                    "unread_messages_count": unread_messages_count,
+                    "all_specialties": all_specialties,
+                    "existing_specialties": existing_specialties
+                }
+            )
+        except Exception as e:
+            print(f"Database error in edit profile form: {e}")
+            print(f"Traceback: {traceback.format_exc()}")
+            return RedirectResponse(url="/front-page")
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in edit profile form: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.post("/profile/update2")
+async def update_profile_v2(request: Request):
+    """
+    A completely new implementation of profile update using only the Request object.
+    This approach eliminates any potential conflict with FastAPI's Form dependencies.
+    """
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login", status_code=303)
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login", status_code=303)
+        form_data = await request.form()
+        profile_data = {
+            "first_name": ensure_str(form_data.get("first_name", "")),
+            "last_name": ensure_str(form_data.get("last_name", "")),
+            "company_email": ensure_str(form_data.get("company_email", "")),
+            "bio": ensure_str(form_data.get("bio", "")),
+            "address": ensure_str(form_data.get("address", ""))
+        }
+        try:
+            profile_data["experience_years"] = int(form_data.get("experience_years", "0"))
+        except ValueError:
+            profile_data["experience_years"] = 0
+
+        try:
+            profile_data["rating"] = float(form_data.get("rating", "0"))
+        except ValueError:
+            profile_data["rating"] = 0
+
+        try:
+            profile_data["review_count"] = int(form_data.get("review_count", "0"))
+        except ValueError:
+            profile_data["review_count"] = 0
+
+        try:
+            profile_data["average_session_length"] = int(form_data.get("average_session_length", "60"))
+        except ValueError:
+            profile_data["average_session_length"] = 60
+        profile_data["is_accepting_new_patients"] = form_data.get("is_accepting_new_patients") == "1"
+        specialties = form_data.getlist("specialties")
+        profile_data["specialties"] = json.dumps(specialties)
+
+        education = form_data.getlist("education")
+        profile_data["education"] = json.dumps(education)
+
+        languages = form_data.getlist("languages")
+        profile_data["languages"] = json.dumps(languages)
+        profile_image_filename = None
+        profile_image = form_data.get("profile_image")
+        if profile_image and hasattr(profile_image, "filename") and profile_image.filename:
+            try:
+                contents = await profile_image.read()
+                if contents and len(contents) > 0:
+                    contents = ensure_bytes(contents)
+                    file_extension = profile_image.filename.split(".")[-1].lower()
+                    allowed_extensions = ["jpg", "jpeg", "png", "gif"]
+
+                    if file_extension in allowed_extensions:
+                        profile_image_filename = f"therapist_{session_data['user_id']}_{int(time.time())}.{file_extension}"
+                        current_file = FilePath(__file__).resolve()
+                        project_root = current_file.parent.parent.parent
+                        uploads_dir = project_root / "Frontend_Web" / "static" / "assets" / "images" / "user"
+                        uploads_dir.mkdir(parents=True, exist_ok=True)
+                        file_path = uploads_dir / profile_image_filename
+                        with open(file_path, "wb") as f:
+                            f.write(contents)
+
+                        print(f"Profile image saved: {profile_image_filename}")
+                        print(f"File path: {file_path}")
+                    else:
+                        print(f"Invalid file extension: {file_extension}")
+                else:
+                    print("Empty file content")
+            except Exception as img_error:
+                print(f"Error processing image: {img_error}")
+                print(f"Traceback: {traceback.format_exc()}")
+        db = get_Mysql_db()
+        cursor = None
+        try:
+            cursor = db.cursor()
+            update_fields = []
+            params = []
+            for field in profile_data:
+                update_fields.append(f"{field} = %s")
+                params.append(profile_data[field])
+            if profile_image_filename:
+                update_fields.append("profile_image = %s")
+                params.append(profile_image_filename)
+            params.append(session_data["user_id"])
+            query = f"UPDATE Therapists SET {', '.join(update_fields)} WHERE id = %s"
+            cursor.execute(query, params)
+            db.commit()
+            print("Profile updated successfully")
+            return RedirectResponse(url="/profile", status_code=303)
+        except Exception as db_error:
+            print(f"Database error: {db_error}")
+            print(f"Traceback: {traceback.format_exc()}")
+            if db:
+                db.rollback()
+            return RedirectResponse(url="/profile/edit", status_code=303)
+        finally:
+            if cursor:
+                cursor.close()
+            if db:
+                db.close()
+
+    except Exception as e:
+        print(f"Unexpected error in profile update: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return RedirectResponse(url="/Therapist_Login", status_code=303)
+
+
+@router.get("/profile/reviews")
+async def therapist_reviews(request: Request):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+
+            cursor.execute(
+                """SELECT id, first_name, last_name, company_email, profile_image, 
+                        rating, review_count
+                   FROM Therapists 
+                   WHERE id = %s""", 
+                (session_data["user_id"],)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return RedirectResponse(url="/Therapist_Login")
+
+
+            cursor.execute(
+                """SELECT r.review_id, r.rating, r.comment, r.created_at, 
+                         p.patient_id, p.first_name, p.last_name
+                   FROM Reviews r
+                   JOIN Patients p ON r.patient_id = p.patient_id
+                   WHERE r.therapist_id = %s
+                   ORDER BY r.created_at DESC""",
+                (session_data["user_id"],)
+            )
+            reviews = cursor.fetchall()
+
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            unread_count_result = cursor.fetchone()
+            unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+
+
+            for review in reviews:
+                if isinstance(review['created_at'], datetime.datetime):
+                    review['formatted_date'] = review['created_at'].strftime('%B %d, %Y')
+
+
+            rating_distribution = {
+                5: 0,
+                4: 0,
+                3: 0,
+                2: 0,
+                1: 0
+            }
+
+            for review in reviews:
+                rating = int(review['rating'])
+                if rating < 1:
+                    rating = 1
+                elif rating > 5:
+                    rating = 5
+                rating_distribution[rating] += 1
+
+
+            total_reviews = len(reviews)
+            rating_percentages = {}
+            for rating, count in rating_distribution.items():
+                if total_reviews > 0:
+                    rating_percentages[rating] = (count / total_reviews) * 100
+                else:
+                    rating_percentages[rating] = 0
+
+            return templates.TemplateResponse(
+                "dist/dashboard/Therapist_reviews.html",
+                {
+                    "request": request,
+                    "therapist": therapist,
+                    "first_name": therapist["first_name"],
+                    "last_name": therapist["last_name"],
+                    "unread_messages_count": unread_messages_count,
+                    "reviews": reviews,
+                    "rating_distribution": rating_distribution,
+                    "rating_percentages": rating_percentages,
+                    "total_reviews": total_reviews
+                }
+            )
+
+        except Exception as e:
+            print(f"Database error in therapist reviews: {e}")
+            return RedirectResponse(url="/profile")
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in therapist reviews: {e}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.get("/reports/patients")
+async def patient_reports(request: Request):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+
+            cursor.execute(
+                """SELECT id, first_name, last_name, profile_image
+                FROM Therapists 
+                WHERE id = %s""", 
+                (session_data["user_id"],)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return RedirectResponse(url="/Therapist_Login")
+
+
+            cursor.execute(
+                """SELECT patient_id, first_name, last_name, diagnosis, status
+                FROM Patients 
+                WHERE therapist_id = %s
+                ORDER BY last_name, first_name""",
+                (session_data["user_id"],)
+            )
+            patients = cursor.fetchall()
+
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            unread_count_result = cursor.fetchone()
+            unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+
+            return templates.TemplateResponse(
+                "dist/reports/patient_reports.html",
+                {
+                    "request": request,
+                    "therapist": therapist,
+                    "first_name": therapist["first_name"],
+                    "last_name": therapist["last_name"],
+                    "unread_messages_count": unread_messages_count,
+                    "patients": patients
+                }
+            )
+
+        except Exception as e:
+            print(f"Database error in patient reports: {e}")
+            return RedirectResponse(url="/front-page")
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in patient reports: {e}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.get("/reports/patients/{patient_id}")
+async def patient_detailed_report(request: Request, patient_id: int):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+
+            cursor.execute(
+                """SELECT id, first_name, last_name, profile_image
+                FROM Therapists 
+                WHERE id = %s""", 
+                (session_data["user_id"],)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return RedirectResponse(url="/Therapist_Login")
+
+
+            cursor.execute(
+                """SELECT * FROM Patients 
+                WHERE patient_id = %s AND therapist_id = %s""",
+                (patient_id, session_data["user_id"])
+            )
+            patient = cursor.fetchone()
+
+            if not patient:
+                return RedirectResponse(url="/reports/patients")
+
+
+            cursor.execute(
+                """SELECT pep.*, tpe.sets, tpe.repetitions,
+                        e.name as exercise_name, e.video_url, e.difficulty
+                FROM PatientExerciseProgress pep
+                JOIN TreatmentPlanExercises tpe ON pep.plan_exercise_id = tpe.plan_exercise_id
+                JOIN Exercises e ON tpe.exercise_id = e.exercise_id
+                JOIN TreatmentPlans tp ON tpe.plan_id = tp.plan_id
+                WHERE tp.patient_id = %s
+                ORDER BY pep.completion_date DESC, pep.modified_at DESC""",
+                (patient_id,)
+            )
+            exercise_history = cursor.fetchall()
+
+
+            cursor.execute(
+                """SELECT * FROM TreatmentPlans
+                WHERE patient_id = %s
+                ORDER BY created_at DESC""",
+                (patient_id,)
+            )
+            treatment_plans = cursor.fetchall()
+
+
+            cursor.execute(
+                """SELECT * FROM PatientMetrics
+                WHERE patient_id = %s
+                ORDER BY measurement_date DESC""",
+                (patient_id,)
+            )
+            patient_metrics = cursor.fetchall()
+
+
+            cursor.execute(
+                """SELECT * FROM feedback
+                WHERE patient_id = %s
+                ORDER BY created_at DESC""",
+                (patient_id,)
+            )
+            patient_feedback = cursor.fetchall()
+
+
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            unread_count_result = cursor.fetchone()
+            unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+
+            return templates.TemplateResponse(
+                "dist/reports/patient_detailed_report.html",
+                {
+                    "request": request,
+                    "therapist": therapist,
+                    "first_name": therapist["first_name"],
+                    "last_name": therapist["last_name"],
+                    "unread_messages_count": unread_messages_count,
+                    "patient": patient,
+                    "exercise_history": exercise_history,
+                    "treatment_plans": treatment_plans,
+                    "patient_metrics": patient_metrics,
+                    "patient_feedback": patient_feedback
+                }
+            )
+
+        except Exception as e:
+            print(f"Database error in patient detailed report: {e}")
+            return RedirectResponse(url="/reports/patients")
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in patient detailed report: {e}")
+        return RedirectResponse(url="/Therapist_Login")
+
+
+@router.get("/patients")
+async def get_patients_page(request: Request, user=Depends(get_current_user)):
+    db = get_Mysql_db()
+    cursor = db.cursor(dictionary=True)
+
+    try:
+        cursor.execute(
+            "SELECT * FROM Patients WHERE therapist_id = %s ORDER BY last_name", 
+            (user["user_id"],)
+        )
+        patients = cursor.fetchall()
+
+        therapist_data = await get_therapist_data(user["user_id"])
+
+        return templates.TemplateResponse(
+            "dist/dashboard/patient_directory.html", 
+            {
+                "request": request,
+                "patients": patients,
+                "first_name": therapist_data["first_name"],
+                "last_name": therapist_data["last_name"]
+            }
+        )
+    finally:
+        cursor.close()
+        db.close()
+
+
+@router.get("/patients/add")
+async def add_patient_page(request: Request, user=Depends(get_current_user)):
+    therapist_data = await get_therapist_data(user["user_id"])
+
+    return templates.TemplateResponse(
+        "dist/dashboard/add_patient.html", 
+        {
+            "request": request,
+            "first_name": therapist_data["first_name"],
+            "last_name": therapist_data["last_name"]
+        }
+    )
+
+
+@router.post("/patients/add")
+async def add_patient(
+    request: Request,
+    first_name: str = Form(...),
+    last_name: str = Form(...),
+    email: str = Form(None),
+    phone: str = Form(None),
+    date_of_birth: str = Form(None),
+    address: str = Form(None),
+    diagnosis: str = Form(None),
+    notes: str = Form(None),
+    user=Depends(get_current_user)
+):
+    db = get_Mysql_db()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute(
+            """INSERT INTO Patients 
+            (therapist_id, first_name, last_name, email, phone, date_of_birth, 
+            address, diagnosis, notes) 
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+            (user["user_id"], first_name, last_name, email, phone, 
+            date_of_birth, address, diagnosis, notes)
+        )
+        db.commit()
+        return RedirectResponse(url="/patients", status_code=303)
+    except Exception as e:
+        print(f"Error adding patient: {e}")
+        therapist_data = await get_therapist_data(user["user_id"])
+        return templates.TemplateResponse(
+            "dist/dashboard/add_patient.html", 
+            {
+                "request": request,
+                "error": f"Error adding patient: {str(e)}",
+                "first_name": therapist_data["first_name"],
+                "last_name": therapist_data["last_name"],
+                "today": datetime.datetime.now()
+            }
+        )
+    finally:
+        cursor.close()
+        db.close()
+
+
+@router.get("/patients/{patient_id}")
+async def patient_detail(request: Request, patient_id: int, user=Depends(get_current_user)):
+    db = get_Mysql_db()
+    cursor = db.cursor(dictionary=True)
+
+    try:
+        cursor.execute(
+            "SELECT * FROM Patients WHERE patient_id = %s AND therapist_id = %s", 
+            (patient_id, user["user_id"])
+        )
+        patient = cursor.fetchone()
+
+        if not patient:
+            return RedirectResponse(url="/patients")
+
+        cursor.execute(
+            "SELECT * FROM TreatmentPlans WHERE patient_id = %s ORDER BY created_at DESC", 
+            (patient_id,)
+        )
+        treatment_plans = cursor.fetchall()
+
+        cursor.execute(
+            """SELECT * FROM Appointments 
+            WHERE patient_id = %s 
+            ORDER BY appointment_date DESC, appointment_time DESC 
+            LIMIT 5""", 
+            (patient_id,)
+        )
+        appointments = cursor.fetchall()
+
+        cursor.execute(
+            """SELECT * FROM PatientMetrics 
+            WHERE patient_id = %s 
+            ORDER BY measurement_date DESC 
+            LIMIT 10""", 
+            (patient_id,)
+        )
+        metrics = cursor.fetchall()
+
+        therapist_data = await get_therapist_data(user["user_id"])
+
+        return templates.TemplateResponse(
+            "dist/dashboard/patient_details.html", 
+            {
+                "request": request,
+                "patient": patient,
+                "treatment_plans": treatment_plans,
+                "appointments": appointments,
+                "metrics": metrics,
+                "first_name": therapist_data["first_name"],
+                "last_name": therapist_data["last_name"],
+                "today": datetime.datetime.now().date()
+            }
+        )
+    finally:
+        cursor.close()
+        db.close()
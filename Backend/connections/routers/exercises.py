@@ -0,0 +1,482 @@
+from connections.functions import *
+from connections.mysql_database import *
+from connections.redis_database import *
+from connections.mongo_db import *
+from connections.routers.common import *
+from connections.templating import templates
+from inference.video_pipeline import video_pipeline
+import traceback
+
+router = APIRouter()
+
+async def queue_video_analysis(file_path, user_id):
+    """Hand an uploaded exercise video to the background analysis pipeline; never fails the upload."""
+    try:
+        video_id, cached = await video_pipeline.submit_cached(str(file_path), int(user_id), user_type="therapist")
+        print(f"{'Reused' if cached else 'Queued'} video analysis {video_id} for {file_path}")
+    except Exception as e:
+        print(f"Error queueing video analysis for {file_path}: {e}")
+
+@router.post("/exercises/add")
+async def add_exercise(
+    request: Request,
+    name: str = Form(...),
+    category_id: Optional[int] = Form(None),
+    description: Optional[str] = Form(None),
+    video_source: Optional[str] = Form(None),
+    video_url: Optional[str] = Form(None),
+    difficulty: Optional[str] = Form(None),
+    duration: Optional[int] = Form(None),
+    instructions: Optional[str] = Form(None),
+    video_upload: Optional[UploadFile] = File(None),
+    user = Depends(get_current_user)
+):
+    """Route to handle adding a new exercise with large file upload support"""
+    db = get_Mysql_db()
+    cursor = None
+
+    try:
+        cursor = db.cursor()
+
+
+        final_video_url = None
+        video_type = 'none'
+        video_size = None
+        video_filename = None
+        uploaded_path = None
+
+
+        if video_source == 'youtube' and video_url:
+            final_video_url = video_url
+            video_type = 'youtube'
+
+
+        elif video_source == 'upload' and video_upload and video_upload.filename:
+
+            current_file = Path(__file__).resolve()
+            project_root = current_file.parent.parent.parent
+            uploads_dir = project_root / "Frontend_Web" / "static" / "assets" / "videos" / "exercises"
+            uploads_dir.mkdir(parents=True, exist_ok=True)
+
+
+            video_filename = video_upload.filename
+
+
+            file_extension = video_filename.split(".")[-1].lower()
+            unique_filename = f"exercise_{int(time.time())}_{secrets.token_hex(4)}.{file_extension}"
+            file_path = uploads_dir / unique_filename
+
+
+            video_content = await video_upload.read()
+            video_size = len(video_content)
+
+
+            async with aiofiles.open(file_path, "wb") as f:
+                await f.write(video_content)
+
+
+            final_video_url = f"/static/assets/videos/exercises/{unique_filename}"
+            video_type = 'upload'
+            uploaded_path = file_path
+
+
+        cursor.execute(
+            """INSERT INTO Exercises 
+            (name, category_id, description, video_url, video_type, video_size, video_filename, 
+            difficulty, duration, instructions) 
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+            (name, category_id, description, final_video_url, video_type, video_size, 
+            video_filename, difficulty, duration, instructions)
+        )
+        db.commit()
+
+        if uploaded_path:
+            await queue_video_analysis(uploaded_path, user["user_id"])
+
+        return RedirectResponse(url="/exercises", status_code=303)
+    except Exception as e:
+        if db:
+            db.rollback()
+        print(f"Error adding exercise: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+
+        categories = await get_exercise_categories()
+
+        therapist_data = await get_therapist_data(user["user_id"])
+        return templates.TemplateResponse(
+            "dist/exercises/add_exercise.html", 
+            {
+                "request": request,
+                "error": f"Error adding exercise: {str(e)}",
+                "categories": categories,
+                "first_name": therapist_data["first_name"],
+                "last_name": therapist_data["last_name"]
+            },
+            status_code=400
+        )
+    finally:
+        if cursor:
+            cursor.close()
+        if db:
+            db.close()
+
+
+@router.get("/exercises/{exercise_id}/edit")
+async def edit_exercise_form(
+    request: Request,
+    exercise_id: int,
+    user = Depends(get_current_user)
+):
+    """Route to display the edit exercise form"""
+    db = get_Mysql_db()
+    cursor = None
+
+    try:
+        cursor = db.cursor(dictionary=True)
+
+        cursor.execute("SELECT * FROM Exercises WHERE exercise_id = %s", (exercise_id,))
+        exercise = cursor.fetchone()
+
+        if not exercise:
+            return RedirectResponse(url="/exercises", status_code=303)
+
+        cursor.execute("SELECT * FROM ExerciseCategories ORDER BY name")
+        categories = cursor.fetchall()
+
+        therapist_data = await get_therapist_data(user["user_id"])
+
+        return templates.TemplateResponse(
+            "dist/exercises/edit_exercise.html", 
+            {
+                "request": request,
+                "exercise": exercise,
+                "categories": categories,
+                "first_name": therapist_data["first_name"],
+                "last_name": therapist_data["last_name"]
+            }
+        )
+    except Exception as e:
+        print(f"Error loading edit exercise form: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return RedirectResponse(url="/exercises", status_code=303)
+    finally:
+        if cursor:
+            cursor.close()
+        if db:
+            db.close()
+
+
+@router.post("/exercises/{exercise_id}/edit")
+async def update_exercise(
+    request: Request,
+    exercise_id: int,
+    name: str = Form(...),
+    category_id: Optional[int] = Form(None),
+    description: Optional[str] = Form(None),
+    difficulty: Optional[str] = Form(None),
+    duration: Optional[int] = Form(None),
+    instructions: Optional[str] = Form(None),
+    keep_current_video: Optional[str] = Form(None),
+    video_source: Optional[str] = Form(None),
+    video_url: Optional[str] = Form(None),
+    video_upload: Optional[UploadFile] = File(None),
+    user = Depends(get_current_user)
+):
+    """Route to handle updating an exercise"""
+    db = get_Mysql_db()
+    cursor = None
+
+    try:
+        cursor = db.cursor(dictionary=True)
+
+        cursor.execute("SELECT * FROM Exercises WHERE exercise_id = %s", (exercise_id,))
+        exercise = cursor.fetchone()
+
+        if not exercise:
+            return RedirectResponse(url="/exercises")
+
+
+        final_video_url = exercise['video_url']  # Keep existing by default
+        video_type = exercise.get('video_type', 'none') # Keep existing type
+        video_size = exercise.get('video_size', None)  # Keep existing size
+        video_filename = exercise.get('video_filename', None)  # Keep existing filename
+        uploaded_path = None
+
+
+        if not keep_current_video:
+            if video_source == 'youtube' and video_url:
+                final_video_url = video_url
+                video_type = 'youtube'
+                video_size = None
+                video_filename = None
+
+            elif video_source == 'upload' and video_upload and video_upload.filename:
+
+                current_file = Path(__file__).resolve()
+                project_root = current_file.parent.parent.parent
+                uploads_dir = project_root / "Frontend_Web" / "static" / "assets" / "videos" / "exercises"
+                uploads_dir.mkdir(parents=True, exist_ok=True)
+
+
+                video_filename = video_upload.filename
+
+
+                file_extension = video_filename.split(".")[-1].lower()
+                unique_filename = f"exercise_{exercise_id}_{int(time.time())}_{secrets.token_hex(4)}.{file_extension}"
+                file_path = uploads_dir / unique_filename
+
+
+                video_content = await video_upload.read()
+                video_size = len(video_content)
+
+
+                async with aiofiles.open(file_path, "wb") as f:
+                    await f.write(video_content)
+
+
+                old_video_url = exercise['video_url']
+                old_video_type = exercise.get('video_type', '')
+
+                if old_video_url and old_video_type == 'upload':
+                    try:
+                        old_video_path = Path(project_root) / "Frontend_Web" / old_video_url.lstrip('/')
+                        if os.path.exists(old_video_path):
+                            os.remove(old_video_path)
+                            print(f"Deleted old video: {old_video_path}")
+                    except Exception as e:
+                        print(f"Error deleting old video: {e}")
+
+
+                final_video_url = f"/static/assets/videos/exercises/{unique_filename}"
+                video_type = 'upload'
+                uploaded_path = file_path
+            else:
+
+                final_video_url = None
+                video_type = 'none'
+                video_size = None
+                video_filename = None
+
+
+        cursor.execute(
+            """UPDATE Exercises 
+            SET name = %s, category_id = %s, description = %s, 
+                video_url = %s, video_type = %s, video_size = %s, video_filename = %s,
+                difficulty = %s, duration = %s, instructions = %s, 
+                updated_at = CURRENT_TIMESTAMP
+            WHERE exercise_id = %s""",
+            (name, category_id, description, final_video_url, video_type, video_size, 
+            video_filename, difficulty, duration, instructions, exercise_id)
+        )
+        db.commit()
+
+        if uploaded_path:
+            await queue_video_analysis(uploaded_path, user["user_id"])
+
+        return RedirectResponse(url=f"/exercises", status_code=303)
+    except Exception as e:
+        if db:
+            db.rollback()
+        print(f"Error updating exercise: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+
+        categories = []
+        try:
+            cursor.execute("SELECT * FROM ExerciseCategories ORDER BY name")
+            categories = cursor.fetchall()
+        except:
+            pass
+
+        therapist_data = await get_therapist_data(user["user_id"])
+
+        return templates.TemplateResponse(
+            "dist/exercises/edit_exercise.html", 
+            {
+                "request": request,
+                "exercise": exercise,
+                "categories": categories,
+                "first_name": therapist_data["first_name"],
+                "last_name": therapist_data["last_name"],
+                "error": f"Error updating exercise: {str(e)}"
+            },
+            status_code=400
+        )
+    finally:
+        if cursor:
+            cursor.close()
+        if db:
+            db.close()
+
+
+@router.post("/exercises/delete")
+async def delete_exercise(
+    request: Request,
+    exercise_id: int = Form(...),
+    user = Depends(get_current_user)
+):
+    """Route to delete an exercise"""
+    db = get_Mysql_db()
+    cursor = None
+
+    try:
+        cursor = db.cursor(dictionary=True)
+
+        cursor.execute(
+            "SELECT video_url, video_type FROM Exercises WHERE exercise_id = %s", 
+            (exercise_id,)
+        )
+        exercise = cursor.fetchone()
+
+        if exercise and exercise['video_url'] and exercise.get('video_type') == 'upload':
+            try:
+                current_file = Path(__file__).resolve()
+                project_root = current_file.parent.parent.parent
+                video_path = project_root / "Frontend_Web" / exercise['video_url'].lstrip('/')
+
+                if os.path.exists(video_path):
+                    os.remove(video_path)
+                    print(f"Deleted video file: {video_path}")
+            except Exception as e:
+                print(f"Error deleting video file: {e}")
+
+        cursor.execute(
+            "DELETE FROM Exercises WHERE exercise_id = %s", 
+            (exercise_id,)
+        )
+        db.commit()
+
+        return RedirectResponse(url="/exercises", status_code=303)
+    except Exception as e:
+        if db:
+            db.rollback()
+        print(f"Error deleting exercise: {e}")
+        return RedirectResponse(url="/exercises", status_code=303)
+    finally:
+        if cursor:
+            cursor.close()
+        if db:
+            db.close()
+
+
+@router.post("/api/exercises/rate")
+async def rate_exercise(
+    request: Request,
+    exercise_progress_id: int = Form(...),
+    rating: int = Form(...),
+    feedback: str = Form(None)
+):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(status_code=401, content={"success": False, "message": "Not authenticated"})
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(status_code=401, content={"success": False, "message": "Not authenticated"})
+
+
+        if rating < 1 or rating > 5:
+            return JSONResponse(status_code=400, content={"success": False, "message": "Rating must be between 1 and 5"})
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+
+            cursor.execute(
+                """SELECT pep.progress_id 
+                FROM PatientExerciseProgress pep
+                JOIN TreatmentPlanExercises tpe ON pep.plan_exercise_id = tpe.plan_exercise_id
+                JOIN TreatmentPlans tp ON tpe.plan_id = tp.plan_id
+                JOIN Patients p ON tp.patient_id = p.patient_id
+                WHERE pep.progress_id = %s AND p.therapist_id = %s""",
+                (exercise_progress_id, session_data["user_id"])
+            )
+            progress = cursor.fetchone()
+
+            if not progress:
+                return JSONResponse(status_code=404, content={"success": False, "message": "Exercise progress not found"})
+
+
+            cursor.execute(
+                """UPDATE PatientExerciseProgress 
+                SET therapist_rating = %s, therapist_feedback = %s
+                WHERE progress_id = %s""",
+                (rating, feedback, exercise_progress_id)
+            )
+            db.commit()
+
+            return JSONResponse(content={"success": True})
+
+        except Exception as e:
+            print(f"Database error in rate exercise: {e}")
+            return JSONResponse(status_code=500, content={"success": False, "message": "Error updating rating"})
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in rate exercise: {e}")
+        return JSONResponse(status_code=500, content={"success": False, "message": "Server error"})
+
+
+@router.get("/exercises")
+async def exercises_page(request: Request, user=Depends(get_current_user)):
+    db = get_Mysql_db()
+    cursor = db.cursor(dictionary=True)
+
+    try:
+        cursor.execute(
+            """SELECT e.*, c.name as category_name 
+            FROM Exercises e
+            LEFT JOIN ExerciseCategories c ON e.category_id = c.category_id
+            """
+        )
+        exercises = cursor.fetchall()
+
+        cursor.execute("SELECT * FROM ExerciseCategories")
+        categories = cursor.fetchall()
+
+        cursor.execute("SELECT * FROM TreatmentPlans")
+        treatment_plans = cursor.fetchall()
+
+        therapist_data = await get_therapist_data(user["user_id"])
+
+        return templates.TemplateResponse(
+            "dist/exercises/exercise_list.html", 
+            {
+                "request": request,
+                "treatment_plans": treatment_plans,
+                "exercises": exercises,
+                "categories": categories,
+                "first_name": therapist_data["first_name"],
+                "last_name": therapist_data["last_name"]
+            }
+        )
+    finally:
+        cursor.close()
+        db.close()
+
+
+@router.get("/exercises/add")
+async def add_exercise_page(request: Request, user=Depends(get_current_user)):
+    db = get_Mysql_db()
+    cursor = db.cursor(dictionary=True)
+
+    try:
+        cursor.execute("SELECT * FROM ExerciseCategories")
+        categories = cursor.fetchall()
+
+        therapist_data = await get_therapist_data(user["user_id"])
+
+        return templates.TemplateResponse(
+            "dist/exercises/add_exercise.html", 
+            {
+                "request": request,
+                "categories": categories,
+                "first_name": therapist_data["first_name"],
+                "last_name": therapist_data["last_name"]
+            }
+        )
+    finally:
+        cursor.close()
+        db.close()
@@ -0,0 +1,299 @@
+from connections.functions import *
+from connections.mysql_database import *
+from connections.mongo_db import *
+from connections.redis_database import *
+from connections.routers.common import *
+from inference.cache import cache_key, content_digest, inference_cache
+from inference.detector import INFERENCE_CONFIDENCE, InferenceBusy, decode_image, detection_batcher, pose_batcher
+from inference.exercise_analysis import analyze_session, record_progress
+from inference.stream import PoseStream
+from inference.video_pipeline import owned_by, video_pipeline
+import asyncio
+import traceback
+
+router = APIRouter()
+
+INFERENCE_VIDEO_DIR = os.getenv(
+    "INFERENCE_VIDEO_DIR",
+    str(FilePath(__file__).resolve().parent.parent.parent / "uploads" / "recordings")
+)
+INFERENCE_VIDEO_EXTENSIONS = {"mp4", "mov", "m4v", "webm", "avi", "mkv"}
+
+@router.post("/inference/detect")
+async def detect_objects(
+    image: UploadFile = File(...),
+    confidence: Optional[float] = Form(None),
+    user=Depends(get_inference_user)
+):
+    """
+    API endpoint running YOLO detection on one uploaded image.
+    Concurrent requests are micro-batched into a single predict call;
+    answers 429 when the inference queue is full. An image already analysed with the
+    same model and threshold is answered from the inference cache. Results are recorded
+    in the annotations collection through the buffered bulk writer.
+    """
+    threshold = INFERENCE_CONFIDENCE if confidence is None else confidence
+    if not 0 <= threshold <= 1:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "invalid", "detail": "confidence must be between 0 and 1"}
+        )
+
+    data = await image.read()
+    model = detection_batcher.active
+    # Hashing and decoding a large upload would otherwise hold up every other request.
+    key = cache_key("frame", await asyncio.to_thread(content_digest, data), model.weights, threshold, model.version)
+    result = await inference_cache.get(key)
+    cached = result is not None
+
+    frame = None if cached else await asyncio.to_thread(decode_image, data)
+    if not cached and frame is None:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "invalid", "detail": "Could not decode image"}
+        )
+
+    try:
+        if not cached:
+            result = await detection_batcher.detect(frame, threshold)
+            inference_cache.put(key, result)
+
+        annotation_writer.add({
+            "user_id": user["user_id"],
+            "user_type": user["user_type"],
+            "image": image.filename,
+            "annotations": result["annotations"],
+            "size": result["size"],
+            "save_location": None,
+            "model_used": result["model_used"],
+            "model_version": result["model_version"],
+            "timestamp": datetime.datetime.now(),
+            "status": "completed",
+            "confidence_threshold": result["confidence_threshold"],
+            "processing_time": result["processing_time"],
+            "device": result["device"]
+        })
+        return {"status": "valid", "image": image.filename, "cached": cached, **result}
+    except InferenceBusy as e:
+        return JSONResponse(
+            status_code=429,
+            content={"status": "invalid", "detail": str(e)},
+            headers={"Retry-After": "1"}
+        )
+    except Exception as e:
+        print(f"Error in detect API: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Inference error: {str(e)}"}
+        )
+
+
+@router.get("/inference/backends")
+async def inference_backends(user=Depends(get_inference_user)):
+    """API endpoint reporting which runtime serves inference and each backend's measured latency"""
+    try:
+        return {
+            "status": "valid",
+            "models": await detection_batcher.backend_report(),
+            "cache": inference_cache.stats()
+        }
+    except Exception as e:
+        print(f"Error in inference backends API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Inference error: {str(e)}"}
+        )
+
+
+@router.get("/inference/models")
+async def inference_models(user=Depends(get_inference_user)):
+    """API endpoint listing the active and recently retired version of each model with its latency"""
+    return {
+        "status": "valid",
+        "models": {
+            "detection": detection_batcher.model_stats(),
+            "pose": pose_batcher.model_stats()
+        }
+    }
+
+
+@router.post("/inference/models/swap", dependencies=[Depends(require_admin)])
+async def swap_model(request: Request):
+    """
+    Admin endpoint deploying a new model version without downtime.
+    JSON body: {"model": "detection" | "pose", "weights": "yolov8s.pt", "version": "2"}.
+    The call returns once the new version is loaded, warmed and serving.
+    """
+    try:
+        data = await request.json()
+        batcher = {"detection": detection_batcher, "pose": pose_batcher}[data["model"]]
+        weights, version = data["weights"], str(data["version"])
+    except Exception:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "invalid", "detail": "Expected model (detection or pose), weights and version"}
+        )
+
+    try:
+        previous = await batcher.swap(weights, version)
+        return {"status": "valid", "active": batcher.active.stats(), "previous": previous.stats()}
+    except Exception as e:
+        print(f"Error swapping model: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Could not load {weights}: {str(e)}"}
+        )
+
+
+@router.post("/inference/exercise-analysis")
+async def exercise_analysis(request: Request, user=Depends(get_inference_user)):
+    """
+    API endpoint counting reps and scoring form from a session's pose keypoints.
+
+    JSON body: keypoints (frames x 17 x [x, y, confidence]) plus fps or timestamps;
+    optional joint and target_range. With patient_id, plan_exercise_id and save=true
+    the result is recorded in PatientExerciseProgress.
+    """
+    try:
+        data = await request.json()
+    except Exception:
+        return JSONResponse(status_code=400, content={"status": "invalid", "detail": "Invalid JSON"})
+    if not isinstance(data, dict) or not data.get("keypoints"):
+        return JSONResponse(status_code=400, content={"status": "invalid", "detail": "keypoints are required"})
+
+    try:
+        analysis = await asyncio.to_thread(
+            analyze_session,
+            data["keypoints"],
+            fps=data.get("fps"),
+            timestamps=data.get("timestamps"),
+            joint=data.get("joint"),
+            target_range=data.get("target_range")
+        )
+    except (TypeError, ValueError) as e:
+        return JSONResponse(status_code=400, content={"status": "invalid", "detail": str(e)})
+
+    if not data.get("save"):
+        return {"status": "valid", **analysis}
+
+    patient_id = data.get("patient_id")
+    plan_exercise_id = data.get("plan_exercise_id")
+    if not patient_id or not plan_exercise_id:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "invalid", "detail": "patient_id and plan_exercise_id are required to save"}
+        )
+
+    db = get_Mysql_db()
+    cursor = None
+    try:
+        cursor = db.cursor(dictionary=True)
+
+        # Therapists may record for their own patients; app users only for the patient record under their email.
+        if user["user_type"] == "therapist":
+            owner_check = "tp.therapist_id = %s"
+        else:
+            owner_check = "p.email = (SELECT email FROM users WHERE user_id = %s)"
+        cursor.execute(
+            f"""SELECT tpe.plan_exercise_id
+                FROM TreatmentPlanExercises tpe
+                JOIN TreatmentPlans tp ON tpe.plan_id = tp.plan_id
+                JOIN Patients p ON tp.patient_id = p.patient_id
+                WHERE tpe.plan_exercise_id = %s AND tp.patient_id = %s AND {owner_check}""",
+            (plan_exercise_id, patient_id, user["user_id"])
+        )
+        if not cursor.fetchone():
+            return JSONResponse(
+                status_code=404,
+                content={"status": "invalid", "detail": "Plan exercise not found for this patient"}
+            )
+
+        progress_id = record_progress(cursor, patient_id, plan_exercise_id, analysis, data.get("notes"))
+        db.commit()
+        return {"status": "valid", "progress_id": progress_id, **analysis}
+    except Exception as e:
+        print(f"Error saving exercise analysis: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        db.rollback()
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Database error: {str(e)}"}
+        )
+    finally:
+        if cursor:
+            cursor.close()
+        db.close()
+
+
+@router.post("/inference/videos")
+async def upload_recording(video: UploadFile = File(...), user=Depends(get_inference_user)):
+    """
+    API endpoint for a patient's exercise recording. The video is saved and analysed
+    in the background; poll /inference/videos/{video_id} for progress. Re-uploading
+    a clip that was already analysed returns the earlier video_id.
+    """
+    file_extension = (video.filename or "").rsplit(".", 1)[-1].lower()
+    if file_extension not in INFERENCE_VIDEO_EXTENSIONS:
+        return JSONResponse(
+            status_code=400,
+            content={"status": "invalid", "detail": f"Unsupported video type: {file_extension}"}
+        )
+
+    os.makedirs(INFERENCE_VIDEO_DIR, exist_ok=True)
+    file_path = os.path.join(
+        INFERENCE_VIDEO_DIR,
+        f"recording_{user['user_id']}_{int(time.time())}_{secrets.token_hex(4)}.{file_extension}"
+    )
+
+    try:
+        async with aiofiles.open(file_path, "wb") as f:
+            while chunk := await video.read(1024 * 1024):
+                await f.write(chunk)
+
+        video_id, cached = await video_pipeline.submit_cached(file_path, user["user_id"], user_type=user["user_type"])
+        return JSONResponse(status_code=202, content={"status": "valid", "video_id": video_id, "cached": cached})
+    except Exception as e:
+        print(f"Error queueing recording: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Could not queue video: {str(e)}"}
+        )
+
+
+@router.get("/inference/videos/{video_id}")
+async def recording_status(video_id: str, user=Depends(get_inference_user)):
+    """API endpoint reporting how far the analysis of an uploaded video has got"""
+    state = video_pipeline.status(video_id)
+    if not state or not owned_by(state, user["user_id"], user["user_type"]):
+        return JSONResponse(status_code=404, content={"status": "invalid", "detail": "Video not found"})
+
+    return {
+        "status": "valid",
+        "video_id": video_id,
+        "state": state["status"],
+        "frames_analysed": state["frames_analysed"],
+        "next_frame": state["next_frame"],
+        "total_frames": state.get("total_frames"),
+        "error": state["error"],
+    }
+
+
+@router.websocket("/ws/inference/pose")
+async def pose_stream(websocket: WebSocket, confidence: Optional[float] = None):
+    """
+    Live pose estimation for an exercise session.
+    Send frames as binary JPEG/WebP messages; keypoints come back per analysed frame.
+    """
+    if not await get_session_user(websocket):
+        await websocket.close(code=4401)
+        return
+
+    threshold = INFERENCE_CONFIDENCE if confidence is None else confidence
+    if not 0 <= threshold <= 1:
+        await websocket.close(code=4400)
+        return
+
+    await PoseStream(websocket, pose_batcher, threshold).serve()
@@ -0,0 +1,496 @@
+from connections.functions import *
+from connections.mysql_database import *
+from connections.redis_database import *
+from connections.mongo_db import *
+from connections.routers.common import *
+from connections.chat import chat_hub, CHAT_PARTICIPANT_TYPES
+from connections.mobile import (
+    USER_MESSAGES_DEFAULT_LIMIT, USER_MESSAGES_MAX_LIMIT, parse_since,
+    fetch_user_messages, fetch_user_messages_page, fetch_user_messages_delta
+)
+from connections.pagination import decode_cursor
+import traceback
+
+router = APIRouter()
+
+async def send_user_message(request: Request):
+    """Mobile variant of /messages/send: a user messaging a therapist with a JSON MessageRequest"""
+    try:
+        message_request = MessageRequest(**await request.json())
+    except Exception as e:
+        return JSONResponse(
+            status_code=422,
+            content={"status": "invalid", "detail": f"Invalid message: {str(e)}"}
+        )
+
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401,
+            content={"status": "invalid", "detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"status": "invalid", "detail": "Not authenticated"}
+            )
+
+        user_id = session_data["user_id"]
+
+        db = get_Mysql_db()
+        cursor = db.cursor()
+
+        try:
+
+            cursor.execute(
+                "SELECT id FROM Therapists WHERE id = %s",
+                (message_request.recipient_id,)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return JSONResponse(
+                    status_code=404,
+                    content={"status": "invalid", "detail": "Recipient not found"}
+                )
+
+
+            cursor.execute(
+                """INSERT INTO Messages 
+                (sender_id, sender_type, recipient_id, recipient_type, subject, content) 
+                VALUES (%s, %s, %s, %s, %s, %s)""",
+                (user_id, "user", message_request.recipient_id, "therapist", 
+                message_request.subject, message_request.content)
+            )
+            db.commit()
+
+            return {"status": "valid", "message": "Message sent successfully"}
+
+        except Exception as e:
+            db.rollback()
+            print(f"Database error in send message API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"status": "invalid", "detail": f"Error sending message: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in send message API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.post("/messages/send")
+async def send_message(request: Request):
+    """Therapists post the inbox form here; the mobile app posts JSON, handled by send_user_message"""
+    if request.headers.get("content-type", "").startswith("application/json"):
+        return await send_user_message(request)
+
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return {"success": False, "message": "Not authenticated"}
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return {"success": False, "message": "Not authenticated"}
+
+        form_data = await request.form()
+        recipient_type = form_data.get("recipient_type")
+        recipient_id = form_data.get("recipient_id")
+        subject = form_data.get("subject")
+        content = form_data.get("content")
+
+
+        if not recipient_type or not recipient_id or not content:
+            return {"success": False, "message": "Recipient and message content are required"}
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+
+            recipient_exists = False
+
+            if recipient_type == "therapist":
+                cursor.execute(
+                    "SELECT id FROM Therapists WHERE id = %s",
+                    (recipient_id,)
+                )
+                recipient = cursor.fetchone()
+                recipient_exists = recipient is not None
+            elif recipient_type == "patient":
+                cursor.execute(
+                    "SELECT patient_id FROM Patients WHERE patient_id = %s",
+                    (recipient_id,)
+                )
+                recipient = cursor.fetchone()
+                recipient_exists = recipient is not None
+            elif recipient_type == "user":
+                cursor.execute(
+                    "SELECT user_id FROM users WHERE user_id = %s",
+                    (recipient_id,)
+                )
+                recipient = cursor.fetchone()
+                recipient_exists = recipient is not None
+
+            if not recipient_exists:
+                return {"success": False, "message": "Recipient not found"}
+
+
+            cursor.execute(
+                """INSERT INTO Messages 
+                    (sender_id, sender_type, recipient_id, recipient_type, subject, content) 
+                    VALUES (%s, %s, %s, %s, %s, %s)""",
+                (session_data["user_id"], "therapist", recipient_id, recipient_type, subject, content)
+            )
+            db.commit()
+
+
+            new_message_id = cursor.lastrowid
+
+            return {"success": True, "message_id": new_message_id}
+
+        except Exception as e:
+            print(f"Database error sending message: {e}")
+            return {"success": False, "message": "Error sending message"}
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error sending message: {e}")
+        return {"success": False, "message": "Error processing request"}
+
+
+@router.post("/messages/reply/{message_id}")
+async def reply_to_message(request: Request, message_id: int):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return {"success": False, "message": "Not authenticated"}
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return {"success": False, "message": "Not authenticated"}
+
+        form_data = await request.form()
+        content = form_data.get("content")
+
+
+        if not content:
+            return {"success": False, "message": "Message content is required"}
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+
+            cursor.execute(
+                """SELECT sender_id, recipient_id, subject, sender_type, recipient_type
+                    FROM Messages 
+                    WHERE message_id = %s 
+                    AND ((sender_id = %s AND sender_type = 'therapist') 
+                         OR (recipient_id = %s AND recipient_type = 'therapist'))""",
+                (message_id, session_data["user_id"], session_data["user_id"])
+            )
+            original_message = cursor.fetchone()
+
+            if not original_message:
+                return {"success": False, "message": "Original message not found"}
+
+
+            if int(original_message['recipient_id']) == int(session_data["user_id"]) and original_message['recipient_type'] == 'therapist':
+                reply_to_id = original_message['sender_id']
+                reply_to_type = original_message['sender_type']
+            else:
+                reply_to_id = original_message['recipient_id']
+                reply_to_type = original_message['recipient_type']
+
+
+            subject = original_message['subject']
+            if not subject.startswith("Re:"):
+                subject = f"Re: {subject}"
+
+
+            cursor.execute(
+                """INSERT INTO Messages 
+                    (sender_id, sender_type, recipient_id, recipient_type, subject, content) 
+                    VALUES (%s, %s, %s, %s, %s, %s)""",
+                (session_data["user_id"], "therapist", reply_to_id, reply_to_type, subject, content)
+            )
+            db.commit()
+
+
+            new_message_id = cursor.lastrowid
+
+            return {"success": True, "message_id": new_message_id}
+
+        except Exception as e:
+            print(f"Database error sending reply: {e}")
+            return {"success": False, "message": "Error sending reply"}
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error sending reply: {e}")
+        return {"success": False, "message": "Error processing request"}
+
+
+@router.delete("/messages/{message_id}")
+async def delete_message(request: Request, message_id: int):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return {"success": False, "message": "Not authenticated"}
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return {"success": False, "message": "Not authenticated"}
+
+        db = get_Mysql_db()
+        cursor = db.cursor()
+
+        try:
+
+            cursor.execute(
+                """SELECT message_id 
+                   FROM Messages 
+                   WHERE message_id = %s 
+                   AND ((sender_id = %s AND sender_type = 'therapist') 
+                        OR (recipient_id = %s AND recipient_type = 'therapist'))""",
+                (message_id, session_data["user_id"], session_data["user_id"])
+            )
+
+            message = cursor.fetchone()
+            if not message:
+                return {"success": False, "message": "Message not found or you don't have permission to delete it"}
+
+
+            cursor.execute(
+                "DELETE FROM Messages WHERE message_id = %s",
+                (message_id,)
+            )
+            db.commit()
+
+            return {"success": True}
+
+        except Exception as e:
+            print(f"Database error deleting message: {e}")
+            return {"success": False, "message": "Error deleting message"}
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error deleting message: {e}")
+        return {"success": False, "message": "Error processing request"}
+
+
+@router.get("/api/messages/unread-count")
+async def get_unread_count(request: Request):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return {"count": 0}
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return {"count": 0}
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+            cursor.execute(
+                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND is_read = FALSE",
+                (session_data["user_id"],)
+            )
+            result = cursor.fetchone()
+            return {"count": result['count'] if result else 0}
+
+        except Exception as e:
+            print(f"Error fetching unread count: {e}")
+            return {"count": 0}
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in unread count API: {e}")
+        return {"count": 0}
+
+
+@router.get("/user/messages")
+async def get_user_messages(
+    request: Request,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None,
+    compact: bool = False
+):
+    """
+    API endpoint to get messages for the current user.
+
+    Without parameters the whole mailbox is returned. `limit`/`cursor` page through it
+    newest first; `since` (timestamp or sync_token) returns only new or changed messages.
+    `compact=true` shortens field names.
+    """
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401,
+            content={"detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"detail": "Not authenticated"}
+            )
+
+        user_id = session_data["user_id"]
+
+        page_size = min(max(limit or USER_MESSAGES_DEFAULT_LIMIT, 1), USER_MESSAGES_MAX_LIMIT)
+
+        since_key = None
+        if since is not None:
+            since_key = parse_since(since)
+            if since_key is None:
+                return JSONResponse(
+                    status_code=400,
+                    content={"detail": "Invalid since value"}
+                )
+
+        before = None
+        if cursor is not None:
+            cursor_values = decode_cursor(cursor, size=1)
+            try:
+                before = int(cursor_values[0])
+            except (TypeError, ValueError):
+                return JSONResponse(
+                    status_code=400,
+                    content={"detail": "Invalid cursor"}
+                )
+
+        db = get_Mysql_db()
+        db_cursor = db.cursor(dictionary=True)
+
+        try:
+            if since_key is not None:
+                return fetch_user_messages_delta(db_cursor, user_id, since_key, page_size, compact)
+
+            if limit is not None or before is not None:
+                return fetch_user_messages_page(db_cursor, user_id, page_size, before, compact)
+
+            return fetch_user_messages(db_cursor, user_id, compact)
+
+        except Exception as e:
+            print(f"Database error in get user messages API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"detail": f"Internal server error: {str(e)}"}
+            )
+        finally:
+            db_cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in get user messages API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.post("/messages/{message_id}/read")
+async def mark_message_read(request: Request, message_id: int):
+    """API endpoint to mark a message as read"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401,
+            content={"status": "invalid", "detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"status": "invalid", "detail": "Not authenticated"}
+            )
+
+        user_id = session_data["user_id"]
+
+        db = get_Mysql_db()
+        cursor = db.cursor()
+
+        try:
+
+            cursor.execute(
+                """SELECT message_id 
+                FROM Messages 
+                WHERE message_id = %s AND recipient_id = %s AND recipient_type = 'user'""",
+                (message_id, user_id)
+            )
+            message = cursor.fetchone()
+
+            if not message:
+                return JSONResponse(
+                    status_code=404,
+                    content={"status": "invalid", "detail": "Message not found"}
+                )
+
+
+            cursor.execute(
+                "UPDATE Messages SET is_read = TRUE WHERE message_id = %s",
+                (message_id,)
+            )
+            db.commit()
+
+            return {"status": "valid", "message": "Message marked as read"}
+
+        except Exception as e:
+            db.rollback()
+            print(f"Database error in mark message read API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"status": "invalid", "detail": f"Error updating message: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in mark message read API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.websocket("/ws/chat/{peer_type}/{peer_id}")
+async def chat_socket(websocket: WebSocket, peer_type: str, peer_id: int, cursor: Optional[int] = None):
+    """Real-time chat with one peer. Pass `cursor` (last seen message_id) to replay missed messages."""
+    user = await get_session_user(websocket)
+    if not user:
+        await websocket.close(code=4401)
+        return
+
+    if peer_type not in CHAT_PARTICIPANT_TYPES:
+        await websocket.close(code=4400)
+        return
+
+    await chat_hub.serve(
+        websocket,
+        user["user_type"],
+        user["user_id"],
+        peer_type,
+        peer_id,
+        cursor
+    )
@@ -0,0 +1,937 @@
+from connections.functions import *
+from connections.mysql_database import *
+from connections.redis_database import *
+from connections.mongo_db import *
+from connections.routers.common import *
+from connections.mobile import (
+    fetch_user_info, fetch_user_appointments, fetch_current_therapist,
+    build_bootstrap, parse_known_etags, section_etag
+)
+import traceback
+
+router = APIRouter()
+
+@router.get("/")
+async def Home(request: Request):
+    session_id = request.cookies.get("session_id")
+
+    if session_id:
+        try:
+            user_data = await get_redis_session(session_id)
+            if user_data:
+                return {"status": "valid", "user": user_data}
+        except Exception as e:
+            print(f"Session validation error: {e}")
+
+    return {"status": "valid"}
+
+
+@router.get("/dashboard")
+async def dashboard(user = Depends(get_current_user)):
+    return {"message": f"Welcome, {user['username']}!", "user_id": user["user_id"]}
+
+
+@router.post("/registerUser")
+async def registerUser(result: Register): 
+    db = get_Mysql_db()
+    cursor = db.cursor()
+
+    hashed_password = bcrypt.hashpw(result.password.encode("utf-8"), bcrypt.gensalt())
+
+    try:
+        cursor.execute(
+            "INSERT INTO users (username, email, password_hash) VALUES (%s, %s, %s)",
+            (result.username, result.email, hashed_password.decode("utf-8"))
+        )
+        db.commit()
+        return RedirectResponse(url="/", status_code=303)
+    except mysql.connector.IntegrityError:
+        return {"error": "Username or email already exists."}
+    finally:
+        cursor.close()
+        db.close()
+
+
+@router.post("/loginUser")
+async def loginUser(result: Login, response: Response):
+    db = get_Mysql_db()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute(
+            "SELECT user_id, password_hash FROM users WHERE username = %s",
+            (result.username,)
+        )
+        user = cursor.fetchone()
+
+        if user is None:
+            raise HTTPException(status_code=401, detail="Invalid username or password")
+
+        user_id, stored_password_hash = user[0], user[1].encode("utf-8")
+
+        if bcrypt.checkpw(result.password.encode("utf-8"), stored_password_hash):
+            session_id = await create_session(
+                user_id=user_id, 
+                email=result.username,
+            )
+
+            response.set_cookie(
+                key="session_id", 
+                value=session_id, 
+                httponly=True,
+                samesite="lax",
+                path="/"
+            )
+            print("response 152", response)
+
+            return {"status": "valid"}
+        else:
+            raise HTTPException(status_code=401, detail="Invalid username or password")
+    finally:
+        cursor.close()
+        db.close()
+
+
+@router.get("/getUserInfo") 
+async def get_user_info(request: Request):
+    session_id = request.cookies.get("session_id")
+
+    if not session_id:
+        raise HTTPException(status_code=401, detail="Session not found") 
+
+    session_data = await get_session_data(session_id)
+
+    if not session_data:
+        raise HTTPException(status_code=401, detail="Invalid session")
+
+    user_id = session_data.user_id  
+
+    db = get_Mysql_db()
+    cursor = db.cursor(dictionary=True)
+
+    try:
+        user_info = fetch_user_info(cursor, user_id)
+
+        if not user_info:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        return user_info
+
+    finally:
+        cursor.close()
+        db.close()
+
+
+@router.post("/logout")
+async def logout(request: Request):
+    session_id = request.cookies.get("session_id")
+
+    if session_id:
+        await delete_session(session_id)
+
+    response = JSONResponse(content={"message": "Logged out"})
+    response.delete_cookie("session_id")
+    return response
+
+
+@router.post("/appointments/request")
+async def request_appointment(request: Request, appointment_request: AppointmentRequest):
+    """API endpoint to request an appointment with a therapist"""
+    session_id = request.cookies.get("session_id")
+    print(f"Appointment request - Cookie session ID: {session_id}")
+
+
+    db = get_Mysql_db()
+    cursor = db.cursor()
+
+    try:
+        cursor.execute(
+            "SELECT id FROM Therapists WHERE id = %s",
+            (appointment_request.therapist_id,)
+        )
+        therapist = cursor.fetchone()
+
+        if not therapist:
+            return JSONResponse(
+                status_code=404,
+                content={"status": "failed", "message": "Therapist not found"}
+            )
+
+        user_info = None
+        user_id = None
+
+        if session_id:
+            try:
+                session_data = await get_session_data(session_id)
+                if session_data and hasattr(session_data, 'user_id'):
+                    user_id = session_data.user_id
+                    cursor.execute(
+                        "SELECT username, email FROM users WHERE user_id = %s",
+                        (user_id,)
+                    )
+                    user_info = cursor.fetchone()
+            except Exception as e:
+                print(f"Error getting session data: {e}")
+
+        patient_id = None
+
+        if user_info:
+            cursor.execute(
+                "SELECT patient_id FROM Patients WHERE email = %s",
+                (user_info[1],) 
+            )
+            patient_record = cursor.fetchone()
+
+            if patient_record:
+                patient_id = patient_record[0]
+            else:
+                cursor.execute(
+                    """INSERT INTO Patients 
+                    (therapist_id, first_name, last_name, email) 
+                    VALUES (%s, %s, %s, %s)""",
+                    (appointment_request.therapist_id, user_info[0], "", user_info[1])
+                )
+                db.commit()
+                patient_id = cursor.lastrowid
+        else:
+            cursor.execute(
+                """INSERT INTO Patients 
+                (therapist_id, first_name, last_name, email) 
+                VALUES (%s, %s, %s, %s)""",
+                (appointment_request.therapist_id, "Guest", "User", f"guest_{int(time.time())}@example.com")
+            )
+            db.commit()
+            patient_id = cursor.lastrowid
+
+        time_parts = appointment_request.time.split()
+        time_str = time_parts[0] 
+        am_pm = time_parts[1] if len(time_parts) > 1 else "AM" 
+
+        try:
+            time_obj = datetime.datetime.strptime(f"{time_str} {am_pm}", "%I:%M %p").time()
+        except ValueError:
+            try:
+                time_obj = datetime.datetime.strptime(time_str, "%H:%M").time()
+            except ValueError:
+                return JSONResponse(
+                    status_code=400,
+                    content={"status": "failed", "message": "Invalid time format"}
+                )
+
+        duration = 60
+
+        full_notes = f"Type: {appointment_request.type}\n"
+        if appointment_request.notes:
+            full_notes += f"Notes: {appointment_request.notes}\n"
+        if appointment_request.insuranceProvider:
+            full_notes += f"Insurance: {appointment_request.insuranceProvider}\n"
+        if appointment_request.insuranceMemberId:
+            full_notes += f"Member ID: {appointment_request.insuranceMemberId}"
+
+        cursor.execute(
+            """INSERT INTO Appointments 
+            (patient_id, therapist_id, appointment_date, appointment_time, duration, notes, status) 
+            VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+            (patient_id, appointment_request.therapist_id, appointment_request.date, 
+            time_obj, duration, full_notes, "Scheduled")
+        )
+        db.commit()
+
+        return {"status": "success", "message": "Appointment scheduled successfully"}
+
+    except Exception as e:
+        db.rollback()
+        print(f"Database error in request appointment API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "failed", "message": f"Error requesting appointment: {str(e)}"}
+        )
+    finally:
+        cursor.close()
+        db.close()
+
+
+@router.post("/appointments/respond/{request_id}")
+async def respond_to_appointment(
+    request: Request, 
+    request_id: int, 
+    response: AppointmentResponse
+):
+    """API endpoint for therapists to approve or reject appointment requests"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401, 
+            content={"status": "invalid", "detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_session_data(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"status": "invalid", "detail": "Not authenticated"}
+            )
+
+        email = session_data.email
+
+        db = get_Mysql_db()
+        cursor = db.cursor()
+
+        cursor.execute(
+            "SELECT id FROM Therapists WHERE company_email = %s",
+            (email,)
+        )
+        therapist_result = cursor.fetchone()
+
+        if not therapist_result:
+            return JSONResponse(
+                status_code=403,
+                content={"status": "invalid", "detail": "Not authorized as a therapist"}
+            )
+
+        therapist_id = therapist_result[0]
+
+        cursor.execute(
+            """SELECT user_id, therapist_id, appointment_date, appointment_time, 
+                    duration, notes 
+            FROM AppointmentRequests 
+            WHERE request_id = %s AND status = 'Pending'""",
+            (request_id,)
+        )
+        request_data = cursor.fetchone()
+
+        if not request_data:
+            return JSONResponse(
+                status_code=404,
+                content={"status": "invalid", "detail": "Appointment request not found or already processed"}
+            )
+
+        req_user_id, req_therapist_id, date, time, duration, notes = request_data
+
+        if therapist_id != req_therapist_id:
+            return JSONResponse(
+                status_code=403,
+                content={"status": "invalid", "detail": "You are not authorized to respond to this request"}
+            )
+
+        try:
+            cursor.execute(
+                "UPDATE AppointmentRequests SET status = %s WHERE request_id = %s",
+                (response.status, request_id)
+            )
+
+            if response.status == "Approved":
+                cursor.execute(
+                    """SELECT COUNT(*) FROM Appointments 
+                    WHERE therapist_id = %s AND appointment_date = %s AND appointment_time = %s 
+                    AND status != 'Cancelled'""",
+                    (therapist_id, date, time)
+                )
+                slot_taken = cursor.fetchone()[0] > 0
+
+                if slot_taken:
+                    db.rollback()
+                    return JSONResponse(
+                        status_code=409,
+                        content={"status": "invalid", "detail": "This time slot is no longer available"}
+                    )
+
+                cursor.execute(
+                    "SELECT username, email FROM users WHERE user_id = %s",
+                    (req_user_id,)
+                )
+                user_info = cursor.fetchone()
+
+                cursor.execute(
+                    "SELECT patient_id FROM Patients WHERE email = %s",
+                    (user_info[1],)  # Email
+                )
+                patient_record = cursor.fetchone()
+
+                patient_id = None
+                if patient_record:
+                    patient_id = patient_record[0]
+                else:
+                    cursor.execute(
+                        """INSERT INTO Patients 
+                        (therapist_id, first_name, last_name, email) 
+                        VALUES (%s, %s, %s, %s)""",
+                        (therapist_id, user_info[0], "", user_info[1])
+                    )
+                    patient_id = cursor.lastrowid
+
+                cursor.execute(
+                    """INSERT INTO Appointments 
+                    (patient_id, therapist_id, appointment_date, appointment_time, duration, notes, status) 
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                    (patient_id, therapist_id, date, time, duration, notes, "Scheduled")
+                )
+
+                message_content = f"Your appointment request for {date} at {time} has been approved."
+            else:
+                message_content = f"Your appointment request for {date} at {time} has been declined."
+                if response.reason:
+                    message_content += f" Reason: {response.reason}"
+
+            cursor.execute(
+                """INSERT INTO Messages
+                (sender_id, sender_type, recipient_id, recipient_type, subject, content)
+                VALUES (%s, %s, %s, %s, %s, %s)""",
+                (therapist_id, "therapist", req_user_id, "user", 
+                "Appointment Request Response", message_content)
+            )
+
+            db.commit()
+            return {"status": "valid", "message": f"Appointment request {response.status.lower()}"}
+
+        except Exception as e:
+            db.rollback()
+            print(f"Database error in appointment response API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"status": "invalid", "detail": f"Error processing response: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in appointment response API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.get("/therapists/{id}/appointment-requests", response_model=List[AppointmentRequestListItem])
+async def get_therapist_appointment_requests(request: Request, id: int, status: Optional[str] = None):
+    """API endpoint to get all appointment requests for a therapist"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401, 
+            content={"status": "invalid", "detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_session_data(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"status": "invalid", "detail": "Not authenticated"}
+            )
+
+        email = session_data.email
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        cursor.execute(
+            "SELECT id FROM Therapists WHERE company_email = %s",
+            (email,)
+        )
+        therapist_result = cursor.fetchone()
+
+        if not therapist_result or therapist_result['id'] != id:
+            return JSONResponse(
+                status_code=403,
+                content={"status": "invalid", "detail": "Not authorized to view these requests"}
+            )
+
+        query = """
+            SELECT ar.request_id, ar.appointment_date, ar.appointment_time, ar.status, ar.notes,
+                u.username as user_name
+            FROM AppointmentRequests ar
+            JOIN users u ON ar.user_id = u.user_id
+            WHERE ar.therapist_id = %s
+        """
+
+        params = [id]
+
+        if status:
+            query += " AND ar.status = %s"
+            params.append(status)
+
+        query += " ORDER BY ar.created_at DESC"
+
+        cursor.execute(query, params)
+        requests = cursor.fetchall()
+
+        formatted_requests = []
+        for req in requests:
+            time_str = req['appointment_time'].strftime("%I:%M %p")
+
+            formatted_requests.append({
+                "request_id": req['request_id'],
+                "date": req['appointment_date'].strftime("%Y-%m-%d"),
+                "time": time_str,
+                "status": req['status'],
+                "user_name": req['user_name'],
+                "notes": req['notes']
+            })
+
+        return formatted_requests
+
+    except Exception as e:
+        print(f"Error in get therapist appointment requests API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.get("/users/appointment-requests")
+async def get_user_appointment_requests(request: Request, status: Optional[str] = None):
+    """API endpoint to get all appointment requests for the logged-in user"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401, 
+            content={"status": "invalid", "detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_session_data(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"status": "invalid", "detail": "Not authenticated"}
+            )
+
+        user_id = session_data.user_id
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        query = """
+            SELECT ar.request_id, ar.appointment_date, ar.appointment_time, ar.status, ar.notes,
+                CONCAT(t.first_name, ' ', t.last_name) as therapist_name
+            FROM AppointmentRequests ar
+            JOIN Therapists t ON ar.therapist_id = t.id
+            WHERE ar.user_id = %s
+        """
+
+        params = [user_id]
+
+        if status:
+            query += " AND ar.status = %s"
+            params.append(status)
+
+        query += " ORDER BY ar.created_at DESC"
+
+        cursor.execute(query, params)
+        requests = cursor.fetchall()
+
+
+        formatted_requests = []
+        for req in requests:
+
+            time_str = req['appointment_time'].strftime("%I:%M %p")
+
+            formatted_requests.append({
+                "request_id": req['request_id'],
+                "date": req['appointment_date'].strftime("%Y-%m-%d"),
+                "time": time_str,
+                "status": req['status'],
+                "therapist_name": req['therapist_name'],
+                "notes": req['notes']
+            })
+
+        return formatted_requests
+
+    except Exception as e:
+        print(f"Error in get user appointment requests API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.get("/mobile/bootstrap")
+async def mobile_bootstrap(request: Request, compact: bool = False):
+    """
+    API endpoint returning everything the mobile home screen needs in one round-trip:
+    status, user info, appointments, current therapist, latest messages and therapists.
+
+    Send `X-Section-ETags: user=<etag>,...` to skip sections the app already has,
+    or `If-None-Match` with the previous ETag to get a 304 when nothing changed.
+    """
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401,
+            content={"detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"detail": "Not authenticated"}
+            )
+
+        static_dir = getattr(request.app.state, 'static_directory', "/PERCEPTRONX/Frontend_Web/static")
+        payload = await build_bootstrap(
+            session_data,
+            static_dir,
+            known_etags=parse_known_etags(request.headers.get("X-Section-ETags")),
+            compact=compact
+        )
+
+        etag = '"' + section_etag({name: section.get("etag") for name, section in payload["sections"].items()}) + '"'
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+        return JSONResponse(content=payload, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    except Exception as e:
+        print(f"Error in mobile bootstrap API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.get("/user/appointments")
+async def get_user_appointments(request: Request):
+    """API endpoint to get all appointments for the current user"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401,
+            content={"detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"detail": "Not authenticated"}
+            )
+
+        user_id = session_data["user_id"]
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+            return fetch_user_appointments(cursor, user_id)
+
+        except Exception as e:
+            print(f"Database error in get user appointments API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"detail": f"Internal server error: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in get user appointments API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.get("/user/therapist")
+async def get_current_therapist(request: Request):
+    """API endpoint to get the current therapist for the logged-in user"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401,
+            content={"detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"detail": "Not authenticated"}
+            )
+
+        user_id = session_data["user_id"]
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+            return fetch_current_therapist(cursor, user_id)
+
+        except Exception as e:
+            print(f"Database error in get current therapist API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"detail": f"Internal server error: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in get current therapist API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.post("/reset-password")
+async def reset_password(email: dict):
+    """API endpoint to initiate password reset"""
+    try:
+        db = get_Mysql_db()
+        cursor = db.cursor()
+
+        try:
+            email_address = email.get("email")
+            if not email_address:
+                return JSONResponse(
+                    status_code=400,
+                    content={"status": "invalid", "detail": "Email is required"}
+                )
+
+
+            cursor.execute(
+                "SELECT user_id FROM users WHERE email = %s",
+                (email_address,)
+            )
+            user = cursor.fetchone()
+
+            if not user:
+
+                cursor.execute(
+                    "SELECT id FROM Therapists WHERE company_email = %s",
+                    (email_address,)
+                )
+                therapist = cursor.fetchone()
+
+                if not therapist:
+
+                    return {"status": "valid", "message": "If this email is registered, you will receive reset instructions"}
+
+
+            expiry = datetime.datetime.now() + datetime.timedelta(hours=24)
+
+
+            reset_token = secrets.token_hex(32)
+
+
+            await r.set(f"reset:{reset_token}", email_address, ex=86400)
+
+
+            print(f"Password reset requested for {email_address}. Token: {reset_token}")
+
+            return {"status": "valid", "message": "If this email is registered, you will receive reset instructions"}
+
+        except Exception as e:
+            print(f"Database error in reset password API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"status": "invalid", "detail": f"Error processing request: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in reset password API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.get("/user/profile")
+async def get_user_profile(request: Request):
+    """API endpoint to get the user's profile information"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401,
+            content={"detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"detail": "Not authenticated"}
+            )
+
+        user_id = session_data["user_id"]
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+
+            cursor.execute(
+                "SELECT username, email, profile_pic, created_at FROM users WHERE user_id = %s",
+                (user_id,)
+            )
+            user = cursor.fetchone()
+
+            if not user:
+                return JSONResponse(
+                    status_code=404,
+                    content={"detail": "User not found"}
+                )
+
+
+            cursor.execute(
+                """SELECT p.*, t.first_name as therapist_first_name, t.last_name as therapist_last_name
+                FROM Patients p
+                LEFT JOIN Therapists t ON p.therapist_id = t.id
+                WHERE p.user_id = %s""",
+                (user_id,)
+            )
+            patient = cursor.fetchone()
+
+
+            profile = {
+                "username": user['username'],
+                "email": user['email'],
+                "profilePicture": f"/static/assets/images/user/{user['profile_pic']}" if user['profile_pic'] else None,
+                "joinedDate": user['created_at'].strftime("%Y-%m-%d") if user['created_at'] else None,
+                "hasPatientProfile": patient is not None
+            }
+
+            if patient:
+                profile.update({
+                    "patientProfile": {
+                        "id": patient['patient_id'],
+                        "firstName": patient['first_name'],
+                        "lastName": patient['last_name'],
+                        "phoneNumber": patient['phone'],
+                        "dateOfBirth": patient['date_of_birth'].strftime("%Y-%m-%d") if patient['date_of_birth'] else None,
+                        "address": patient['address'],
+                        "diagnosis": patient['diagnosis'],
+                        "status": patient['status'],
+                        "therapist": {
+                            "id": patient['therapist_id'],
+                            "name": f"{patient['therapist_first_name']} {patient['therapist_last_name']}".strip() if patient['therapist_first_name'] else None
+                        }
+                    }
+                })
+
+            return profile
+
+        except Exception as e:
+            print(f"Database error in get user profile API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"detail": f"Internal server error: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in get user profile API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.put("/user/profile")
+async def update_user_profile(request: Request, profile_data: dict):
+    """API endpoint to update user profile information"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401,
+            content={"status": "invalid", "detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"status": "invalid", "detail": "Not authenticated"}
+            )
+
+        user_id = session_data["user_id"]
+
+        db = get_Mysql_db()
+        cursor = db.cursor()
+
+        try:
+            if 'username' in profile_data or 'email' in profile_data:
+                update_fields = []
+                params = []
+
+                if 'username' in profile_data:
+                    update_fields.append("username = %s")
+                    params.append(ensure_str(profile_data['username']))
+
+                if 'email' in profile_data:
+                    update_fields.append("email = %s")
+                    params.append(ensure_str(profile_data['email']))
+
+                params.append(user_id)
+
+                cursor.execute(
+                    f"UPDATE users SET {', '.join(update_fields)}, updated_at = CURRENT_TIMESTAMP WHERE user_id = %s",
+                    params
+                )
+            patient_data = profile_data.get('patientProfile', {})
+            if patient_data:
+                cursor.execute(
+                    "SELECT patient_id FROM Patients WHERE user_id = %s",
+                    (user_id,)
+                )
+                patient = cursor.fetchone()
+
+                if patient:
+                    patient_id = patient[0]
+
+                    update_fields = []
+                    params = []
+
+                    for field, db_field in [
+                        ('firstName', 'first_name'),
+                        ('lastName', 'last_name'),
+                        ('phoneNumber', 'phone'),
+                        ('dateOfBirth', 'date_of_birth'),
+                        ('address', 'address'),
+                        ('diagnosis', 'diagnosis')
+                    ]:
+                        if field in patient_data:
+                            update_fields.append(f"{db_field} = %s")
+                            params.append(ensure_str(patient_data[field]))
+
+                    if update_fields:
+                        params.append(patient_id)
+                        cursor.execute(
+                            f"UPDATE Patients SET {', '.join(update_fields)}, updated_at = CURRENT_TIMESTAMP WHERE patient_id = %s",
+                            params
+                        )
+                else:
+                    pass
+
+            db.commit()
+
+            return {"status": "valid", "message": "Profile updated successfully"}
+
+        except Exception as e:
+            db.rollback()
+            print(f"Database error in update user profile API: {e}")
+            print(f"Traceback: {traceback.format_exc()}")
+            return JSONResponse(
+                status_code=500,
+                content={"status": "invalid", "detail": f"Error updating profile: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in update user profile API: {e}")
+        print(f"Traceback: {traceback.format_exc()}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Server error: {str(e)}"}
+        )
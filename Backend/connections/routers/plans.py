@@ -0,0 +1,509 @@
+from connections.functions import *
+from connections.mysql_database import *
+from connections.redis_database import *
+from connections.mongo_db import *
+from connections.routers.common import *
+from connections.templating import templates
+import traceback
+
+router = APIRouter()
+logger = get_logger("plans")
+
+@router.get("/treatment-plans/{plan_id}/edit")
+async def edit_treatment_plan_form(request: Request, plan_id: int):
+    """Route to display the edit treatment plan form"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+        db = get_Mysql_db()
+        cursor = None
+
+        try:
+            cursor = db.cursor(dictionary=True)
+
+
+            cursor.execute(
+                """SELECT tp.*, p.first_name as patient_first_name, p.last_name as patient_last_name
+                FROM TreatmentPlans tp
+                JOIN Patients p ON tp.patient_id = p.patient_id
+                WHERE tp.plan_id = %s AND tp.therapist_id = %s""",
+                (plan_id, session_data["user_id"])
+            )
+            plan = cursor.fetchone()
+
+            if not plan:
+                return RedirectResponse(url="/treatment-plans", status_code=303)
+
+
+            cursor.execute(
+                """SELECT tpe.*, e.name as exercise_name, e.difficulty, e.duration as exercise_duration
+                FROM TreatmentPlanExercises tpe
+                JOIN Exercises e ON tpe.exercise_id = e.exercise_id
+                WHERE tpe.plan_id = %s
+                ORDER BY tpe.plan_exercise_id""",
+                (plan_id,)
+            )
+            plan_exercises = cursor.fetchall()
+
+
+            cursor.execute(
+                "SELECT patient_id, first_name, last_name FROM Patients WHERE therapist_id = %s",
+                (session_data["user_id"],)
+            )
+            patients = cursor.fetchall()
+
+
+            cursor.execute("SELECT * FROM Exercises ORDER BY name")
+            exercises = cursor.fetchall()
+
+
+            therapist_data = await get_therapist_data(session_data["user_id"])
+
+            return templates.TemplateResponse(
+                "dist/treatment_plans/edit_plan.html",
+                {
+                    "request": request,
+                    "plan": plan,
+                    "plan_exercises": plan_exercises,
+                    "patients": patients,
+                    "exercises": exercises,
+                    "first_name": therapist_data["first_name"],
+                    "last_name": therapist_data["last_name"]
+                }
+            )
+        except Exception as e:
+            logger.exception("treatment_plan_edit_form_failed", plan_id=plan_id, error=str(e))
+            return RedirectResponse(url="/treatment-plans", status_code=303)
+        finally:
+            if cursor:
+                cursor.close()
+            if db:
+                db.close()
+    except Exception as e:
+        logger.exception("treatment_plan_edit_form_error", plan_id=plan_id, error=str(e))
+        return RedirectResponse(url="/front-page", status_code=303)
+
+
+@router.post("/treatment-plans/{plan_id}/edit")
+async def update_treatment_plan(request: Request, plan_id: int):
+    """Route to handle updating a treatment plan"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+
+        form = await request.form()
+        logger.debug("treatment_plan_update_form", plan_id=plan_id, fields=sorted(form.keys()))
+
+
+        patient_id = form.get("patient_id")
+        plan_name = form.get("plan_name")
+        description = form.get("description", "")
+        start_date = form.get("start_date")
+        end_date = form.get("end_date")
+        status = form.get("status", "Active")
+
+        if not patient_id or not plan_name or not start_date:
+            logger.info("treatment_plan_update_invalid", plan_id=plan_id, therapist_id=session_data["user_id"])
+            return RedirectResponse(f"/treatment-plans/{plan_id}/edit?error=missing_fields", status_code=303)
+
+        db = get_Mysql_db()
+        cursor = None
+
+        try:
+            cursor = db.cursor()
+
+
+            cursor.execute(
+                "SELECT plan_id FROM TreatmentPlans WHERE plan_id = %s AND therapist_id = %s",
+                (plan_id, session_data["user_id"])
+            )
+            if not cursor.fetchone():
+                return RedirectResponse(url="/treatment-plans", status_code=303)
+
+
+            cursor.execute(
+                """UPDATE TreatmentPlans 
+                SET patient_id = %s, name = %s, description = %s, 
+                    start_date = %s, end_date = %s, status = %s
+                WHERE plan_id = %s""",
+                (patient_id, plan_name, description, start_date, end_date, status, plan_id)
+            )
+
+
+            existing_exercise_ids = form.getlist("existing_exercise_id")
+            keep_exercises = form.getlist("keep_exercise")
+
+
+            cursor.execute(
+                "SELECT plan_exercise_id FROM TreatmentPlanExercises WHERE plan_id = %s",
+                (plan_id,)
+            )
+            current_exercise_ids = [row[0] for row in cursor.fetchall()]
+
+
+            for ex_id in current_exercise_ids:
+                if str(ex_id) not in keep_exercises:
+                    cursor.execute(
+                        "DELETE FROM TreatmentPlanExercises WHERE plan_exercise_id = %s",
+                        (ex_id,)
+                    )
+
+
+            for i, ex_id in enumerate(keep_exercises):
+                if not ex_id:
+                    continue
+
+                prefix = f"existing_{ex_id}_"
+                ex_sets = form.get(f"{prefix}sets")
+                ex_reps = form.get(f"{prefix}repetitions")
+                ex_freq = form.get(f"{prefix}frequency")
+                ex_duration = form.get(f"{prefix}duration")
+                ex_notes = form.get(f"{prefix}notes")
+
+                cursor.execute(
+                    """UPDATE TreatmentPlanExercises
+                    SET sets = %s, repetitions = %s, frequency = %s, 
+                        duration = %s, notes = %s
+                    WHERE plan_exercise_id = %s""",
+                    (ex_sets, ex_reps, ex_freq, ex_duration, ex_notes, ex_id)
+                )
+
+
+            new_exercises = form.getlist("new_exercise_id")
+            new_sets = form.getlist("new_sets")
+            new_reps = form.getlist("new_repetitions")
+            new_freq = form.getlist("new_frequency")
+            new_duration = form.getlist("new_duration")
+            new_notes = form.getlist("new_notes")
+
+            for i, ex_id in enumerate(new_exercises):
+                if not ex_id or ex_id == "":
+                    continue
+
+                ex_sets = new_sets[i] if i < len(new_sets) else None
+                ex_reps = new_reps[i] if i < len(new_reps) else None
+                ex_freq = new_freq[i] if i < len(new_freq) else None
+                ex_duration = new_duration[i] if i < len(new_duration) else None
+                ex_notes = new_notes[i] if i < len(new_notes) else None
+
+                cursor.execute(
+                    """INSERT INTO TreatmentPlanExercises
+                    (plan_id, exercise_id, sets, repetitions, frequency, duration, notes)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                    (plan_id, ex_id, ex_sets, ex_reps, ex_freq, ex_duration, ex_notes)
+                )
+
+            db.commit()
+            logger.info("treatment_plan_updated", plan_id=plan_id, therapist_id=session_data["user_id"],
+                        removed=sum(1 for ex_id in current_exercise_ids if str(ex_id) not in keep_exercises),
+                        kept=sum(1 for ex_id in keep_exercises if ex_id),
+                        added=sum(1 for ex_id in new_exercises if ex_id))
+
+            return RedirectResponse(url=f"/treatment-plans", status_code=303)
+        except Exception as e:
+            if db:
+                db.rollback()
+            logger.exception("treatment_plan_update_failed", plan_id=plan_id, error=str(e))
+            return RedirectResponse(f"/treatment-plans/{plan_id}/edit?error=db_error", status_code=303)
+        finally:
+            if cursor:
+                cursor.close()
+            if db:
+                db.close()
+    except Exception as e:
+        logger.exception("treatment_plan_update_error", plan_id=plan_id, error=str(e))
+        return RedirectResponse(url="/front-page", status_code=303)
+
+
+@router.post("/treatment-plans/delete")
+async def delete_treatment_plan(request: Request):
+    """Route to delete a treatment plan"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+
+        form = await request.form()
+        plan_id_str = form.get("plan_id")
+
+        if not plan_id_str:
+            return RedirectResponse(url="/treatment-plans?error=no_plan_id", status_code=303)
+
+        try:
+            plan_id = int(plan_id_str)
+        except ValueError:
+            return RedirectResponse(url="/treatment-plans?error=invalid_plan_id", status_code=303)
+
+        db = get_Mysql_db()
+        cursor = None
+
+        try:
+            cursor = db.cursor()
+
+
+            cursor.execute(
+                "SELECT plan_id FROM TreatmentPlans WHERE plan_id = %s AND therapist_id = %s",
+                (plan_id, session_data["user_id"])
+            )
+            if not cursor.fetchone():
+                return RedirectResponse(url="/treatment-plans?error=not_found", status_code=303)
+
+
+
+            cursor.execute(
+                "DELETE FROM TreatmentPlanExercises WHERE plan_id = %s",
+                (plan_id,)
+            )
+
+
+            cursor.execute(
+                "DELETE FROM TreatmentPlans WHERE plan_id = %s",
+                (plan_id,)
+            )
+
+            db.commit()
+            logger.info("treatment_plan_deleted", plan_id=plan_id, therapist_id=session_data["user_id"])
+
+            return RedirectResponse(url="/treatment-plans?success=deleted", status_code=303)
+        except Exception as e:
+            if db:
+                db.rollback()
+            logger.exception("treatment_plan_delete_failed", plan_id=plan_id, error=str(e))
+            return RedirectResponse(url="/treatment-plans?error=db_error", status_code=303)
+        finally:
+            if cursor:
+                cursor.close()
+            if db:
+                db.close()
+    except Exception as e:
+        logger.exception("treatment_plan_delete_error", error=str(e))
+        return RedirectResponse(url="/front-page", status_code=303)
+
+
+@router.get("/treatment-plans")
+async def treatment_plans_page(request: Request, user=Depends(get_current_user)):
+    db = get_Mysql_db()
+    cursor = db.cursor(dictionary=True)
+
+    try:
+        cursor.execute(
+            """SELECT tp.*, p.first_name, p.last_name 
+            FROM TreatmentPlans tp
+            JOIN Patients p ON tp.patient_id = p.patient_id
+            WHERE tp.therapist_id = %s
+            ORDER BY tp.created_at DESC""", 
+            (user["user_id"],)
+        )
+        treatment_plans = cursor.fetchall()
+
+        therapist_data = await get_therapist_data(user["user_id"])
+
+        return templates.TemplateResponse(
+            "dist/treatment_plans/plan_list.html", 
+            {
+                "request": request,
+                "treatment_plans": treatment_plans,
+                "first_name": therapist_data["first_name"],
+                "last_name": therapist_data["last_name"]
+            }
+        )
+    finally:
+        cursor.close()
+        db.close()
+
+
+@router.post("/treatment-plans/new")
+async def create_treatment_plan(request: Request):
+    """Route to handle creating a new treatment plan with exercises"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return RedirectResponse(url="/Therapist_Login")
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return RedirectResponse(url="/Therapist_Login")
+
+
+        form = await request.form()
+        logger.debug("treatment_plan_form", fields=sorted(form.keys()))
+
+
+        patient_id = form.get("patient_id")
+        plan_name = form.get("plan_name")
+        description = form.get("description", "")
+        start_date = form.get("start_date")
+        end_date = form.get("end_date")
+        status = form.get("status", "Active")
+
+
+        if not patient_id or not plan_name or not start_date:
+            error_msg = "Missing required fields: "
+            if not patient_id: error_msg += "patient, "
+            if not plan_name: error_msg += "plan name, "
+            if not start_date: error_msg += "start date"
+
+            logger.info("treatment_plan_invalid", therapist_id=session_data["user_id"], detail=error_msg)
+
+
+            db = get_Mysql_db()
+            cursor = db.cursor(dictionary=True)
+            cursor.execute("SELECT patient_id, first_name, last_name FROM Patients WHERE therapist_id = %s", 
+                        (session_data["user_id"],))
+            patients = cursor.fetchall()
+            cursor.execute("SELECT * FROM Exercises")
+            exercises = cursor.fetchall()
+            cursor.close()
+            db.close()
+
+            therapist_data = await get_therapist_data(session_data["user_id"])
+
+            return templates.TemplateResponse(
+                "dist/treatment_plans/new_plan.html", 
+                {
+                    "request": request,
+                    "error": error_msg,
+                    "patients": patients,
+                    "exercises": exercises,
+                    "first_name": therapist_data["first_name"],
+                    "last_name": therapist_data["last_name"]
+                }
+            )
+
+
+        exercises = form.getlist("exercises[]")
+        sets = form.getlist("sets[]")
+        repetitions = form.getlist("repetitions[]")
+        frequencies = form.getlist("frequency[]")
+        durations = form.getlist("duration[]")
+        exercise_notes = form.getlist("exercise_notes[]")
+
+
+        db = get_Mysql_db()
+        cursor = None
+
+        try:
+            cursor = db.cursor()
+
+
+            cursor.execute(
+                """INSERT INTO TreatmentPlans 
+                (patient_id, therapist_id, name, description, start_date, end_date, status) 
+                VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                (patient_id, session_data["user_id"], plan_name, description, start_date, end_date, status)
+            )
+            plan_id = cursor.lastrowid
+
+
+            for i in range(len(exercises)):
+                exercise_id = exercises[i] if i < len(exercises) else None
+
+                if not exercise_id or exercise_id == "":
+                    continue
+
+                exercise_sets = sets[i] if i < len(sets) and sets[i] else None
+                exercise_reps = repetitions[i] if i < len(repetitions) and repetitions[i] else None
+                exercise_freq = frequencies[i] if i < len(frequencies) and frequencies[i] else None
+                exercise_duration = durations[i] if i < len(durations) and durations[i] else None
+                exercise_note = exercise_notes[i] if i < len(exercise_notes) else None
+
+                try:
+                    cursor.execute(
+                        """INSERT INTO TreatmentPlanExercises
+                        (plan_id, exercise_id, sets, repetitions, frequency, duration, notes)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                        (plan_id, exercise_id, exercise_sets, exercise_reps, exercise_freq, exercise_duration, exercise_note)
+                    )
+                except Exception as ex:
+                    logger.error("treatment_plan_exercise_failed", plan_id=plan_id, exercise_id=exercise_id, error=str(ex))
+
+
+            db.commit()
+            logger.info("treatment_plan_created", plan_id=plan_id, therapist_id=session_data["user_id"],
+                        exercises=sum(1 for exercise_id in exercises if exercise_id))
+            return RedirectResponse(url="/treatment-plans", status_code=303)
+
+        except Exception as e:
+            if db:
+                db.rollback()
+            logger.exception("treatment_plan_failed", therapist_id=session_data["user_id"], error=str(e))
+
+
+            cursor = db.cursor(dictionary=True)
+            cursor.execute("SELECT patient_id, first_name, last_name FROM Patients WHERE therapist_id = %s", 
+                        (session_data["user_id"],))
+            patients = cursor.fetchall()
+            cursor.execute("SELECT * FROM Exercises")
+            exercises = cursor.fetchall()
+
+            therapist_data = await get_therapist_data(session_data["user_id"])
+
+            return templates.TemplateResponse(
+                "dist/treatment_plans/new_plan.html", 
+                {
+                    "request": request,
+                    "error": f"Database error: {str(e)}",
+                    "patients": patients,
+                    "exercises": exercises,
+                    "first_name": therapist_data["first_name"],
+                    "last_name": therapist_data["last_name"]
+                }
+            )
+        finally:
+            if cursor:
+                cursor.close()
+            if db:
+                db.close()
+
+    except Exception as e:
+        logger.exception("treatment_plan_create_error", error=str(e))
+        return RedirectResponse(url="/front-page")
+
+
+@router.get("/treatment-plans/new")
+async def new_treatment_plan_page(request: Request, user=Depends(get_current_user)):
+    db = get_Mysql_db()
+    cursor = db.cursor(dictionary=True)
+
+    try:
+        cursor.execute(
+            "SELECT patient_id, first_name, last_name FROM Patients WHERE therapist_id = %s", 
+            (user["user_id"],)
+        )
+        patients = cursor.fetchall()
+
+        cursor.execute("SELECT * FROM Exercises")
+        exercises = cursor.fetchall()
+
+        therapist_data = await get_therapist_data(user["user_id"])
+
+        return templates.TemplateResponse(
+            "dist/treatment_plans/new_plan.html", 
+            {
+                "request": request,
+                "patients": patients,
+                "exercises": exercises,
+                "first_name": therapist_data["first_name"],
+                "last_name": therapist_data["last_name"],
+            }
+        )
+    finally:
+        cursor.close()
+        db.close()
@@ -0,0 +1,711 @@
+from connections.functions import *
+from connections.mysql_database import *
+from connections.redis_database import *
+from connections.mongo_db import *
+from connections.routers.common import *
+from connections.mobile import fetch_therapist_list
+import traceback
+
+router = APIRouter()
+logger = get_logger("therapists")
+
+@router.get("/api/therapist/{therapist_id}")
+async def get_therapist_api(therapist_id: int):
+    """API endpoint to get therapist information"""
+    db = get_Mysql_db()
+    cursor = db.cursor(dictionary=True)
+
+    try:
+        cursor.execute(
+            """SELECT id, first_name, last_name, profile_image, 
+                    bio, experience_years, specialties, education, languages, 
+                    address, rating, review_count, 
+                    is_accepting_new_patients, average_session_length
+            FROM Therapists 
+            WHERE id = %s""", 
+            (therapist_id,)
+        )
+        therapist = cursor.fetchone()
+
+        if not therapist:
+            return JSONResponse(
+                status_code=404,
+                content={"error": "Therapist not found"}
+            )
+
+
+        for field in ['specialties', 'education', 'languages']:
+            if therapist[field] and isinstance(therapist[field], str):
+                try:
+                    therapist[field] = json.loads(therapist[field])
+                except:
+                    therapist[field] = []
+            elif therapist[field] is None:
+                therapist[field] = []
+
+
+        response_data = {
+            "id": therapist["id"],
+            "name": f"{therapist['first_name']} {therapist['last_name']}",
+            "photoUrl": f"/static/assets/images/user/{therapist['profile_image']}",
+            "specialties": therapist["specialties"],
+            "bio": therapist["bio"] or "",
+            "experienceYears": therapist["experience_years"] or 0,
+            "education": therapist["education"],
+            "languages": therapist["languages"],
+            "address": therapist["address"] or "",
+            "rating": therapist["rating"] or 0,
+            "reviewCount": therapist["review_count"] or 0,
+            "isAcceptingNewPatients": bool(therapist["is_accepting_new_patients"]),
+            "averageSessionLength": therapist["average_session_length"] or 60
+        }
+
+        return response_data
+
+    except Exception as e:
+        print(f"Database error in get therapist API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Internal server error: {str(e)}"}
+        )
+    finally:
+        cursor.close()
+        db.close()
+
+
+@router.get("/api/therapist/{therapist_id}/reviews")
+async def get_therapist_reviews(therapist_id: int, limit: int = 10, offset: int = 0):
+    """API endpoint to get therapist reviews"""
+    db = get_Mysql_db()
+    cursor = db.cursor(dictionary=True)
+
+    try:
+
+        cursor.execute(
+            """SELECT r.review_id, r.rating, r.comment, r.created_at, 
+                     p.patient_id, p.first_name, p.last_name
+               FROM Reviews r
+               JOIN Patients p ON r.patient_id = p.patient_id
+               WHERE r.therapist_id = %s
+               ORDER BY r.created_at DESC
+               LIMIT %s OFFSET %s""", 
+            (therapist_id, limit, offset)
+        )
+        reviews = cursor.fetchall()
+
+
+        cursor.execute(
+            """SELECT COUNT(*) as total, AVG(rating) as average_rating
+               FROM Reviews
+               WHERE therapist_id = %s""", 
+            (therapist_id,)
+        )
+        stats = cursor.fetchone()
+
+
+        formatted_reviews = []
+        for review in reviews:
+            formatted_reviews.append({
+                "id": review["review_id"],
+                "rating": review["rating"],
+                "comment": review["comment"],
+                "createdAt": review["created_at"].isoformat(),
+                "patient": {
+                    "id": review["patient_id"],
+                    "name": f"{review['first_name']} {review['last_name']}"
+                }
+            })
+
+        return {
+            "reviews": formatted_reviews,
+            "totalReviews": stats["total"] or 0,
+            "averageRating": float(stats["average_rating"]) if stats["average_rating"] else 0,
+            "limit": limit,
+            "offset": offset
+        }
+
+    except Exception as e:
+        print(f"Database error in get therapist reviews API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Internal server error: {str(e)}"}
+        )
+    finally:
+        cursor.close()
+        db.close()
+
+
+@router.post("/api/therapist/reviews")
+async def create_therapist_review(
+    request: Request,
+    therapist_id: int = Form(...),
+    patient_id: int = Form(...),
+    rating: float = Form(...),
+    comment: str = Form(None)
+):
+    """API endpoint to create a review for a therapist"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401,
+            content={"error": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"error": "Not authenticated"}
+            )
+
+
+
+
+        db = get_Mysql_db()
+        cursor = db.cursor()
+
+        try:
+
+            cursor.execute(
+                """SELECT review_id FROM Reviews 
+                   WHERE therapist_id = %s AND patient_id = %s""", 
+                (therapist_id, patient_id)
+            )
+            existing_review = cursor.fetchone()
+
+            if existing_review:
+
+                cursor.execute(
+                    """UPDATE Reviews 
+                       SET rating = %s, comment = %s, updated_at = NOW() 
+                       WHERE therapist_id = %s AND patient_id = %s""", 
+                    (rating, comment, therapist_id, patient_id)
+                )
+                db.commit()
+
+                return {"message": "Review updated successfully", "review_id": existing_review[0]}
+            else:
+
+                cursor.execute(
+                    """INSERT INTO Reviews (therapist_id, patient_id, rating, comment)
+                       VALUES (%s, %s, %s, %s)""", 
+                    (therapist_id, patient_id, rating, comment)
+                )
+                db.commit()
+
+                return {"message": "Review created successfully", "review_id": cursor.lastrowid}
+
+        except Exception as e:
+            db.rollback()
+            print(f"Database error in create review: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"error": f"Error submitting review: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in create review: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Error processing request: {str(e)}"}
+        )
+
+
+@router.post("/api/reviews/{review_id}/reply")
+async def reply_to_review(
+    request: Request,
+    review_id: int,
+    reply: str = Form(...)
+):
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(status_code=401, content={"success": False, "message": "Not authenticated"})
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(status_code=401, content={"success": False, "message": "Not authenticated"})
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+
+            cursor.execute(
+                """SELECT review_id 
+                   FROM Reviews 
+                   WHERE review_id = %s AND therapist_id = %s""",
+                (review_id, session_data["user_id"])
+            )
+            review = cursor.fetchone()
+
+            if not review:
+                return JSONResponse(status_code=404, content={"success": False, "message": "Review not found"})
+
+
+            cursor.execute(
+                """UPDATE Reviews 
+                   SET therapist_reply = %s, 
+                       therapist_reply_date = CURRENT_TIMESTAMP
+                   WHERE review_id = %s""",
+                (reply, review_id)
+            )
+            db.commit()
+
+            return JSONResponse(content={"success": True})
+
+        except Exception as e:
+            print(f"Database error in reply to review: {e}")
+            return JSONResponse(status_code=500, content={"success": False, "message": "Error replying to review"})
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in reply to review: {e}")
+        return JSONResponse(status_code=500, content={"success": False, "message": "Server error"})
+
+
+@router.get("/therapists")
+async def get_therapists(request: Request):
+    """API endpoint to get a list of all therapists for the mobile app"""
+    try:
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+            static_dir = getattr(request.app.state, 'static_directory', "/PERCEPTRONX/Frontend_Web/static")
+
+            return fetch_therapist_list(cursor, static_dir)
+
+        except Exception as e:
+            print(f"Database error in get therapists API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"error": f"Internal server error: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in get therapists API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Server error: {str(e)}"}
+        )
+
+
+@router.get("/therapists/{id}")
+async def get_therapist_details(request: Request, id: int):
+    """API endpoint to get detailed information about a specific therapist"""
+    try:
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+            cursor.execute(
+                """SELECT id, first_name, last_name, profile_image, 
+                        bio, experience_years, specialties, education, languages, 
+                        address, rating, review_count, 
+                        is_accepting_new_patients, average_session_length
+                FROM Therapists 
+                WHERE id = %s""", 
+                (id,)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return JSONResponse(
+                    status_code=404,
+                    content={"error": "Therapist not found"}
+                )
+
+            for field in ['specialties', 'education', 'languages']:
+                therapist[field] = safely_parse_json_field(therapist[field], [])
+
+            static_dir = getattr(request.app.state, 'static_directory', "/PERCEPTRONX/Frontend_Web/static")
+
+            profile_image = therapist['profile_image']
+            matched_image = find_best_matching_image(id, profile_image, static_dir)
+
+            photoUrl = f"/static/assets/images/user/{matched_image}"
+
+            logger.debug("therapist_image", therapist_id=id, requested=profile_image, matched=matched_image)
+
+            formatted_therapist = {
+                "id": therapist["id"],
+                "name": f"{therapist['first_name']} {therapist['last_name']}",
+                "photoUrl": photoUrl,
+                "specialties": therapist["specialties"],
+                "bio": therapist["bio"] or "",
+                "experienceYears": therapist["experience_years"] or 0,
+                "education": therapist["education"],
+                "languages": therapist["languages"],
+                "address": therapist["address"] or "",
+                "rating": float(therapist["rating"] or 0),
+                "reviewCount": therapist["review_count"] or 0,
+                "isAcceptingNewPatients": bool(therapist["is_accepting_new_patients"]),
+                "averageSessionLength": therapist["average_session_length"] or 60
+            }
+
+            return formatted_therapist
+
+        except Exception as e:
+            print(f"Database error in get therapist details API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"error": f"Internal server error: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in get therapist details API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Server error: {str(e)}"}
+        )
+
+
+@router.get("/therapists/{id}/availability")
+async def get_therapist_availability(id: int, date: str = None):
+    """API endpoint to get available time slots for a therapist"""
+    try:
+
+        if not date:
+            date = datetime.datetime.now().strftime("%Y-%m-%d")
+
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+
+            cursor.execute(
+                "SELECT id, average_session_length FROM Therapists WHERE id = %s",
+                (id,)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return JSONResponse(
+                    status_code=404,
+                    content={"error": "Therapist not found"}
+                )
+
+
+            cursor.execute(
+                """SELECT appointment_time, duration 
+                FROM Appointments 
+                WHERE therapist_id = %s AND appointment_date = %s 
+                AND status != 'Cancelled'""",
+                (id, date)
+            )
+            booked_slots = cursor.fetchall()
+
+
+            slot_duration = therapist['average_session_length'] or 60
+            return build_availability_slots(date, booked_slots, slot_duration)
+
+        except Exception as e:
+            print(f"Database error in get therapist availability API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"error": f"Internal server error: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in get therapist availability API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Server error: {str(e)}"}
+        )
+
+
+@router.post("/therapists/{id}/add_patient")
+async def add_patient_to_therapist(request: Request, id: int, patient: dict):
+    """API endpoint to add a user as a patient to a therapist"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401,
+            content={"status": "invalid", "detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"status": "invalid", "detail": "Not authenticated"}
+            )
+
+        user_id = session_data["user_id"]
+
+        db = get_Mysql_db()
+        cursor = db.cursor()
+
+        try:
+
+            cursor.execute(
+                "SELECT id FROM Therapists WHERE id = %s",
+                (id,)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return JSONResponse(
+                    status_code=404,
+                    content={"status": "invalid", "detail": "Therapist not found"}
+                )
+
+
+            cursor.execute(
+                "SELECT patient_id FROM Patients WHERE user_id = %s",
+                (user_id,)
+            )
+            existing_patient = cursor.fetchone()
+
+            if existing_patient:
+
+                cursor.execute(
+                    """UPDATE Patients 
+                    SET therapist_id = %s,
+                        first_name = %s,
+                        last_name = %s,
+                        phone = %s,
+                        diagnosis = %s,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE user_id = %s""",
+                    (id, patient.get('first_name', ''), patient.get('last_name', ''), 
+                    patient.get('phone', ''), patient.get('diagnosis', ''), user_id)
+                )
+            else:
+
+                cursor.execute(
+                    "SELECT email FROM users WHERE user_id = %s",
+                    (user_id,)
+                )
+                user_email = cursor.fetchone()
+                email = user_email[0] if user_email else ''
+
+
+                cursor.execute(
+                    """INSERT INTO Patients 
+                    (therapist_id, user_id, first_name, last_name, email, phone, diagnosis) 
+                    VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                    (id, user_id, patient.get('first_name', ''), patient.get('last_name', ''), 
+                    email, patient.get('phone', ''), patient.get('diagnosis', ''))
+                )
+
+            db.commit()
+
+            return {"status": "valid", "message": "Patient added successfully"}
+
+        except Exception as e:
+            db.rollback()
+            print(f"Database error in add patient API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"status": "invalid", "detail": f"Error adding patient: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in add patient API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.post("/therapists/{id}/rate")
+async def rate_therapist(request: Request, id: int, rating: dict):
+    """API endpoint to rate a therapist"""
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return JSONResponse(
+            status_code=401,
+            content={"status": "invalid", "detail": "Not authenticated"}
+        )
+
+    try:
+        session_data = await get_redis_session(session_id)
+        if not session_data:
+            return JSONResponse(
+                status_code=401,
+                content={"status": "invalid", "detail": "Not authenticated"}
+            )
+
+        user_id = session_data["user_id"]
+
+        db = get_Mysql_db()
+        cursor = db.cursor()
+
+        try:
+
+            cursor.execute(
+                "SELECT id FROM Therapists WHERE id = %s",
+                (id,)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return JSONResponse(
+                    status_code=404,
+                    content={"status": "invalid", "detail": "Therapist not found"}
+                )
+
+
+            cursor.execute(
+                "SELECT patient_id FROM Patients WHERE user_id = %s",
+                (user_id,)
+            )
+            patient_record = cursor.fetchone()
+
+            if not patient_record:
+                return JSONResponse(
+                    status_code=400,
+                    content={"status": "invalid", "detail": "You must be a patient to leave a review"}
+                )
+
+            patient_id = patient_record[0]
+
+
+            cursor.execute(
+                "SELECT review_id FROM Reviews WHERE therapist_id = %s AND patient_id = %s",
+                (id, patient_id)
+            )
+            existing_review = cursor.fetchone()
+
+            rating_value = float(rating.get('rating', 5))
+            comment = rating.get('comment', '')
+
+            if existing_review:
+
+                cursor.execute(
+                    """UPDATE Reviews 
+                    SET rating = %s, comment = %s, updated_at = CURRENT_TIMESTAMP
+                    WHERE review_id = %s""",
+                    (rating_value, comment, existing_review[0])
+                )
+            else:
+
+                cursor.execute(
+                    """INSERT INTO Reviews 
+                    (therapist_id, patient_id, rating, comment) 
+                    VALUES (%s, %s, %s, %s)""",
+                    (id, patient_id, rating_value, comment)
+                )
+
+            db.commit()
+
+
+            cursor.execute(
+                """UPDATE Therapists t
+                SET rating = (
+                    SELECT AVG(r.rating) FROM Reviews r WHERE r.therapist_id = %s
+                ),
+                review_count = (
+                    SELECT COUNT(*) FROM Reviews r WHERE r.therapist_id = %s
+                )
+                WHERE t.id = %s""",
+                (id, id, id)
+            )
+            db.commit()
+
+            return {"status": "valid", "message": "Review submitted successfully"}
+
+        except Exception as e:
+            db.rollback()
+            print(f"Database error in rate therapist API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"status": "invalid", "detail": f"Error submitting review: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in rate therapist API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"status": "invalid", "detail": f"Server error: {str(e)}"}
+        )
+
+
+@router.get("/therapists/{id}/reviews")
+async def list_therapist_reviews(id: int, limit: int = 10, offset: int = 0):
+    """API endpoint to get reviews for a specific therapist"""
+    try:
+        db = get_Mysql_db()
+        cursor = db.cursor(dictionary=True)
+
+        try:
+
+            cursor.execute(
+                "SELECT id FROM Therapists WHERE id = %s",
+                (id,)
+            )
+            therapist = cursor.fetchone()
+
+            if not therapist:
+                return JSONResponse(
+                    status_code=404,
+                    content={"error": "Therapist not found"}
+                )
+
+
+            cursor.execute(
+                """SELECT r.review_id, r.rating, r.comment, r.created_at,
+                        p.first_name, p.last_name
+                FROM Reviews r
+                JOIN Patients p ON r.patient_id = p.patient_id
+                WHERE r.therapist_id = %s
+                ORDER BY r.created_at DESC
+                LIMIT %s OFFSET %s""",
+                (id, limit, offset)
+            )
+            reviews = cursor.fetchall()
+
+
+            formatted_reviews = []
+            for review in reviews:
+
+                created_date = review['created_at']
+                formatted_date = created_date.strftime("%Y-%m-%d") if created_date else "N/A"
+
+
+                patient_name = f"{review['first_name'] or ''} {review['last_name'] or ''}".strip()
+                if not patient_name:
+                    patient_name = "Anonymous Patient"
+
+                formatted_reviews.append({
+                    "id": review['review_id'],
+                    "patientName": patient_name,
+                    "rating": float(review['rating']),
+                    "comment": review['comment'] or "",
+                    "date": formatted_date
+                })
+
+            return formatted_reviews
+
+        except Exception as e:
+            print(f"Database error in get therapist reviews API: {e}")
+            return JSONResponse(
+                status_code=500,
+                content={"error": f"Internal server error: {str(e)}"}
+            )
+        finally:
+            cursor.close()
+            db.close()
+    except Exception as e:
+        print(f"Error in get therapist reviews API: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"Server error: {str(e)}"}
+        )
@@ -2,59 +2,32 @@ from connections.functions import *
 from connections.mysql_database import *
 from connections.redis_database import *
 from connections.mongo_db import *
+from connections.chat import chat_hub
+from inference.detector import INFERENCE_PRELOAD, detection_batcher, pose_batcher
+from inference.cache import inference_cache
+from inference.video_pipeline import video_pipeline
+from connections.routers import TEMPLATE_DOMAINS, get_deployment_role, include_routers
+from connections.metrics import MetricsMiddleware, render_metrics
+from connections.health import readiness_probe
+from connections.logs import RequestIdMiddleware
+from connections.profiling import ProfilingMiddleware, list_profiles, load_profile, profile_path
+from connections.query_log import slow_queries
+from connections.routers.common import require_admin
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import FileResponse
 from contextlib import asynccontextmanager
+import asyncio
+import functools
+import re
 import traceback
 
 
-def find_best_matching_image(therapist_id, requested_filename, static_dir):
-    """
-    Find the best matching image for a therapist, even if the filename doesn't exactly match.
-    This handles cases where database references don't match actual files.
-    
-    Args:
-        therapist_id: The ID of the therapist
-        requested_filename: The filename from the database
-        static_dir: The static directory path
-        
-    Returns:
-        The best matching filename or a default avatar
-    """
-    import os
-    
-    user_images_dir = os.path.join(static_dir, "assets/images/user")
-    
-    if requested_filename and os.path.exists(os.path.join(user_images_dir, requested_filename)):
-        return requested_filename
-    
-    if therapist_id:
-        prefix = f"therapist_{therapist_id}_"
-        
-        if os.path.exists(user_images_dir) and os.path.isdir(user_images_dir):
-            try:
-                all_files = os.listdir(user_images_dir)
-                
-                matching_files = [f for f in all_files if f.startswith(prefix)]
-                
-                if matching_files:
-                    print(f"Found matching image for therapist {therapist_id}: {matching_files[0]}")
-                    return matching_files[0]
-            except Exception as e:
-                print(f"Error searching for matching images: {e}")
-    
-    avatar_id = (therapist_id % 10) if therapist_id else 1
-    default_image = f"avatar-{avatar_id}.jpg"
-    
-    if os.path.exists(os.path.join(user_images_dir, default_image)):
-        return default_image
-    else:
-        return "avatar-1.jpg"
-
 def getIP():
     try:
         hostname = socket.gethostname()
-        
+
         ip = socket.gethostbyname(hostname)
-        
+
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         try:
             s.connect(('10.255.255.255', 1))
@@ -63,7 +36,7 @@ def getIP():
             ip = '127.0.0.1'
         finally:
             s.close()
-        
+
         full_ip = f"http://{ip}:8000"
         print(f"Using IP: {ip}")
         print(f"Base URL: {full_ip}")
@@ -73,56 +46,6 @@ def getIP():
         print("Defaulting to localhost")
         return "http://127.0.0.1:8000"
 
-def safely_parse_json_field(field_value, default=None):
-    """
-    Safely parse a JSON field from the database.
-    Returns the parsed JSON or the default value if parsing fails.
-    """
-    if field_value is None:
-        return default if default is not None else []
-    
-    if isinstance(field_value, (list, dict)):
-        return field_value
-        
-    if isinstance(field_value, bytes):
-        field_value = field_value.decode('utf-8')
-        
-    if not isinstance(field_value, str):
-        return default if default is not None else []
-        
-    try:
-        return json.loads(field_value)
-    except (json.JSONDecodeError, TypeError):
-        if isinstance(field_value, str) and ',' in field_value:
-            return [item.strip() for item in field_value.split(',')]
-        return default if default is not None else []
-
-def ensure_bytes(data):
-    """
-    Ensure data is in bytes format, converting from string if necessary.
-    Use this before writing data to binary mode files or sending to functions expecting bytes.
-    """
-    if data is None:
-        return b''
-    if isinstance(data, bytes):
-        return data
-    if isinstance(data, str):
-        return data.encode('utf-8')
-    return str(data).encode('utf-8')
-
-def ensure_str(data):
-    """
-    Ensure data is in string format, converting from bytes if necessary.
-    Use this before inserting data into database fields expecting strings.
-    """
-    if data is None:
-        return None
-    if isinstance(data, str):
-        return data
-    if isinstance(data, bytes):
-        return data.decode('utf-8')
-    return str(data)
-
 async def test_redis_connection():
     pass
 
@@ -132,68 +55,95 @@ async def lifespan(app: FastAPI):
         app.state.base_url = getIP()
 
     await test_redis_connection()
+
+    if "annotations" in getattr(app.state, "router_domains", []):
+        try:
+            await ensure_annotation_indexes()
+        except Exception as e:
+            print(f"Could not create annotations indexes: {e}")
+
+    # Load and warm the models before the first request rather than on it.
+    if INFERENCE_PRELOAD and "inference" in getattr(app.state, "router_domains", []):
+        try:
+            await asyncio.gather(detection_batcher.preload(), pose_batcher.preload())
+        except Exception as e:
+            print(f"Could not preload inference models: {e}")
+
+    # Videos left half-analysed by the previous run resume in the background, from one worker only.
+    if {"exercises", "inference"} & set(getattr(app.state, "router_domains", [])) and video_pipeline.claim_resume():
+        video_pipeline.resume()
+
     yield
 
+    await chat_hub.close()
+    await detection_batcher.close()
+    await pose_batcher.close()
+    video_pipeline.close()
+    await annotation_writer.close()
+    await inference_cache.close()
+    close_Mongo_clients()
+
 def configure_static_files(app):
     static_dir = os.environ.get("STATIC_DIR", None)
-    
+
     if not static_dir:
         current_file = FilePath(__file__).resolve()
         project_root = current_file.parent.parent.parent
         static_dir = str(project_root / "Frontend_Web" / "static")
-    
+
     if not os.path.exists(static_dir):
         os.makedirs(static_dir, exist_ok=True)
         print(f"Created static directory: {static_dir}")
-    
+
     if not hasattr(app.state, 'base_url') or not app.state.base_url:
         base_url = os.environ.get("BASE_URL", None)
         if base_url:
             app.state.base_url = base_url
         else:
             app.state.base_url = getIP()
-    
+
     if not any(route.path == "/static" for route in app.routes):
         app.mount("/static", StaticFiles(directory=static_dir), name="static")
         print(f"Static directory mounted: {static_dir}")
-    
+
     print(f"Base URL configured as: {app.state.base_url}")
-    
-    templates_dir = os.path.join(os.path.dirname(static_dir), "templates")
-    if os.path.exists(templates_dir) and not any(route.path == "/dist" for route in app.routes):
-        app.mount("/dist", StaticFiles(directory=templates_dir), name="templates")
-        print(f"Templates directory mounted: {templates_dir}")
-    
-    return Jinja2Templates(directory=templates_dir) if os.path.exists(templates_dir) else None
 
 app = FastAPI(title="PerceptronX API", version="1.0", lifespan=lifespan)
 
-templates = configure_static_files(app)
+configure_static_files(app)
 
-class PlatformRoutingMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app):
-        super().__init__(app)
-        self.web_redirects = {
-            "/": "/Therapist_Login",
+USER_AGENT_CACHE_SIZE = int(os.getenv("USER_AGENT_CACHE_SIZE", 4096))
+
+@functools.lru_cache(maxsize=USER_AGENT_CACHE_SIZE)
+def is_mobile_user_agent(user_agent: str):
+    """user_agents.parse is a stack of regexes; clients send a handful of distinct strings, so remember the answer."""
+    return user_agents.parse(user_agent).is_mobile
 
+class PlatformRoutingMiddleware:
+    """
+    Pure ASGI middleware sending desktop browsers from the mobile entry points to the
+    web ones. Only paths in web_redirects look at the User-Agent; everything else,
+    static files included, passes straight through.
+    """
 
-        }
+    web_redirects = {
+        "/": "/Therapist_Login",
+    }
 
-    async def dispatch(self, request: Request, call_next):
-        user_agent = request.headers.get("User-Agent")
-        if not user_agent:
-            return await call_next(request)
+    def __init__(self, app):
+        self.app = app
 
-        ua = user_agents.parse(user_agent)
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.web_redirects:
+            await self.app(scope, receive, send)
+            return
 
-        if ua.is_mobile:
-            return await call_next(request)
-        
-        current_path = request.url.path
-        if current_path in self.web_redirects:
-            return RedirectResponse(url=self.web_redirects[current_path])
+        user_agent = dict(scope["headers"]).get(b"user-agent", b"").decode("latin-1")
+        if not user_agent or is_mobile_user_agent(user_agent):
+            await self.app(scope, receive, send)
+            return
 
-        return await call_next(request)
+        await RedirectResponse(url=self.web_redirects[scope["path"]])(scope, receive, send)
 
 app.add_middleware(PlatformRoutingMiddleware)
 
@@ -201,6005 +151,98 @@ app.add_middleware(PlatformRoutingMiddleware)
 async def startup_event():
     print("Testing Redis connection...")
     try:
-        await r.set("startup_test_key", "test_value")
-        test_value = await r.get("startup_test_key")
+        # One round trip for the whole check.
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.set("startup_test_key", "test_value")
+            pipe.get("startup_test_key")
+            pipe.hset("startup_test_hash", mapping={"test_field": "test_value"})
+            pipe.hgetall("startup_test_hash")
+            pipe.delete("startup_test_key", "startup_test_hash")
+            _, test_value, _, hash_value, _ = await pipe.execute()
         print(f"Redis connection test result: {test_value}")
-        
-        await r.hset("startup_test_hash", mapping={"test_field": "test_value"})
-        hash_value = await r.hgetall("startup_test_hash")
         print(f"Redis hash operation test result: {hash_value}")
-        
-        await r.delete("startup_test_key", "startup_test_hash")
-        
+
         print("Redis connection and operations successfully tested")
     except Exception as e:
         print(f"ERROR: Redis connection failed: {e}")
         print("APPLICATION WARNING: Session management will not work correctly!")
 
-
-router = APIRouter()
-app.include_router(router)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"], 
-    allow_credentials=True,
-    allow_methods=["*"], 
-    allow_headers=["*"],  
-)
-
-current_file = FilePath(__file__).resolve()
-project_root = current_file.parent.parent.parent
-
-static_directory = project_root / "Frontend_Web" / "static"
-templates_directory = project_root / "Frontend_Web" / "templates"
-
-templates = Jinja2Templates(directory=templates_directory)
-
-print(f"Static directory: {static_directory}")
-print(f"Templates directory: {templates_directory}")
-
-if static_directory.exists():
-    app.mount("/static", StaticFiles(directory=str(static_directory)), name="static")
-    print(f"Static directory mounted successfully")
-else:
-    print(f"Warning: Static directory does not exist: {static_directory}")
-
-if templates_directory.exists():
-    app.mount("/dist", StaticFiles(directory=str(templates_directory)), name="templates")
-    print(f"Templates directory mounted successfully")
-else:
-    print(f"Warning: Templates directory does not exist: {templates_directory}")
-
-app.include_router(router)
-
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"], 
+    allow_origins=["*"],
     allow_credentials=True,
-    allow_methods=["*"], 
-    allow_headers=["*"],  
+    allow_methods=["*"],
+    allow_headers=["*"],
 )
 
-def Routes():
-    @app.get("/")
-    async def Home(request: Request):
-        session_id = request.cookies.get("session_id")
-
-        if session_id:
-            try:
-                user_data = await get_redis_session(session_id)
-                if user_data:
-                    return {"status": "valid", "user": user_data}
-            except Exception as e:
-                print(f"Session validation error: {e}")
-
-        return {"status": "valid"}
-    
-    @app.get("/front-page")
-    async def front_page(request: Request):
-        session_id = request.cookies.get("session_id")
-        print(f"Session ID from cookie: {session_id}")
-        if not session_id:
-            print("No session ID found in cookie")
-            return RedirectResponse(url="/Therapist_Login")
-        try:
-            session_data = await get_redis_session(session_id)
-            print(f"Session data retrieved: {session_data}")
-            if not session_data:
-                print("Session data is None")
-                return RedirectResponse(url="/Therapist_Login")
-
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-            try:
- 
-                cursor.execute(
-                    "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-                print(f"Therapist data: {therapist}")
-                if not therapist:
-                    print(f"No therapist found for ID: {session_data['user_id']}")
-                    return RedirectResponse(url="/Therapist_Login")
-
- 
-                cursor.execute(
-                    """SELECT m.message_id, m.subject, m.content, m.created_at, 
-                            t.first_name, t.last_name, COALESCE(t.profile_image, 'avatar-1.jpg') as profile_image
-                        FROM Messages m
-                        JOIN Therapists t ON m.sender_id = t.id
-                        WHERE m.recipient_id = %s AND m.is_read = FALSE
-                        ORDER BY m.created_at DESC
-                        LIMIT 4""",
-                    (session_data["user_id"],)
-                )
-                messages_result = cursor.fetchall()
-
- 
-                recent_messages = []
-                for message in messages_result:
-                    message_with_time = message.copy()
-
- 
-                    timestamp = message['created_at']
-                    now = datetime.datetime.now()
-                    if isinstance(timestamp, datetime.datetime):
-                        diff = now - timestamp
-                        if timestamp.date() == now.date():
-                            message_with_time['time_display'] = timestamp.strftime('%I:%M %p')
-
-                            minutes_ago = diff.seconds // 60
-                            if minutes_ago < 60:
-                                message_with_time['time_ago'] = f"{minutes_ago} min ago"
-                            else:
-                                hours_ago = minutes_ago // 60
-                                message_with_time['time_ago'] = f"{hours_ago} hours ago"
-
-                        elif timestamp.date() == (now - timedelta(days=1)).date():
-                            message_with_time['time_display'] = "Yesterday"
-                            message_with_time['time_ago'] = timestamp.strftime('%I:%M %p')
-                        else:
-                            message_with_time['time_display'] = timestamp.strftime('%d %b')
-                            message_with_time['time_ago'] = timestamp.strftime('%Y')
-
-                    recent_messages.append(message_with_time)
-
- 
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
-
- 
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Appointments WHERE therapist_id = %s", 
-                    (session_data["user_id"],)
-                )
-                appointments_result = cursor.fetchone()
-                appointments_count = appointments_result['count'] if appointments_result else 0
-
- 
-                last_month = datetime.datetime.now() - timedelta(days=30)
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Appointments WHERE therapist_id = %s AND created_at < %s", 
-                    (session_data["user_id"], last_month)
-                )
-                last_month_appointments = cursor.fetchone()
-                last_month_count = last_month_appointments['count'] if last_month_appointments else 0
-
- 
-                appointments_monthly_diff = appointments_count - last_month_count
-                appointments_growth = round((appointments_monthly_diff / max(last_month_count, 1)) * 100, 1)
-
- 
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Patients WHERE therapist_id = %s AND status = 'Active'", 
-                    (session_data["user_id"],)
-                )
-                active_patients_result = cursor.fetchone()
-                active_patients_count = active_patients_result['count'] if active_patients_result else 0
-
- 
-                this_month_start = datetime.datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Patients WHERE therapist_id = %s AND created_at >= %s", 
-                    (session_data["user_id"], this_month_start)
-                )
-                new_patients_result = cursor.fetchone()
-                new_patients_monthly = new_patients_result['count'] if new_patients_result else 0
-
- 
-                last_month_start = (this_month_start - timedelta(days=1)).replace(day=1)
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Patients WHERE therapist_id = %s AND created_at BETWEEN %s AND %s", 
-                    (session_data["user_id"], last_month_start, this_month_start)
-                )
-                last_month_new_patients = cursor.fetchone()
-                last_month_new_count = last_month_new_patients['count'] if last_month_new_patients else 1
-                patient_growth = round((new_patients_monthly / max(last_month_new_count, 1)) * 100, 1)
-
- 
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM TreatmentPlans WHERE therapist_id = %s", 
-                    (session_data["user_id"],)
-                )
-                treatment_plans_result = cursor.fetchone()
-                treatment_plans_count = treatment_plans_result['count'] if treatment_plans_result else 0
-
- 
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM TreatmentPlans WHERE therapist_id = %s AND created_at >= %s", 
-                    (session_data["user_id"], this_month_start)
-                )
-                new_plans_result = cursor.fetchone()
-                new_plans_monthly = new_plans_result['count'] if new_plans_result else 0
-
- 
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM TreatmentPlans WHERE therapist_id = %s AND created_at BETWEEN %s AND %s", 
-                    (session_data["user_id"], last_month_start, this_month_start)
-                )
-                last_month_plans = cursor.fetchone()
-                last_month_plans_count = last_month_plans['count'] if last_month_plans else 1
-                plans_growth = round((new_plans_monthly / max(last_month_plans_count, 1)) * 100, 1)
-
- 
-                cursor.execute(
-                    "SELECT AVG(adherence_rate) as avg_rate FROM PatientMetrics WHERE therapist_id = %s", 
-                    (session_data["user_id"],)
-                )
-                adherence_result = cursor.fetchone()
-                average_adherence_rate = round(adherence_result['avg_rate'], 1) if adherence_result and adherence_result['avg_rate'] is not None else 0
-
- 
-                cursor.execute(
-                    """SELECT AVG(adherence_rate) as avg_rate 
-                    FROM PatientMetrics 
-                    WHERE therapist_id = %s AND measurement_date BETWEEN %s AND %s""", 
-                    (session_data["user_id"], last_month_start, this_month_start)
-                )
-                last_month_adherence = cursor.fetchone()
-                last_month_adherence_rate = last_month_adherence['avg_rate'] if last_month_adherence and last_month_adherence['avg_rate'] is not None else 0
-
- 
-                adherence_monthly_diff = round(average_adherence_rate - last_month_adherence_rate, 1)
-                adherence_change = abs(adherence_monthly_diff)
-
-                if adherence_monthly_diff >= 0:
-                    adherence_trend_direction = "up"
-                    adherence_trend_color = "success"
-                    adherence_direction = "Up by"
-                else:
-                    adherence_trend_direction = "down"
-                    adherence_trend_color = "warning"
-                    adherence_direction = "Down"
-
-                week_ago = datetime.datetime.now() - timedelta(days=7)
-                cursor.execute(
-                    """SELECT AVG(
-                        CASE 
-                            WHEN repetitions IS NOT NULL THEN (repetitions_completed / repetitions) * 100
-                            ELSE (sets_completed / sets) * 100
-                        END
-                    ) as completion_rate
-                    FROM PatientExerciseProgress pep
-                    JOIN TreatmentPlanExercises tpe ON pep.plan_exercise_id = tpe.plan_exercise_id
-                    WHERE pep.completion_date >= %s""", 
-                    (week_ago,)
-                )
-                completion_result = cursor.fetchone()
-                weekly_completion_rate = round(completion_result['completion_rate'], 0) if completion_result and completion_result['completion_rate'] is not None else 0
-
- 
-                cursor.execute(
-                    """SELECT p.patient_id, p.first_name, p.last_name, p.diagnosis, p.status,
-                        COALESCE(AVG(pm.adherence_rate), 0) as adherence_rate
-                    FROM Patients p
-                    LEFT JOIN PatientMetrics pm ON p.patient_id = pm.patient_id
-                    WHERE p.therapist_id = %s
-                    GROUP BY p.patient_id
-                    ORDER BY p.created_at DESC
-                    LIMIT 5""", 
-                    (session_data["user_id"],)
-                )
-                recent_patients_result = cursor.fetchall()
-
- 
-                recent_patients = []
-                for patient in recent_patients_result:
-                    status_color = "success"
-                    if patient['status'] == "Inactive":
-                        status_color = "danger"
-                    elif patient['status'] == "At Risk":
-                        status_color = "warning"
-
-                    patient_with_color = patient.copy()
-                    patient_with_color['status_color'] = status_color
-                    patient_with_color['adherence_rate'] = round(patient['adherence_rate'], 0)
-                    recent_patients.append(patient_with_color)
-
- 
-                cursor.execute(
-                    "SELECT AVG(recovery_progress) as avg_recovery FROM PatientMetrics WHERE therapist_id = %s", 
-                    (session_data["user_id"],)
-                )
-                recovery_result = cursor.fetchone()
-                avg_recovery_rate = round(recovery_result['avg_recovery'], 1) if recovery_result and recovery_result['avg_recovery'] is not None else 0
-
- 
-                cursor.execute(
-                    """SELECT AVG(
-                        CASE 
-                            WHEN repetitions IS NOT NULL THEN (repetitions_completed / repetitions) * 100
-                            ELSE (sets_completed / sets) * 100
-                        END
-                    ) as completion_rate
-                    FROM PatientExerciseProgress pep
-                    JOIN TreatmentPlanExercises tpe ON pep.plan_exercise_id = tpe.plan_exercise_id"""
-                )
-                overall_completion = cursor.fetchone()
-                exercise_completion_rate = round(overall_completion['completion_rate'], 1) if overall_completion and overall_completion['completion_rate'] is not None else 0
-
- 
-                cursor.execute(
-                    "SELECT AVG(rating) as avg_rating FROM feedback"
-                )
-                satisfaction_result = cursor.fetchone()
-                avg_satisfaction = satisfaction_result['avg_rating'] if satisfaction_result and satisfaction_result['avg_rating'] is not None else 0
-
-                if avg_satisfaction >= 4:
-                    patient_satisfaction = "High"
-                elif avg_satisfaction >= 3:
-                    patient_satisfaction = "Medium"
-                else:
-                    patient_satisfaction = "Low"
-
- 
-                cursor.execute(
-                    "SELECT AVG(functionality_score) as avg_score FROM PatientMetrics WHERE therapist_id = %s", 
-                    (session_data["user_id"],)
-                )
-                progress_result = cursor.fetchone()
-                progress_metric_value = progress_result['avg_score'] if progress_result and progress_result['avg_score'] is not None else 0
-
- 
-                cursor.execute(
-                    """(SELECT 'video' as type, 'New Exercise Uploaded' as title, e.name as primary_detail, 
-                        CONCAT(e.duration, ' min') as secondary_detail, e.created_at as timestamp,
-                        CONCAT('/exercises/', e.exercise_id) as link
-                    FROM Exercises e
-                    WHERE e.therapist_id = %s
-                    ORDER BY e.created_at DESC
-                    LIMIT 3)
-                    UNION
-                    (SELECT 'user-plus' as type, 'New Patient Added' as title, 
-                        CONCAT(p.first_name, ' ', p.last_name) as primary_detail, 
-                        p.diagnosis as secondary_detail, p.created_at as timestamp,
-                        CONCAT('/patients/', p.patient_id) as link
-                    FROM Patients p
-                    WHERE p.therapist_id = %s
-                    ORDER BY p.created_at DESC
-                    LIMIT 3)
-                    UNION
-                    (SELECT 'report-medical' as type, 'Progress Report Updated' as title, 
-                        CONCAT(p.first_name, ' ', p.last_name) as primary_detail, 
-                        CONCAT('+', pm.recovery_progress, '% improvement') as secondary_detail, 
-                        pm.created_at as timestamp,
-                        CONCAT('/patients/', p.patient_id) as link
-                    FROM PatientMetrics pm
-                    JOIN Patients p ON pm.patient_id = p.patient_id
-                    WHERE pm.therapist_id = %s
-                    ORDER BY pm.created_at DESC
-                    LIMIT 3)
-                    ORDER BY timestamp DESC
-                    LIMIT 3""", 
-                    (session_data["user_id"], session_data["user_id"], session_data["user_id"])
-                )
-                activities_result = cursor.fetchall()
-
- 
-                recent_activities = []
-                for activity in activities_result:
-                    activity_with_color = activity.copy()
-
- 
-                    if activity['type'] == 'video':
-                        activity_with_color['color'] = 'success'
-                        activity_with_color['icon'] = 'video'
-                    elif activity['type'] == 'user-plus':
-                        activity_with_color['color'] = 'primary'
-                        activity_with_color['icon'] = 'user-plus'
-                    else:
-                        activity_with_color['color'] = 'warning'
-                        activity_with_color['icon'] = 'report-medical'
-
- 
-                    timestamp = activity['timestamp']
-                    now = datetime.datetime.now()
-                    if isinstance(timestamp, datetime.datetime):
-                        if timestamp.date() == now.date():
-                            activity_with_color['timestamp'] = f"Today, {timestamp.strftime('%I:%M %p')}"
-                        elif timestamp.date() == (now - timedelta(days=1)).date():
-                            activity_with_color['timestamp'] = f"Yesterday, {timestamp.strftime('%I:%M %p')}"
-                        else:
-                            activity_with_color['timestamp'] = f"{(now - timestamp).days} days ago"
-
-                    recent_activities.append(activity_with_color)
-
- 
-                cursor.execute(
-                    """SELECT 
-                        DATE_FORMAT(completion_date, '%a') as day, 
-                        COUNT(*) as count
-                    FROM PatientExerciseProgress
-                    WHERE completion_date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
-                    GROUP BY DATE_FORMAT(completion_date, '%a')
-                    ORDER BY FIELD(day, 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')"""
-                )
-                weekly_activity = cursor.fetchall()
-
- 
-                days_of_week = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-                activity_data = {day: 0 for day in days_of_week}
-
-                for record in weekly_activity:
-                    if record['day'] in activity_data:
-                        activity_data[record['day']] = record['count']
-
-                chart_data = [{'day': day, 'count': count} for day, count in activity_data.items()]
-
-                cursor.execute(
-                    """SELECT 
-                        DATE_FORMAT(completion_date, '%d') as date, 
-                        COUNT(*) as count
-                    FROM PatientExerciseProgress
-                    WHERE completion_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
-                    GROUP BY DATE_FORMAT(completion_date, '%d')
-                    ORDER BY date"""
-                )
-                monthly_activity = cursor.fetchall()
-                monthly_chart_data = [{'date': record['date'], 'count': record['count']} for record in monthly_activity]
-
-                cursor.execute(
-                    """SELECT 
-                        DATE_FORMAT(measurement_date, '%d %b') as date,
-                        AVG(functionality_score) as score 
-                    FROM PatientMetrics 
-                    WHERE measurement_date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
-                    AND therapist_id = %s
-                    GROUP BY DATE_FORMAT(measurement_date, '%d %b')
-                    ORDER BY measurement_date""", 
-                    (session_data["user_id"],)
-                )
-                progress_chart_data = cursor.fetchall()
-                progress_data = [{'date': record['date'], 'score': float(record['score']) if record['score'] is not None else 0} for record in progress_chart_data]
-
- 
-                cursor.execute(
-                    """SELECT 
-                        CASE 
-                            WHEN (
-                                CASE 
-                                    WHEN repetitions IS NOT NULL THEN (repetitions_completed / repetitions) * 100
-                                    ELSE (sets_completed / sets) * 100
-                                END
-                            ) >= 90 THEN 'Completed'
-                            WHEN (
-                                CASE 
-                                    WHEN repetitions IS NOT NULL THEN (repetitions_completed / repetitions) * 100
-                                    ELSE (sets_completed / sets) * 100
-                                END
-                            ) >= 50 THEN 'Partial'
-                            ELSE 'Missed'
-                        END as status,
-                        COUNT(*) as count
-                    FROM PatientExerciseProgress pep
-                    JOIN TreatmentPlanExercises tpe ON pep.plan_exercise_id = tpe.plan_exercise_id
-                    WHERE completion_date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
-                    GROUP BY status"""
-                )
-                completion_breakdown = cursor.fetchall()
-                donut_data = {'Completed': 0, 'Partial': 0, 'Missed': 0}
-                for record in completion_breakdown:
-                    if record['status'] in donut_data:
-                        donut_data[record['status']] = record['count']
-
- 
-                print("Rendering dashboard template with dynamic data")
-                return templates.TemplateResponse(
-                    "dist/dashboard/index.html", 
-                    {
-                        "request": request,
-                        "first_name": therapist["first_name"],
-                        "last_name": therapist["last_name"],
-                        "appointments_count": appointments_count,
-                        "appointments_growth": appointments_growth,
-                        "appointments_monthly_diff": appointments_monthly_diff,
-                        "active_patients_count": active_patients_count,
-                        "patient_growth": patient_growth,
-                        "new_patients_monthly": new_patients_monthly,
-                        "treatment_plans_count": treatment_plans_count,
-                        "plans_growth": plans_growth,
-                        "new_plans_monthly": new_plans_monthly,
-                        "average_adherence_rate": average_adherence_rate,
-                        "adherence_trend_color": adherence_trend_color,
-                        "adherence_trend_direction": adherence_trend_direction,
-                        "adherence_change": adherence_change,
-                        "adherence_direction": adherence_direction,
-                        "adherence_monthly_diff": adherence_monthly_diff,
-                        "weekly_completion_rate": weekly_completion_rate,
-                        "recent_patients": recent_patients,
-                        "avg_recovery_rate": avg_recovery_rate,
-                        "exercise_completion_rate": exercise_completion_rate,
-                        "patient_satisfaction": patient_satisfaction,
-                        "progress_metric_value": progress_metric_value,
-                        "recent_activities": recent_activities,
-                        "chart_data": chart_data,
-                        "monthly_chart_data": monthly_chart_data,
-                        "progress_data": progress_data,
-                        "donut_data": donut_data,
-                        "recent_messages": recent_messages,
-                        "unread_messages_count": unread_messages_count
-                    }
-                )
-            except Exception as e:
-                print(f"Database error in front-page route: {e}")
-                return RedirectResponse(url="/Therapist_Login")
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in front-page route: {e}")
-            return RedirectResponse(url="/Therapist_Login")
-        
-    @app.get("/messages")
-    async def messages_page(request: Request, search: str = None):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-                if not therapist:
-                    return RedirectResponse(url="/Therapist_Login")
-
- 
-                search_condition = ""
-                search_params = []
-                if search:
-                    search_condition = """
-                        AND (
-                            t.first_name LIKE %s OR 
-                            t.last_name LIKE %s OR 
-                            m.subject LIKE %s OR 
-                            m.content LIKE %s
-                        )
-                    """
-                    search_term = f"%{search}%"
-                    search_params = [search_term, search_term, search_term, search_term]
-
- 
-                inbox_query = f"""
-                    SELECT 
-                        m.message_id, m.subject, m.content, m.created_at, m.is_read,
-                        CASE 
-                            WHEN m.sender_type = 'therapist' THEN 
-                                (SELECT CONCAT(first_name, ' ', last_name) FROM Therapists WHERE id = m.sender_id)
-                            WHEN m.sender_type = 'patient' THEN 
-                                (SELECT CONCAT(first_name, ' ', last_name) FROM Patients WHERE patient_id = m.sender_id)
-                            ELSE 
-                                (SELECT username FROM users WHERE user_id = m.sender_id)
-                        END as sender_name,
-                        CASE 
-                            WHEN m.sender_type = 'therapist' THEN 
-                                COALESCE((SELECT profile_image FROM Therapists WHERE id = m.sender_id), 'avatar-1.jpg')
-                            WHEN m.sender_type = 'patient' THEN 
-                                'patient-avatar.jpg'
-                            ELSE 
-                                COALESCE((SELECT profile_pic FROM users WHERE user_id = m.sender_id), 'user-avatar.jpg')
-                        END as profile_image,
-                        m.sender_type,
-                        m.sender_id
-                    FROM Messages m
-                    WHERE m.recipient_id = %s 
-                    AND m.recipient_type = 'therapist'
-                    {search_condition}
-                    ORDER BY m.created_at DESC
-                """
-
-                inbox_params = [session_data["user_id"]] + search_params if search else [session_data["user_id"]]
-                cursor.execute(inbox_query, inbox_params)
-                inbox_messages = cursor.fetchall()
-
- 
-                sent_query = f"""
-                    SELECT 
-                        m.message_id, m.subject, m.content, m.created_at, m.is_read,
-                        CASE 
-                            WHEN m.recipient_type = 'therapist' THEN 
-                                (SELECT CONCAT(first_name, ' ', last_name) FROM Therapists WHERE id = m.recipient_id)
-                            WHEN m.recipient_type = 'patient' THEN 
-                                (SELECT CONCAT(first_name, ' ', last_name) FROM Patients WHERE patient_id = m.recipient_id)
-                            ELSE 
-                                (SELECT username FROM users WHERE user_id = m.recipient_id)
-                        END as recipient_name,
-                        CASE 
-                            WHEN m.recipient_type = 'therapist' THEN 
-                                COALESCE((SELECT profile_image FROM Therapists WHERE id = m.recipient_id), 'avatar-1.jpg')
-                            WHEN m.recipient_type = 'patient' THEN 
-                                'patient-avatar.jpg'
-                            ELSE 
-                                COALESCE((SELECT profile_pic FROM users WHERE user_id = m.recipient_id), 'user-avatar.jpg')
-                        END as profile_image,
-                        m.recipient_type,
-                        m.recipient_id
-                    FROM Messages m
-                    WHERE m.sender_id = %s 
-                    AND m.sender_type = 'therapist'
-                    {search_condition}
-                    ORDER BY m.created_at DESC
-                """
-
-                sent_params = [session_data["user_id"]] + search_params if search else [session_data["user_id"]]
-                cursor.execute(sent_query, sent_params)
-                sent_messages = cursor.fetchall()
-
- 
-                for messages_list in [inbox_messages, sent_messages]:
-                    for message in messages_list:
- 
-                        timestamp = message['created_at']
-                        now = datetime.datetime.now()
-                        if isinstance(timestamp, datetime.datetime):
-                            diff = now - timestamp
-
-                            if timestamp.date() == now.date():
-                                message['formatted_date'] = timestamp.strftime('%I:%M %p')
-
-                                minutes_ago = diff.seconds // 60
-                                if minutes_ago < 60:
-                                    message['time_ago'] = f"{minutes_ago} min ago"
-                                else:
-                                    hours_ago = minutes_ago // 60
-                                    message['time_ago'] = f"{hours_ago} hours ago"
-
-                            elif timestamp.date() == (now - timedelta(days=1)).date():
-                                message['formatted_date'] = "Yesterday"
-                                message['time_ago'] = timestamp.strftime('%I:%M %p')
-                            else:
-                                message['formatted_date'] = timestamp.strftime('%d %b')
-                                message['time_ago'] = timestamp.strftime('%Y')
-
- 
-                        if message['content'] and len(message['content']) > 100:
-                            message['short_content'] = message['content'][:100] + '...'
-                        else:
-                            message['short_content'] = message['content']
-
- 
-                cursor.execute(
-                    "SELECT id, first_name, last_name FROM Therapists WHERE id != %s",
-                    (session_data["user_id"],)
-                )
-                therapists = cursor.fetchall()
-
- 
-                cursor.execute(
-                    "SELECT patient_id, first_name, last_name FROM Patients"
-                )
-                patients = cursor.fetchall()
-
- 
-                cursor.execute(
-                    "SELECT user_id, username FROM users"
-                )
-                users = cursor.fetchall()
-
- 
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
-
-                return templates.TemplateResponse(
-                    "dist/messages/index.html", 
-                    {
-                        "request": request,
-                        "first_name": therapist["first_name"],
-                        "last_name": therapist["last_name"],
-                        "inbox_messages": inbox_messages,
-                        "sent_messages": sent_messages,
-                        "therapists": therapists,
-                        "patients": patients,
-                        "users": users,
-                        "unread_messages_count": unread_messages_count,
-                        "search_term": search
-                    }
-                )
-
-            except Exception as e:
-                print(f"Database error in messages page: {e}")
-                return RedirectResponse(url="/front-page")
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in messages page: {e}")
-            return RedirectResponse(url="/Therapist_Login")
-        
-    
-    @app.get("/messages/{message_id}")
-    async def view_message(request: Request, message_id: int):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-                if not therapist:
-                    return RedirectResponse(url="/Therapist_Login")
-
- 
-                cursor.execute(
-                    """SELECT 
-                        m.message_id, m.subject, m.content, m.created_at, m.is_read,
-                        m.sender_id, m.recipient_id, m.sender_type, m.recipient_type,
-                        CASE 
-                            WHEN m.sender_type = 'therapist' THEN 
-                                (SELECT CONCAT(first_name, ' ', last_name) FROM Therapists WHERE id = m.sender_id)
-                            WHEN m.sender_type = 'patient' THEN 
-                                (SELECT CONCAT(first_name, ' ', last_name) FROM Patients WHERE patient_id = m.sender_id)
-                            ELSE 
-                                (SELECT username FROM users WHERE user_id = m.sender_id)
-                        END as sender_name,
-                        CASE 
-                            WHEN m.recipient_type = 'therapist' THEN 
-                                (SELECT CONCAT(first_name, ' ', last_name) FROM Therapists WHERE id = m.recipient_id)
-                            WHEN m.recipient_type = 'patient' THEN 
-                                (SELECT CONCAT(first_name, ' ', last_name) FROM Patients WHERE patient_id = m.recipient_id)
-                            ELSE 
-                                (SELECT username FROM users WHERE user_id = m.recipient_id)
-                        END as recipient_name,
-                        CASE 
-                            WHEN m.sender_type = 'therapist' THEN 
-                                COALESCE((SELECT profile_image FROM Therapists WHERE id = m.sender_id), 'avatar-1.jpg')
-                            WHEN m.sender_type = 'patient' THEN 
-                                'patient-avatar.jpg'
-                            ELSE 
-                                COALESCE((SELECT profile_pic FROM users WHERE user_id = m.sender_id), 'user-avatar.jpg')
-                        END as sender_profile_image
-                    FROM Messages m
-                    WHERE m.message_id = %s
-                    AND ((m.sender_id = %s AND m.sender_type = 'therapist') 
-                         OR (m.recipient_id = %s AND m.recipient_type = 'therapist'))""", 
-                    (message_id, session_data["user_id"], session_data["user_id"])
-                )
-                message = cursor.fetchone()
-
-                if not message:
- 
-                    return RedirectResponse(url="/messages")
-
- 
-                if message['recipient_id'] == int(session_data["user_id"]) and message['recipient_type'] == 'therapist' and not message['is_read']:
-                    cursor.execute(
-                        "UPDATE Messages SET is_read = TRUE WHERE message_id = %s",
-                        (message_id,)
-                    )
-                    db.commit()
-
- 
-                timestamp = message['created_at']
-                if isinstance(timestamp, datetime.datetime):
-                    now = datetime.datetime.now()
-                    if timestamp.date() == now.date():
-                        message['formatted_date'] = f"Today at {timestamp.strftime('%I:%M %p')}"
-                    elif timestamp.date() == (now - timedelta(days=1)).date():
-                        message['formatted_date'] = f"Yesterday at {timestamp.strftime('%I:%M %p')}"
-                    else:
-                        message['formatted_date'] = timestamp.strftime('%b %d, %Y at %I:%M %p')
-
- 
-                message['direction'] = 'received' if message['recipient_id'] == int(session_data["user_id"]) and message['recipient_type'] == 'therapist' else 'sent'
-
- 
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
-                return templates.TemplateResponse(
-                    "dist/messages/view.html",
-                    {
-                        "request": request,
-                        "first_name": therapist["first_name"],
-                        "last_name": therapist["last_name"],
-                        "message": message,
-                        "unread_messages_count": unread_messages_count
-                    }
-                )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
-            except Exception as e:
-                print(f"Database error in view message: {e}")
-                return RedirectResponse(url="/messages")
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in view message: {e}")
-            return RedirectResponse(url="/Therapist_Login")
-
-    @app.post("/messages/send")
-    async def send_message(request: Request):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return {"success": False, "message": "Not authenticated"}
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return {"success": False, "message": "Not authenticated"}
-
-            form_data = await request.form()
-            recipient_type = form_data.get("recipient_type")
-            recipient_id = form_data.get("recipient_id")
-            subject = form_data.get("subject")
-            content = form_data.get("content")
-
- 
-            if not recipient_type or not recipient_id or not content:
-                return {"success": False, "message": "Recipient and message content are required"}
-
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                recipient_exists = False
-
-                if recipient_type == "therapist":
-                    cursor.execute(
-                        "SELECT id FROM Therapists WHERE id = %s",
-                        (recipient_id,)
-                    )
-                    recipient = cursor.fetchone()
-                    recipient_exists = recipient is not None
-                elif recipient_type == "patient":
-                    cursor.execute(
-                        "SELECT patient_id FROM Patients WHERE patient_id = %s",
-                        (recipient_id,)
-                    )
-                    recipient = cursor.fetchone()
-                    recipient_exists = recipient is not None
-                elif recipient_type == "user":
-                    cursor.execute(
-                        "SELECT user_id FROM users WHERE user_id = %s",
-                        (recipient_id,)
-                    )
-                    recipient = cursor.fetchone()
-                    recipient_exists = recipient is not None
-
-                if not recipient_exists:
-                    return {"success": False, "message": "Recipient not found"}
-
- 
-                cursor.execute(
-                    """INSERT INTO Messages 
-                        (sender_id, sender_type, recipient_id, recipient_type, subject, content) 
-                        VALUES (%s, %s, %s, %s, %s, %s)""",
-                    (session_data["user_id"], "therapist", recipient_id, recipient_type, subject, content)
-                )
-                db.commit()
-
- 
-                new_message_id = cursor.lastrowid
-
-                return {"success": True, "message_id": new_message_id}
-
-            except Exception as e:
-                print(f"Database error sending message: {e}")
-                return {"success": False, "message": "Error sending message"}
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error sending message: {e}")
-            return {"success": False, "message": "Error processing request"}
-
-    @app.post("/messages/reply/{message_id}")
-    async def reply_to_message(request: Request, message_id: int):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return {"success": False, "message": "Not authenticated"}
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return {"success": False, "message": "Not authenticated"}
-
-            form_data = await request.form()
-            content = form_data.get("content")
-
- 
-            if not content:
-                return {"success": False, "message": "Message content is required"}
-
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    """SELECT sender_id, recipient_id, subject, sender_type, recipient_type
-                        FROM Messages 
-                        WHERE message_id = %s 
-                        AND ((sender_id = %s AND sender_type = 'therapist') 
-                             OR (recipient_id = %s AND recipient_type = 'therapist'))""",
-                    (message_id, session_data["user_id"], session_data["user_id"])
-                )
-                original_message = cursor.fetchone()
-
-                if not original_message:
-                    return {"success": False, "message": "Original message not found"}
-
- 
-                if int(original_message['recipient_id']) == int(session_data["user_id"]) and original_message['recipient_type'] == 'therapist':
-                    reply_to_id = original_message['sender_id']
-                    reply_to_type = original_message['sender_type']
-                else:
-                    reply_to_id = original_message['recipient_id']
-                    reply_to_type = original_message['recipient_type']
-
- 
-                subject = original_message['subject']
-                if not subject.startswith("Re:"):
-                    subject = f"Re: {subject}"
-
- 
-                cursor.execute(
-                    """INSERT INTO Messages 
-                        (sender_id, sender_type, recipient_id, recipient_type, subject, content) 
-                        VALUES (%s, %s, %s, %s, %s, %s)""",
-                    (session_data["user_id"], "therapist", reply_to_id, reply_to_type, subject, content)
-                )
-                db.commit()
-
- 
-                new_message_id = cursor.lastrowid
-
-                return {"success": True, "message_id": new_message_id}
-
-            except Exception as e:
-                print(f"Database error sending reply: {e}")
-                return {"success": False, "message": "Error sending reply"}
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error sending reply: {e}")
-            return {"success": False, "message": "Error processing request"}
-
-    @app.delete("/messages/{message_id}")
-    async def delete_message(request: Request, message_id: int):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return {"success": False, "message": "Not authenticated"}
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return {"success": False, "message": "Not authenticated"}
-
-            db = get_Mysql_db()
-            cursor = db.cursor()
-
-            try:
- 
-                cursor.execute(
-                    """SELECT message_id 
-                       FROM Messages 
-                       WHERE message_id = %s 
-                       AND ((sender_id = %s AND sender_type = 'therapist') 
-                            OR (recipient_id = %s AND recipient_type = 'therapist'))""",
-                    (message_id, session_data["user_id"], session_data["user_id"])
-                )
-
-                message = cursor.fetchone()
-                if not message:
-                    return {"success": False, "message": "Message not found or you don't have permission to delete it"}
-
- 
-                cursor.execute(
-                    "DELETE FROM Messages WHERE message_id = %s",
-                    (message_id,)
-                )
-                db.commit()
-
-                return {"success": True}
-
-            except Exception as e:
-                print(f"Database error deleting message: {e}")
-                return {"success": False, "message": "Error deleting message"}
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error deleting message: {e}")
-            return {"success": False, "message": "Error processing request"}
-        
-    @app.get("/api/messages/unread-count")
-    async def get_unread_count(request: Request):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return {"count": 0}
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return {"count": 0}
-
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                result = cursor.fetchone()
-                return {"count": result['count'] if result else 0}
-
-            except Exception as e:
-                print(f"Error fetching unread count: {e}")
-                return {"count": 0}
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in unread count API: {e}")
-            return {"count": 0}
-        
-    @app.get("/profile")
-    async def view_profile(request: Request):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
-                cursor.execute(
-                    """SELECT id, first_name, last_name, company_email, profile_image, 
-                            bio, experience_years, specialties, education, languages, 
-                            address, rating, review_count, 
-                            is_accepting_new_patients, average_session_length
-                    FROM Therapists 
-                    WHERE id = %s""", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-
-                if not therapist:
-                    return RedirectResponse(url="/Therapist_Login")
-
-                for field in ['specialties', 'education', 'languages']:
-                    therapist[field] = safely_parse_json_field(therapist[field])
-
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
-
-                cursor.execute(
-                    """SELECT patient_id, first_name, last_name, diagnosis, status 
-                    FROM Patients 
-                    WHERE therapist_id = %s 
-                    ORDER BY created_at DESC 
-                    LIMIT 5""",
-                    (session_data["user_id"],)
-                )
-                recent_patients = cursor.fetchall()
-                
-                for patient in recent_patients:
-                    for key in patient:
-                        if isinstance(patient[key], bytes):
-                            patient[key] = patient[key].decode('utf-8')
-
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Patients WHERE therapist_id = %s",
-                    (session_data["user_id"],)
-                )
-                total_patients_result = cursor.fetchone()
-                total_patients = total_patients_result['count'] if total_patients_result else 0
-
-                cursor.execute(
-                    """SELECT AVG(rating) as average_rating, COUNT(*) as review_count 
-                    FROM Reviews 
-                    WHERE therapist_id = %s""",
-                    (session_data["user_id"],)
-                )
-                reviews_summary = cursor.fetchone()
-                if reviews_summary and reviews_summary['average_rating']:
-                    average_rating = round(reviews_summary['average_rating'], 1)
-                    review_count = reviews_summary['review_count']
-                else:
-                    average_rating = 0
-                    review_count = 0
-
-                cursor.execute(
-                    """SELECT r.review_id, r.rating, r.comment, r.created_at, 
-                            p.first_name, p.last_name
-                    FROM Reviews r
-                    JOIN Patients p ON r.patient_id = p.patient_id
-                    WHERE r.therapist_id = %s
-                    ORDER BY r.created_at DESC
-                    LIMIT 3""",
-                    (session_data["user_id"],)
-                )
-                recent_reviews = cursor.fetchall()
-                
-                for review in recent_reviews:
-                    for key in review:
-                        if isinstance(review[key], bytes):
-                            review[key] = review[key].decode('utf-8')
-
-                return templates.TemplateResponse(
-                    "dist/dashboard/therapist_profile.html",
-                    {
-                        "request": request,
-                        "therapist": therapist,
-                        "first_name": ensure_str(therapist["first_name"]),
-                        "last_name": ensure_str(therapist["last_name"]),
-                        "unread_messages_count": unread_messages_count,
-                        "recent_patients": recent_patients,
-                        "total_patients": total_patients,
-                        "average_rating": average_rating,
-                        "review_count": review_count,
-                        "recent_reviews": recent_reviews,
-                    }
-                )
-
-            except Exception as e:
-                print(f"Database error in profile view: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return RedirectResponse(url="/front-page")
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in profile view: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/Therapist_Login")
-    @app.get("/api/therapist/{therapist_id}")
-    async def get_therapist_api(therapist_id: int):
-        """API endpoint to get therapist information"""
-        db = get_Mysql_db()
-        cursor = db.cursor(dictionary=True)
-
-        try:
-            cursor.execute(
-                """SELECT id, first_name, last_name, profile_image, 
-                        bio, experience_years, specialties, education, languages, 
-                        address, rating, review_count, 
-                        is_accepting_new_patients, average_session_length
-                FROM Therapists 
-                WHERE id = %s""", 
-                (therapist_id,)
-            )
-            therapist = cursor.fetchone()
-
-            if not therapist:
-                return JSONResponse(
-                    status_code=404,
-                    content={"error": "Therapist not found"}
-                )
-
- 
-            for field in ['specialties', 'education', 'languages']:
-                if therapist[field] and isinstance(therapist[field], str):
-                    try:
-                        therapist[field] = json.loads(therapist[field])
-                    except:
-                        therapist[field] = []
-                elif therapist[field] is None:
-                    therapist[field] = []
+# Outermost, so latency covers every other middleware too.
+app.add_middleware(MetricsMiddleware)
 
- 
-            response_data = {
-                "id": therapist["id"],
-                "name": f"{therapist['first_name']} {therapist['last_name']}",
-                "photoUrl": f"/static/assets/images/user/{therapist['profile_image']}",
-                "specialties": therapist["specialties"],
-                "bio": therapist["bio"] or "",
-                "experienceYears": therapist["experience_years"] or 0,
-                "education": therapist["education"],
-                "languages": therapist["languages"],
-                "address": therapist["address"] or "",
-                "rating": therapist["rating"] or 0,
-                "reviewCount": therapist["review_count"] or 0,
-                "isAcceptingNewPatients": bool(therapist["is_accepting_new_patients"]),
-                "averageSessionLength": therapist["average_session_length"] or 60
-            }
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """Liveness: the worker's event loop is serving requests. No I/O."""
+    return {"status": "ok"}
 
-            return response_data
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    """Readiness: MySQL, Redis and MongoDB answer a ping within HEALTH_CHECK_TIMEOUT; 503 otherwise"""
+    result = await readiness_probe.check()
+    return JSONResponse(status_code=200 if result["status"] == "ready" else 503, content=result)
 
-        except Exception as e:
-            print(f"Database error in get therapist API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"error": f"Internal server error: {str(e)}"}
-            )
-        finally:
-            cursor.close()
-            db.close()
-        
-    @app.get("`/profile`/edit")
-    async def edit_profile_form(request: Request):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-            try:
-                cursor.execute(
-                    """SELECT id, first_name, last_name, company_email, profile_image, 
-                            bio, experience_years, specialties, education, languages, 
-                            address, rating, review_count, 
-                            is_accepting_new_patients, average_session_length
-                    FROM Therapists 
-                    WHERE id = %s""", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-                if not therapist:
-                    return RedirectResponse(url="/Therapist_Login")
-                for field in ['specialties', 'education', 'languages']:
-                    therapist[field] = safely_parse_json_field(therapist[field])
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
-                all_specialties = get_all_specialties()
-                existing_specialties = therapist["specialties"]
-                
-                return templates.TemplateResponse(
-                    "dist/dashboard/therapist_edit_profile.html",
-                    {
-                        "request": request,
-                        "therapist": therapist,
-                        "first_name": ensure_str(therapist["first_name"]),
-                        "last_name": ensure_str(therapist["last_name"]),
-                        "unread_messages_count": unread_messages_count,
-                        "all_specialties": all_specialties,
-                        "existing_specialties": existing_specialties
-                    }
-                )
-            except Exception as e:
-                print(f"Database error in edit profile form: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return RedirectResponse(url="/front-page")
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in edit profile form: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/Therapist_Login")
-        
-    @app.get("/profile/edit")
-    async def edit_profile_form(request: Request):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-            try:
-                cursor.execute(
-                    """SELECT id, first_name, last_name, company_email, profile_image, 
-                            bio, experience_years, specialties, education, languages, 
-                            address, rating, review_count, 
-                            is_accepting_new_patients, average_session_length
-                    FROM Therapists 
-                    WHERE id = %s""", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-                if not therapist:
-                    return RedirectResponse(url="/Therapist_Login")
-                for field in ['specialties', 'education', 'languages']:
-                    therapist[field] = safely_parse_json_field(therapist[field])
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
-                all_specialties = get_all_specialties()
-                existing_specialties = therapist["specialties"]
-                
-                return templates.TemplateResponse(
-                    "dist/dashboard/therapist_edit_profile.html",
-                    {
-                        "request": request,
-                        "therapist": therapist,
-                        "first_name": ensure_str(therapist["first_name"]),
-                        "last_name": ensure_str(therapist["last_name"]),
-                        "unread_messages_count": unread_messages_count,
-                        "all_specialties": all_specialties,
-                        "existing_specialties": existing_specialties
-                    }
-                )
-            except Exception as e:
-                print(f"Database error in edit profile form: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return RedirectResponse(url="/front-page")
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in edit profile form: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/Therapist_Login")
-    
-    @app.post("/profile/update2")
-    async def update_profile_v2(request: Request):
-        """
-        A completely new implementation of profile update using only the Request object.
-        This approach eliminates any potential conflict with FastAPI's Form dependencies.
-        """
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login", status_code=303)
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login", status_code=303)
-            form_data = await request.form()
-            profile_data = {
-                "first_name": ensure_str(form_data.get("first_name", "")),
-                "last_name": ensure_str(form_data.get("last_name", "")),
-                "company_email": ensure_str(form_data.get("company_email", "")),
-                "bio": ensure_str(form_data.get("bio", "")),
-                "address": ensure_str(form_data.get("address", ""))
-            }
-            try:
-                profile_data["experience_years"] = int(form_data.get("experience_years", "0"))
-            except ValueError:
-                profile_data["experience_years"] = 0
-                
-            try:
-                profile_data["rating"] = float(form_data.get("rating", "0"))
-            except ValueError:
-                profile_data["rating"] = 0
-                
-            try:
-                profile_data["review_count"] = int(form_data.get("review_count", "0"))
-            except ValueError:
-                profile_data["review_count"] = 0
-                
-            try:
-                profile_data["average_session_length"] = int(form_data.get("average_session_length", "60"))
-            except ValueError:
-                profile_data["average_session_length"] = 60
-            profile_data["is_accepting_new_patients"] = form_data.get("is_accepting_new_patients") == "1"
-            specialties = form_data.getlist("specialties")
-            profile_data["specialties"] = json.dumps(specialties)
-                
-            education = form_data.getlist("education")
-            profile_data["education"] = json.dumps(education)
-                
-            languages = form_data.getlist("languages")
-            profile_data["languages"] = json.dumps(languages)
-            profile_image_filename = None
-            profile_image = form_data.get("profile_image")
-            if profile_image and hasattr(profile_image, "filename") and profile_image.filename:
-                try:
-                    contents = await profile_image.read()
-                    if contents and len(contents) > 0:
-                        contents = ensure_bytes(contents)
-                        file_extension = profile_image.filename.split(".")[-1].lower()
-                        allowed_extensions = ["jpg", "jpeg", "png", "gif"]
-                        
-                        if file_extension in allowed_extensions:
-                            profile_image_filename = f"therapist_{session_data['user_id']}_{int(time.time())}.{file_extension}"
-                            current_file = FilePath(__file__).resolve()
-                            project_root = current_file.parent.parent.parent
-                            uploads_dir = project_root / "Frontend_Web" / "static" / "assets" / "images" / "user"
-                            uploads_dir.mkdir(parents=True, exist_ok=True)
-                            file_path = uploads_dir / profile_image_filename
-                            with open(file_path, "wb") as f:
-                                f.write(contents)
-                            
-                            print(f"Profile image saved: {profile_image_filename}")
-                            print(f"File path: {file_path}")
-                        else:
-                            print(f"Invalid file extension: {file_extension}")
-                    else:
-                        print("Empty file content")
-                except Exception as img_error:
-                    print(f"Error processing image: {img_error}")
-                    print(f"Traceback: {traceback.format_exc()}")
-            db = get_Mysql_db()
-            cursor = None
-            try:
-                cursor = db.cursor()
-                update_fields = []
-                params = []
-                for field in profile_data:
-                    update_fields.append(f"{field} = %s")
-                    params.append(profile_data[field])
-                if profile_image_filename:
-                    update_fields.append("profile_image = %s")
-                    params.append(profile_image_filename)
-                params.append(session_data["user_id"])
-                query = f"UPDATE Therapists SET {', '.join(update_fields)} WHERE id = %s"
-                cursor.execute(query, params)
-                db.commit()
-                print("Profile updated successfully")
-                return RedirectResponse(url="/profile", status_code=303)
-            except Exception as db_error:
-                print(f"Database error: {db_error}")
-                print(f"Traceback: {traceback.format_exc()}")
-                if db:
-                    db.rollback()
-                return RedirectResponse(url="/profile/edit", status_code=303)
-            finally:
-                if cursor:
-                    cursor.close()
-                if db:
-                    db.close()
-                    
-        except Exception as e:
-            print(f"Unexpected error in profile update: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/Therapist_Login", status_code=303)
-
- 
-
-    async def get_therapist_data(db, user_id):
-        """Retrieve therapist data from database"""
-        try:
-            cursor = db.cursor(dictionary=True)
-            cursor.execute(
-                """SELECT id, first_name, last_name, company_email, profile_image, 
-                        bio, experience_years, specialties, education, languages, 
-                        address, rating, review_count, 
-                        is_accepting_new_patients, average_session_length
-                FROM Therapists 
-                WHERE id = %s""", 
-                (user_id,)
-            )
-            therapist = cursor.fetchone()
-            
- 
-            for field in ['specialties', 'education', 'languages']:
-                if therapist[field] and isinstance(therapist[field], str):
-                    try:
-                        therapist[field] = json.loads(therapist[field])
-                    except:
-                        therapist[field] = []
-                elif therapist[field] is None:
-                    therapist[field] = []
-                    
-            return therapist
-        except Exception as e:
-            print(f"Error retrieving therapist data: {e}")
-            return {
-                "first_name": "",
-                "last_name": "",
-                "company_email": "",
-                "profile_image": "avatar-1.jpg",
-                "specialties": [],
-                "education": [],
-                "languages": []
-            }
-        finally:
-            if cursor:
-                cursor.close()
-
-    async def get_unread_messages_count(db, user_id):
-        """Get count of unread messages"""
-        try:
-            cursor = db.cursor(dictionary=True)
-            cursor.execute(
-                "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                (user_id,)
-            )
-            result = cursor.fetchone()
-            return result['count'] if result else 0
-        except Exception as e:
-            print(f"Error counting unread messages: {e}")
-            return 0
-        finally:
-            if cursor:
-                cursor.close()
-
-    def get_all_specialties():
-        """Return list of all specialties"""
-        return [
-            "Orthopedic Physical Therapy",
-            "Neurological Physical Therapy",
-            "Cardiovascular & Pulmonary Physical Therapy",
-            "Pediatric Physical Therapy",
-            "Geriatric Physical Therapy",
-            "Sports Physical Therapy",
-            "Women's Health Physical Therapy",
-            "Manual Therapy",
-            "Vestibular Rehabilitation",
-            "Post-Surgical Rehabilitation",
-            "Pain Management"
-        ]
-        
-    @app.get("/api/therapist/{therapist_id}")
-    async def get_therapist_api(therapist_id: int):
-            """API endpoint to get therapist information"""
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
-                cursor.execute(
-                    """SELECT id, first_name, last_name, profile_image, 
-                            bio, experience_years, specialties, education, languages, 
-                            address, latitude, longitude, rating, review_count, 
-                            is_accepting_new_patients, average_session_length
-                    FROM Therapists 
-                    WHERE id = %s""", 
-                    (therapist_id,)
-                )
-                therapist = cursor.fetchone()
-
-                if not therapist:
-                    return JSONResponse(
-                        status_code=404,
-                        content={"error": "Therapist not found"}
-                    )
-
- 
-                for field in ['specialties', 'education', 'languages']:
-                    if therapist[field] and isinstance(therapist[field], str):
-                        try:
-                            therapist[field] = json.loads(therapist[field])
-                        except:
-                            therapist[field] = []
-                    elif therapist[field] is None:
-                        therapist[field] = []
-
- 
-                response_data = {
-                    "id": therapist["id"],
-                    "name": f"{therapist['first_name']} {therapist['last_name']}",
-                    "photoUrl": f"/static/assets/images/user/{therapist['profile_image']}",
-                    "specialties": therapist["specialties"],
-                    "bio": therapist["bio"] or "",
-                    "experienceYears": therapist["experience_years"] or 0,
-                    "education": therapist["education"],
-                    "languages": therapist["languages"],
-                    "address": therapist["address"] or "",
-                    "latitude": therapist["latitude"] or 0,
-                    "longitude": therapist["longitude"] or 0,
-                    "rating": therapist["rating"] or 0,
-                    "reviewCount": therapist["review_count"] or 0,
-                    "isAcceptingNewPatients": bool(therapist["is_accepting_new_patients"]),
-                    "averageSessionLength": therapist["average_session_length"] or 60
-                }
-
-                return response_data
-
-            except Exception as e:
-                print(f"Database error in get therapist API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"error": f"Internal server error: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-
-
-    @app.get("/api/therapist/{therapist_id}/reviews")
-    async def get_therapist_reviews(therapist_id: int, limit: int = 10, offset: int = 0):
-        """API endpoint to get therapist reviews"""
-        db = get_Mysql_db()
-        cursor = db.cursor(dictionary=True)
-
-        try:
- 
-            cursor.execute(
-                """SELECT r.review_id, r.rating, r.comment, r.created_at, 
-                         p.patient_id, p.first_name, p.last_name
-                   FROM Reviews r
-                   JOIN Patients p ON r.patient_id = p.patient_id
-                   WHERE r.therapist_id = %s
-                   ORDER BY r.created_at DESC
-                   LIMIT %s OFFSET %s""", 
-                (therapist_id, limit, offset)
-            )
-            reviews = cursor.fetchall()
-
- 
-            cursor.execute(
-                """SELECT COUNT(*) as total, AVG(rating) as average_rating
-                   FROM Reviews
-                   WHERE therapist_id = %s""", 
-                (therapist_id,)
-            )
-            stats = cursor.fetchone()
-
- 
-            formatted_reviews = []
-            for review in reviews:
-                formatted_reviews.append({
-                    "id": review["review_id"],
-                    "rating": review["rating"],
-                    "comment": review["comment"],
-                    "createdAt": review["created_at"].isoformat(),
-                    "patient": {
-                        "id": review["patient_id"],
-                        "name": f"{review['first_name']} {review['last_name']}"
-                    }
-                })
-
-            return {
-                "reviews": formatted_reviews,
-                "totalReviews": stats["total"] or 0,
-                "averageRating": float(stats["average_rating"]) if stats["average_rating"] else 0,
-                "limit": limit,
-                "offset": offset
-            }
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
 
-        except Exception as e:
-            print(f"Database error in get therapist reviews API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"error": f"Internal server error: {str(e)}"}
-            )
-        finally:
-            cursor.close()
-            db.close()
-
-
-    @app.post("/api/therapist/reviews")
-    async def create_therapist_review(
-        request: Request,
-        therapist_id: int = Form(...),
-        patient_id: int = Form(...),
-        rating: float = Form(...),
-        comment: str = Form(None)
-    ):
-        """API endpoint to create a review for a therapist"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401,
-                content={"error": "Not authenticated"}
-            )
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"error": "Not authenticated"}
-                )
-
- 
- 
-
-            db = get_Mysql_db()
-            cursor = db.cursor()
-
-            try:
- 
-                cursor.execute(
-                    """SELECT review_id FROM Reviews 
-                       WHERE therapist_id = %s AND patient_id = %s""", 
-                    (therapist_id, patient_id)
-                )
-                existing_review = cursor.fetchone()
-
-                if existing_review:
- 
-                    cursor.execute(
-                        """UPDATE Reviews 
-                           SET rating = %s, comment = %s, updated_at = NOW() 
-                           WHERE therapist_id = %s AND patient_id = %s""", 
-                        (rating, comment, therapist_id, patient_id)
-                    )
-                    db.commit()
-
-                    return {"message": "Review updated successfully", "review_id": existing_review[0]}
-                else:
- 
-                    cursor.execute(
-                        """INSERT INTO Reviews (therapist_id, patient_id, rating, comment)
-                           VALUES (%s, %s, %s, %s)""", 
-                        (therapist_id, patient_id, rating, comment)
-                    )
-                    db.commit()
-
-                    return {"message": "Review created successfully", "review_id": cursor.lastrowid}
-
-            except Exception as e:
-                db.rollback()
-                print(f"Database error in create review: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"error": f"Error submitting review: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in create review: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"error": f"Error processing request: {str(e)}"}
-            )
-
-    @app.get("/profile/reviews")
-    async def therapist_reviews(request: Request):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    """SELECT id, first_name, last_name, company_email, profile_image, 
-                            rating, review_count
-                       FROM Therapists 
-                       WHERE id = %s""", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-
-                if not therapist:
-                    return RedirectResponse(url="/Therapist_Login")
-
- 
-                cursor.execute(
-                    """SELECT r.review_id, r.rating, r.comment, r.created_at, 
-                             p.patient_id, p.first_name, p.last_name
-                       FROM Reviews r
-                       JOIN Patients p ON r.patient_id = p.patient_id
-                       WHERE r.therapist_id = %s
-                       ORDER BY r.created_at DESC""",
-                    (session_data["user_id"],)
-                )
-                reviews = cursor.fetchall()
-
- 
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
-
- 
-                for review in reviews:
-                    if isinstance(review['created_at'], datetime.datetime):
-                        review['formatted_date'] = review['created_at'].strftime('%B %d, %Y')
-
- 
-                rating_distribution = {
-                    5: 0,
-                    4: 0,
-                    3: 0,
-                    2: 0,
-                    1: 0
-                }
+@app.get("/admin/slow-queries", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def list_slow_queries(route: Optional[str] = None):
+    """Recent slow MySQL statements with redacted parameters and, when captured, their EXPLAIN plan"""
+    entries = [entry for entry in slow_queries if route is None or entry["route"] == route]
+    return JSONResponse(content=json.loads(json.dumps({"status": "valid", "queries": entries[::-1]}, default=str)))
 
-                for review in reviews:
-                    rating = int(review['rating'])
-                    if rating < 1:
-                        rating = 1
-                    elif rating > 5:
-                        rating = 5
-                    rating_distribution[rating] += 1
+@app.get("/admin/profiles", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def list_request_profiles(route: Optional[str] = None):
+    """Stored request profiles, newest first"""
+    return {"status": "valid", "profiles": await asyncio.to_thread(list_profiles, route)}
 
- 
-                total_reviews = len(reviews)
-                rating_percentages = {}
-                for rating, count in rating_distribution.items():
-                    if total_reviews > 0:
-                        rating_percentages[rating] = (count / total_reviews) * 100
-                    else:
-                        rating_percentages[rating] = 0
-
-                return templates.TemplateResponse(
-                    "dist/dashboard/Therapist_reviews.html",
-                    {
-                        "request": request,
-                        "therapist": therapist,
-                        "first_name": therapist["first_name"],
-                        "last_name": therapist["last_name"],
-                        "unread_messages_count": unread_messages_count,
-                        "reviews": reviews,
-                        "rating_distribution": rating_distribution,
-                        "rating_percentages": rating_percentages,
-                        "total_reviews": total_reviews
-                    }
-                )
-
-            except Exception as e:
-                print(f"Database error in therapist reviews: {e}")
-                return RedirectResponse(url="/profile")
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in therapist reviews: {e}")
-            return RedirectResponse(url="/Therapist_Login")
-
-    @app.post("/api/reviews/{review_id}/reply")
-    async def reply_to_review(
-        request: Request,
-        review_id: int,
-        reply: str = Form(...)
-    ):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(status_code=401, content={"success": False, "message": "Not authenticated"})
+@app.get("/admin/profiles/{profile_id}", include_in_schema=False, dependencies=[Depends(require_admin)])
+async def get_request_profile(profile_id: str, format: str = "summary"):
+    """
+    One stored profile: `summary` (timings and MySQL breakdown), `speedscope`
+    (open in https://www.speedscope.app) or `flamegraph` (HTML)
+    """
+    if not re.fullmatch(r"[\w-]+", profile_id) or format not in ("summary", "speedscope", "flamegraph"):
+        return JSONResponse(status_code=400, content={"status": "invalid", "detail": "Invalid profile request"})
+
+    summary = await asyncio.to_thread(load_profile, profile_id)
+    if summary is None:
+        return JSONResponse(status_code=404, content={"status": "invalid", "detail": "Profile not found"})
+    if format == "speedscope":
+        return FileResponse(profile_path(profile_id, "speedscope.json"), media_type="application/json",
+                            filename=f"{profile_id}.speedscope.json")
+    if format == "flamegraph":
+        return FileResponse(profile_path(profile_id, "html"), media_type="text/html")
+    return {"status": "valid", "profile": summary}
+
+def Routes(role=None):
+    """
+    Mount the per-domain routers for this deployment role (DEPLOYMENT_ROLE, default "all").
+    Template assets under /dist are only served when a template-rendering router is mounted.
+    """
+    role = role or get_deployment_role()
+    domains = include_routers(app, role)
 
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(status_code=401, content={"success": False, "message": "Not authenticated"})
-
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    """SELECT review_id 
-                       FROM Reviews 
-                       WHERE review_id = %s AND therapist_id = %s""",
-                    (review_id, session_data["user_id"])
-                )
-                review = cursor.fetchone()
-
-                if not review:
-                    return JSONResponse(status_code=404, content={"success": False, "message": "Review not found"})
-
- 
-                cursor.execute(
-                    """UPDATE Reviews 
-                       SET therapist_reply = %s, 
-                           therapist_reply_date = CURRENT_TIMESTAMP
-                       WHERE review_id = %s""",
-                    (reply, review_id)
-                )
-                db.commit()
-
-                return JSONResponse(content={"success": True})
-
-            except Exception as e:
-                print(f"Database error in reply to review: {e}")
-                return JSONResponse(status_code=500, content={"success": False, "message": "Error replying to review"})
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in reply to review: {e}")
-            return JSONResponse(status_code=500, content={"success": False, "message": "Server error"})
-
-    @app.get("/dashboard")
-    async def dashboard(user = Depends(get_current_user)):
-        return {"message": f"Welcome, {user['username']}!", "user_id": user["user_id"]}
-
-    @app.post("/registerUser")
-    async def registerUser(result: Register): 
-        db = get_Mysql_db()
-        cursor = db.cursor()
-    
-        hashed_password = bcrypt.hashpw(result.password.encode("utf-8"), bcrypt.gensalt())
-
-        try:
-            cursor.execute(
-                "INSERT INTO users (username, email, password_hash) VALUES (%s, %s, %s)",
-                (result.username, result.email, hashed_password.decode("utf-8"))
-            )
-            db.commit()
-            return RedirectResponse(url="/", status_code=303)
-        except mysql.connector.IntegrityError:
-            return {"error": "Username or email already exists."}
-        finally:
-            cursor.close()
-            db.close()
-            
-    @app.route("/Register_User_Web", methods=["GET", "POST"])
-    async def Register_User_Web(request: Request):
-        form = await request.form()
-        first_name = form.get("first_name")
-        last_name = form.get("last_name")
-        company_email = form.get("company_email")
-        password = form.get("password")
-
-        if not all([first_name, last_name, company_email, password]):
-            return templates.TemplateResponse("dist/pages/register.html", {
-                "request": request,
-                "error": "All fields are required."
-            })
-
-        db = get_Mysql_db()
-        cursor = db.cursor()
-
-        hashed_password = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
-
-        try:
-            cursor.execute(
-                "INSERT INTO Therapists (first_name, last_name, company_email, password) VALUES (%s, %s, %s, %s)",
-                (first_name, last_name, company_email, hashed_password.decode("utf-8"))
-            )
-            db.commit()
-            return RedirectResponse(url="/", status_code=303)
-        except mysql.connector.IntegrityError:
-            return templates.TemplateResponse("dist/pages/register.html", {
-                "request": request,
-                "error": "Therapist with this email already exists."
-            })
-        finally:
-            cursor.close()
-            db.close()
-
-    active_sessions: Dict[str, SessionData] = {}
-
-    @app.post("/loginUser")
-    async def loginUser(result: Login, response: Response):
-        db = get_Mysql_db()
-        cursor = db.cursor()
-
-        try:
-            cursor.execute(
-                "SELECT user_id, password_hash FROM users WHERE username = %s",
-                (result.username,)
-            )
-            user = cursor.fetchone()
-
-            if user is None:
-                raise HTTPException(status_code=401, detail="Invalid username or password")
-
-            user_id, stored_password_hash = user[0], user[1].encode("utf-8")
-
-            if bcrypt.checkpw(result.password.encode("utf-8"), stored_password_hash):
-                session_id = await create_session(
-                    user_id=user_id, 
-                    email=result.username,
-                )
-
-                response.set_cookie(
-                    key="session_id", 
-                    value=session_id, 
-                    httponly=True,
-                    samesite="lax",
-                    path="/"
-                )
-                print("response 152", response)
-
-                return {"status": "valid"}
-            else:
-                raise HTTPException(status_code=401, detail="Invalid username or password")
-        finally:
-            cursor.close()
-            db.close()
-            
-    @app.get("/getUserInfo") 
-    async def get_user_info(request: Request):
-        session_id = request.cookies.get("session_id")
-
-        if not session_id:
-            raise HTTPException(status_code=401, detail="Session not found") 
-
-        session_data = await get_session_data(session_id)
-
-        if not session_data:
-            raise HTTPException(status_code=401, detail="Invalid session")
-
-        user_id = session_data.user_id  
-
-        db = get_Mysql_db()
-        cursor = db.cursor()
-
-        try:
-            cursor.execute("SELECT username, email, created_at FROM users WHERE user_id = %s", (user_id,))
-            row = cursor.fetchone()
-
-            if not row:
-                raise HTTPException(status_code=404, detail="User not found")
-
-            username, email, created_at = row
-            return {
-                "username": username,
-                "email": email,
-                "joined": str(created_at)
-            }
-
-        finally:
-            cursor.close()
-            db.close()
-
-
-    @app.post("/logout")
-    async def logout(request: Request):
-        session_id = request.cookies.get("session_id")
-
-        if session_id:
-            await delete_session(session_id)
-
-        response = JSONResponse(content={"message": "Logged out"})
-        response.delete_cookie("session_id")
-        return response
-    
-    @app.get("/logout")
-    async def logout_get(request: Request):
-        session_id = request.cookies.get("session_id")
-        if session_id:
-            await delete_session(session_id)
-        response = RedirectResponse(url="/Therapist_Login")
-        response.delete_cookie("session_id")
-        return response
-
-    async def create_session(user_id: int, email: str, remember: bool = False) -> str:
-        session_id = secrets.token_hex(16)
-
-        if remember:
-            expires = datetime.datetime.now() + datetime.timedelta(days=30)
-        else:
-            expires = datetime.datetime.now() + datetime.timedelta(hours=24)
-
-        active_sessions[session_id] = SessionData(
-            user_id=user_id,
-            email=email,
-            expires=expires
-        )
-
-        return session_id
-
-    async def delete_session(session_id: str) -> None:
-        if session_id in active_sessions:
-            del active_sessions[session_id]
-
-    async def get_session_data(session_id: str) -> Optional[SessionData]:
-        session = active_sessions.get(session_id)
-
-        if not session:
-            return None
-
-        if session.expires < datetime.datetime.now():
-            await delete_session(session_id)
-            return None
-
-        return session
-
-    @app.get("/Therapist_Login")
-    async def therapist_login_page(request: Request):
-        session_id = request.cookies.get("session_id")
-        if session_id:
-            session = await get_session_data(session_id)
-            if session:
-                return RedirectResponse(url="/front-page")
-
-        return templates.TemplateResponse("dist/pages/login.html", {"request": request})
-
-
-    @app.post("/Therapist_Login")
-    async def therapist_login(
-        request: Request,
-        email: str = Form(...),
-        password: str = Form(...),
-        remember: bool = Form(False)
-    ):
-        db = get_Mysql_db()
-        cursor = db.cursor(dictionary=True)
-
-        try:
-            cursor.execute(
-                "SELECT id, company_email, password, first_name, last_name FROM Therapists WHERE company_email = %s",
-                (email,)
-            )
-            therapist = cursor.fetchone()
-
-            if not therapist:
-                return templates.TemplateResponse(
-                    "dist/pages/login.html",
-                    {"request": request, "error": "Invalid email or password"}
-                )
-
-            stored_password = therapist["password"]
-
-            if bcrypt.checkpw(password.encode('utf-8'), stored_password.encode('utf-8')):
-                session_data = {
-                    "user_id": str(therapist["id"]),
-                    "email": therapist["company_email"]
-                }
-
-                session_id = await create_redis_session(
-                    data=session_data,
-                )
-
-                print(f"Session created: {session_id}")
-                print(f"User ID: {therapist['id']}")
-
-                response = RedirectResponse(url="/front-page", status_code=303)
-
-                response.set_cookie(
-                    key="session_id",
-                    value=session_id,
-                    httponly=True,
-                    samesite="lax"
-                )
-
-                print(f"Response created with cookie: {response.headers}")
-                return response
-            else:
-                return templates.TemplateResponse(
-                    "dist/pages/login.html",
-                    {"request": request, "error": "Invalid email or password"}
-                )
-
-        except Exception as e:
-            print(f"Login error: {e}")
-            return templates.TemplateResponse(
-                "dist/pages/login.html",
-                {"request": request, "error": f"Server error: {str(e)}"}
-            )
-
-        finally:
-            cursor.close()
-            db.close()
-            
-    @app.get("/reports/patients")
-    async def patient_reports(request: Request):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    """SELECT id, first_name, last_name, profile_image
-                    FROM Therapists 
-                    WHERE id = %s""", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-
-                if not therapist:
-                    return RedirectResponse(url="/Therapist_Login")
-
- 
-                cursor.execute(
-                    """SELECT patient_id, first_name, last_name, diagnosis, status
-                    FROM Patients 
-                    WHERE therapist_id = %s
-                    ORDER BY last_name, first_name""",
-                    (session_data["user_id"],)
-                )
-                patients = cursor.fetchall()
-
- 
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
-
-                return templates.TemplateResponse(
-                    "dist/reports/patient_reports.html",
-                    {
-                        "request": request,
-                        "therapist": therapist,
-                        "first_name": therapist["first_name"],
-                        "last_name": therapist["last_name"],
-                        "unread_messages_count": unread_messages_count,
-                        "patients": patients
-                    }
-                )
-
-            except Exception as e:
-                print(f"Database error in patient reports: {e}")
-                return RedirectResponse(url="/front-page")
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in patient reports: {e}")
-            return RedirectResponse(url="/Therapist_Login")
-
-
-    @app.get("/reports/patients/{patient_id}")
-    async def patient_detailed_report(request: Request, patient_id: int):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    """SELECT id, first_name, last_name, profile_image
-                    FROM Therapists 
-                    WHERE id = %s""", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-
-                if not therapist:
-                    return RedirectResponse(url="/Therapist_Login")
-
- 
-                cursor.execute(
-                    """SELECT * FROM Patients 
-                    WHERE patient_id = %s AND therapist_id = %s""",
-                    (patient_id, session_data["user_id"])
-                )
-                patient = cursor.fetchone()
-
-                if not patient:
-                    return RedirectResponse(url="/reports/patients")
-
- 
-                cursor.execute(
-                    """SELECT pep.*, tpe.sets, tpe.repetitions,
-                            e.name as exercise_name, e.video_url, e.difficulty
-                    FROM PatientExerciseProgress pep
-                    JOIN TreatmentPlanExercises tpe ON pep.plan_exercise_id = tpe.plan_exercise_id
-                    JOIN Exercises e ON tpe.exercise_id = e.exercise_id
-                    JOIN TreatmentPlans tp ON tpe.plan_id = tp.plan_id
-                    WHERE tp.patient_id = %s
-                    ORDER BY pep.completion_date DESC, pep.modified_at DESC""",
-                    (patient_id,)
-                )
-                exercise_history = cursor.fetchall()
-
- 
-                cursor.execute(
-                    """SELECT * FROM TreatmentPlans
-                    WHERE patient_id = %s
-                    ORDER BY created_at DESC""",
-                    (patient_id,)
-                )
-                treatment_plans = cursor.fetchall()
-
- 
-                cursor.execute(
-                    """SELECT * FROM PatientMetrics
-                    WHERE patient_id = %s
-                    ORDER BY measurement_date DESC""",
-                    (patient_id,)
-                )
-                patient_metrics = cursor.fetchall()
-
- 
-                cursor.execute(
-                    """SELECT * FROM feedback
-                    WHERE patient_id = %s
-                    ORDER BY created_at DESC""",
-                    (patient_id,)
-                )
-                patient_feedback = cursor.fetchall()
-
- 
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
-
-                return templates.TemplateResponse(
-                    "dist/reports/patient_detailed_report.html",
-                    {
-                        "request": request,
-                        "therapist": therapist,
-                        "first_name": therapist["first_name"],
-                        "last_name": therapist["last_name"],
-                        "unread_messages_count": unread_messages_count,
-                        "patient": patient,
-                        "exercise_history": exercise_history,
-                        "treatment_plans": treatment_plans,
-                        "patient_metrics": patient_metrics,
-                        "patient_feedback": patient_feedback
-                    }
-                )
-
-            except Exception as e:
-                print(f"Database error in patient detailed report: {e}")
-                return RedirectResponse(url="/reports/patients")
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in patient detailed report: {e}")
-            return RedirectResponse(url="/Therapist_Login")
-
-
-
-
-    @app.post("/exercises/add")
-    async def add_exercise(
-        request: Request,
-        name: str = Form(...),
-        category_id: Optional[int] = Form(None),
-        description: Optional[str] = Form(None),
-        video_source: Optional[str] = Form(None),
-        video_url: Optional[str] = Form(None),
-        difficulty: Optional[str] = Form(None),
-        duration: Optional[int] = Form(None),
-        instructions: Optional[str] = Form(None),
-        video_upload: Optional[UploadFile] = File(None),
-        user = Depends(get_current_user)
-    ):
-        """Route to handle adding a new exercise with large file upload support"""
-        db = get_Mysql_db()
-        cursor = None
-        
-        try:
-            cursor = db.cursor()
-            
-
-            final_video_url = None
-            video_type = 'none'
-            video_size = None
-            video_filename = None
-            
-
-            if video_source == 'youtube' and video_url:
-                final_video_url = video_url
-                video_type = 'youtube'
-            
-
-            elif video_source == 'upload' and video_upload and video_upload.filename:
-
-                current_file = Path(__file__).resolve()
-                project_root = current_file.parent.parent.parent
-                uploads_dir = project_root / "Frontend_Web" / "static" / "assets" / "videos" / "exercises"
-                uploads_dir.mkdir(parents=True, exist_ok=True)
-                
-
-                video_filename = video_upload.filename
-                
-
-                file_extension = video_filename.split(".")[-1].lower()
-                unique_filename = f"exercise_{int(time.time())}_{secrets.token_hex(4)}.{file_extension}"
-                file_path = uploads_dir / unique_filename
-                
-
-                video_content = await video_upload.read()
-                video_size = len(video_content)
-                
-
-                async with aiofiles.open(file_path, "wb") as f:
-                    await f.write(video_content)
-                
-
-                final_video_url = f"/static/assets/videos/exercises/{unique_filename}"
-                video_type = 'upload'
-            
-
-            cursor.execute(
-                """INSERT INTO Exercises 
-                (name, category_id, description, video_url, video_type, video_size, video_filename, 
-                difficulty, duration, instructions) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-                (name, category_id, description, final_video_url, video_type, video_size, 
-                video_filename, difficulty, duration, instructions)
-            )
-            db.commit()
-            
-            return RedirectResponse(url="/exercises", status_code=303)
-        except Exception as e:
-            if db:
-                db.rollback()
-            print(f"Error adding exercise: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            
-            categories = await get_exercise_categories()
-            
-            therapist_data = await get_therapist_data(user["user_id"])
-            return templates.TemplateResponse(
-                "dist/exercises/add_exercise.html", 
-                {
-                    "request": request,
-                    "error": f"Error adding exercise: {str(e)}",
-                    "categories": categories,
-                    "first_name": therapist_data["first_name"],
-                    "last_name": therapist_data["last_name"]
-                },
-                status_code=400
-            )
-        finally:
-            if cursor:
-                cursor.close()
-            if db:
-                db.close()
-                
-    @app.get("/exercises/{exercise_id}/edit")
-    async def edit_exercise_form(
-        request: Request,
-        exercise_id: int,
-        user = Depends(get_current_user)
-    ):
-        """Route to display the edit exercise form"""
-        db = get_Mysql_db()
-        cursor = None
-        
-        try:
-            cursor = db.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM Exercises WHERE exercise_id = %s", (exercise_id,))
-            exercise = cursor.fetchone()
-            
-            if not exercise:
-                return RedirectResponse(url="/exercises", status_code=303)
-            
-            cursor.execute("SELECT * FROM ExerciseCategories ORDER BY name")
-            categories = cursor.fetchall()
-            
-            therapist_data = await get_therapist_data(user["user_id"])
-            
-            return templates.TemplateResponse(
-                "dist/exercises/edit_exercise.html", 
-                {
-                    "request": request,
-                    "exercise": exercise,
-                    "categories": categories,
-                    "first_name": therapist_data["first_name"],
-                    "last_name": therapist_data["last_name"]
-                }
-            )
-        except Exception as e:
-            print(f"Error loading edit exercise form: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/exercises", status_code=303)
-        finally:
-            if cursor:
-                cursor.close()
-            if db:
-                db.close()
-
-    @app.post("/exercises/{exercise_id}/edit")
-    async def update_exercise(
-        request: Request,
-        exercise_id: int,
-        name: str = Form(...),
-        category_id: Optional[int] = Form(None),
-        description: Optional[str] = Form(None),
-        difficulty: Optional[str] = Form(None),
-        duration: Optional[int] = Form(None),
-        instructions: Optional[str] = Form(None),
-        keep_current_video: Optional[str] = Form(None),
-        video_source: Optional[str] = Form(None),
-        video_url: Optional[str] = Form(None),
-        video_upload: Optional[UploadFile] = File(None),
-        user = Depends(get_current_user)
-    ):
-        """Route to handle updating an exercise"""
-        db = get_Mysql_db()
-        cursor = None
-        
-        try:
-            cursor = db.cursor(dictionary=True)
-            
-            cursor.execute("SELECT * FROM Exercises WHERE exercise_id = %s", (exercise_id,))
-            exercise = cursor.fetchone()
-            
-            if not exercise:
-                return RedirectResponse(url="/exercises")
-            
-
-            final_video_url = exercise['video_url']  # Keep existing by default
-            video_type = exercise.get('video_type', 'none') # Keep existing type
-            video_size = exercise.get('video_size', None)  # Keep existing size
-            video_filename = exercise.get('video_filename', None)  # Keep existing filename
-            
-
-            if not keep_current_video:
-                if video_source == 'youtube' and video_url:
-                    final_video_url = video_url
-                    video_type = 'youtube'
-                    video_size = None
-                    video_filename = None
-                    
-                elif video_source == 'upload' and video_upload and video_upload.filename:
-
-                    current_file = Path(__file__).resolve()
-                    project_root = current_file.parent.parent.parent
-                    uploads_dir = project_root / "Frontend_Web" / "static" / "assets" / "videos" / "exercises"
-                    uploads_dir.mkdir(parents=True, exist_ok=True)
-                    
-
-                    video_filename = video_upload.filename
-                    
-
-                    file_extension = video_filename.split(".")[-1].lower()
-                    unique_filename = f"exercise_{exercise_id}_{int(time.time())}_{secrets.token_hex(4)}.{file_extension}"
-                    file_path = uploads_dir / unique_filename
-                    
-
-                    video_content = await video_upload.read()
-                    video_size = len(video_content)
-                    
-
-                    async with aiofiles.open(file_path, "wb") as f:
-                        await f.write(video_content)
-                    
-
-                    old_video_url = exercise['video_url']
-                    old_video_type = exercise.get('video_type', '')
-                    
-                    if old_video_url and old_video_type == 'upload':
-                        try:
-                            old_video_path = Path(project_root) / "Frontend_Web" / old_video_url.lstrip('/')
-                            if os.path.exists(old_video_path):
-                                os.remove(old_video_path)
-                                print(f"Deleted old video: {old_video_path}")
-                        except Exception as e:
-                            print(f"Error deleting old video: {e}")
-                    
-
-                    final_video_url = f"/static/assets/videos/exercises/{unique_filename}"
-                    video_type = 'upload'
-                else:
-
-                    final_video_url = None
-                    video_type = 'none'
-                    video_size = None
-                    video_filename = None
-            
-
-            cursor.execute(
-                """UPDATE Exercises 
-                SET name = %s, category_id = %s, description = %s, 
-                    video_url = %s, video_type = %s, video_size = %s, video_filename = %s,
-                    difficulty = %s, duration = %s, instructions = %s, 
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE exercise_id = %s""",
-                (name, category_id, description, final_video_url, video_type, video_size, 
-                video_filename, difficulty, duration, instructions, exercise_id)
-            )
-            db.commit()
-            
-            return RedirectResponse(url=f"/exercises", status_code=303)
-        except Exception as e:
-            if db:
-                db.rollback()
-            print(f"Error updating exercise: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            
-            categories = []
-            try:
-                cursor.execute("SELECT * FROM ExerciseCategories ORDER BY name")
-                categories = cursor.fetchall()
-            except:
-                pass
-            
-            therapist_data = await get_therapist_data(user["user_id"])
-            
-            return templates.TemplateResponse(
-                "dist/exercises/edit_exercise.html", 
-                {
-                    "request": request,
-                    "exercise": exercise,
-                    "categories": categories,
-                    "first_name": therapist_data["first_name"],
-                    "last_name": therapist_data["last_name"],
-                    "error": f"Error updating exercise: {str(e)}"
-                },
-                status_code=400
-            )
-        finally:
-            if cursor:
-                cursor.close()
-            if db:
-                db.close()
-
-    @app.post("/exercises/delete")
-    async def delete_exercise(
-        request: Request,
-        exercise_id: int = Form(...),
-        user = Depends(get_current_user)
-    ):
-        """Route to delete an exercise"""
-        db = get_Mysql_db()
-        cursor = None
-        
-        try:
-            cursor = db.cursor(dictionary=True)
-            
-            cursor.execute(
-                "SELECT video_url, video_type FROM Exercises WHERE exercise_id = %s", 
-                (exercise_id,)
-            )
-            exercise = cursor.fetchone()
-            
-            if exercise and exercise['video_url'] and exercise.get('video_type') == 'upload':
-                try:
-                    current_file = Path(__file__).resolve()
-                    project_root = current_file.parent.parent.parent
-                    video_path = project_root / "Frontend_Web" / exercise['video_url'].lstrip('/')
-                    
-                    if os.path.exists(video_path):
-                        os.remove(video_path)
-                        print(f"Deleted video file: {video_path}")
-                except Exception as e:
-                    print(f"Error deleting video file: {e}")
-            
-            cursor.execute(
-                "DELETE FROM Exercises WHERE exercise_id = %s", 
-                (exercise_id,)
-            )
-            db.commit()
-            
-            return RedirectResponse(url="/exercises", status_code=303)
-        except Exception as e:
-            if db:
-                db.rollback()
-            print(f"Error deleting exercise: {e}")
-            return RedirectResponse(url="/exercises", status_code=303)
-        finally:
-            if cursor:
-                cursor.close()
-            if db:
-                db.close()
-    
-    @app.post("/api/exercises/rate")
-    async def rate_exercise(
-        request: Request,
-        exercise_progress_id: int = Form(...),
-        rating: int = Form(...),
-        feedback: str = Form(None)
-    ):
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(status_code=401, content={"success": False, "message": "Not authenticated"})
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(status_code=401, content={"success": False, "message": "Not authenticated"})
-
- 
-            if rating < 1 or rating > 5:
-                return JSONResponse(status_code=400, content={"success": False, "message": "Rating must be between 1 and 5"})
-
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    """SELECT pep.progress_id 
-                    FROM PatientExerciseProgress pep
-                    JOIN TreatmentPlanExercises tpe ON pep.plan_exercise_id = tpe.plan_exercise_id
-                    JOIN TreatmentPlans tp ON tpe.plan_id = tp.plan_id
-                    JOIN Patients p ON tp.patient_id = p.patient_id
-                    WHERE pep.progress_id = %s AND p.therapist_id = %s""",
-                    (exercise_progress_id, session_data["user_id"])
-                )
-                progress = cursor.fetchone()
-
-                if not progress:
-                    return JSONResponse(status_code=404, content={"success": False, "message": "Exercise progress not found"})
-
- 
-                cursor.execute(
-                    """UPDATE PatientExerciseProgress 
-                    SET therapist_rating = %s, therapist_feedback = %s
-                    WHERE progress_id = %s""",
-                    (rating, feedback, exercise_progress_id)
-                )
-                db.commit()
-
-                return JSONResponse(content={"success": True})
-
-            except Exception as e:
-                print(f"Database error in rate exercise: {e}")
-                return JSONResponse(status_code=500, content={"success": False, "message": "Error updating rating"})
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in rate exercise: {e}")
-            return JSONResponse(status_code=500, content={"success": False, "message": "Server error"})
-
-            
-    @app.get("/patients")
-    async def get_patients_page(request: Request, user=Depends(get_current_user)):
-        db = get_Mysql_db()
-        cursor = db.cursor(dictionary=True)
-
-        try:
-            cursor.execute(
-                "SELECT * FROM Patients WHERE therapist_id = %s ORDER BY last_name", 
-                (user["user_id"],)
-            )
-            patients = cursor.fetchall()
-
-            therapist_data = await get_therapist_data(user["user_id"])
-
-            return templates.TemplateResponse(
-                "dist/dashboard/patient_directory.html", 
-                {
-                    "request": request,
-                    "patients": patients,
-                    "first_name": therapist_data["first_name"],
-                    "last_name": therapist_data["last_name"]
-                }
-            )
-        finally:
-            cursor.close()
-            db.close()
-
-    @app.get("/patients/add")
-    async def add_patient_page(request: Request, user=Depends(get_current_user)):
-        therapist_data = await get_therapist_data(user["user_id"])
-
-        return templates.TemplateResponse(
-            "dist/dashboard/add_patient.html", 
-            {
-                "request": request,
-                "first_name": therapist_data["first_name"],
-                "last_name": therapist_data["last_name"]
-            }
-        )
-
-    @app.post("/patients/add")
-    async def add_patient(
-        request: Request,
-        first_name: str = Form(...),
-        last_name: str = Form(...),
-        email: str = Form(None),
-        phone: str = Form(None),
-        date_of_birth: str = Form(None),
-        address: str = Form(None),
-        diagnosis: str = Form(None),
-        notes: str = Form(None),
-        user=Depends(get_current_user)
-    ):
-        db = get_Mysql_db()
-        cursor = db.cursor()
-
-        try:
-            cursor.execute(
-                """INSERT INTO Patients 
-                (therapist_id, first_name, last_name, email, phone, date_of_birth, 
-                address, diagnosis, notes) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)""",
-                (user["user_id"], first_name, last_name, email, phone, 
-                date_of_birth, address, diagnosis, notes)
-            )
-            db.commit()
-            return RedirectResponse(url="/patients", status_code=303)
-        except Exception as e:
-            print(f"Error adding patient: {e}")
-            therapist_data = await get_therapist_data(user["user_id"])
-            return templates.TemplateResponse(
-                "dist/dashboard/add_patient.html", 
-                {
-                    "request": request,
-                    "error": f"Error adding patient: {str(e)}",
-                    "first_name": therapist_data["first_name"],
-                    "last_name": therapist_data["last_name"],
-                    "today": datetime.datetime.now()
-                }
-            )
-        finally:
-            cursor.close()
-            db.close()
-
-    @app.get("/patients/{patient_id}")
-    async def patient_detail(request: Request, patient_id: int, user=Depends(get_current_user)):
-        db = get_Mysql_db()
-        cursor = db.cursor(dictionary=True)
-
-        try:
-            cursor.execute(
-                "SELECT * FROM Patients WHERE patient_id = %s AND therapist_id = %s", 
-                (patient_id, user["user_id"])
-            )
-            patient = cursor.fetchone()
-
-            if not patient:
-                return RedirectResponse(url="/patients")
-
-            cursor.execute(
-                "SELECT * FROM TreatmentPlans WHERE patient_id = %s ORDER BY created_at DESC", 
-                (patient_id,)
-            )
-            treatment_plans = cursor.fetchall()
-
-            cursor.execute(
-                """SELECT * FROM Appointments 
-                WHERE patient_id = %s 
-                ORDER BY appointment_date DESC, appointment_time DESC 
-                LIMIT 5""", 
-                (patient_id,)
-            )
-            appointments = cursor.fetchall()
-
-            cursor.execute(
-                """SELECT * FROM PatientMetrics 
-                WHERE patient_id = %s 
-                ORDER BY measurement_date DESC 
-                LIMIT 10""", 
-                (patient_id,)
-            )
-            metrics = cursor.fetchall()
-
-            therapist_data = await get_therapist_data(user["user_id"])
-
-            return templates.TemplateResponse(
-                "dist/dashboard/patient_details.html", 
-                {
-                    "request": request,
-                    "patient": patient,
-                    "treatment_plans": treatment_plans,
-                    "appointments": appointments,
-                    "metrics": metrics,
-                    "first_name": therapist_data["first_name"],
-                    "last_name": therapist_data["last_name"],
-                    "today": datetime.datetime.now().date()
-                }
-            )
-        finally:
-            cursor.close()
-            db.close()
-            
-    @app.get("/treatment-plans/{plan_id}/edit")
-    async def edit_treatment_plan_form(request: Request, plan_id: int):
-        """Route to display the edit treatment plan form"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-        
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-            
-            db = get_Mysql_db()
-            cursor = None
-            
-            try:
-                cursor = db.cursor(dictionary=True)
-                
-
-                cursor.execute(
-                    """SELECT tp.*, p.first_name as patient_first_name, p.last_name as patient_last_name
-                    FROM TreatmentPlans tp
-                    JOIN Patients p ON tp.patient_id = p.patient_id
-                    WHERE tp.plan_id = %s AND tp.therapist_id = %s""",
-                    (plan_id, session_data["user_id"])
-                )
-                plan = cursor.fetchone()
-                
-                if not plan:
-                    return RedirectResponse(url="/treatment-plans", status_code=303)
-                
-
-                cursor.execute(
-                    """SELECT tpe.*, e.name as exercise_name, e.difficulty, e.duration as exercise_duration
-                    FROM TreatmentPlanExercises tpe
-                    JOIN Exercises e ON tpe.exercise_id = e.exercise_id
-                    WHERE tpe.plan_id = %s
-                    ORDER BY tpe.plan_exercise_id""",
-                    (plan_id,)
-                )
-                plan_exercises = cursor.fetchall()
-                
-
-                cursor.execute(
-                    "SELECT patient_id, first_name, last_name FROM Patients WHERE therapist_id = %s",
-                    (session_data["user_id"],)
-                )
-                patients = cursor.fetchall()
-                
-
-                cursor.execute("SELECT * FROM Exercises ORDER BY name")
-                exercises = cursor.fetchall()
-                
-
-                therapist_data = await get_therapist_data(session_data["user_id"])
-                
-                return templates.TemplateResponse(
-                    "dist/treatment_plans/edit_plan.html",
-                    {
-                        "request": request,
-                        "plan": plan,
-                        "plan_exercises": plan_exercises,
-                        "patients": patients,
-                        "exercises": exercises,
-                        "first_name": therapist_data["first_name"],
-                        "last_name": therapist_data["last_name"]
-                    }
-                )
-            except Exception as e:
-                print(f"Error loading edit treatment plan form: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return RedirectResponse(url="/treatment-plans", status_code=303)
-            finally:
-                if cursor:
-                    cursor.close()
-                if db:
-                    db.close()
-        except Exception as e:
-            print(f"Unexpected error in edit treatment plan form: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/front-page", status_code=303)
-
-    @app.post("/treatment-plans/{plan_id}/edit")
-    async def update_treatment_plan(request: Request, plan_id: int):
-        """Route to handle updating a treatment plan"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-        
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-            
-
-            form = await request.form()
-            print("RECEIVED FORM DATA FOR UPDATE:", dict(form))
-            
-
-            patient_id = form.get("patient_id")
-            plan_name = form.get("plan_name")
-            description = form.get("description", "")
-            start_date = form.get("start_date")
-            end_date = form.get("end_date")
-            status = form.get("status", "Active")
-            
-            print(f"Plan update details: ID={plan_id}, patient={patient_id}, name={plan_name}")
-            
-
-            if not patient_id or not plan_name or not start_date:
-                print("Missing required fields in update")
-                return RedirectResponse(f"/treatment-plans/{plan_id}/edit?error=missing_fields", status_code=303)
-            
-            db = get_Mysql_db()
-            cursor = None
-            
-            try:
-                cursor = db.cursor()
-                
-
-                cursor.execute(
-                    "SELECT plan_id FROM TreatmentPlans WHERE plan_id = %s AND therapist_id = %s",
-                    (plan_id, session_data["user_id"])
-                )
-                if not cursor.fetchone():
-                    return RedirectResponse(url="/treatment-plans", status_code=303)
-                
-
-                cursor.execute(
-                    """UPDATE TreatmentPlans 
-                    SET patient_id = %s, name = %s, description = %s, 
-                        start_date = %s, end_date = %s, status = %s
-                    WHERE plan_id = %s""",
-                    (patient_id, plan_name, description, start_date, end_date, status, plan_id)
-                )
-                
-
-                existing_exercise_ids = form.getlist("existing_exercise_id")
-                keep_exercises = form.getlist("keep_exercise")
-                
-
-                cursor.execute(
-                    "SELECT plan_exercise_id FROM TreatmentPlanExercises WHERE plan_id = %s",
-                    (plan_id,)
-                )
-                current_exercise_ids = [row[0] for row in cursor.fetchall()]
-                
-
-                for ex_id in current_exercise_ids:
-                    if str(ex_id) not in keep_exercises:
-                        cursor.execute(
-                            "DELETE FROM TreatmentPlanExercises WHERE plan_exercise_id = %s",
-                            (ex_id,)
-                        )
-                        print(f"Deleted exercise ID: {ex_id}")
-                
-
-                for i, ex_id in enumerate(keep_exercises):
-                    if not ex_id:
-                        continue
-                        
-                    prefix = f"existing_{ex_id}_"
-                    ex_sets = form.get(f"{prefix}sets")
-                    ex_reps = form.get(f"{prefix}repetitions")
-                    ex_freq = form.get(f"{prefix}frequency")
-                    ex_duration = form.get(f"{prefix}duration")
-                    ex_notes = form.get(f"{prefix}notes")
-                    
-                    cursor.execute(
-                        """UPDATE TreatmentPlanExercises
-                        SET sets = %s, repetitions = %s, frequency = %s, 
-                            duration = %s, notes = %s
-                        WHERE plan_exercise_id = %s""",
-                        (ex_sets, ex_reps, ex_freq, ex_duration, ex_notes, ex_id)
-                    )
-                    print(f"Updated exercise ID: {ex_id}")
-                
-
-                new_exercises = form.getlist("new_exercise_id")
-                new_sets = form.getlist("new_sets")
-                new_reps = form.getlist("new_repetitions")
-                new_freq = form.getlist("new_frequency")
-                new_duration = form.getlist("new_duration")
-                new_notes = form.getlist("new_notes")
-                
-                for i, ex_id in enumerate(new_exercises):
-                    if not ex_id or ex_id == "":
-                        continue
-                        
-                    ex_sets = new_sets[i] if i < len(new_sets) else None
-                    ex_reps = new_reps[i] if i < len(new_reps) else None
-                    ex_freq = new_freq[i] if i < len(new_freq) else None
-                    ex_duration = new_duration[i] if i < len(new_duration) else None
-                    ex_notes = new_notes[i] if i < len(new_notes) else None
-                    
-                    cursor.execute(
-                        """INSERT INTO TreatmentPlanExercises
-                        (plan_id, exercise_id, sets, repetitions, frequency, duration, notes)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                        (plan_id, ex_id, ex_sets, ex_reps, ex_freq, ex_duration, ex_notes)
-                    )
-                    print(f"Added new exercise ID: {ex_id}")
-                
-                db.commit()
-                print(f"Treatment plan {plan_id} updated successfully")
-                
-                return RedirectResponse(url=f"/treatment-plans", status_code=303)
-            except Exception as e:
-                if db:
-                    db.rollback()
-                print(f"Database error in update treatment plan: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return RedirectResponse(f"/treatment-plans/{plan_id}/edit?error=db_error", status_code=303)
-            finally:
-                if cursor:
-                    cursor.close()
-                if db:
-                    db.close()
-        except Exception as e:
-            print(f"Unexpected error in update treatment plan: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/front-page", status_code=303)
-
-    @app.post("/treatment-plans/delete")
-    async def delete_treatment_plan(request: Request):
-        """Route to delete a treatment plan"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-        
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-            
-
-            form = await request.form()
-            plan_id_str = form.get("plan_id")
-            
-            print(f"Delete request for plan ID: {plan_id_str}")
-            
-            if not plan_id_str:
-                return RedirectResponse(url="/treatment-plans?error=no_plan_id", status_code=303)
-            
-            try:
-                plan_id = int(plan_id_str)
-            except ValueError:
-                return RedirectResponse(url="/treatment-plans?error=invalid_plan_id", status_code=303)
-            
-            db = get_Mysql_db()
-            cursor = None
-            
-            try:
-                cursor = db.cursor()
-                
-
-                cursor.execute(
-                    "SELECT plan_id FROM TreatmentPlans WHERE plan_id = %s AND therapist_id = %s",
-                    (plan_id, session_data["user_id"])
-                )
-                if not cursor.fetchone():
-                    return RedirectResponse(url="/treatment-plans?error=not_found", status_code=303)
-                
-
-
-                cursor.execute(
-                    "DELETE FROM TreatmentPlanExercises WHERE plan_id = %s",
-                    (plan_id,)
-                )
-                
-
-                cursor.execute(
-                    "DELETE FROM TreatmentPlans WHERE plan_id = %s",
-                    (plan_id,)
-                )
-                
-                db.commit()
-                print(f"Treatment plan {plan_id} deleted successfully")
-                
-                return RedirectResponse(url="/treatment-plans?success=deleted", status_code=303)
-            except Exception as e:
-                if db:
-                    db.rollback()
-                print(f"Database error in delete treatment plan: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return RedirectResponse(url="/treatment-plans?error=db_error", status_code=303)
-            finally:
-                if cursor:
-                    cursor.close()
-                if db:
-                    db.close()
-        except Exception as e:
-            print(f"Unexpected error in delete treatment plan: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/front-page", status_code=303)
-
-    
-    
-    @app.get("/appointments/new")
-    async def new_appointment_form(request: Request):
-        """Display the new appointment form"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-
-            db = get_Mysql_db()
-            cursor = None
-            
-            try:
-                cursor = db.cursor(dictionary=True)
-                
-                cursor.execute(
-                    "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-                
-                if not therapist:
-                    return RedirectResponse(url="/Therapist_Login")
-                
-                cursor.execute(
-                    """SELECT patient_id, first_name, last_name, diagnosis, phone
-                    FROM Patients 
-                    WHERE therapist_id = %s
-                    ORDER BY last_name, first_name""", 
-                    (session_data["user_id"],)
-                )
-                patients = cursor.fetchall()
-                
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
-                
-                cursor.execute(
-                    """SELECT m.message_id, m.subject, m.content, m.created_at, 
-                            t.first_name, t.last_name, COALESCE(t.profile_image, 'avatar-1.jpg') as profile_image
-                        FROM Messages m
-                        JOIN Therapists t ON m.sender_id = t.id
-                        WHERE m.recipient_id = %s AND m.is_read = FALSE
-                        ORDER BY m.created_at DESC
-                        LIMIT 4""",
-                    (session_data["user_id"],)
-                )
-                messages_result = cursor.fetchall()
-
-                recent_messages = []
-                for message in messages_result:
-                    message_with_time = message.copy()
-                    
-                    timestamp = message['created_at']
-                    now = datetime.datetime.now()
-                    if isinstance(timestamp, datetime.datetime):
-                        diff = now - timestamp
-                        if timestamp.date() == now.date():
-                            message_with_time['time_display'] = timestamp.strftime('%I:%M %p')
-                            
-                            minutes_ago = diff.seconds // 60
-                            if minutes_ago < 60:
-                                message_with_time['time_ago'] = f"{minutes_ago} min ago"
-                            else:
-                                hours_ago = minutes_ago // 60
-                                message_with_time['time_ago'] = f"{hours_ago} hours ago"
-                                
-                        elif timestamp.date() == (now - timedelta(days=1)).date():
-                            message_with_time['time_display'] = "Yesterday"
-                            message_with_time['time_ago'] = timestamp.strftime('%I:%M %p')
-                        else:
-                            message_with_time['time_display'] = timestamp.strftime('%d %b')
-                            message_with_time['time_ago'] = timestamp.strftime('%Y')
-                            
-                    recent_messages.append(message_with_time)
-                
-                today = datetime.datetime.now().strftime('%Y-%m-%d')
-                
-                return templates.TemplateResponse(
-                    "dist/appointments/new_appointment.html",
-                    {
-                        "request": request,
-                        "first_name": therapist["first_name"],
-                        "last_name": therapist["last_name"],
-                        "patients": patients,
-                        "unread_messages_count": unread_messages_count,
-                        "recent_messages": recent_messages,
-                        "today": today
-                    }
-                )
-            except Exception as e:
-                print(f"Database error in new appointment form: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return RedirectResponse(url="/appointments")
-            finally:
-                if cursor:
-                    cursor.close()
-                if db:
-                    db.close()
-        except Exception as e:
-            print(f"Error in new appointment form: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/Therapist_Login")
-
-    def process_appointment_for_calendar(appointment):
-        """Process an appointment object to make it suitable for calendar display"""
-        from datetime import datetime, date, time, timedelta  # Import at the top of the function
-        
-        processed = dict(appointment)
-        
-
-        if 'appointment_id' in processed and processed['appointment_id'] is not None:
-            processed['appointment_id'] = int(processed['appointment_id'])
-        
-
-        if 'appointment_date' in processed and processed['appointment_date'] is not None:
-            if isinstance(processed['appointment_date'], datetime) or isinstance(processed['appointment_date'], date):
-                processed['appointment_date_iso'] = processed['appointment_date'].isoformat()
-        
-
-        if 'appointment_time' in processed and processed['appointment_time'] is not None:
-            if isinstance(processed['appointment_time'], timedelta):
-                total_seconds = processed['appointment_time'].total_seconds()
-                hours = int(total_seconds // 3600)
-                minutes = int((total_seconds % 3600) // 60)
-                
-
-                processed['appointment_time_obj'] = {
-                    'hour': hours,
-                    'minute': minutes
-                }
-                
-
-                processed['appointment_time_24h'] = f"{hours:02d}:{minutes:02d}"
-                
-
-                am_pm = "AM" if hours < 12 else "PM"
-                display_hours = hours if hours <= 12 else hours - 12
-                display_hours = 12 if display_hours == 0 else display_hours
-                processed['appointment_time_12h'] = f"{display_hours}:{minutes:02d} {am_pm}"
-                
-
-                end_hours = hours + ((processed.get('duration', 60) + minutes) // 60)
-                end_minutes = (minutes + processed.get('duration', 60)) % 60
-                processed['end_time_24h'] = f"{end_hours:02d}:{end_minutes:02d}"
-                
-
-                processed['formatted_time'] = processed['appointment_time_12h']
-            
-            elif hasattr(processed['appointment_time'], 'hour'):
-
-                hours = processed['appointment_time'].hour
-                minutes = processed['appointment_time'].minute
-                
-
-                processed['appointment_time_obj'] = {
-                    'hour': hours,
-                    'minute': minutes
-                }
-                
-
-                processed['appointment_time_24h'] = f"{hours:02d}:{minutes:02d}"
-                
-
-                am_pm = "AM" if hours < 12 else "PM"
-                display_hours = hours if hours <= 12 else hours - 12
-                display_hours = 12 if display_hours == 0 else display_hours
-                processed['appointment_time_12h'] = f"{display_hours}:{minutes:02d} {am_pm}"
-                
-
-                end_hours = hours + ((processed.get('duration', 60) + minutes) // 60)
-                end_minutes = (minutes + processed.get('duration', 60)) % 60
-                processed['end_time_24h'] = f"{end_hours:02d}:{end_minutes:02d}"
-                
-
-                processed['formatted_time'] = processed['appointment_time_12h']
-        
-
-        if 'duration' not in processed or processed['duration'] is None:
-            processed['duration'] = 60
-        
-
-        if 'status' not in processed or processed['status'] is None:
-            processed['status'] = 'Scheduled'
-        
-        return processed
-
-    def serialize_datetime(obj):
-        """JSON serializer for datetime objects not serializable by default json code"""
-        from datetime import datetime, date, time, timedelta
-        
-        if isinstance(obj, (datetime, date)):
-            return obj.isoformat()
-        elif isinstance(obj, time):
-            return obj.strftime('%H:%M:%S')
-        elif isinstance(obj, timedelta):
-            total_seconds = obj.total_seconds()
-            hours = int(total_seconds // 3600)
-            minutes = int((total_seconds % 3600) // 60)
-            return f"{hours:02d}:{minutes:02d}"
-        raise TypeError(f"Type {type(obj)} not serializable")
-    
-    
-    @app.get("/appointments")
-    async def appointments_page(request: Request):
-        """Route to display appointments schedule and management page"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-        
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-
-            db = get_Mysql_db()
-            cursor = None
-            
-            try:
-                cursor = db.cursor(dictionary=True)
-                
-                cursor.execute(
-                    "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-                
-                if not therapist:
-                    return RedirectResponse(url="/Therapist_Login")
-                
-                cursor.execute(
-                    """SELECT a.*, p.first_name as patient_first_name, p.last_name as patient_last_name 
-                    FROM Appointments a
-                    JOIN Patients p ON a.patient_id = p.patient_id
-                    WHERE a.therapist_id = %s AND a.appointment_date >= CURDATE()
-                    ORDER BY a.appointment_date, a.appointment_time""", 
-                    (session_data["user_id"],)
-                )
-                upcoming_appointments_raw = cursor.fetchall()
-
-                cursor.execute(
-                    """SELECT a.*, p.first_name as patient_first_name, p.last_name as patient_last_name 
-                    FROM Appointments a
-                    JOIN Patients p ON a.patient_id = p.patient_id
-                    WHERE a.therapist_id = %s AND a.appointment_date < CURDATE()
-                    ORDER BY a.appointment_date DESC, a.appointment_time DESC
-                    LIMIT 10""", 
-                    (session_data["user_id"],)
-                )
-                past_appointments_raw = cursor.fetchall()
-                
-                cursor.execute(
-                    "SELECT patient_id, first_name, last_name, diagnosis FROM Patients WHERE therapist_id = %s", 
-                    (session_data["user_id"],)
-                )
-                patients = cursor.fetchall()
-                
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
-                
-                cursor.execute(
-                    """SELECT m.message_id, m.subject, m.content, m.created_at, 
-                            t.first_name, t.last_name, COALESCE(t.profile_image, 'avatar-1.jpg') as profile_image
-                        FROM Messages m
-                        JOIN Therapists t ON m.sender_id = t.id
-                        WHERE m.recipient_id = %s AND m.is_read = FALSE
-                        ORDER BY m.created_at DESC
-                        LIMIT 4""",
-                    (session_data["user_id"],)
-                )
-                messages_result = cursor.fetchall()
-
-                recent_messages = []
-                for message in messages_result:
-                    message_with_time = message.copy()
-                    
-                    timestamp = message['created_at']
-                    now = datetime.datetime.now()
-                    if isinstance(timestamp, datetime):
-                        diff = now - timestamp
-                        if timestamp.date() == now.date():
-                            message_with_time['time_display'] = timestamp.strftime('%I:%M %p')
-                            
-                            minutes_ago = diff.seconds // 60
-                            if minutes_ago < 60:
-                                message_with_time['time_ago'] = f"{minutes_ago} min ago"
-                            else:
-                                hours_ago = minutes_ago // 60
-                                message_with_time['time_ago'] = f"{hours_ago} hours ago"
-                                
-                        elif timestamp.date() == (now - timedelta(days=1)).date():
-                            message_with_time['time_display'] = "Yesterday"
-                            message_with_time['time_ago'] = timestamp.strftime('%I:%M %p')
-                        else:
-                            message_with_time['time_display'] = timestamp.strftime('%d %b')
-                            message_with_time['time_ago'] = timestamp.strftime('%Y')
-                            
-                    recent_messages.append(message_with_time)
-                
-                today = datetime.datetime.now().strftime('%Y-%m-%d')
-
-
-                upcoming_appointments = []
-                for appt in upcoming_appointments_raw:
-                    processed_appt = process_appointment_for_calendar(appt)
-                    upcoming_appointments.append(processed_appt)
-
-                past_appointments = []
-                for appt in past_appointments_raw:
-                    processed_appt = process_appointment_for_calendar(appt)
-                    past_appointments.append(processed_appt)
-                
-
-                serialized_upcoming = json.dumps(upcoming_appointments, default=serialize_datetime)
-                
-                return templates.TemplateResponse(
-                    "dist/appointments/appointment_list.html",
-                    {
-                        "request": request,
-                        "first_name": therapist["first_name"],
-                        "last_name": therapist["last_name"],
-                        "upcoming_appointments": upcoming_appointments,
-                        "past_appointments": past_appointments,
-                        "patients": patients,
-                        "unread_messages_count": unread_messages_count,
-                        "recent_messages": recent_messages,
-                        "today": today,
-                        "serialized_upcoming": serialized_upcoming  # Pass serialized data to template
-                    }
-                )
-            except Exception as e:
-                print(f"Database error in appointments page: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return RedirectResponse(url="/front-page")
-            finally:
-                if cursor:
-                    cursor.close()
-                if db:
-                    db.close()
-        except Exception as e:
-            print(f"Error in appointments page: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/Therapist_Login")
-        
-    @app.get("/appointments/{appointment_id}")
-    async def view_appointment(request: Request, appointment_id: int):
-        """Display the detailed view of an appointment"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-
-            db = get_Mysql_db()
-            cursor = None
-            
-            try:
-                cursor = db.cursor(dictionary=True)
-                
-
-                cursor.execute(
-                    "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-                
-                if not therapist:
-                    return RedirectResponse(url="/Therapist_Login")
-                
-
-                cursor.execute(
-                    """SELECT a.*, p.first_name as patient_first_name, p.last_name as patient_last_name,
-                            p.diagnosis, p.phone, p.email
-                    FROM Appointments a
-                    JOIN Patients p ON a.patient_id = p.patient_id
-                    WHERE a.appointment_id = %s AND a.therapist_id = %s""", 
-                    (appointment_id, session_data["user_id"])
-                )
-                appointment = cursor.fetchone()
-                
-                if not appointment:
-                    return RedirectResponse(url="/appointments?error=not_found")
-                
-
-                processed_appointment = process_appointment_for_calendar(appointment)
-                
-
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
-                
-
-                cursor.execute(
-                    """SELECT m.message_id, m.subject, m.content, m.created_at, 
-                            t.first_name, t.last_name, COALESCE(t.profile_image, 'avatar-1.jpg') as profile_image
-                        FROM Messages m
-                        JOIN Therapists t ON m.sender_id = t.id
-                        WHERE m.recipient_id = %s AND m.is_read = FALSE
-                        ORDER BY m.created_at DESC
-                        LIMIT 4""",
-                    (session_data["user_id"],)
-                )
-                messages_result = cursor.fetchall()
-
-                recent_messages = []
-                for message in messages_result:
-                    message_with_time = message.copy()
-                    
-                    timestamp = message['created_at']
-                    now = datetime.datetime.now()
-                    if isinstance(timestamp, datetime.datetime):
-                        diff = now - timestamp
-                        if timestamp.date() == now.date():
-                            message_with_time['time_display'] = timestamp.strftime('%I:%M %p')
-                            
-                            minutes_ago = diff.seconds // 60
-                            if minutes_ago < 60:
-                                message_with_time['time_ago'] = f"{minutes_ago} min ago"
-                            else:
-                                hours_ago = minutes_ago // 60
-                                message_with_time['time_ago'] = f"{hours_ago} hours ago"
-                                
-                        elif timestamp.date() == (now - timedelta(days=1)).date():
-                            message_with_time['time_display'] = "Yesterday"
-                            message_with_time['time_ago'] = timestamp.strftime('%I:%M %p')
-                        else:
-                            message_with_time['time_display'] = timestamp.strftime('%d %b')
-                            message_with_time['time_ago'] = timestamp.strftime('%Y')
-                            
-                    recent_messages.append(message_with_time)
-                
-
-                cursor.execute(
-                    """SELECT plan_id, name, status 
-                    FROM TreatmentPlans 
-                    WHERE patient_id = %s 
-                    ORDER BY start_date DESC""",
-                    (appointment['patient_id'],)
-                )
-                treatment_plans = cursor.fetchall()
-                
-                return templates.TemplateResponse(
-                    "dist/appointments/view_appointment.html",
-                    {
-                        "request": request,
-                        "first_name": therapist["first_name"],
-                        "last_name": therapist["last_name"],
-                        "appointment": processed_appointment,
-                        "treatment_plans": treatment_plans,
-                        "unread_messages_count": unread_messages_count,
-                        "recent_messages": recent_messages
-                    }
-                )
-            except Exception as e:
-                print(f"Database error in view appointment: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return RedirectResponse(url="/appointments?error=database")
-            finally:
-                if cursor:
-                    cursor.close()
-                if db:
-                    db.close()
-        except Exception as e:
-            print(f"Error in view appointment: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/Therapist_Login")
-            
-    @app.get("/appointments/{appointment_id}/edit")
-    async def edit_appointment_form(request: Request, appointment_id: int):
-        """Display the form to edit an appointment"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-
-            db = get_Mysql_db()
-            cursor = None
-            
-            try:
-                cursor = db.cursor(dictionary=True)
-                
-                cursor.execute(
-                    "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
-                    (session_data["user_id"],)
-                )
-                therapist = cursor.fetchone()
-                
-                if not therapist:
-                    return RedirectResponse(url="/Therapist_Login")
-                
-                cursor.execute(
-                    """SELECT a.*, p.first_name as patient_first_name, p.last_name as patient_last_name 
-                    FROM Appointments a
-                    JOIN Patients p ON a.patient_id = p.patient_id
-                    WHERE a.appointment_id = %s AND a.therapist_id = %s""", 
-                    (appointment_id, session_data["user_id"])
-                )
-                appointment = cursor.fetchone()
-                
-                if not appointment:
-                    return RedirectResponse(url="/appointments?error=not_found")
-                
-                processed_appointment = process_appointment_for_calendar(appointment)
-                
-                cursor.execute(
-                    """SELECT patient_id, first_name, last_name, diagnosis, phone
-                    FROM Patients 
-                    WHERE therapist_id = %s
-                    ORDER BY last_name, first_name""", 
-                    (session_data["user_id"],)
-                )
-                patients = cursor.fetchall()
-                
-                cursor.execute(
-                    "SELECT COUNT(*) as count FROM Messages WHERE recipient_id = %s AND recipient_type = 'therapist' AND is_read = FALSE",
-                    (session_data["user_id"],)
-                )
-                unread_count_result = cursor.fetchone()
-                unread_messages_count = unread_count_result['count'] if unread_count_result else 0
-                
-                cursor.execute(
-                    """SELECT m.message_id, m.subject, m.content, m.created_at, 
-                            t.first_name, t.last_name, COALESCE(t.profile_image, 'avatar-1.jpg') as profile_image
-                        FROM Messages m
-                        JOIN Therapists t ON m.sender_id = t.id
-                        WHERE m.recipient_id = %s AND m.is_read = FALSE
-                        ORDER BY m.created_at DESC
-                        LIMIT 4""",
-                    (session_data["user_id"],)
-                )
-                messages_result = cursor.fetchall()
-
-                recent_messages = []
-                for message in messages_result:
-                    message_with_time = message.copy()
-                    
-                    timestamp = message['created_at']
-                    now = datetime.datetime.now()
-                    if isinstance(timestamp, datetime.datetime):
-                        diff = now - timestamp
-                        if timestamp.date() == now.date():
-                            message_with_time['time_display'] = timestamp.strftime('%I:%M %p')
-                            
-                            minutes_ago = diff.seconds // 60
-                            if minutes_ago < 60:
-                                message_with_time['time_ago'] = f"{minutes_ago} min ago"
-                            else:
-                                hours_ago = minutes_ago // 60
-                                message_with_time['time_ago'] = f"{hours_ago} hours ago"
-                                
-                        elif timestamp.date() == (now - timedelta(days=1)).date():
-                            message_with_time['time_display'] = "Yesterday"
-                            message_with_time['time_ago'] = timestamp.strftime('%I:%M %p')
-                        else:
-                            message_with_time['time_display'] = timestamp.strftime('%d %b')
-                            message_with_time['time_ago'] = timestamp.strftime('%Y')
-                            
-                    recent_messages.append(message_with_time)
-                
-                appointment_date = appointment['appointment_date']
-                formatted_date = appointment_date.strftime('%Y-%m-%d') if isinstance(appointment_date, datetime.date) else appointment_date
-                
-                appointment_time = appointment['appointment_time']
-                if isinstance(appointment_time, datetime.time):
-                    formatted_time = appointment_time.strftime('%H:%M')
-                elif isinstance(appointment_time, datetime.timedelta):
-                    total_seconds = appointment_time.total_seconds()
-                    hours = int(total_seconds // 3600)
-                    minutes = int((total_seconds % 3600) // 60)
-                    formatted_time = f"{hours:02d}:{minutes:02d}"
-                else:
-                    formatted_time = appointment_time
-                    
-                status_options = ['Scheduled', 'Completed', 'Cancelled', 'No-Show']
-                
-                return templates.TemplateResponse(
-                    "dist/appointments/edit_appointment.html",
-                    {
-                        "request": request,
-                        "first_name": therapist["first_name"],
-                        "last_name": therapist["last_name"],
-                        "appointment": processed_appointment,
-                        "appointment_date": formatted_date,
-                        "appointment_time": formatted_time,
-                        "patients": patients,
-                        "unread_messages_count": unread_messages_count,
-                        "recent_messages": recent_messages,
-                        "status_options": status_options
-                    }
-                )
-            except Exception as e:
-                print(f"Database error in edit appointment form: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return RedirectResponse(url="/appointments?error=database")
-            finally:
-                if cursor:
-                    cursor.close()
-                if db:
-                    db.close()
-        except Exception as e:
-            print(f"Error in edit appointment form: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/Therapist_Login")
-
-    @app.post("/appointments/{appointment_id}/edit")
-    async def update_appointment(request: Request, appointment_id: int):
-        """Handle appointment update form submission"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-
-            form_data = await request.form()
-            
-            patient_id = form_data.get("patient_id")
-            appointment_date = form_data.get("appointment_date")
-            appointment_time = form_data.get("appointment_time")
-            duration = form_data.get("duration", "60")
-            notes = form_data.get("notes")
-            status = form_data.get("status", "Scheduled")
-            
-            if not patient_id or not appointment_date or not appointment_time:
-                return RedirectResponse(
-                    url=f"/appointments/{appointment_id}/edit?error=missing_fields", 
-                    status_code=303
-                )
-
-            db = get_Mysql_db()
-            cursor = None
-            
-            try:
-                cursor = db.cursor()
-                
-
-                cursor.execute(
-                    """SELECT appointment_id 
-                    FROM Appointments 
-                    WHERE appointment_id = %s AND therapist_id = %s""",
-                    (appointment_id, session_data["user_id"])
-                )
-                
-                if not cursor.fetchone():
-                    print(f"Appointment {appointment_id} does not belong to therapist {session_data['user_id']}")
-                    return RedirectResponse(url="/appointments?error=unauthorized")
-                
-
-                cursor.execute(
-                    "SELECT patient_id FROM Patients WHERE patient_id = %s AND therapist_id = %s",
-                    (patient_id, session_data["user_id"])
-                )
-                
-                if not cursor.fetchone():
-                    print(f"Patient {patient_id} does not belong to therapist {session_data['user_id']}")
-                    return RedirectResponse(url=f"/appointments/{appointment_id}/edit?error=invalid_patient")
-                
-                try:
-
-                    try:
-                        time_obj = datetime.datetime.strptime(appointment_time, "%H:%M").time()
-                    except ValueError:
-                        try:
-                            time_obj = datetime.datetime.strptime(appointment_time, "%I:%M %p").time()
-                        except ValueError:
-                            time_obj = datetime.datetime.strptime(appointment_time, "%I:%M%p").time()
-                    
-
-                    cursor.execute(
-                        """UPDATE Appointments 
-                        SET patient_id = %s, 
-                            appointment_date = %s, 
-                            appointment_time = %s, 
-                            duration = %s, 
-                            notes = %s, 
-                            status = %s,
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE appointment_id = %s""",
-                        (patient_id, appointment_date, time_obj, duration, notes, status, appointment_id)
-                    )
-                    db.commit()
-                    
-                    return RedirectResponse(url="/appointments?success=updated", status_code=303)
-                except ValueError as ve:
-                    print(f"Time parsing error: {ve}")
-                    return RedirectResponse(url=f"/appointments/{appointment_id}/edit?error=invalid_time_format")
-                    
-            except Exception as e:
-                if db:
-                    db.rollback()
-                print(f"Database error updating appointment: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return RedirectResponse(url=f"/appointments/{appointment_id}/edit?error=db_error")
-            finally:
-                if cursor:
-                    cursor.close()
-                if db:
-                    db.close()
-        except Exception as e:
-            print(f"Error updating appointment: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/Therapist_Login")
-    
-    @app.post("/appointments/new")
-    async def create_appointment(request: Request):
-        """Handle appointment creation"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-
-            form_data = await request.form()
-            
-            patient_id = form_data.get("patient_id")
-            appointment_date = form_data.get("appointment_date")
-            appointment_time = form_data.get("appointment_time")
-            duration = form_data.get("duration", "60")
-            notes = form_data.get("notes")
-            
-            if not patient_id or not appointment_date or not appointment_time:
-                return RedirectResponse(url="/appointments/new?error=missing_fields", status_code=303)
-
-            db = get_Mysql_db()
-            cursor = None
-            
-            try:
-                cursor = db.cursor()
-                
-                cursor.execute(
-                    "SELECT patient_id FROM Patients WHERE patient_id = %s AND therapist_id = %s",
-                    (patient_id, session_data["user_id"])
-                )
-                
-                if not cursor.fetchone():
-                    print(f"Patient {patient_id} does not belong to therapist {session_data['user_id']}")
-                    return RedirectResponse(url="/appointments/new?error=invalid_patient")
-                
-                try:
-                    try:
-                        time_obj = datetime.datetime.strptime(appointment_time, "%H:%M").time()
-                    except ValueError:
-                        try:
-                            time_obj = datetime.datetime.strptime(appointment_time, "%I:%M %p").time()
-                        except ValueError:
-                            time_obj = datetime.datetime.strptime(appointment_time, "%I:%M%p").time()
-                    
-                    cursor.execute(
-                        """INSERT INTO Appointments 
-                        (patient_id, therapist_id, appointment_date, appointment_time, duration, notes, status) 
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                        (patient_id, session_data["user_id"], appointment_date, time_obj, duration, notes, "Scheduled")
-                    )
-                    db.commit()
-                    
-                    return RedirectResponse(url="/appointments", status_code=303)
-                except ValueError as ve:
-                    print(f"Time parsing error: {ve}")
-                    return RedirectResponse(url="/appointments/new?error=invalid_time_format")
-                    
-            except Exception as e:
-                if db:
-                    db.rollback()
-                print(f"Database error creating appointment: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return RedirectResponse(url="/appointments/new?error=db_error")
-            finally:
-                if cursor:
-                    cursor.close()
-                if db:
-                    db.close()
-        except Exception as e:
-            print(f"Error creating appointment: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/Therapist_Login")
-
-
-    @app.post("/appointments/{appointment_id}/status")
-    async def update_appointment_status(
-        request: Request,
-        appointment_id: int,
-        status: str = Form(...),
-        session_notes: str = Form(None)
-    ):
-        """Route to update appointment status"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(status_code=401, content={"success": False, "message": "Not authenticated"})
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(status_code=401, content={"success": False, "message": "Not authenticated"})
-
-            db = get_Mysql_db()
-            cursor = None
-            
-            try:
-                cursor = db.cursor()
-                
-                cursor.execute(
-                    """SELECT appointment_id FROM Appointments 
-                    WHERE appointment_id = %s AND therapist_id = %s""",
-                    (appointment_id, session_data["user_id"])
-                )
-                
-                if not cursor.fetchone():
-                    return JSONResponse(
-                        status_code=403, 
-                        content={"success": False, "message": "You don't have permission to update this appointment"}
-                    )
-                
-                notes_update = ""
-                if session_notes:
-                    notes_update = f", notes = CONCAT(COALESCE(notes, ''), '\n\n{session_notes}')"
-                
-                cursor.execute(
-                    f"UPDATE Appointments SET status = %s{notes_update} WHERE appointment_id = %s",
-                    (status, appointment_id)
-                )
-                
-                db.commit()
-                
-                return JSONResponse(content={"success": True, "message": f"Appointment marked as {status}"})
-                
-            except Exception as e:
-                if db:
-                    db.rollback()
-                print(f"Database error in update appointment status: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return JSONResponse(
-                    status_code=500, 
-                    content={"success": False, "message": f"Error updating appointment: {str(e)}"}
-                )
-            finally:
-                if cursor:
-                    cursor.close()
-                if db:
-                    db.close()
-        except Exception as e:
-            print(f"Error in update appointment status: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return JSONResponse(
-                status_code=500, 
-                content={"success": False, "message": "Server error"}
-            )
-
-
-    @app.get("/exercises")
-    async def exercises_page(request: Request, user=Depends(get_current_user)):
-        db = get_Mysql_db()
-        cursor = db.cursor(dictionary=True)
-
-        try:
-            cursor.execute(
-                """SELECT e.*, c.name as category_name 
-                FROM Exercises e
-                LEFT JOIN ExerciseCategories c ON e.category_id = c.category_id
-                """
-            )
-            exercises = cursor.fetchall()
-
-            cursor.execute("SELECT * FROM ExerciseCategories")
-            categories = cursor.fetchall()
-            
-            cursor.execute("SELECT * FROM TreatmentPlans")
-            treatment_plans = cursor.fetchall()
-            
-            therapist_data = await get_therapist_data(user["user_id"])
-
-            return templates.TemplateResponse(
-                "dist/exercises/exercise_list.html", 
-                {
-                    "request": request,
-                    "treatment_plans": treatment_plans,
-                    "exercises": exercises,
-                    "categories": categories,
-                    "first_name": therapist_data["first_name"],
-                    "last_name": therapist_data["last_name"]
-                }
-            )
-        finally:
-            cursor.close()
-            db.close()
-
-    @app.get("/exercises/add")
-    async def add_exercise_page(request: Request, user=Depends(get_current_user)):
-        db = get_Mysql_db()
-        cursor = db.cursor(dictionary=True)
-
-        try:
-            cursor.execute("SELECT * FROM ExerciseCategories")
-            categories = cursor.fetchall()
-
-            therapist_data = await get_therapist_data(user["user_id"])
-
-            return templates.TemplateResponse(
-                "dist/exercises/add_exercise.html", 
-                {
-                    "request": request,
-                    "categories": categories,
-                    "first_name": therapist_data["first_name"],
-                    "last_name": therapist_data["last_name"]
-                }
-            )
-        finally:
-            cursor.close()
-            db.close()
-
-    @app.post("/exercises/add")
-    async def add_exercise(
-        request: Request,
-        name: str = Form(...),
-        category_id: int = Form(...),
-        description: str = Form(None),
-        video_url: str = Form(None),
-        duration: int = Form(None),
-        difficulty: str = Form(None),
-        instructions: str = Form(None),
-        user=Depends(get_current_user)
-    ):
-        db = get_Mysql_db()
-        cursor = db.cursor()
-
-        try:
-            cursor.execute(
-                """INSERT INTO Exercises 
-                (therapist_id, category_id, name, description, video_url, duration, difficulty, instructions) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
-                (user["user_id"], category_id, name, description, video_url, duration, difficulty, instructions)
-            )
-            db.commit()
-            return RedirectResponse(url="/exercises", status_code=303)
-        except Exception as e:
-            print(f"Error adding exercise: {e}")
-            return RedirectResponse(url="/exercises/add", status_code=303)
-        finally:
-            cursor.close()
-            db.close()
-
-    @app.get("/treatment-plans")
-    async def treatment_plans_page(request: Request, user=Depends(get_current_user)):
-        db = get_Mysql_db()
-        cursor = db.cursor(dictionary=True)
-
-        try:
-            cursor.execute(
-                """SELECT tp.*, p.first_name, p.last_name 
-                FROM TreatmentPlans tp
-                JOIN Patients p ON tp.patient_id = p.patient_id
-                WHERE tp.therapist_id = %s
-                ORDER BY tp.created_at DESC""", 
-                (user["user_id"],)
-            )
-            treatment_plans = cursor.fetchall()
-
-            therapist_data = await get_therapist_data(user["user_id"])
-
-            return templates.TemplateResponse(
-                "dist/treatment_plans/plan_list.html", 
-                {
-                    "request": request,
-                    "treatment_plans": treatment_plans,
-                    "first_name": therapist_data["first_name"],
-                    "last_name": therapist_data["last_name"]
-                }
-            )
-        finally:
-            cursor.close()
-            db.close()
-            
-    @app.post("/treatment-plans/new")
-    async def create_treatment_plan(request: Request):
-        """Route to handle creating a new treatment plan with exercises"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return RedirectResponse(url="/Therapist_Login")
-        
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return RedirectResponse(url="/Therapist_Login")
-            
-
-            form = await request.form()
-            print("RECEIVED FORM DATA:", dict(form))
-            
-
-            patient_id = form.get("patient_id")
-            plan_name = form.get("plan_name")
-            description = form.get("description", "")
-            start_date = form.get("start_date")
-            end_date = form.get("end_date")
-            status = form.get("status", "Active")
-            
-            print(f"Plan details: patient={patient_id}, name={plan_name}, start={start_date}, end={end_date}, status={status}")
-            
-
-            if not patient_id or not plan_name or not start_date:
-                error_msg = "Missing required fields: "
-                if not patient_id: error_msg += "patient, "
-                if not plan_name: error_msg += "plan name, "
-                if not start_date: error_msg += "start date"
-                
-                print(f"ERROR: {error_msg}")
-                
-
-                db = get_Mysql_db()
-                cursor = db.cursor(dictionary=True)
-                cursor.execute("SELECT patient_id, first_name, last_name FROM Patients WHERE therapist_id = %s", 
-                            (session_data["user_id"],))
-                patients = cursor.fetchall()
-                cursor.execute("SELECT * FROM Exercises")
-                exercises = cursor.fetchall()
-                cursor.close()
-                db.close()
-                
-                therapist_data = await get_therapist_data(session_data["user_id"])
-                
-                return templates.TemplateResponse(
-                    "dist/treatment_plans/new_plan.html", 
-                    {
-                        "request": request,
-                        "error": error_msg,
-                        "patients": patients,
-                        "exercises": exercises,
-                        "first_name": therapist_data["first_name"],
-                        "last_name": therapist_data["last_name"]
-                    }
-                )
-            
-
-            exercises = form.getlist("exercises[]")
-            sets = form.getlist("sets[]")
-            repetitions = form.getlist("repetitions[]")
-            frequencies = form.getlist("frequency[]")
-            durations = form.getlist("duration[]")
-            exercise_notes = form.getlist("exercise_notes[]")
-            
-            print(f"Exercises: {exercises}")
-            print(f"Sets: {sets}")
-            print(f"Repetitions: {repetitions}")
-            print(f"Frequencies: {frequencies}")
-            print(f"Durations: {durations}")
-            
-
-            db = get_Mysql_db()
-            cursor = None
-            
-            try:
-                cursor = db.cursor()
-                
-
-                cursor.execute(
-                    """INSERT INTO TreatmentPlans 
-                    (patient_id, therapist_id, name, description, start_date, end_date, status) 
-                    VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                    (patient_id, session_data["user_id"], plan_name, description, start_date, end_date, status)
-                )
-                plan_id = cursor.lastrowid
-                print(f"Created plan with ID: {plan_id}")
-                
-
-                for i in range(len(exercises)):
-                    exercise_id = exercises[i] if i < len(exercises) else None
-                    
-                    if not exercise_id or exercise_id == "":
-                        print(f"Skipping empty exercise at index {i}")
-                        continue
-                        
-                    exercise_sets = sets[i] if i < len(sets) and sets[i] else None
-                    exercise_reps = repetitions[i] if i < len(repetitions) and repetitions[i] else None
-                    exercise_freq = frequencies[i] if i < len(frequencies) and frequencies[i] else None
-                    exercise_duration = durations[i] if i < len(durations) and durations[i] else None
-                    exercise_note = exercise_notes[i] if i < len(exercise_notes) else None
-                    
-                    print(f"Adding exercise: ID={exercise_id}, Sets={exercise_sets}, Reps={exercise_reps}, Freq={exercise_freq}, Duration={exercise_duration}")
-                    
-                    try:
-                        cursor.execute(
-                            """INSERT INTO TreatmentPlanExercises
-                            (plan_id, exercise_id, sets, repetitions, frequency, duration, notes)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                            (plan_id, exercise_id, exercise_sets, exercise_reps, exercise_freq, exercise_duration, exercise_note)
-                        )
-                        print(f"Successfully added exercise {exercise_id} to plan {plan_id}")
-                    except Exception as ex:
-                        print(f"Error adding exercise {exercise_id}: {ex}")
-
-                
-                db.commit()
-                print(f"Treatment plan {plan_id} created successfully with exercises")
-                return RedirectResponse(url="/treatment-plans", status_code=303)
-                
-            except Exception as e:
-                if db:
-                    db.rollback()
-                print(f"Database error: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                
-
-                cursor = db.cursor(dictionary=True)
-                cursor.execute("SELECT patient_id, first_name, last_name FROM Patients WHERE therapist_id = %s", 
-                            (session_data["user_id"],))
-                patients = cursor.fetchall()
-                cursor.execute("SELECT * FROM Exercises")
-                exercises = cursor.fetchall()
-                
-                therapist_data = await get_therapist_data(session_data["user_id"])
-                
-                return templates.TemplateResponse(
-                    "dist/treatment_plans/new_plan.html", 
-                    {
-                        "request": request,
-                        "error": f"Database error: {str(e)}",
-                        "patients": patients,
-                        "exercises": exercises,
-                        "first_name": therapist_data["first_name"],
-                        "last_name": therapist_data["last_name"]
-                    }
-                )
-            finally:
-                if cursor:
-                    cursor.close()
-                if db:
-                    db.close()
-                
-        except Exception as e:
-            print(f"General error: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return RedirectResponse(url="/front-page")
-
-    @app.get("/treatment-plans/new")
-    async def new_treatment_plan_page(request: Request, user=Depends(get_current_user)):
-        db = get_Mysql_db()
-        cursor = db.cursor(dictionary=True)
-
-        try:
-            cursor.execute(
-                "SELECT patient_id, first_name, last_name FROM Patients WHERE therapist_id = %s", 
-                (user["user_id"],)
-            )
-            patients = cursor.fetchall()
-
-            cursor.execute("SELECT * FROM Exercises")
-            exercises = cursor.fetchall()
-
-            therapist_data = await get_therapist_data(user["user_id"])
-            print(f"exercises: {exercises}")
-
-            return templates.TemplateResponse(
-                "dist/treatment_plans/new_plan.html", 
-                {
-                    "request": request,
-                    "patients": patients,
-                    "exercises": exercises,
-                    "first_name": therapist_data["first_name"],
-                    "last_name": therapist_data["last_name"],
-                }
-            )
-        finally:
-            cursor.close()
-            db.close()
-
-    async def get_therapist_data(therapist_id):
-        db = get_Mysql_db()
-        cursor = db.cursor(dictionary=True)
-
-        try:
-            cursor.execute(
-                "SELECT first_name, last_name FROM Therapists WHERE id = %s", 
-                (therapist_id,)
-            )
-            return cursor.fetchone()
-        finally:
-            cursor.close()
-            db.close()
-            
- 
-    @app.get("/therapists")
-    async def get_therapists():
-        """API endpoint to get a list of all therapists for the mobile app"""
-        try:
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
-                cursor.execute(
-                    """SELECT id, first_name, last_name, profile_image, 
-                            specialties, address, rating, review_count, 
-                            is_accepting_new_patients
-                    FROM Therapists 
-                    WHERE is_accepting_new_patients = TRUE
-                    ORDER BY rating DESC, review_count DESC"""
-                )
-                therapists = cursor.fetchall()
-
-                base_url = app.state.base_url
-                static_dir = getattr(app.state, 'static_directory', "/PERCEPTRONX/Frontend_Web/static")
-                
-                print(f"Using base URL: {base_url}")
-                
-                formatted_therapists = []
-                for therapist in therapists:
-                    specialties = safely_parse_json_field(therapist['specialties'], [])
-                    
-                    profile_image = therapist['profile_image']
-                    matched_image = find_best_matching_image(
-                        therapist["id"], 
-                        profile_image, 
-                        static_dir
-                    )
-                    
-                    photoUrl = f"/static/assets/images/user/{matched_image}"
-                    
-                    print(f"Therapist ID: {therapist['id']}, Original Image: {profile_image}, Matched: {matched_image}, URL: {photoUrl}")
-
-                    formatted_therapists.append({
-                        "id": therapist["id"],
-                        "name": f"{therapist['first_name']} {therapist['last_name']}",
-                        "photoUrl": photoUrl,
-                        "specialties": specialties,
-                        "location": therapist["address"] or "Location not provided",
-                        "rating": float(therapist["rating"] or 0),
-                        "reviewCount": therapist["review_count"] or 0,
-                        "distance": 0.0, 
-                        "nextAvailable": "Today" 
-                    })
-
-                return formatted_therapists
-
-            except Exception as e:
-                print(f"Database error in get therapists API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"error": f"Internal server error: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in get therapists API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"error": f"Server error: {str(e)}"}
-            )
-            
-    @app.get("/therapists/{id}")
-    async def get_therapist_details(id: int):
-        """API endpoint to get detailed information about a specific therapist"""
-        try:
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
-                cursor.execute(
-                    """SELECT id, first_name, last_name, profile_image, 
-                            bio, experience_years, specialties, education, languages, 
-                            address, rating, review_count, 
-                            is_accepting_new_patients, average_session_length
-                    FROM Therapists 
-                    WHERE id = %s""", 
-                    (id,)
-                )
-                therapist = cursor.fetchone()
-
-                if not therapist:
-                    return JSONResponse(
-                        status_code=404,
-                        content={"error": "Therapist not found"}
-                    )
-                
-                for field in ['specialties', 'education', 'languages']:
-                    therapist[field] = safely_parse_json_field(therapist[field], [])
-                        
-                static_dir = getattr(app.state, 'static_directory', "/PERCEPTRONX/Frontend_Web/static")
-                
-                profile_image = therapist['profile_image']
-                matched_image = find_best_matching_image(id, profile_image, static_dir)
-                
-                photoUrl = f"/static/assets/images/user/{matched_image}"
-                
-                print(f"Therapist detail ID: {id}, Original Image: {profile_image}, Matched: {matched_image}, URL: {photoUrl}")
-
-                formatted_therapist = {
-                    "id": therapist["id"],
-                    "name": f"{therapist['first_name']} {therapist['last_name']}",
-                    "photoUrl": photoUrl,
-                    "specialties": therapist["specialties"],
-                    "bio": therapist["bio"] or "",
-                    "experienceYears": therapist["experience_years"] or 0,
-                    "education": therapist["education"],
-                    "languages": therapist["languages"],
-                    "address": therapist["address"] or "",
-                    "rating": float(therapist["rating"] or 0),
-                    "reviewCount": therapist["review_count"] or 0,
-                    "isAcceptingNewPatients": bool(therapist["is_accepting_new_patients"]),
-                    "averageSessionLength": therapist["average_session_length"] or 60
-                }
-
-                return formatted_therapist
-                
-            except Exception as e:
-                print(f"Database error in get therapist details API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"error": f"Internal server error: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in get therapist details API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"error": f"Server error: {str(e)}"}
-            )
-
-    @app.get("/therapists/{id}/availability")
-    async def get_therapist_availability(id: int, date: str = None):
-        """API endpoint to get available time slots for a therapist"""
-        try:
- 
-            if not date:
-                date = datetime.datetime.now().strftime("%Y-%m-%d")
-            
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    "SELECT id, average_session_length FROM Therapists WHERE id = %s",
-                    (id,)
-                )
-                therapist = cursor.fetchone()
-                
-                if not therapist:
-                    return JSONResponse(
-                        status_code=404,
-                        content={"error": "Therapist not found"}
-                    )
-                
- 
-                cursor.execute(
-                    """SELECT appointment_time, duration 
-                    FROM Appointments 
-                    WHERE therapist_id = %s AND appointment_date = %s 
-                    AND status != 'Cancelled'""",
-                    (id, date)
-                )
-                booked_slots = cursor.fetchall()
-                
- 
-                start_hour = 9
-                end_hour = 17
-                
- 
-                slot_duration = therapist['average_session_length'] or 60
-                
- 
-                available_slots = []
-                current_time = datetime.time(start_hour, 0)
-                end_time = datetime.time(end_hour, 0)
-                
-                slot_id = 1
-                while current_time < end_time:
-                    slot_end = (datetime.datetime.combine(datetime.date.today(), current_time) + 
-                            datetime.timedelta(minutes=slot_duration)).time()
-                    
- 
-                    is_available = True
-                    for booked in booked_slots:
-                        booked_start = booked['appointment_time']
-                        booked_end_dt = (datetime.datetime.combine(datetime.date.today(), booked_start) + 
-                                    datetime.timedelta(minutes=booked['duration']))
-                        booked_end = booked_end_dt.time()
-                        
- 
-                        if (current_time < booked_end and slot_end > booked_start):
-                            is_available = False
-                            break
-                    
- 
-                    formatted_time = current_time.strftime("%I:%M %p")
-                    
-                    available_slots.append({
-                        "id": slot_id,
-                        "date": date,
-                        "time": formatted_time,
-                        "isAvailable": is_available
-                    })
-                    
-                    slot_id += 1
-                    
- 
-                    current_time_dt = datetime.datetime.combine(datetime.date.today(), current_time)
-                    current_time_dt += datetime.timedelta(minutes=30)
-                    current_time = current_time_dt.time()
-                
-                return available_slots
-
-            except Exception as e:
-                print(f"Database error in get therapist availability API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"error": f"Internal server error: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in get therapist availability API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"error": f"Server error: {str(e)}"}
-            )
-    
-    @app.post("/appointments/request")
-    async def request_appointment(request: Request, appointment_request: AppointmentRequest):
-        """API endpoint to request an appointment with a therapist"""
-        session_id = request.cookies.get("session_id")
-        print(f"Appointment request - Cookie session ID: {session_id}")
-        
-        
-        db = get_Mysql_db()
-        cursor = db.cursor()
-
-        try:
-            cursor.execute(
-                "SELECT id FROM Therapists WHERE id = %s",
-                (appointment_request.therapist_id,)
-            )
-            therapist = cursor.fetchone()
-            
-            if not therapist:
-                return JSONResponse(
-                    status_code=404,
-                    content={"status": "failed", "message": "Therapist not found"}
-                )
-            
-            user_info = None
-            user_id = None
-            
-            if session_id:
-                try:
-                    session_data = await get_session_data(session_id)
-                    if session_data and hasattr(session_data, 'user_id'):
-                        user_id = session_data.user_id
-                        cursor.execute(
-                            "SELECT username, email FROM users WHERE user_id = %s",
-                            (user_id,)
-                        )
-                        user_info = cursor.fetchone()
-                except Exception as e:
-                    print(f"Error getting session data: {e}")
-            
-            patient_id = None
-            
-            if user_info:
-                cursor.execute(
-                    "SELECT patient_id FROM Patients WHERE email = %s",
-                    (user_info[1],) 
-                )
-                patient_record = cursor.fetchone()
-                
-                if patient_record:
-                    patient_id = patient_record[0]
-                else:
-                    cursor.execute(
-                        """INSERT INTO Patients 
-                        (therapist_id, first_name, last_name, email) 
-                        VALUES (%s, %s, %s, %s)""",
-                        (appointment_request.therapist_id, user_info[0], "", user_info[1])
-                    )
-                    db.commit()
-                    patient_id = cursor.lastrowid
-            else:
-                cursor.execute(
-                    """INSERT INTO Patients 
-                    (therapist_id, first_name, last_name, email) 
-                    VALUES (%s, %s, %s, %s)""",
-                    (appointment_request.therapist_id, "Guest", "User", f"guest_{int(time.time())}@example.com")
-                )
-                db.commit()
-                patient_id = cursor.lastrowid
-            
-            time_parts = appointment_request.time.split()
-            time_str = time_parts[0] 
-            am_pm = time_parts[1] if len(time_parts) > 1 else "AM" 
-            
-            try:
-                time_obj = datetime.datetime.strptime(f"{time_str} {am_pm}", "%I:%M %p").time()
-            except ValueError:
-                try:
-                    time_obj = datetime.datetime.strptime(time_str, "%H:%M").time()
-                except ValueError:
-                    return JSONResponse(
-                        status_code=400,
-                        content={"status": "failed", "message": "Invalid time format"}
-                    )
-            
-            duration = 60
-            
-            full_notes = f"Type: {appointment_request.type}\n"
-            if appointment_request.notes:
-                full_notes += f"Notes: {appointment_request.notes}\n"
-            if appointment_request.insuranceProvider:
-                full_notes += f"Insurance: {appointment_request.insuranceProvider}\n"
-            if appointment_request.insuranceMemberId:
-                full_notes += f"Member ID: {appointment_request.insuranceMemberId}"
-            
-            cursor.execute(
-                """INSERT INTO Appointments 
-                (patient_id, therapist_id, appointment_date, appointment_time, duration, notes, status) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                (patient_id, appointment_request.therapist_id, appointment_request.date, 
-                time_obj, duration, full_notes, "Scheduled")
-            )
-            db.commit()
-            
-            return {"status": "success", "message": "Appointment scheduled successfully"}
-
-        except Exception as e:
-            db.rollback()
-            print(f"Database error in request appointment API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"status": "failed", "message": f"Error requesting appointment: {str(e)}"}
-            )
-        finally:
-            cursor.close()
-            db.close()
-
-
-    @app.post("/appointments/respond/{request_id}")
-    async def respond_to_appointment(
-        request: Request, 
-        request_id: int, 
-        response: AppointmentResponse
-    ):
-        """API endpoint for therapists to approve or reject appointment requests"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401, 
-                content={"status": "invalid", "detail": "Not authenticated"}
-            )
-        
-        try:
-            session_data = await get_session_data(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"status": "invalid", "detail": "Not authenticated"}
-                )
-            
-            email = session_data.email
-            
-            db = get_Mysql_db()
-            cursor = db.cursor()
-            
-            cursor.execute(
-                "SELECT id FROM Therapists WHERE company_email = %s",
-                (email,)
-            )
-            therapist_result = cursor.fetchone()
-            
-            if not therapist_result:
-                return JSONResponse(
-                    status_code=403,
-                    content={"status": "invalid", "detail": "Not authorized as a therapist"}
-                )
-            
-            therapist_id = therapist_result[0]
-            
-            cursor.execute(
-                """SELECT user_id, therapist_id, appointment_date, appointment_time, 
-                        duration, notes 
-                FROM AppointmentRequests 
-                WHERE request_id = %s AND status = 'Pending'""",
-                (request_id,)
-            )
-            request_data = cursor.fetchone()
-            
-            if not request_data:
-                return JSONResponse(
-                    status_code=404,
-                    content={"status": "invalid", "detail": "Appointment request not found or already processed"}
-                )
-            
-            req_user_id, req_therapist_id, date, time, duration, notes = request_data
-            
-            if therapist_id != req_therapist_id:
-                return JSONResponse(
-                    status_code=403,
-                    content={"status": "invalid", "detail": "You are not authorized to respond to this request"}
-                )
-            
-            try:
-                cursor.execute(
-                    "UPDATE AppointmentRequests SET status = %s WHERE request_id = %s",
-                    (response.status, request_id)
-                )
-                
-                if response.status == "Approved":
-                    cursor.execute(
-                        """SELECT COUNT(*) FROM Appointments 
-                        WHERE therapist_id = %s AND appointment_date = %s AND appointment_time = %s 
-                        AND status != 'Cancelled'""",
-                        (therapist_id, date, time)
-                    )
-                    slot_taken = cursor.fetchone()[0] > 0
-                    
-                    if slot_taken:
-                        db.rollback()
-                        return JSONResponse(
-                            status_code=409,
-                            content={"status": "invalid", "detail": "This time slot is no longer available"}
-                        )
-                    
-                    cursor.execute(
-                        "SELECT username, email FROM users WHERE user_id = %s",
-                        (req_user_id,)
-                    )
-                    user_info = cursor.fetchone()
-                    
-                    cursor.execute(
-                        "SELECT patient_id FROM Patients WHERE email = %s",
-                        (user_info[1],)  # Email
-                    )
-                    patient_record = cursor.fetchone()
-                    
-                    patient_id = None
-                    if patient_record:
-                        patient_id = patient_record[0]
-                    else:
-                        cursor.execute(
-                            """INSERT INTO Patients 
-                            (therapist_id, first_name, last_name, email) 
-                            VALUES (%s, %s, %s, %s)""",
-                            (therapist_id, user_info[0], "", user_info[1])
-                        )
-                        patient_id = cursor.lastrowid
-                    
-                    cursor.execute(
-                        """INSERT INTO Appointments 
-                        (patient_id, therapist_id, appointment_date, appointment_time, duration, notes, status) 
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                        (patient_id, therapist_id, date, time, duration, notes, "Scheduled")
-                    )
-                    
-                    message_content = f"Your appointment request for {date} at {time} has been approved."
-                else:
-                    message_content = f"Your appointment request for {date} at {time} has been declined."
-                    if response.reason:
-                        message_content += f" Reason: {response.reason}"
-                
-                cursor.execute(
-                    """INSERT INTO Messages
-                    (sender_id, sender_type, recipient_id, recipient_type, subject, content)
-                    VALUES (%s, %s, %s, %s, %s, %s)""",
-                    (therapist_id, "therapist", req_user_id, "user", 
-                    "Appointment Request Response", message_content)
-                )
-                
-                db.commit()
-                return {"status": "valid", "message": f"Appointment request {response.status.lower()}"}
-                
-            except Exception as e:
-                db.rollback()
-                print(f"Database error in appointment response API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"status": "invalid", "detail": f"Error processing response: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in appointment response API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"status": "invalid", "detail": f"Server error: {str(e)}"}
-            )
-
-
-    @app.get("/therapists/{id}/appointment-requests", response_model=List[AppointmentRequestListItem])
-    async def get_therapist_appointment_requests(request: Request, id: int, status: Optional[str] = None):
-        """API endpoint to get all appointment requests for a therapist"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401, 
-                content={"status": "invalid", "detail": "Not authenticated"}
-            )
-        
-        try:
-            session_data = await get_session_data(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"status": "invalid", "detail": "Not authenticated"}
-                )
-            
-            email = session_data.email
-            
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-            
-            cursor.execute(
-                "SELECT id FROM Therapists WHERE company_email = %s",
-                (email,)
-            )
-            therapist_result = cursor.fetchone()
-            
-            if not therapist_result or therapist_result['id'] != id:
-                return JSONResponse(
-                    status_code=403,
-                    content={"status": "invalid", "detail": "Not authorized to view these requests"}
-                )
-            
-            query = """
-                SELECT ar.request_id, ar.appointment_date, ar.appointment_time, ar.status, ar.notes,
-                    u.username as user_name
-                FROM AppointmentRequests ar
-                JOIN users u ON ar.user_id = u.user_id
-                WHERE ar.therapist_id = %s
-            """
-            
-            params = [id]
-            
-            if status:
-                query += " AND ar.status = %s"
-                params.append(status)
-                
-            query += " ORDER BY ar.created_at DESC"
-            
-            cursor.execute(query, params)
-            requests = cursor.fetchall()
-            
-            formatted_requests = []
-            for req in requests:
-                time_str = req['appointment_time'].strftime("%I:%M %p")
-                
-                formatted_requests.append({
-                    "request_id": req['request_id'],
-                    "date": req['appointment_date'].strftime("%Y-%m-%d"),
-                    "time": time_str,
-                    "status": req['status'],
-                    "user_name": req['user_name'],
-                    "notes": req['notes']
-                })
-            
-            return formatted_requests
-            
-        except Exception as e:
-            print(f"Error in get therapist appointment requests API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"status": "invalid", "detail": f"Server error: {str(e)}"}
-            )
-
-
-    @app.get("/users/appointment-requests")
-    async def get_user_appointment_requests(request: Request, status: Optional[str] = None):
-        """API endpoint to get all appointment requests for the logged-in user"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401, 
-                content={"status": "invalid", "detail": "Not authenticated"}
-            )
-        
-        try:
-            session_data = await get_session_data(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"status": "invalid", "detail": "Not authenticated"}
-                )
-            
-            user_id = session_data.user_id
-            
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-            
-            query = """
-                SELECT ar.request_id, ar.appointment_date, ar.appointment_time, ar.status, ar.notes,
-                    CONCAT(t.first_name, ' ', t.last_name) as therapist_name
-                FROM AppointmentRequests ar
-                JOIN Therapists t ON ar.therapist_id = t.id
-                WHERE ar.user_id = %s
-            """
-            
-            params = [user_id]
-            
-            if status:
-                query += " AND ar.status = %s"
-                params.append(status)
-                
-            query += " ORDER BY ar.created_at DESC"
-            
-            cursor.execute(query, params)
-            requests = cursor.fetchall()
-            
-
-            formatted_requests = []
-            for req in requests:
-
-                time_str = req['appointment_time'].strftime("%I:%M %p")
-                
-                formatted_requests.append({
-                    "request_id": req['request_id'],
-                    "date": req['appointment_date'].strftime("%Y-%m-%d"),
-                    "time": time_str,
-                    "status": req['status'],
-                    "therapist_name": req['therapist_name'],
-                    "notes": req['notes']
-                })
-            
-            return formatted_requests
-            
-        except Exception as e:
-            print(f"Error in get user appointment requests API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"status": "invalid", "detail": f"Server error: {str(e)}"}
-            )
-
-    @app.post("/messages/send")
-    async def send_message(request: Request, message_request: MessageRequest):
-        """API endpoint to send a message to a therapist"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401,
-                content={"status": "invalid", "detail": "Not authenticated"}
-            )
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"status": "invalid", "detail": "Not authenticated"}
-                )
-
-            user_id = session_data["user_id"]
-            
-            db = get_Mysql_db()
-            cursor = db.cursor()
-
-            try:
- 
-                cursor.execute(
-                    "SELECT id FROM Therapists WHERE id = %s",
-                    (message_request.recipient_id,)
-                )
-                therapist = cursor.fetchone()
-                
-                if not therapist:
-                    return JSONResponse(
-                        status_code=404,
-                        content={"status": "invalid", "detail": "Recipient not found"}
-                    )
-                
- 
-                cursor.execute(
-                    """INSERT INTO Messages 
-                    (sender_id, sender_type, recipient_id, recipient_type, subject, content) 
-                    VALUES (%s, %s, %s, %s, %s, %s)""",
-                    (user_id, "user", message_request.recipient_id, "therapist", 
-                    message_request.subject, message_request.content)
-                )
-                db.commit()
-                
-                return {"status": "valid", "message": "Message sent successfully"}
-
-            except Exception as e:
-                db.rollback()
-                print(f"Database error in send message API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"status": "invalid", "detail": f"Error sending message: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in send message API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"status": "invalid", "detail": f"Server error: {str(e)}"}
-            )
-
-    @app.post("/therapists/{id}/add_patient")
-    async def add_patient_to_therapist(request: Request, id: int, patient: dict):
-        """API endpoint to add a user as a patient to a therapist"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401,
-                content={"status": "invalid", "detail": "Not authenticated"}
-            )
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"status": "invalid", "detail": "Not authenticated"}
-                )
-
-            user_id = session_data["user_id"]
-            
-            db = get_Mysql_db()
-            cursor = db.cursor()
-
-            try:
- 
-                cursor.execute(
-                    "SELECT id FROM Therapists WHERE id = %s",
-                    (id,)
-                )
-                therapist = cursor.fetchone()
-                
-                if not therapist:
-                    return JSONResponse(
-                        status_code=404,
-                        content={"status": "invalid", "detail": "Therapist not found"}
-                    )
-                
- 
-                cursor.execute(
-                    "SELECT patient_id FROM Patients WHERE user_id = %s",
-                    (user_id,)
-                )
-                existing_patient = cursor.fetchone()
-                
-                if existing_patient:
- 
-                    cursor.execute(
-                        """UPDATE Patients 
-                        SET therapist_id = %s,
-                            first_name = %s,
-                            last_name = %s,
-                            phone = %s,
-                            diagnosis = %s,
-                            updated_at = CURRENT_TIMESTAMP
-                        WHERE user_id = %s""",
-                        (id, patient.get('first_name', ''), patient.get('last_name', ''), 
-                        patient.get('phone', ''), patient.get('diagnosis', ''), user_id)
-                    )
-                else:
- 
-                    cursor.execute(
-                        "SELECT email FROM users WHERE user_id = %s",
-                        (user_id,)
-                    )
-                    user_email = cursor.fetchone()
-                    email = user_email[0] if user_email else ''
-                    
- 
-                    cursor.execute(
-                        """INSERT INTO Patients 
-                        (therapist_id, user_id, first_name, last_name, email, phone, diagnosis) 
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                        (id, user_id, patient.get('first_name', ''), patient.get('last_name', ''), 
-                        email, patient.get('phone', ''), patient.get('diagnosis', ''))
-                    )
-                
-                db.commit()
-                
-                return {"status": "valid", "message": "Patient added successfully"}
-
-            except Exception as e:
-                db.rollback()
-                print(f"Database error in add patient API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"status": "invalid", "detail": f"Error adding patient: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in add patient API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"status": "invalid", "detail": f"Server error: {str(e)}"}
-            )
-
-    @app.get("/user/appointments")
-    async def get_user_appointments(request: Request):
-        """API endpoint to get all appointments for the current user"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Not authenticated"}
-            )
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "Not authenticated"}
-                )
-
-            user_id = session_data["user_id"]
-            
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    "SELECT patient_id FROM Patients WHERE user_id = %s",
-                    (user_id,)
-                )
-                patient_record = cursor.fetchone()
-                
-                if not patient_record:
- 
-                    return []
-                
-                patient_id = patient_record['patient_id']
-                
- 
-                cursor.execute(
-                    """SELECT a.appointment_id, a.appointment_date, a.appointment_time, a.duration, a.status, a.notes,
-                            t.id as therapist_id, t.first_name, t.last_name, t.profile_image
-                    FROM Appointments a
-                    JOIN Therapists t ON a.therapist_id = t.id
-                    WHERE a.patient_id = %s
-                    ORDER BY 
-                        CASE WHEN a.status = 'Scheduled' THEN 0
-                            WHEN a.status = 'Completed' THEN 1
-                            ELSE 2 END,
-                        a.appointment_date DESC, 
-                        a.appointment_time DESC""",
-                    (patient_id,)
-                )
-                appointments = cursor.fetchall()
-                
- 
-                formatted_appointments = []
-                for appointment in appointments:
- 
-                    time_obj = appointment['appointment_time']
-                    formatted_time = time_obj.strftime("%I:%M %p") if time_obj else "N/A"
-                    
- 
-                    date_obj = appointment['appointment_date']
-                    formatted_date = date_obj.strftime("%Y-%m-%d") if date_obj else "N/A"
-                    
-                    formatted_appointments.append({
-                        "id": appointment['appointment_id'],
-                        "date": formatted_date,
-                        "time": formatted_time,
-                        "duration": appointment['duration'],
-                        "status": appointment['status'],
-                        "notes": appointment['notes'],
-                        "therapist": {
-                            "id": appointment['therapist_id'],
-                            "name": f"{appointment['first_name']} {appointment['last_name']}",
-                            "photoUrl": f"/static/assets/images/user/{appointment['profile_image']}" if appointment['profile_image'] else "/static/assets/images/user/avatar-1.jpg"
-                        }
-                    })
-                
-                return formatted_appointments
-
-            except Exception as e:
-                print(f"Database error in get user appointments API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"detail": f"Internal server error: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in get user appointments API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"detail": f"Server error: {str(e)}"}
-            )
-
-    @app.get("/user/therapist")
-    async def get_current_therapist(request: Request):
-        """API endpoint to get the current therapist for the logged-in user"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Not authenticated"}
-            )
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "Not authenticated"}
-                )
-
-            user_id = session_data["user_id"]
-            
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    """SELECT p.therapist_id, t.first_name, t.last_name, t.profile_image, 
-                            t.bio, t.experience_years, t.specialties, t.education, t.languages, 
-                            t.address, t.rating, t.review_count, 
-                            t.is_accepting_new_patients, t.average_session_length
-                    FROM Patients p
-                    JOIN Therapists t ON p.therapist_id = t.id
-                    WHERE p.user_id = %s""",
-                    (user_id,)
-                )
-                result = cursor.fetchone()
-                
-                if not result:
- 
-                    return None
-                
- 
-                for field in ['specialties', 'education', 'languages']:
-                    if result[field] and isinstance(result[field], str):
-                        try:
-                            result[field] = json.loads(result[field])
-                        except:
-                            result[field] = []
-                    elif result[field] is None:
-                        result[field] = []
-                
- 
-                therapist = {
-                    "id": result["therapist_id"],
-                    "name": f"{result['first_name']} {result['last_name']}",
-                    "photoUrl": f"/static/assets/images/user/{result['profile_image']}" if result['profile_image'] else "/static/assets/images/user/avatar-1.jpg",
-                    "specialties": result["specialties"],
-                    "bio": result["bio"] or "",
-                    "experienceYears": result["experience_years"] or 0,
-                    "education": result["education"],
-                    "languages": result["languages"],
-                    "address": result["address"] or "",
-                    "rating": float(result["rating"] or 0),
-                    "reviewCount": result["review_count"] or 0,
-                    "isAcceptingNewPatients": bool(result["is_accepting_new_patients"]),
-                    "averageSessionLength": result["average_session_length"] or 60
-                }
-                
-                return therapist
-
-            except Exception as e:
-                print(f"Database error in get current therapist API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"detail": f"Internal server error: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in get current therapist API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"detail": f"Server error: {str(e)}"}
-            )
-
-    @app.post("/therapists/{id}/rate")
-    async def rate_therapist(request: Request, id: int, rating: dict):
-        """API endpoint to rate a therapist"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401,
-                content={"status": "invalid", "detail": "Not authenticated"}
-            )
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"status": "invalid", "detail": "Not authenticated"}
-                )
-
-            user_id = session_data["user_id"]
-            
-            db = get_Mysql_db()
-            cursor = db.cursor()
-
-            try:
- 
-                cursor.execute(
-                    "SELECT id FROM Therapists WHERE id = %s",
-                    (id,)
-                )
-                therapist = cursor.fetchone()
-                
-                if not therapist:
-                    return JSONResponse(
-                        status_code=404,
-                        content={"status": "invalid", "detail": "Therapist not found"}
-                    )
-                
- 
-                cursor.execute(
-                    "SELECT patient_id FROM Patients WHERE user_id = %s",
-                    (user_id,)
-                )
-                patient_record = cursor.fetchone()
-                
-                if not patient_record:
-                    return JSONResponse(
-                        status_code=400,
-                        content={"status": "invalid", "detail": "You must be a patient to leave a review"}
-                    )
-                
-                patient_id = patient_record[0]
-                
- 
-                cursor.execute(
-                    "SELECT review_id FROM Reviews WHERE therapist_id = %s AND patient_id = %s",
-                    (id, patient_id)
-                )
-                existing_review = cursor.fetchone()
-                
-                rating_value = float(rating.get('rating', 5))
-                comment = rating.get('comment', '')
-                
-                if existing_review:
- 
-                    cursor.execute(
-                        """UPDATE Reviews 
-                        SET rating = %s, comment = %s, updated_at = CURRENT_TIMESTAMP
-                        WHERE review_id = %s""",
-                        (rating_value, comment, existing_review[0])
-                    )
-                else:
- 
-                    cursor.execute(
-                        """INSERT INTO Reviews 
-                        (therapist_id, patient_id, rating, comment) 
-                        VALUES (%s, %s, %s, %s)""",
-                        (id, patient_id, rating_value, comment)
-                    )
-                
-                db.commit()
-                
- 
-                cursor.execute(
-                    """UPDATE Therapists t
-                    SET rating = (
-                        SELECT AVG(r.rating) FROM Reviews r WHERE r.therapist_id = %s
-                    ),
-                    review_count = (
-                        SELECT COUNT(*) FROM Reviews r WHERE r.therapist_id = %s
-                    )
-                    WHERE t.id = %s""",
-                    (id, id, id)
-                )
-                db.commit()
-                
-                return {"status": "valid", "message": "Review submitted successfully"}
-
-            except Exception as e:
-                db.rollback()
-                print(f"Database error in rate therapist API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"status": "invalid", "detail": f"Error submitting review: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in rate therapist API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"status": "invalid", "detail": f"Server error: {str(e)}"}
-            )
-
-    @app.post("/reset-password")
-    async def reset_password(email: dict):
-        """API endpoint to initiate password reset"""
-        try:
-            db = get_Mysql_db()
-            cursor = db.cursor()
-
-            try:
-                email_address = email.get("email")
-                if not email_address:
-                    return JSONResponse(
-                        status_code=400,
-                        content={"status": "invalid", "detail": "Email is required"}
-                    )
-                
- 
-                cursor.execute(
-                    "SELECT user_id FROM users WHERE email = %s",
-                    (email_address,)
-                )
-                user = cursor.fetchone()
-                
-                if not user:
- 
-                    cursor.execute(
-                        "SELECT id FROM Therapists WHERE company_email = %s",
-                        (email_address,)
-                    )
-                    therapist = cursor.fetchone()
-                    
-                    if not therapist:
- 
-                        return {"status": "valid", "message": "If this email is registered, you will receive reset instructions"}
-                
- 
-                expiry = datetime.datetime.now() + datetime.timedelta(hours=24)
-                
- 
-                reset_token = secrets.token_hex(32)
-
- 
-                await r.set(f"reset:{reset_token}", email_address, ex=86400)
- 
- 
-                print(f"Password reset requested for {email_address}. Token: {reset_token}")
-                
-                return {"status": "valid", "message": "If this email is registered, you will receive reset instructions"}
-
-            except Exception as e:
-                print(f"Database error in reset password API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"status": "invalid", "detail": f"Error processing request: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in reset password API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"status": "invalid", "detail": f"Server error: {str(e)}"}
-            )
-
-    @app.get("/therapists/{id}/reviews")
-    async def get_therapist_reviews(id: int, limit: int = 10, offset: int = 0):
-        """API endpoint to get reviews for a specific therapist"""
-        try:
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    "SELECT id FROM Therapists WHERE id = %s",
-                    (id,)
-                )
-                therapist = cursor.fetchone()
-                
-                if not therapist:
-                    return JSONResponse(
-                        status_code=404,
-                        content={"error": "Therapist not found"}
-                    )
-                
- 
-                cursor.execute(
-                    """SELECT r.review_id, r.rating, r.comment, r.created_at,
-                            p.first_name, p.last_name
-                    FROM Reviews r
-                    JOIN Patients p ON r.patient_id = p.patient_id
-                    WHERE r.therapist_id = %s
-                    ORDER BY r.created_at DESC
-                    LIMIT %s OFFSET %s""",
-                    (id, limit, offset)
-                )
-                reviews = cursor.fetchall()
-                
- 
-                formatted_reviews = []
-                for review in reviews:
- 
-                    created_date = review['created_at']
-                    formatted_date = created_date.strftime("%Y-%m-%d") if created_date else "N/A"
-                    
- 
-                    patient_name = f"{review['first_name'] or ''} {review['last_name'] or ''}".strip()
-                    if not patient_name:
-                        patient_name = "Anonymous Patient"
-                    
-                    formatted_reviews.append({
-                        "id": review['review_id'],
-                        "patientName": patient_name,
-                        "rating": float(review['rating']),
-                        "comment": review['comment'] or "",
-                        "date": formatted_date
-                    })
-                
-                return formatted_reviews
-
-            except Exception as e:
-                print(f"Database error in get therapist reviews API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"error": f"Internal server error: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in get therapist reviews API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"error": f"Server error: {str(e)}"}
-            )
-
-    @app.get("/user/messages")
-    async def get_user_messages(request: Request):
-        """API endpoint to get messages for the current user"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Not authenticated"}
-            )
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "Not authenticated"}
-                )
-
-            user_id = session_data["user_id"]
-            
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    """SELECT m.message_id, m.subject, m.content, m.created_at, m.is_read,
-                            CASE 
-                                WHEN m.sender_type = 'therapist' THEN 
-                                    CONCAT(t.first_name, ' ', t.last_name)
-                                ELSE 'System'
-                            END as sender_name,
-                            CASE 
-                                WHEN m.sender_type = 'therapist' THEN 
-                                    t.profile_image
-                                ELSE 'system-avatar.jpg'
-                            END as sender_image,
-                            m.sender_id, m.sender_type
-                    FROM Messages m
-                    LEFT JOIN Therapists t ON m.sender_id = t.id AND m.sender_type = 'therapist'
-                    WHERE (m.recipient_id = %s AND m.recipient_type = 'user')
-                    OR (m.sender_id = %s AND m.sender_type = 'user')
-                    ORDER BY m.created_at DESC""",
-                    (user_id, user_id)
-                )
-                messages = cursor.fetchall()
-                
- 
-                formatted_messages = []
-                for message in messages:
- 
-                    created_date = message['created_at']
-                    formatted_date = created_date.strftime("%Y-%m-%d %H:%M") if created_date else "N/A"
-                    
-                    formatted_messages.append({
-                        "id": message['message_id'],
-                        "subject": message['subject'] or "",
-                        "content": message['content'] or "",
-                        "date": formatted_date,
-                        "isRead": bool(message['is_read']),
-                        "sender": {
-                            "id": message['sender_id'],
-                            "name": message['sender_name'],
-                            "photoUrl": f"/static/assets/images/user/{message['sender_image']}" if message['sender_image'] else "/static/assets/images/user/avatar-1.jpg",
-                            "type": message['sender_type']
-                        },
-                        "direction": "incoming" if message['recipient_id'] == int(user_id) and message['recipient_type'] == 'user' else "outgoing"
-                    })
-                
-                return formatted_messages
-
-            except Exception as e:
-                print(f"Database error in get user messages API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"detail": f"Internal server error: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in get user messages API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"detail": f"Server error: {str(e)}"}
-            )
-
-    
-    @app.post("/messages/{message_id}/read")
-    async def mark_message_read(request: Request, message_id: int):
-        """API endpoint to mark a message as read"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401,
-                content={"status": "invalid", "detail": "Not authenticated"}
-            )
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"status": "invalid", "detail": "Not authenticated"}
-                )
-
-            user_id = session_data["user_id"]
-            
-            db = get_Mysql_db()
-            cursor = db.cursor()
-
-            try:
- 
-                cursor.execute(
-                    """SELECT message_id 
-                    FROM Messages 
-                    WHERE message_id = %s AND recipient_id = %s AND recipient_type = 'user'""",
-                    (message_id, user_id)
-                )
-                message = cursor.fetchone()
-                
-                if not message:
-                    return JSONResponse(
-                        status_code=404,
-                        content={"status": "invalid", "detail": "Message not found"}
-                    )
-                
- 
-                cursor.execute(
-                    "UPDATE Messages SET is_read = TRUE WHERE message_id = %s",
-                    (message_id,)
-                )
-                db.commit()
-                
-                return {"status": "valid", "message": "Message marked as read"}
-
-            except Exception as e:
-                db.rollback()
-                print(f"Database error in mark message read API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"status": "invalid", "detail": f"Error updating message: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in mark message read API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"status": "invalid", "detail": f"Server error: {str(e)}"}
-            )
-
-    @app.get("/user/profile")
-    async def get_user_profile(request: Request):
-        """API endpoint to get the user's profile information"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401,
-                content={"detail": "Not authenticated"}
-            )
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"detail": "Not authenticated"}
-                )
-
-            user_id = session_data["user_id"]
-            
-            db = get_Mysql_db()
-            cursor = db.cursor(dictionary=True)
-
-            try:
- 
-                cursor.execute(
-                    "SELECT username, email, profile_pic, created_at FROM users WHERE user_id = %s",
-                    (user_id,)
-                )
-                user = cursor.fetchone()
-                
-                if not user:
-                    return JSONResponse(
-                        status_code=404,
-                        content={"detail": "User not found"}
-                    )
-                
- 
-                cursor.execute(
-                    """SELECT p.*, t.first_name as therapist_first_name, t.last_name as therapist_last_name
-                    FROM Patients p
-                    LEFT JOIN Therapists t ON p.therapist_id = t.id
-                    WHERE p.user_id = %s""",
-                    (user_id,)
-                )
-                patient = cursor.fetchone()
-                
- 
-                profile = {
-                    "username": user['username'],
-                    "email": user['email'],
-                    "profilePicture": f"/static/assets/images/user/{user['profile_pic']}" if user['profile_pic'] else None,
-                    "joinedDate": user['created_at'].strftime("%Y-%m-%d") if user['created_at'] else None,
-                    "hasPatientProfile": patient is not None
-                }
-                
-                if patient:
-                    profile.update({
-                        "patientProfile": {
-                            "id": patient['patient_id'],
-                            "firstName": patient['first_name'],
-                            "lastName": patient['last_name'],
-                            "phoneNumber": patient['phone'],
-                            "dateOfBirth": patient['date_of_birth'].strftime("%Y-%m-%d") if patient['date_of_birth'] else None,
-                            "address": patient['address'],
-                            "diagnosis": patient['diagnosis'],
-                            "status": patient['status'],
-                            "therapist": {
-                                "id": patient['therapist_id'],
-                                "name": f"{patient['therapist_first_name']} {patient['therapist_last_name']}".strip() if patient['therapist_first_name'] else None
-                            }
-                        }
-                    })
-                
-                return profile
-
-            except Exception as e:
-                print(f"Database error in get user profile API: {e}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"detail": f"Internal server error: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in get user profile API: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={"detail": f"Server error: {str(e)}"}
-            )
-
-    @app.put("/user/profile")
-    async def update_user_profile(request: Request, profile_data: dict):
-        """API endpoint to update user profile information"""
-        session_id = request.cookies.get("session_id")
-        if not session_id:
-            return JSONResponse(
-                status_code=401,
-                content={"status": "invalid", "detail": "Not authenticated"}
-            )
-
-        try:
-            session_data = await get_redis_session(session_id)
-            if not session_data:
-                return JSONResponse(
-                    status_code=401,
-                    content={"status": "invalid", "detail": "Not authenticated"}
-                )
-
-            user_id = session_data["user_id"]
-            
-            db = get_Mysql_db()
-            cursor = db.cursor()
-
-            try:
-                if 'username' in profile_data or 'email' in profile_data:
-                    update_fields = []
-                    params = []
-                    
-                    if 'username' in profile_data:
-                        update_fields.append("username = %s")
-                        params.append(ensure_str(profile_data['username']))
-                    
-                    if 'email' in profile_data:
-                        update_fields.append("email = %s")
-                        params.append(ensure_str(profile_data['email']))
-                    
-                    params.append(user_id)
-                    
-                    cursor.execute(
-                        f"UPDATE users SET {', '.join(update_fields)}, updated_at = CURRENT_TIMESTAMP WHERE user_id = %s",
-                        params
-                    )
-                patient_data = profile_data.get('patientProfile', {})
-                if patient_data:
-                    cursor.execute(
-                        "SELECT patient_id FROM Patients WHERE user_id = %s",
-                        (user_id,)
-                    )
-                    patient = cursor.fetchone()
-                    
-                    if patient:
-                        patient_id = patient[0]
-                        
-                        update_fields = []
-                        params = []
-                        
-                        for field, db_field in [
-                            ('firstName', 'first_name'),
-                            ('lastName', 'last_name'),
-                            ('phoneNumber', 'phone'),
-                            ('dateOfBirth', 'date_of_birth'),
-                            ('address', 'address'),
-                            ('diagnosis', 'diagnosis')
-                        ]:
-                            if field in patient_data:
-                                update_fields.append(f"{db_field} = %s")
-                                params.append(ensure_str(patient_data[field]))
-                        
-                        if update_fields:
-                            params.append(patient_id)
-                            cursor.execute(
-                                f"UPDATE Patients SET {', '.join(update_fields)}, updated_at = CURRENT_TIMESTAMP WHERE patient_id = %s",
-                                params
-                            )
-                    else:
-                        pass
-                
-                db.commit()
-                
-                return {"status": "valid", "message": "Profile updated successfully"}
-
-            except Exception as e:
-                db.rollback()
-                print(f"Database error in update user profile API: {e}")
-                print(f"Traceback: {traceback.format_exc()}")
-                return JSONResponse(
-                    status_code=500,
-                    content={"status": "invalid", "detail": f"Error updating profile: {str(e)}"}
-                )
-            finally:
-                cursor.close()
-                db.close()
-        except Exception as e:
-            print(f"Error in update user profile API: {e}")
-            print(f"Traceback: {traceback.format_exc()}")
-            return JSONResponse(
-                status_code=500,
-                content={"status": "invalid", "detail": f"Server error: {str(e)}"}
-            )
-    
+    if any(domain in TEMPLATE_DOMAINS for domain in domains):
+        from connections.templating import mount_templates
+        mount_templates(app)
 
-    if __name__ == "__main__":
-        base_url = getIP()
-        uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    app.state.deployment_role = role
+    app.state.router_domains = list(domains)
+    print(f"Deployment role '{role}' mounted routers: {', '.join(domains)}")
+    return domains
@@ -0,0 +1,32 @@
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
+from pathlib import Path as FilePath
+import os
+
+
+def get_static_directory():
+    static_dir = os.environ.get("STATIC_DIR", None)
+    if static_dir:
+        return FilePath(static_dir)
+
+    project_root = FilePath(__file__).resolve().parent.parent.parent
+    return project_root / "Frontend_Web" / "static"
+
+templates_directory = get_static_directory().parent / "templates"
+
+templates = Jinja2Templates(directory=str(templates_directory))
+
+
+def mount_templates(app):
+    """
+    Serve the dashboard's template assets under /dist.
+    Only called when a router that renders templates is mounted.
+    """
+    if any(route.path == "/dist" for route in app.routes):
+        return
+
+    if templates_directory.exists():
+        app.mount("/dist", StaticFiles(directory=str(templates_directory)), name="templates")
+        print(f"Templates directory mounted: {templates_directory}")
+    else:
+        print(f"Warning: Templates directory does not exist: {templates_directory}")
@@ -1,5 +1,8 @@
 from fastapi import Request, HTTPException, Depends
 from connections.redis_database import get_redis_session
+from connections.logs import get_logger
+
+logger = get_logger("session")
 
 async def get_current_user(request: Request):
     session_id = request.cookies.get("session_id")
@@ -8,7 +11,7 @@ async def get_current_user(request: Request):
         raise HTTPException(status_code=401, detail="Not authenticated")
 
     session = await get_redis_session(session_id)
-    print(f"session: {session}")
+    logger.debug("session_loaded", found=bool(session), user_type=session.get("user_type") if session else None)
 
     if not session:
         raise HTTPException(status_code=401, detail="Session expired or invalid")
@@ -0,0 +1,191 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+import time
+
+from connections.logs import get_logger
+from connections.metrics import create_background_task
+from inference.detector import INFERENCE_MODEL_VERSION
+from inference.runtime import INFERENCE_IMGSZ
+
+INFERENCE_CACHE_ENABLED = os.getenv("INFERENCE_CACHE_ENABLED", "1").lower() in ("1", "true", "yes")
+INFERENCE_CACHE_HOT_ENTRIES = int(os.getenv("INFERENCE_CACHE_HOT_ENTRIES", 10000))
+INFERENCE_CACHE_HOT_TTL = int(os.getenv("INFERENCE_CACHE_HOT_TTL", 24 * 3600))
+INFERENCE_CACHE_COLD_TTL = int(os.getenv("INFERENCE_CACHE_COLD_TTL", 30 * 24 * 3600))
+INFERENCE_CACHE_COLD_ENTRIES = int(os.getenv("INFERENCE_CACHE_COLD_ENTRIES", 1000000))
+INFERENCE_CACHE_TRIM_EVERY = int(os.getenv("INFERENCE_CACHE_TRIM_EVERY", 100))
+
+CACHE_PREFIX = "inference:cache:"
+CACHE_LRU_KEY = "inference:cache:lru"
+CACHE_COLLECTION = "inference_cache"
+
+logger = get_logger("inference.cache")
+
+
+def content_digest(data: bytes):
+    """Exact SHA-256 of an uploaded frame as sent, so identical re-uploads hit before decoding."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(kind, digest, model_name, threshold, version=INFERENCE_MODEL_VERSION):
+    """
+    Everything that changes the output is part of the key: the content, the model and its
+    version (bump INFERENCE_MODEL_VERSION when weights change under the same name),
+    the input size and the confidence threshold.
+    """
+    return f"{kind}:{model_name}:{version}:{INFERENCE_IMGSZ}:{threshold:.4f}:{digest}"
+
+
+class InferenceCache:
+    """
+    Two-tier cache of inference results.
+
+    Hot entries live in Redis next to the sessions, so instead of a server-wide eviction
+    policy the cache keeps its own LRU: a sorted set of keys scored by last use, trimmed
+    to INFERENCE_CACHE_HOT_ENTRIES. Every entry is also written to the Mongo
+    `inference_cache` collection, which is kept to INFERENCE_CACHE_COLD_ENTRIES by
+    deleting the least recently used documents; its TTL index on last_used also drops
+    entries nobody has read for INFERENCE_CACHE_COLD_TTL seconds. A cold hit is promoted
+    back to Redis.
+
+    Writes run as background tasks so a miss only pays for inference. Cache errors are
+    logged and treated as misses; they never fail inference.
+    """
+
+    def __init__(
+        self,
+        enabled=INFERENCE_CACHE_ENABLED,
+        hot_entries=INFERENCE_CACHE_HOT_ENTRIES,
+        cold_entries=INFERENCE_CACHE_COLD_ENTRIES,
+    ):
+        self.enabled = enabled
+        self.hot_entries = hot_entries
+        self.cold_entries = cold_entries
+        self.hits = {"hot": 0, "cold": 0}
+        self.misses = 0
+        self._indexes_ready = False
+        self._writes = 0
+        self._tasks = set()
+
+    def _redis(self):
+        from connections.redis_database import r
+        return r
+
+    async def _collection(self):
+        from connections.mongo_db import get_async_Mongo_db
+
+        collection = get_async_Mongo_db(CACHE_COLLECTION)
+        if not self._indexes_ready:
+            await collection.create_index("last_used", expireAfterSeconds=INFERENCE_CACHE_COLD_TTL)
+            self._indexes_ready = True
+        return collection
+
+    async def get(self, key):
+        if not self.enabled:
+            return None
+
+        try:
+            async with self._redis().pipeline(transaction=False) as pipe:
+                pipe.get(CACHE_PREFIX + key)
+                pipe.zadd(CACHE_LRU_KEY, {key: time.time()}, xx=True)
+                value, _ = await pipe.execute()
+            if value is not None:
+                self.hits["hot"] += 1
+                return json.loads(value)
+        except Exception as e:
+            logger.warning("inference_cache_read_failed", tier="redis", error=str(e))
+
+        try:
+            collection = await self._collection()
+            doc = await collection.find_one_and_update(
+                {"_id": key}, {"$set": {"last_used": datetime.datetime.utcnow()}}
+            )
+            if doc is not None:
+                self.hits["cold"] += 1
+                self._spawn(self._put_hot(key, doc["result"]))
+                return doc["result"]
+        except Exception as e:
+            logger.warning("inference_cache_read_failed", tier="mongo", error=str(e))
+
+        self.misses += 1
+        return None
+
+    def put(self, key, result):
+        """Schedule writing an entry to both tiers without waiting for it."""
+        if not self.enabled:
+            return
+        self._spawn(self._put(key, result))
+
+    def _spawn(self, coro):
+        task = create_background_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def close(self):
+        """Wait for scheduled writes to finish."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _put(self, key, result):
+        await self._put_hot(key, result)
+        try:
+            collection = await self._collection()
+            await collection.replace_one(
+                {"_id": key}, {"result": result, "last_used": datetime.datetime.utcnow()}, upsert=True
+            )
+            self._writes += 1
+            if self._writes % INFERENCE_CACHE_TRIM_EVERY == 0:
+                await self._trim_cold(collection)
+        except Exception as e:
+            logger.warning("inference_cache_write_failed", tier="mongo", error=str(e))
+
+    async def _trim_cold(self, collection):
+        """Delete the least recently used documents beyond cold_entries."""
+        excess = await collection.estimated_document_count() - self.cold_entries
+        if excess <= 0:
+            return
+        oldest = collection.find({}, {"_id": 1}).sort("last_used", 1).limit(excess)
+        keys = [doc["_id"] async for doc in oldest]
+        if keys:
+            await collection.delete_many({"_id": {"$in": keys}})
+
+    async def _put_hot(self, key, result):
+        """Write an entry to Redis and evict the least recently used keys beyond hot_entries."""
+        try:
+            redis_client = self._redis()
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.set(CACHE_PREFIX + key, json.dumps(result), ex=INFERENCE_CACHE_HOT_TTL)
+                pipe.zadd(CACHE_LRU_KEY, {key: time.time()})
+                pipe.zcard(CACHE_LRU_KEY)
+                _, _, size = await pipe.execute()
+
+            if size > self.hot_entries:
+                evicted = await redis_client.zpopmin(CACHE_LRU_KEY, size - self.hot_entries)
+                if evicted:
+                    await redis_client.delete(*(CACHE_PREFIX + name for name, _ in evicted))
+        except Exception as e:
+            logger.warning("inference_cache_write_failed", tier="redis", error=str(e))
+
+    def stats(self):
+        lookups = self.hits["hot"] + self.hits["cold"] + self.misses
+        return {
+            "enabled": self.enabled,
+            "hot_hits": self.hits["hot"],
+            "cold_hits": self.hits["cold"],
+            "misses": self.misses,
+            "hit_ratio": round((self.hits["hot"] + self.hits["cold"]) / lookups, 3) if lookups else None,
+        }
+
+
+inference_cache = InferenceCache()
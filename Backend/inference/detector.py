@@ -0,0 +1,386 @@
+import asyncio
+import collections
+import os
+import statistics
+import threading
+import time
+from typing import Optional
+
+from connections.logs import get_logger
+from connections.metrics import create_background_task
+from inference.runtime import (
+    INFERENCE_BACKEND, INFERENCE_IMGSZ, INFERENCE_INT8, get_backend_report, load_fastest_model, run_batch
+)
+from inference.worker_pool import INFERENCE_WORKERS, InferencePool
+
+INFERENCE_MODEL = os.getenv("INFERENCE_MODEL", "yolov8n.pt")
+INFERENCE_POSE_MODEL = os.getenv("INFERENCE_POSE_MODEL", "yolov8n-pose.pt")
+INFERENCE_DEVICE = os.getenv("INFERENCE_DEVICE", "cpu")
+INFERENCE_CONFIDENCE = float(os.getenv("INFERENCE_CONFIDENCE", 0.25))
+INFERENCE_MAX_BATCH = int(os.getenv("INFERENCE_MAX_BATCH", 8))
+INFERENCE_BATCH_WINDOW = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", 10)) / 1000
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", 64))
+INFERENCE_MODEL_VERSION = os.getenv("INFERENCE_MODEL_VERSION", "1")
+INFERENCE_POSE_MODEL_VERSION = os.getenv("INFERENCE_POSE_MODEL_VERSION", "1")
+INFERENCE_KEEPWARM_SECONDS = float(os.getenv("INFERENCE_KEEPWARM_SECONDS", 60))
+INFERENCE_PRELOAD = os.getenv("INFERENCE_PRELOAD", "1").lower() in ("1", "true", "yes")
+
+_models = {}
+_models_lock = threading.Lock()
+
+logger = get_logger("inference.detector")
+
+
+def model_key(name, version=None):
+    return name, version, INFERENCE_BACKEND, INFERENCE_INT8
+
+
+def load_model(name=INFERENCE_MODEL, version=None):
+    """
+    Load a YOLO model once per worker process and reuse it for every request.
+    Models are cached per (weights, version, backend, int8), so a retrained file swapped
+    in under the same path as a new version is loaded fresh rather than served from the cache.
+    The fastest available runtime (PyTorch, ONNX Runtime or OpenVINO) is picked at load time.
+    ultralytics is imported lazily so web-only workers never pay for torch.
+    """
+    key = model_key(name, version)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            started = time.perf_counter()
+            model = load_fastest_model(name, INFERENCE_BACKEND, INFERENCE_IMGSZ, INFERENCE_INT8)
+            _models[key] = model
+            logger.info("model_loaded", weights=name, version=version, seconds=round(time.perf_counter() - started, 2))
+
+    return model
+
+
+def unload_model(name, version=None):
+    with _models_lock:
+        _models.pop(model_key(name, version), None)
+
+
+def warm_model(name, version=None):
+    """Load `name` if needed and run one blank frame through it, so the next real request is fast."""
+    import numpy as np
+
+    model = load_model(name, version)
+    started = time.perf_counter()
+    run_batch(model, [np.zeros((INFERENCE_IMGSZ, INFERENCE_IMGSZ, 3), dtype=np.uint8)], imgsz=INFERENCE_IMGSZ, verbose=False)
+    return time.perf_counter() - started
+
+
+def decode_image(data: bytes):
+    """Decode an uploaded JPEG/PNG/WebP into the BGR array `model.predict` expects, or None."""
+    import cv2
+    import numpy as np
+
+    if not data:
+        return None
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def format_detections(result, confidence_threshold):
+    """
+    Turn one ultralytics Result into the annotation shape stored in Mongo:
+    [{"class", "confidence", "bbox": [x1, y1, x2, y2]}, ...]
+    Pose models add "keypoints": [[x, y, confidence], ...] in the model's keypoint order.
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return []
+
+    names = result.names
+    classes = boxes.cls.tolist()
+    confidences = boxes.conf.tolist()
+    coordinates = boxes.xyxy.tolist()
+    keypoints = result.keypoints.data.tolist() if getattr(result, "keypoints", None) is not None else None
+
+    annotations = []
+    for index, (cls, confidence, bbox) in enumerate(zip(classes, confidences, coordinates)):
+        if confidence < confidence_threshold:
+            continue
+        annotation = {
+            "class": names[int(cls)],
+            "confidence": round(confidence, 4),
+            "bbox": [round(value, 1) for value in bbox],
+        }
+        if keypoints is not None:
+            annotation["keypoints"] = [[round(value, 2) for value in point] for point in keypoints[index]]
+        annotations.append(annotation)
+    return annotations
+
+
+def predict_frames(model_name, device, frames, thresholds, version=None):
+    """
+    Run one predict call over a batch of frames at the loosest requested threshold,
+    then filter each frame's detections to its own threshold.
+    """
+    model = load_model(model_name, version)
+
+    started = time.perf_counter()
+    results = run_batch(model, frames, conf=min(thresholds), imgsz=INFERENCE_IMGSZ, device=device, verbose=False)
+    processing_time = time.perf_counter() - started
+
+    detections = []
+    for frame, threshold, result in zip(frames, thresholds, results):
+        height, width = frame.shape[:2]
+        detections.append({
+            "annotations": format_detections(result, threshold),
+            "size": {"height": height, "width": width},
+            "model_used": model_name,
+            "confidence_threshold": threshold,
+            "processing_time": round(processing_time, 4),
+            "batch_size": len(frames),
+            "device": device,
+        })
+    return detections
+
+
+class InferenceBusy(Exception):
+    """Raised when the inference queue is full; routes answer 429."""
+
+
+class ModelVersion:
+    """
+    One deployed version of a model: its weights, its process pool when workers are used,
+    and latency statistics for the batches it served.
+    """
+
+    def __init__(self, weights, version, device=INFERENCE_DEVICE, workers=0):
+        self.weights = weights
+        self.version = str(version)
+        self.pool = InferencePool(weights, device, workers, version=self.version) if workers > 0 else None
+        self.activated_at = None
+        self.retired_at = None
+        self.batches = 0
+        self.frames = 0
+        self.latencies = collections.deque(maxlen=1000)
+        self.tasks = set()
+
+    def record(self, batch_size, seconds):
+        self.batches += 1
+        self.frames += batch_size
+        self.latencies.append(seconds * 1000)
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        return {
+            "weights": self.weights,
+            "version": self.version,
+            "activated_at": self.activated_at,
+            "retired_at": self.retired_at,
+            "batches": self.batches,
+            "frames": self.frames,
+            "latency_ms_p50": round(statistics.median(latencies), 2) if latencies else None,
+            "latency_ms_p95": round(latencies[int(0.95 * (len(latencies) - 1))], 2) if latencies else None,
+            "in_flight": len(self.tasks),
+        }
+
+
+class DetectionBatcher:
+    """
+    Collects frames from concurrent requests and runs them through the model as one
+    `predict` call, waiting at most `batch_window` seconds for a batch to fill.
+
+    With INFERENCE_WORKERS > 0 batches go to a process pool, one in flight per worker,
+    so prediction never competes with the event loop for the GIL. Otherwise they run
+    in a thread, one at a time. The queue is bounded: when it is full, `detect`
+    raises InferenceBusy instead of letting latency grow without limit.
+    """
+
+    def __init__(self, model_name=INFERENCE_MODEL, max_batch=INFERENCE_MAX_BATCH,
+                 batch_window=INFERENCE_BATCH_WINDOW, device=INFERENCE_DEVICE,
+                 queue_size=INFERENCE_QUEUE_SIZE, workers=None, version=INFERENCE_MODEL_VERSION):
+        self.model_name = model_name
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.device = device
+        self.queue_size = queue_size
+        self.workers = INFERENCE_WORKERS if workers is None else workers
+        self.active = ModelVersion(model_name, version, device, self.workers)
+        self.active.activated_at = time.time()
+        self.retired = collections.deque(maxlen=5)
+        self.last_batch_at = 0.0
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._keep_warm_task: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._swap_lock: Optional[asyncio.Lock] = None
+        self._inflight = set()
+        self._background = set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self.queue = asyncio.Queue(maxsize=self.queue_size)
+            self._slots = asyncio.Semaphore(max(1, self.workers))
+            self._swap_lock = asyncio.Lock()
+            self._task = create_background_task(self._run())
+            if INFERENCE_KEEPWARM_SECONDS > 0:
+                self._keep_warm_task = create_background_task(self._keep_warm())
+
+    async def preload(self):
+        """Load and warm the active version before traffic arrives (every pool worker when workers are used)."""
+        self.start()
+        async with self._slots:
+            await self._warm(self.active)
+
+    async def swap(self, weights, version):
+        """
+        Hot-swap to another model version without dropping requests.
+
+        The new version is loaded and warmed while the current one keeps serving. The switch
+        itself is a single reference change: batches dispatched before it finish on the old
+        version, which is released once they are done. Returns the retired version.
+        """
+        self.start()
+        async with self._swap_lock:
+            candidate = ModelVersion(weights, version, self.device, self.workers)
+            try:
+                await self._warm(candidate)
+            except Exception:
+                if candidate.pool is not None:
+                    candidate.pool.close()
+                raise
+
+            previous, self.active = self.active, candidate
+            candidate.activated_at = previous.retired_at = time.time()
+            self.retired.append(previous)
+            logger.info("model_swapped", model=self.model_name, previous_weights=previous.weights,
+                        previous_version=previous.version, weights=weights, version=version)
+
+        task = create_background_task(self._release(previous))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return previous
+
+    async def _warm(self, model):
+        if model.pool is not None:
+            await model.pool.warm()
+        else:
+            await asyncio.to_thread(warm_model, model.weights, model.version)
+
+    async def _release(self, model):
+        if model.tasks:
+            await asyncio.gather(*model.tasks, return_exceptions=True)
+        if model.pool is not None:
+            model.pool.close()
+        elif (model.weights, model.version) != (self.active.weights, self.active.version):
+            unload_model(model.weights, model.version)
+
+    async def _keep_warm(self):
+        """Run a blank frame through the model when it has been idle, so caches and threads stay hot."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(INFERENCE_KEEPWARM_SECONDS)
+            if loop.time() - self.last_batch_at >= INFERENCE_KEEPWARM_SECONDS:
+                # Take a batch slot: in thread mode the model must not predict concurrently with _dispatch.
+                async with self._slots:
+                    try:
+                        await self._warm(self.active)
+                    except Exception as e:
+                        logger.warning("keep_warm_failed", weights=self.active.weights, error=str(e))
+
+    def model_stats(self):
+        return {
+            "active": self.active.stats(),
+            "retired": [model.stats() for model in self.retired],
+        }
+
+    async def detect(self, frame, confidence_threshold=INFERENCE_CONFIDENCE):
+        """Queue one frame and wait for its detections. Raises InferenceBusy when the queue is full."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((frame, confidence_threshold, future))
+        except asyncio.QueueFull:
+            raise InferenceBusy(f"Inference queue is full ({self.queue_size} frames waiting)")
+        return await future
+
+    async def backend_report(self):
+        """Per-backend latency recorded when the model was loaded, loading it if needed."""
+        model = self.active
+        if model.pool is not None:
+            return await model.pool.backend_report()
+        await asyncio.to_thread(load_model, model.weights, model.version)
+        return get_backend_report()
+
+    def pending(self):
+        return self.queue.qsize() if self.queue is not None else 0
+
+    async def close(self):
+        if self._task is None:
+            return
+        if self._keep_warm_task is not None:
+            self._keep_warm_task.cancel()
+            self._keep_warm_task = None
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._inflight or self._background:
+            await asyncio.gather(*self._inflight, *self._background, return_exceptions=True)
+        for model in (self.active, *self.retired):
+            if model.pool is not None:
+                model.pool.close()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._slots.acquire()
+            # The batch is bound to the version active now; a swap from here on doesn't affect it.
+            model = self.active
+            task = asyncio.create_task(self._dispatch(model, batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+            model.tasks.add(task)
+            task.add_done_callback(model.tasks.discard)
+
+    async def _dispatch(self, model, batch):
+        frames = [frame for frame, _, _ in batch]
+        thresholds = [threshold for _, threshold, _ in batch]
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            if model.pool is not None:
+                results = await model.pool.predict(frames, thresholds)
+            else:
+                results = await asyncio.to_thread(
+                    predict_frames, model.weights, self.device, frames, thresholds, model.version
+                )
+            model.record(len(batch), loop.time() - started)
+            self.last_batch_at = loop.time()
+            for (_, _, future), result in zip(batch, results):
+                result["model_version"] = model.version
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            logger.exception("inference_batch_failed", weights=model.weights, version=model.version,
+                             batch_size=len(batch), error=str(e))
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+
+detection_batcher = DetectionBatcher()
+pose_batcher = DetectionBatcher(model_name=INFERENCE_POSE_MODEL, version=INFERENCE_POSE_MODEL_VERSION)
@@ -0,0 +1,255 @@
+import datetime
+
+import numpy as np
+
+# COCO keypoint order used by the YOLO pose models.
+KEYPOINTS = {
+    "nose": 0, "left_eye": 1, "right_eye": 2, "left_ear": 3, "right_ear": 4,
+    "left_shoulder": 5, "right_shoulder": 6, "left_elbow": 7, "right_elbow": 8,
+    "left_wrist": 9, "right_wrist": 10, "left_hip": 11, "right_hip": 12,
+    "left_knee": 13, "right_knee": 14, "left_ankle": 15, "right_ankle": 16,
+}
+
+# Each joint angle is measured at the middle keypoint of the triple.
+JOINTS = {
+    "left_elbow": ("left_shoulder", "left_elbow", "left_wrist"),
+    "right_elbow": ("right_shoulder", "right_elbow", "right_wrist"),
+    "left_shoulder": ("left_elbow", "left_shoulder", "left_hip"),
+    "right_shoulder": ("right_elbow", "right_shoulder", "right_hip"),
+    "left_hip": ("left_shoulder", "left_hip", "left_knee"),
+    "right_hip": ("right_shoulder", "right_hip", "right_knee"),
+    "left_knee": ("left_hip", "left_knee", "left_ankle"),
+    "right_knee": ("right_hip", "right_knee", "right_ankle"),
+}
+
+_JOINT_NAMES = list(JOINTS)
+_JOINT_INDEX = np.array([[KEYPOINTS[name] for name in JOINTS[joint]] for joint in _JOINT_NAMES])
+
+MIN_KEYPOINT_CONFIDENCE = 0.5
+MIN_RANGE_OF_MOTION = 25.0
+SMOOTHING_SECONDS = 0.2
+SET_BREAK_SECONDS = 20.0
+
+
+def joint_angles(keypoints, min_confidence=MIN_KEYPOINT_CONFIDENCE):
+    """
+    Angles in degrees for every joint in JOINTS over a whole sequence at once.
+
+    keypoints: array of shape (frames, 17, 3) holding x, y, confidence.
+    Returns an array of shape (frames, len(JOINTS)); NaN where any of the three
+    keypoints was below min_confidence.
+    """
+    keypoints = np.asarray(keypoints, dtype=np.float32)
+    points = keypoints[:, _JOINT_INDEX, :2]
+    confidence = keypoints[:, _JOINT_INDEX, 2].min(axis=2)
+
+    first = points[:, :, 0] - points[:, :, 1]
+    second = points[:, :, 2] - points[:, :, 1]
+    norms = np.linalg.norm(first, axis=2) * np.linalg.norm(second, axis=2)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cosine = np.einsum("fjk,fjk->fj", first, second) / norms
+    angles = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+    angles[(confidence < min_confidence) | (norms == 0)] = np.nan
+    return angles
+
+
+def fill_gaps(series):
+    """Linearly interpolate NaN gaps in a 1-D series; all-NaN input is returned unchanged."""
+    valid = ~np.isnan(series)
+    if valid.all() or not valid.any():
+        return series
+    positions = np.arange(series.size)
+    return np.interp(positions, positions[valid], series[valid])
+
+
+def smooth(series, window):
+    """Centered moving average with edge padding, so the output keeps the input's length."""
+    if window <= 1 or series.size < window:
+        return series
+    padded = np.pad(series, (window // 2, window - 1 - window // 2), mode="edge")
+    return np.convolve(padded, np.ones(window) / window, mode="valid")
+
+
+def detect_repetitions(series, min_range=MIN_RANGE_OF_MOTION):
+    """
+    Count repetitions in a joint-angle series with hysteresis peak detection.
+
+    The series is split into "extended" and "flexed" phases using thresholds at 30% and
+    70% of its robust range; each flexed phase bounded by extended phases is one rep.
+    Returns (starts, bottoms, ends) as frame-index arrays, one entry per repetition.
+    """
+    empty = np.array([], dtype=int)
+    if series.size < 3 or np.isnan(series).all():
+        return empty, empty, empty
+
+    low, high = np.nanpercentile(series, [5, 95])
+    if high - low < min_range:
+        return empty, empty, empty
+
+    flexed_below = low + 0.3 * (high - low)
+    extended_above = low + 0.7 * (high - low)
+
+    state = np.zeros(series.size, dtype=np.int8)
+    state[series >= extended_above] = 1
+    state[series <= flexed_below] = -1
+
+    # Keep only frames where the state is decided, then find where it flips.
+    decided = np.flatnonzero(state)
+    if decided.size < 2:
+        return empty, empty, empty
+    flips = np.flatnonzero(np.diff(state[decided])) + 1
+    phase_starts = np.concatenate(([0], flips))
+    phase_states = state[decided[phase_starts]]
+    phase_first = decided[phase_starts]
+    phase_last = decided[np.concatenate((flips, [decided.size])) - 1]
+
+    # A rep is extended -> flexed -> extended: every flexed phase with an extended one on both sides.
+    flexed = np.flatnonzero(phase_states == -1)
+    flexed = flexed[(flexed > 0) & (flexed < phase_states.size - 1)]
+    if flexed.size == 0:
+        return empty, empty, empty
+
+    # From leaving the extended position to getting back to it, so rests between reps are excluded.
+    starts = phase_last[flexed - 1]
+    ends = phase_first[flexed + 1]
+
+    # The deepest point of each rep, found for all reps at once.
+    segment_bounds = np.stack([starts, ends], axis=1).ravel()
+    filled = np.where(np.isnan(series), np.inf, series)
+    minima = np.minimum.reduceat(filled, segment_bounds)[::2]
+    bottoms = np.array([start + np.flatnonzero(filled[start:end] == value)[0]
+                        for start, end, value in zip(starts, ends, minima)], dtype=int)
+    return starts, bottoms, ends
+
+
+def group_sets(starts, ends, times, set_break=SET_BREAK_SECONDS):
+    """Split consecutive reps into sets wherever the rest between them exceeds set_break seconds."""
+    if starts.size == 0:
+        return []
+    rests = times[starts[1:]] - times[ends[:-1]]
+    breaks = np.flatnonzero(rests > set_break) + 1
+    return [int(size) for size in np.diff(np.concatenate(([0], breaks, [starts.size])))]
+
+
+def choose_primary_joint(angles):
+    """The joint that moves the most (largest 5-95 percentile range) with enough tracked frames."""
+    tracked = (~np.isnan(angles)).mean(axis=0)
+    with np.errstate(all="ignore"):
+        spread = np.nanpercentile(angles, 95, axis=0) - np.nanpercentile(angles, 5, axis=0)
+    spread = np.where((tracked >= 0.5) & ~np.isnan(spread), spread, -1)
+    return _JOINT_NAMES[int(np.argmax(spread))]
+
+
+def score_form(series, angles, joint, starts, bottoms, ends, times, target_range=None):
+    """
+    Form score out of 100 from four parts, each 0-1:
+    range of motion against the target (or the session's best rep), consistency of
+    range between reps, consistency of tempo, and left/right symmetry of the joint.
+    Symmetry is None when no frame has both sides visible, and the other parts are
+    reweighted to make up the score.
+    """
+    if starts.size == 0:
+        return 0.0, {}
+
+    peaks = np.maximum.reduceat(np.where(np.isnan(series), -np.inf, series),
+                                np.stack([starts, ends], axis=1).ravel())[::2]
+    ranges = peaks - series[bottoms]
+    durations = times[ends] - times[starts]
+
+    target = target_range or float(ranges.max())
+    range_score = float(np.clip(ranges / target, 0, 1).mean())
+    range_consistency = float(np.clip(1 - ranges.std() / max(ranges.mean(), 1e-6), 0, 1))
+    tempo_consistency = float(np.clip(1 - durations.std() / max(durations.mean(), 1e-6), 0, 1))
+
+    side, _, name = joint.partition("_")
+    mirror = f"{'right' if side == 'left' else 'left'}_{name}"
+    difference = np.abs(angles[:, _JOINT_NAMES.index(joint)] - angles[:, _JOINT_NAMES.index(mirror)])
+    difference = difference[np.isfinite(difference)]
+    symmetry = float(np.clip(1 - difference.mean() / 45, 0, 1)) if difference.size else None
+
+    parts = {
+        "range_of_motion": round(range_score, 3),
+        "range_consistency": round(range_consistency, 3),
+        "tempo_consistency": round(tempo_consistency, 3),
+        "symmetry": round(symmetry, 3) if symmetry is not None else None,
+    }
+    score = 0.4 * range_score + 0.2 * range_consistency + 0.2 * tempo_consistency
+    if symmetry is None:
+        score /= 0.8
+    else:
+        score += 0.2 * symmetry
+    return round(100 * score, 1), parts
+
+
+def analyze_session(keypoints, fps=None, timestamps=None, joint=None, target_range=None,
+                    min_confidence=MIN_KEYPOINT_CONFIDENCE, set_break=SET_BREAK_SECONDS):
+    """
+    Analyse one person's keypoint sequence from an exercise session.
+
+    Pass either `fps` for evenly spaced frames or `timestamps` (seconds) for frames that
+    were skipped irregularly, e.g. from the live pose stream. `joint` picks the joint to
+    count on; by default the one with the largest movement is used.
+    """
+    keypoints = np.asarray(keypoints, dtype=np.float32)
+    if keypoints.ndim != 3 or keypoints.shape[1:] != (17, 3):
+        raise ValueError("keypoints must have shape (frames, 17, 3)")
+    if joint is not None and joint not in JOINTS:
+        raise ValueError(f"Unknown joint: {joint}")
+
+    frames = keypoints.shape[0]
+    if timestamps is not None:
+        times = np.asarray(timestamps, dtype=np.float64)
+        if times.shape != (frames,):
+            raise ValueError("timestamps must have one entry per frame")
+    else:
+        times = np.arange(frames, dtype=np.float64) / float(fps or 30)
+
+    angles = joint_angles(keypoints, min_confidence)
+    joint = joint or choose_primary_joint(angles)
+
+    frame_interval = np.median(np.diff(times)) if frames > 1 else 1.0
+    window = max(1, int(round(SMOOTHING_SECONDS / max(frame_interval, 1e-6))))
+    series = smooth(fill_gaps(angles[:, _JOINT_NAMES.index(joint)]), window)
+
+    starts, bottoms, ends = detect_repetitions(series)
+    sets = group_sets(starts, ends, times, set_break)
+    form_score, form_parts = score_form(series, angles, joint, starts, bottoms, ends, times, target_range)
+
+    return {
+        "joint": joint,
+        "frames": frames,
+        "duration_seconds": round(float(times[-1] - times[0]), 2) if frames else 0.0,
+        "tracked_ratio": round(float((~np.isnan(angles[:, _JOINT_NAMES.index(joint)])).mean()), 3) if frames else 0.0,
+        "repetitions": int(starts.size),
+        "sets": sets,
+        "form_score": form_score,
+        "form": form_parts,
+        "reps": [
+            {
+                "start": round(float(times[start]), 2),
+                "bottom": round(float(times[bottom]), 2),
+                "end": round(float(times[end]), 2),
+                "min_angle": round(float(series[bottom]), 1),
+            }
+            for start, bottom, end in zip(starts, bottoms, ends)
+        ],
+    }
+
+
+def record_progress(cursor, patient_id, plan_exercise_id, analysis, notes=None):
+    """Insert the analysis as a PatientExerciseProgress row and return its progress_id."""
+    summary = (
+        f"Pose analysis: {analysis['repetitions']} reps on {analysis['joint'].replace('_', ' ')}, "
+        f"form score {analysis['form_score']}"
+    )
+    cursor.execute(
+        """INSERT INTO PatientExerciseProgress
+            (patient_id, plan_exercise_id, completion_date, sets_completed,
+             repetitions_completed, duration_seconds, form_score, notes)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+        (patient_id, plan_exercise_id, datetime.date.today(), len(analysis["sets"]),
+         analysis["repetitions"], int(round(analysis["duration_seconds"])),
+         analysis["form_score"], f"{notes}\n{summary}" if notes else summary)
+    )
+    return cursor.lastrowid
@@ -0,0 +1,221 @@
+import contextlib
+import importlib.util
+import os
+import shutil
+import statistics
+import time
+
+from connections.logs import get_logger
+
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "auto").lower()
+INFERENCE_IMGSZ = int(os.getenv("INFERENCE_IMGSZ", 640))
+INFERENCE_INT8 = os.getenv("INFERENCE_INT8", "0").lower() in ("1", "true", "yes")
+INFERENCE_INT8_DATA = os.getenv("INFERENCE_INT8_DATA", "")
+INFERENCE_BENCHMARK_RUNS = int(os.getenv("INFERENCE_BENCHMARK_RUNS", 10))
+# Static batch of the ONNX/OpenVINO exports: big enough for a full micro-batch (INFERENCE_MAX_BATCH)
+# and a video chunk (INFERENCE_VIDEO_CHUNK). Smaller calls are padded, larger ones split.
+INFERENCE_EXPORT_BATCH = int(os.getenv(
+    "INFERENCE_EXPORT_BATCH",
+    max(int(os.getenv("INFERENCE_MAX_BATCH", 8)), int(os.getenv("INFERENCE_VIDEO_CHUNK", 16)))
+))
+
+# Runtime package each backend needs installed.
+BACKENDS = {
+    "torch": "torch",
+    "onnx": "onnxruntime",
+    "openvino": "openvino",
+}
+
+backend_report = {}
+
+logger = get_logger("inference.runtime")
+
+
+def available_backends():
+    return [name for name, package in BACKENDS.items() if importlib.util.find_spec(package) is not None]
+
+
+def candidate_backends(requested=INFERENCE_BACKEND):
+    """With "auto" every installed runtime is tried; otherwise only the named one."""
+    if requested == "auto":
+        return available_backends()
+    if requested not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {requested}")
+    return [requested]
+
+
+@contextlib.contextmanager
+def export_lock(weights):
+    """
+    Exclusive lock for exporting `weights`. Pool workers start together and would otherwise
+    export to (and replace) the same paths at the same time.
+    """
+    import fcntl
+
+    with open(f"{os.path.splitext(weights)[0]}.export.lock", "w") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def is_current(path, weights):
+    """An export is reused only while it is newer than its weights, so a retrained file is re-exported."""
+    return os.path.exists(path) and (not os.path.exists(weights) or os.path.getmtime(path) >= os.path.getmtime(weights))
+
+
+def replace_export(exported, path):
+    """Move an export from the name ultralytics gives it to `path`, replacing a stale one."""
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.replace(exported, path)
+    return path
+
+
+def export_model(weights, backend, imgsz=INFERENCE_IMGSZ, int8=INFERENCE_INT8, batch=INFERENCE_EXPORT_BATCH):
+    """
+    Export `weights` for `backend` with a static batch x imgsz x imgsz input and return the
+    path to load. Exports are written next to the weights with the batch and size in their
+    name, and reused until the weights change; other settings get their own export.
+
+    INT8 uses OpenVINO's post-training quantization (calibrated on INFERENCE_INT8_DATA)
+    or ONNX Runtime dynamic quantization of the float export.
+    """
+    if backend == "torch":
+        return weights
+
+    from ultralytics import YOLO
+
+    stem, _ = os.path.splitext(weights)
+    stem = f"{stem}_{imgsz}_b{batch}"
+    started = time.perf_counter()
+
+    if backend == "onnx":
+        path = f"{stem}.onnx"
+        if not is_current(path, weights):
+            exported = YOLO(weights).export(format="onnx", imgsz=imgsz, batch=batch, dynamic=False)
+            replace_export(exported, path)
+            logger.info("model_exported", weights=weights, backend="onnx", batch=batch, imgsz=imgsz,
+                        seconds=round(time.perf_counter() - started, 1))
+        if not int8:
+            return path
+
+        quantized = f"{stem}_int8.onnx"
+        if not is_current(quantized, path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantize_dynamic(path, quantized, weight_type=QuantType.QUInt8)
+            logger.info("model_quantized", path=path, seconds=round(time.perf_counter() - started, 1))
+        return quantized
+
+    # ultralytics recognises an OpenVINO model by the _openvino_model suffix.
+    path = f"{stem}{'_int8' if int8 else ''}_openvino_model"
+    if is_current(path, weights):
+        return path
+
+    options = {"format": "openvino", "imgsz": imgsz, "batch": batch, "dynamic": False}
+    if int8:
+        options["int8"] = True
+        if INFERENCE_INT8_DATA:
+            options["data"] = INFERENCE_INT8_DATA
+    replace_export(YOLO(weights).export(**options), path)
+    logger.info("model_exported", weights=weights, backend="openvino", int8=int8, batch=batch, imgsz=imgsz,
+                seconds=round(time.perf_counter() - started, 1))
+    return path
+
+
+def run_batch(model, frames, **options):
+    """
+    model.predict over `frames`. Fixed-batch exports only accept exactly their batch, so
+    frames go through in full batches, the last one padded with blank frames whose results
+    are dropped.
+    """
+    batch = getattr(model, "export_batch", None)
+    if not batch:
+        return list(model.predict(frames, **options))
+
+    import numpy as np
+
+    blank = np.zeros((32, 32, 3), dtype=np.uint8)
+    results = []
+    for start in range(0, len(frames), batch):
+        chunk = list(frames[start:start + batch])
+        results.extend(list(model.predict(chunk + [blank] * (batch - len(chunk)), **options))[:len(chunk)])
+    return results
+
+
+def measure_latency(model, imgsz=INFERENCE_IMGSZ, batch=INFERENCE_EXPORT_BATCH, runs=INFERENCE_BENCHMARK_RUNS):
+    """
+    Median latency in milliseconds of one `batch`-frame call on blank frames, after one
+    warm-up call. Timing full batches is what tells the backends apart under micro-batching.
+    """
+    import numpy as np
+
+    frames = [np.zeros((imgsz, imgsz, 3), dtype=np.uint8)] * batch
+    run_batch(model, frames, imgsz=imgsz, verbose=False)
+
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        run_batch(model, frames, imgsz=imgsz, verbose=False)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def load_fastest_model(weights, requested=INFERENCE_BACKEND, imgsz=INFERENCE_IMGSZ, int8=INFERENCE_INT8,
+                       batch=INFERENCE_EXPORT_BATCH):
+    """
+    Export and time `weights` on every candidate backend, keep the fastest one loaded,
+    and record each backend's latency (or failure) in backend_report[weights].
+    """
+    from ultralytics import YOLO
+
+    candidates = candidate_backends(requested)
+    report = {"imgsz": imgsz, "int8": int8, "batch": batch, "backends": {}, "selected": None}
+    backend_report[weights] = report
+
+    best = None
+    for backend in candidates:
+        try:
+            with export_lock(weights):
+                path = export_model(weights, backend, imgsz, int8 and backend != "torch", batch)
+            model = YOLO(path)
+            model.export_batch = batch if backend != "torch" else None
+            latency = measure_latency(model, imgsz, batch)
+            report["backends"][backend] = {
+                "path": path, "batch_latency_ms": round(latency, 2), "latency_ms": round(latency / batch, 2)
+            }
+            logger.info("backend_measured", weights=weights, backend=backend, batch=batch, imgsz=imgsz,
+                        batch_latency_ms=round(latency, 2))
+
+            if best is None or latency < best[0]:
+                best = (latency, backend, model)
+        except Exception as e:
+            logger.warning("backend_unavailable", weights=weights, backend=backend, error=str(e))
+            report["backends"][backend] = {"error": str(e)}
+
+    if best is None:
+        raise RuntimeError(f"No inference backend could load {weights}: {report['backends']}")
+
+    report["selected"] = best[1]
+    return best[2]
+
+
+def get_backend_report():
+    return backend_report
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Export a YOLO model and compare CPU inference backends")
+    parser.add_argument("weights", nargs="?", default=os.getenv("INFERENCE_MODEL", "yolov8n.pt"))
+    parser.add_argument("--backend", default="auto", choices=["auto"] + list(BACKENDS))
+    parser.add_argument("--imgsz", type=int, default=INFERENCE_IMGSZ)
+    parser.add_argument("--int8", action="store_true", default=INFERENCE_INT8)
+    parser.add_argument("--batch", type=int, default=INFERENCE_EXPORT_BATCH)
+    args = parser.parse_args()
+
+    load_fastest_model(args.weights, args.backend, args.imgsz, args.int8, args.batch)
+    print(json.dumps(backend_report, indent=2))
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import os
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from connections.logs import get_logger
+from inference.detector import INFERENCE_CONFIDENCE, InferenceBusy, decode_image
+
+INFERENCE_STREAM_MAX_AGE = float(os.getenv("INFERENCE_STREAM_MAX_AGE_MS", 500)) / 1000
+INFERENCE_STREAM_MAX_FRAME_BYTES = int(os.getenv("INFERENCE_STREAM_MAX_FRAME_BYTES", 512 * 1024))
+
+logger = get_logger("inference.stream")
+
+
+class PoseStream:
+    """
+    One live exercise session over a WebSocket.
+
+    The phone sends compressed frames (JPEG/WebP) as binary messages. Only the newest
+    frame is kept: anything that arrives while the previous one is being analysed
+    replaces it, and frames older than INFERENCE_STREAM_MAX_AGE_MS are dropped, so the
+    session never builds a backlog. Each analysed frame is answered with its keypoints
+    as a small JSON message instead of a rendered image.
+
+    Text messages: {"type": "config", "confidence": 0.5}, {"type": "ping"}.
+    """
+
+    def __init__(self, websocket: WebSocket, batcher, confidence=INFERENCE_CONFIDENCE):
+        self.websocket = websocket
+        self.batcher = batcher
+        self.confidence = confidence
+        self.latest = None
+        self.frame_ready = asyncio.Event()
+        self.received = 0
+        self.analysed = 0
+        self.skipped = 0
+
+    async def serve(self):
+        await self.websocket.accept()
+        analyser = asyncio.create_task(self._analyse())
+        try:
+            await self._receive()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            analyser.cancel()
+            await asyncio.gather(analyser, return_exceptions=True)
+
+    def stats(self):
+        return {"received": self.received, "analysed": self.analysed, "skipped": self.skipped}
+
+    async def _receive(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await self.websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+            data = message.get("bytes")
+            if data is not None:
+                if len(data) > INFERENCE_STREAM_MAX_FRAME_BYTES:
+                    await self.websocket.send_json({"type": "error", "detail": "Frame too large"})
+                    continue
+                self.received += 1
+                if self.latest is not None:
+                    self.skipped += 1
+                self.latest = (self.received, loop.time(), data)
+                self.frame_ready.set()
+                continue
+
+            try:
+                event = json.loads(message.get("text") or "")
+            except ValueError:
+                await self.websocket.send_json({"type": "error", "detail": "Invalid JSON"})
+                continue
+
+            kind = event.get("type") if isinstance(event, dict) else None
+            if kind == "config":
+                try:
+                    confidence = float(event.get("confidence", self.confidence))
+                except (TypeError, ValueError):
+                    confidence = -1
+                if not 0 <= confidence <= 1:
+                    await self.websocket.send_json({"type": "error", "detail": "confidence must be between 0 and 1"})
+                    continue
+                self.confidence = confidence
+                await self.websocket.send_json({"type": "config", "confidence": self.confidence})
+            elif kind == "ping":
+                await self.websocket.send_json({"type": "pong", **self.stats()})
+            else:
+                await self.websocket.send_json({"type": "error", "detail": f"Unknown event type: {kind}"})
+
+    async def _analyse(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.frame_ready.wait()
+            self.frame_ready.clear()
+            if self.latest is None:
+                continue
+            sequence, received_at, data = self.latest
+            self.latest = None
+
+            if loop.time() - received_at > INFERENCE_STREAM_MAX_AGE:
+                self.skipped += 1
+                continue
+
+            frame = await asyncio.to_thread(decode_image, data)
+            if frame is None:
+                await self.websocket.send_json({"type": "error", "frame": sequence, "detail": "Could not decode frame"})
+                continue
+
+            try:
+                result = await self.batcher.detect(frame, self.confidence)
+            except InferenceBusy:
+                self.skipped += 1
+                await self.websocket.send_json({"type": "busy", "frame": sequence})
+                continue
+            except Exception as e:
+                logger.warning("pose_frame_failed", frame=sequence, error=str(e))
+                await self.websocket.send_json({"type": "error", "frame": sequence, "detail": "Inference failed"})
+                continue
+
+            self.analysed += 1
+            await self.websocket.send_json({
+                "type": "pose",
+                "frame": sequence,
+                "size": result["size"],
+                "people": [
+                    {
+                        "bbox": annotation["bbox"],
+                        "confidence": annotation["confidence"],
+                        "keypoints": annotation.get("keypoints", []),
+                    }
+                    for annotation in result["annotations"]
+                ],
+                "latency_ms": round((loop.time() - received_at) * 1000, 1),
+                "skipped": self.skipped,
+            })
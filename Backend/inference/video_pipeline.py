@@ -0,0 +1,380 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from connections.logs import get_logger
+from inference.cache import cache_key, file_digest, inference_cache
+from inference.detector import INFERENCE_CONFIDENCE, INFERENCE_DEVICE, INFERENCE_MODEL, predict_frames
+from inference.worker_pool import _init_worker, torch_threads_per_worker
+
+INFERENCE_VIDEO_WORKERS = int(os.getenv("INFERENCE_VIDEO_WORKERS", max(1, (os.cpu_count() or 1) // 2)))
+INFERENCE_VIDEO_SAMPLE_FPS = float(os.getenv("INFERENCE_VIDEO_SAMPLE_FPS", 5))
+INFERENCE_VIDEO_CHUNK = int(os.getenv("INFERENCE_VIDEO_CHUNK", 16))
+# Times a video is resubmitted after its worker died before it is left as failed.
+INFERENCE_VIDEO_MAX_RETRIES = int(os.getenv("INFERENCE_VIDEO_MAX_RETRIES", 2))
+INFERENCE_VIDEO_CHECKPOINT_DIR = os.getenv(
+    "INFERENCE_VIDEO_CHECKPOINT_DIR",
+    str(Path(__file__).resolve().parent.parent / "uploads" / "checkpoints")
+)
+
+# Mean absolute difference (0-1) between consecutive sampled frames, on a downscaled grey image.
+MOTION_HIGH = 0.04
+MOTION_LOW = 0.01
+
+logger = get_logger("inference.video")
+
+
+def video_key(path):
+    """Stable id for a video file; the same file resumes under the same checkpoint and annotation ids."""
+    path = os.path.abspath(path)
+    return hashlib.sha1(f"{path}:{os.path.getsize(path)}".encode()).hexdigest()[:16]
+
+
+def checkpoint_path(key):
+    return os.path.join(INFERENCE_VIDEO_CHECKPOINT_DIR, f"{key}.json")
+
+
+def load_checkpoint(key):
+    try:
+        with open(checkpoint_path(key)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def save_checkpoint(key, state):
+    """Write the checkpoint atomically so a crash mid-write never leaves a corrupt file."""
+    os.makedirs(INFERENCE_VIDEO_CHECKPOINT_DIR, exist_ok=True)
+    temporary = f"{checkpoint_path(key)}.tmp"
+    with open(temporary, "w") as f:
+        json.dump({**state, "updated_at": time.time()}, f)
+    os.replace(temporary, checkpoint_path(key))
+
+
+def pending_checkpoints():
+    if not os.path.isdir(INFERENCE_VIDEO_CHECKPOINT_DIR):
+        return []
+    states = []
+    for name in os.listdir(INFERENCE_VIDEO_CHECKPOINT_DIR):
+        if name.endswith(".json"):
+            state = load_checkpoint(name[:-len(".json")])
+            if state and not state.get("done"):
+                states.append(state)
+    return states
+
+
+def owned_by(state, user_id, user_type):
+    """Therapist and app user ids overlap, so a video belongs to a (user_id, user_type) pair."""
+    return state.get("user_id") == user_id and state.get("user_type", "user") == user_type
+
+
+def motion_score(previous, frame):
+    """How much changed between two frames, measured on every 8th pixel in greyscale."""
+    import numpy as np
+
+    current = frame[::8, ::8].mean(axis=2, dtype=np.float32)
+    if previous is None or previous.shape != current.shape:
+        return current, None
+    return current, float(np.abs(current - previous).mean() / 255)
+
+
+def sample_frames(capture, start_frame, stride, fps):
+    """
+    Yield (frame_index, frame, stride) from `start_frame` on, reading every `stride`-th frame.
+
+    The stride adapts to the video: it halves while consecutive samples differ a lot (the
+    patient is moving) and doubles while they barely change, within a quarter to four times
+    the stride that gives INFERENCE_VIDEO_SAMPLE_FPS. Skipped frames are only grabbed, not
+    converted, which is much cheaper than reading them.
+    """
+    import cv2
+
+    base_stride = max(1, int(round(fps / INFERENCE_VIDEO_SAMPLE_FPS)))
+    min_stride, max_stride = max(1, base_stride // 4), base_stride * 4
+    stride = min(max(stride or base_stride, min_stride), max_stride)
+
+    if start_frame:
+        capture.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    index = start_frame
+    previous = None
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            return
+        yield index, frame, stride
+
+        previous, motion = motion_score(previous, frame)
+        if motion is not None:
+            if motion > MOTION_HIGH:
+                stride = max(min_stride, stride // 2)
+            elif motion < MOTION_LOW:
+                stride = min(max_stride, stride * 2)
+
+        for _ in range(stride - 1):
+            if not capture.grab():
+                return
+        index += stride
+
+
+def store_annotations(collection, documents):
+    """Insert a chunk's annotations; ids are deterministic, so a chunk re-run after a crash is skipped."""
+    from pymongo.errors import BulkWriteError
+
+    try:
+        collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+
+
+def analyze_video(path, user_id=None, model_name=INFERENCE_MODEL, confidence=INFERENCE_CONFIDENCE,
+                  device=INFERENCE_DEVICE):
+    """
+    Run one video through the model in a worker process, resuming from its checkpoint.
+
+    Sampled frames are batched INFERENCE_VIDEO_CHUNK at a time into one predict call; each
+    frame becomes one document in the Mongo `annotations` collection (the shape
+    serialize_document reads, plus video/frame fields). The checkpoint is advanced only
+    after a chunk is stored.
+    """
+    import cv2
+    from connections.mongo_db import get_Mongo_db
+
+    key = video_key(path)
+    state = load_checkpoint(key) or {}
+    if state.get("done"):
+        return state
+
+    state = {
+        "video_id": key, "path": os.path.abspath(path), "user_id": user_id, "user_type": "user",
+        "model": model_name, "confidence": confidence, "next_frame": 0, "stride": None, "frames_analysed": 0,
+        "done": False, **state
+    }
+
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video {path}")
+
+    try:
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        state["total_frames"] = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        collection = get_Mongo_db("annotations")
+        started = time.perf_counter()
+
+        chunk = []
+
+        def flush(next_frame, stride):
+            detections = predict_frames(model_name, device, [frame for _, frame in chunk], [confidence] * len(chunk))
+            now = datetime.datetime.now()
+            store_annotations(collection, [
+                {
+                    "_id": f"{key}:{index}",
+                    "user_id": user_id,
+                    "user_type": state["user_type"],
+                    "image": f"{os.path.basename(path)}#t={index / fps:.2f}",
+                    "save_location": state["path"],
+                    "timestamp": now,
+                    "status": "completed",
+                    "video_id": key,
+                    "frame": index,
+                    **{field: value for field, value in detection.items() if field != "batch_size"},
+                }
+                for (index, _), detection in zip(chunk, detections)
+            ])
+            state.update(next_frame=next_frame, stride=stride, frames_analysed=state["frames_analysed"] + len(chunk))
+            save_checkpoint(key, state)
+            chunk.clear()
+
+        for index, frame, stride in sample_frames(capture, state["next_frame"], state["stride"], fps):
+            chunk.append((index, frame))
+            if len(chunk) >= INFERENCE_VIDEO_CHUNK:
+                flush(index + stride, stride)
+        if chunk:
+            flush(chunk[-1][0] + 1, state["stride"])
+
+        state["done"] = True
+        save_checkpoint(key, state)
+        logger.info("video_analysed", video_id=key, frames=state["frames_analysed"],
+                    seconds=round(time.perf_counter() - started, 1))
+        return state
+    finally:
+        capture.release()
+
+
+class VideoPipeline:
+    """
+    Background analysis of uploaded videos on a process pool, one video per worker at a time,
+    so long videos use every core without touching the web workers.
+
+    Jobs are tracked by checkpoint files: whatever is unfinished after a restart is queued
+    again by resume(), and jobs lost to a crashed worker are resubmitted straight away.
+    Both resume where the checkpoint stopped.
+    """
+
+    def __init__(self, workers=INFERENCE_VIDEO_WORKERS, model_name=INFERENCE_MODEL, device=INFERENCE_DEVICE):
+        self.workers = workers
+        self.model_name = model_name
+        self.device = device
+        self._executor = None
+        self._loop = None
+        self._jobs = {}
+        self._retries = {}
+        self._resume_lock = None
+
+    def start(self):
+        if self._executor is not None:
+            return
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+        context = multiprocessing.get_context("spawn")
+        threads = torch_threads_per_worker(self.workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.model_name, None, threads, False, context.Value("i", 0))
+        )
+        logger.info("video_pipeline_started", workers=self.workers, torch_threads=threads)
+
+    def claim_resume(self):
+        """
+        True in only one process sharing the checkpoint directory: the one that gets its lock.
+        The lock is held until that process exits, so uvicorn's other workers don't resume too.
+        """
+        import fcntl
+
+        os.makedirs(INFERENCE_VIDEO_CHECKPOINT_DIR, exist_ok=True)
+        handle = open(os.path.join(INFERENCE_VIDEO_CHECKPOINT_DIR, ".resume.lock"), "w")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._resume_lock = handle
+        return True
+
+    def resume(self):
+        """Queue every unfinished checkpoint left by a previous run, skipping videos this process already has."""
+        for state in pending_checkpoints():
+            if state["video_id"] in self._jobs or not os.path.exists(state["path"]):
+                continue
+            logger.info("video_resumed", video_id=state["video_id"], next_frame=state["next_frame"])
+            self.submit(state["path"], state.get("user_id"), state.get("confidence", INFERENCE_CONFIDENCE),
+                        state.get("user_type", "user"))
+
+    def submit(self, path, user_id=None, confidence=INFERENCE_CONFIDENCE, user_type="user"):
+        """Queue a video for analysis and return its video_id; already queued videos are not queued twice."""
+        key = video_key(path)
+        job = self._jobs.get(key)
+        if job is not None and not job.done():
+            return key
+
+        if load_checkpoint(key) is None:
+            save_checkpoint(key, {
+                "video_id": key, "path": os.path.abspath(path), "user_id": user_id, "user_type": user_type,
+                "model": self.model_name,
+                "confidence": confidence, "next_frame": 0, "stride": None, "frames_analysed": 0, "done": False
+            })
+
+        self.start()
+        executor = self._executor
+        job = executor.submit(analyze_video, path, user_id, self.model_name, confidence, self.device)
+        job.add_done_callback(lambda finished: self._finished(key, finished, executor))
+        self._jobs[key] = job
+        return key
+
+    async def submit_cached(self, path, user_id=None, confidence=INFERENCE_CONFIDENCE, user_type="user"):
+        """
+        Like submit, but a video whose content this user already had analysed (or queued)
+        with the same model and threshold is not analysed again.
+        Returns (video_id, cached).
+        """
+        key = cache_key("video", await asyncio.to_thread(file_digest, path), self.model_name, confidence)
+        entry = await inference_cache.get(key)
+        if entry is not None:
+            state = self.status(entry["video_id"])
+            if state and owned_by(state, user_id, user_type) and state["status"] != "failed":
+                return entry["video_id"], True
+
+        video_id = self.submit(path, user_id, confidence, user_type)
+        inference_cache.put(key, {"video_id": video_id})
+        return video_id, False
+
+    def _finished(self, key, job, executor):
+        """Runs on the executor's thread when a job ends; recovery from a dead worker happens on the event loop."""
+        if job.cancelled():
+            return
+        error = job.exception()
+        if error is None:
+            self._retries.pop(key, None)
+            return
+        logger.error("video_failed", video_id=key, error=str(error))
+        if isinstance(error, BrokenProcessPool):
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._recover, key, executor)
+            else:
+                self._recover(key, executor)
+
+    def _recover(self, key, executor):
+        """Replace the pool `executor` (only if it is still the current one) and resubmit the lost job."""
+        if self._executor is executor:
+            self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        state = load_checkpoint(key)
+        if not state or state.get("done") or not os.path.exists(state["path"]):
+            return
+        retries = self._retries.get(key, 0)
+        if retries >= INFERENCE_VIDEO_MAX_RETRIES:
+            logger.error("video_abandoned", video_id=key, retries=retries)
+            return
+        self._retries[key] = retries + 1
+        self.submit(state["path"], state.get("user_id"), state.get("confidence", INFERENCE_CONFIDENCE),
+                    state.get("user_type", "user"))
+
+    def status(self, key):
+        state = load_checkpoint(key)
+        if state is None:
+            return None
+        job = self._jobs.get(key)
+        running = job is not None and not job.done()
+        error = job.exception() if job is not None and job.done() and not job.cancelled() else None
+        return {
+            **state,
+            "status": "completed" if state.get("done") else "failed" if error else "processing" if running else "queued",
+            "error": str(error) if error else None,
+        }
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+video_pipeline = VideoPipeline()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analyse exercise videos and store frame annotations in MongoDB")
+    parser.add_argument("videos", nargs="+")
+    parser.add_argument("--user-id", type=int, default=None)
+    parser.add_argument("--confidence", type=float, default=INFERENCE_CONFIDENCE)
+    args = parser.parse_args()
+
+    with ProcessPoolExecutor(max_workers=min(INFERENCE_VIDEO_WORKERS, len(args.videos)),
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        for summary in executor.map(analyze_video, args.videos, [args.user_id] * len(args.videos),
+                                    [INFERENCE_MODEL] * len(args.videos), [args.confidence] * len(args.videos)):
+            print(json.dumps({field: summary[field] for field in ("path", "frames_analysed", "done")}))
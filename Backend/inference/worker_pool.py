@@ -0,0 +1,159 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+
+from connections.logs import get_logger
+
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 0))
+INFERENCE_TORCH_THREADS = int(os.getenv("INFERENCE_TORCH_THREADS", 0))
+INFERENCE_PIN_CPUS = os.getenv("INFERENCE_PIN_CPUS", "0").lower() in ("1", "true", "yes")
+
+logger = get_logger("inference.pool")
+
+
+def torch_threads_per_worker(workers):
+    """Split the machine's cores between workers unless INFERENCE_TORCH_THREADS says otherwise."""
+    if INFERENCE_TORCH_THREADS > 0:
+        return INFERENCE_TORCH_THREADS
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _init_worker(model_name, version, threads, pin_cpus, counter):
+    """
+    Runs once in each worker process: cap torch/OpenMP threads so workers don't
+    oversubscribe the CPU, optionally pin the worker to its own cores, then load the model.
+    """
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = str(threads)
+
+    if pin_cpus and hasattr(os, "sched_setaffinity"):
+        with counter.get_lock():
+            index = counter.value
+            counter.value += 1
+        cpus = sorted(os.sched_getaffinity(0))
+        start = (index * threads) % len(cpus)
+        os.sched_setaffinity(0, set(cpus[start:start + threads]) or set(cpus))
+
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+    from inference.detector import load_model
+    load_model(model_name, version)
+
+
+def pack_frames(frames):
+    """
+    Copy a batch of uint8 frames into one shared-memory block.
+    Returns the block and each frame's (offset, shape) so a worker can map them without pickling pixels.
+    """
+    import numpy as np
+
+    frames = [np.ascontiguousarray(frame, dtype=np.uint8) for frame in frames]
+    shm = SharedMemory(create=True, size=max(1, sum(frame.nbytes for frame in frames)))
+
+    layout = []
+    offset = 0
+    for frame in frames:
+        np.ndarray(frame.shape, dtype=np.uint8, buffer=shm.buf, offset=offset)[:] = frame
+        layout.append((offset, frame.shape))
+        offset += frame.nbytes
+
+    return shm, layout
+
+
+def predict_shared(model_name, version, device, shm_name, layout, thresholds):
+    """Worker side of the handoff: view the frames in place and run one predict call over them."""
+    import numpy as np
+    from inference.detector import predict_frames
+
+    # The web process owns the block and unlinks it once the result is back.
+    shm = SharedMemory(name=shm_name)
+    try:
+        frames = [np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=offset) for offset, shape in layout]
+        detections = predict_frames(model_name, device, frames, thresholds, version)
+        del frames
+        return detections
+    finally:
+        shm.close()
+
+
+def warm_worker(model_name, version):
+    """
+    Dummy inference in one worker. The short pause keeps this worker busy so
+    concurrent warm-up calls land on different workers.
+    """
+    import time
+    from inference.detector import warm_model
+
+    latency = warm_model(model_name, version)
+    time.sleep(0.2)
+    return latency
+
+
+class InferencePool:
+    """
+    Process pool that keeps YOLO out of the web workers.
+    Each worker loads the model once; frames travel through shared memory and only
+    the small detection dicts are pickled back.
+    """
+
+    def __init__(self, model_name, device, workers=INFERENCE_WORKERS, pin_cpus=INFERENCE_PIN_CPUS, version=None):
+        self.model_name = model_name
+        self.version = version
+        self.device = device
+        self.workers = workers
+        self.threads = torch_threads_per_worker(workers)
+        self.pin_cpus = pin_cpus
+        self._executor = None
+
+    def start(self):
+        if self._executor is None:
+            context = multiprocessing.get_context("spawn")
+            worker_counter = context.Value("i", 0)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.model_name, self.version, self.threads, self.pin_cpus, worker_counter)
+            )
+            logger.info("inference_pool_started", model=self.model_name, workers=self.workers, torch_threads=self.threads)
+
+    async def predict(self, frames, thresholds):
+        self.start()
+        shm, layout = pack_frames(frames)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, predict_shared,
+                self.model_name, self.version, self.device, shm.name, layout, thresholds
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool on the next batch.
+            self.close()
+            raise
+        finally:
+            shm.close()
+            shm.unlink()
+
+    async def warm(self):
+        """Start every worker (loading the model) and run a blank frame through each of them."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, warm_worker, self.model_name, self.version) for _ in range(self.workers)
+        ))
+
+    async def backend_report(self):
+        """Backend latencies measured by one of the workers when it loaded the model."""
+        from inference.runtime import get_backend_report
+
+        self.start()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, get_backend_report)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
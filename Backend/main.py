@@ -1,6 +1,10 @@
+import time
+_boot_started = time.perf_counter()
+
 from connections.mysql_database import *
 from connections.functions import *
 from connections.routes import *
 
 
-Routes()
\ No newline at end of file
+Routes()
+app.state.startup_report = startup_report(_boot_started)
@@ -105,12 +105,15 @@ CREATE TABLE `Messages` (
   `content` text COLLATE utf8mb4_general_ci NOT NULL,
   `is_read` tinyint(1) DEFAULT '0',
   `created_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  `updated_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
   PRIMARY KEY (`message_id`),
   KEY `recipient_id` (`recipient_id`,`is_read`),
   KEY `created_at` (`created_at`),
   KEY `idx_messages_sender` (`sender_id`,`sender_type`),
   KEY `idx_messages_recipient` (`recipient_id`,`recipient_type`),
   KEY `idx_messages_read_status` (`is_read`),
+  KEY `idx_messages_recipient_sync` (`recipient_id`,`recipient_type`,`updated_at`),
+  KEY `idx_messages_sender_sync` (`sender_id`,`sender_type`,`updated_at`),
   CONSTRAINT `Messages_ibfk_1` FOREIGN KEY (`sender_id`) REFERENCES `Therapists` (`id`) ON DELETE CASCADE,
   CONSTRAINT `Messages_ibfk_2` FOREIGN KEY (`recipient_id`) REFERENCES `Therapists` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB AUTO_INCREMENT=19 DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
@@ -132,6 +135,7 @@ CREATE TABLE `PatientExerciseProgress` (
   `duration_seconds` int DEFAULT NULL,
   `pain_level` int DEFAULT NULL,
   `difficulty_level` int DEFAULT NULL,
+  `form_score` decimal(5,2) DEFAULT NULL,
   `notes` text COLLATE utf8mb4_general_ci,
   `created_at` timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
   PRIMARY KEY (`progress_id`),